@@ -45,6 +45,164 @@ EXPLICIT_WAIT = 20  # секунды
 # Screenshot Configuration
 SCREENSHOT_DIR = 'screenshots'
 SCREENSHOT_ON_FAILURE = True
+# Пошаговые скриншоты (take_screenshot); можно отключить при записи видео
+STEP_SCREENSHOTS = os.getenv('E2E_STEP_SCREENSHOTS', '1') != '0'
+
+# Video Recording Configuration
+RECORD_VIDEO = os.getenv('E2E_RECORD_VIDEO', '0') == '1'
+VIDEO_DIR = 'videos'
+VIDEO_TIME_LIMIT = 1800  # секунды, максимум для Android
+VIDEO_BIT_RATE = 2000000  # бит/с; ниже стандартных 4 Мбит/с - меньше нагрузка на устройство
+VIDEO_SIZE = os.getenv('E2E_VIDEO_SIZE', '720x1280')
+
+# Logcat Configuration (кольцевой буфер логов приложения)
+LOGCAT_CAPTURE = os.getenv('E2E_LOGCAT', '1') != '0'
+LOGCAT_BUFFER_SIZE = 5000  # строк
+LOGCAT_MAX_LINE = 1000  # символов в строке
+LOGCAT_POLL_INTERVAL = 1.0  # секунды
+LOGCAT_TAGS = ['ReactNativeJS', 'ReactNative', 'AndroidRuntime', 'Expo', 'ExpoModulesCore', 'unknown:ReactNative']
+
+# KPI Configuration (замеры задержек экранов)
+KPI_ITERATIONS = int(os.getenv('E2E_KPI_ITERATIONS', '10'))
+KPI_POLL_INTERVAL = 0.05  # секунды между проверками готовности экрана
+KPI_TOLERANCE = 0.2  # допустимое ухудшение относительно baseline (20%)
+KPI_RESULTS_FILE = 'kpi_results.json'
+KPI_BASELINE_FILE = 'kpi_baseline.json'
+
+# App Start Benchmark Configuration
+APP_START_RESULTS_FILE = 'app_start_results.json'
+APP_START_HISTORY_FILE = 'app_start_history.jsonl'
+APP_START_CHART_FILE = 'app_start_trend.svg'
+
+# Frame Jank Configuration
+JANK_MAX_PERCENT = float(os.getenv('E2E_JANK_MAX_PERCENT', '20'))  # допустимая доля janky-кадров при жесте
+
+# Resource Sampling Configuration (память и CPU приложения)
+RESOURCE_SAMPLING = os.getenv('E2E_SAMPLE_RESOURCES', '0') == '1'
+RESOURCE_SAMPLE_INTERVAL = float(os.getenv('E2E_RESOURCE_INTERVAL', '2.0'))  # секунды
+LEAK_MIN_GROWTH_KB = 5 * 1024  # рост PSS за серию итераций, с которого считаем утечку
+LEAK_MIN_GROWTH_PERCENT = 5.0
+LEAK_MIN_R2 = 0.6  # рост должен быть устойчивым, а не шумом
+LEAK_ITERATIONS = int(os.getenv('E2E_LEAK_ITERATIONS', '50'))
+
+# List Navigation (прокрутка виртуализированных списков)
+LIST_MAX_GESTURES = 30  # жестов на поиск одного элемента
+LIST_SWIPE_DURATION_MS = 600  # медленный жест без инерции
+
+# Element Cache (хендлы WebElement до смены экрана)
+ELEMENT_CACHE = os.getenv('E2E_ELEMENT_CACHE', '1') != '0'
+
+# Session Watchdog (heartbeat сессии Appium между тестами)
+SESSION_WATCHDOG = os.getenv('E2E_SESSION_WATCHDOG', '1') != '0'
+SESSION_HEARTBEAT_TIMEOUT = float(os.getenv('E2E_HEARTBEAT_TIMEOUT', '10'))  # секунды
+SESSION_MAX_RECREATIONS = int(os.getenv('E2E_MAX_SESSION_RECREATIONS', '3'))  # за прогон
+
+# Screen Router (переходы между экранами по графу)
+ROUTER_COSTS_FILE = os.getenv('E2E_ROUTER_COSTS', 'navigation_costs.json')  # измеренные стоимости переходов
+ROUTER_COST_ALPHA = 0.3  # вес нового замера в EWMA
+ROUTER_MAX_REPLANS = 3
+# Deep links: "ProfilePage=foodapp://profile,MainPage=foodapp://main" (нужен linking в NavigationContainer)
+DEEP_LINKS = dict(
+    item.split('=', 1) for item in os.getenv('E2E_DEEP_LINKS', '').split(',') if '=' in item
+)
+
+# Catalogue Scaling (большой каталог в заглушке бэкенда, см. utilities/catalog_scaling.py)
+CATALOG_SIZES = tuple(int(n) for n in os.getenv('E2E_CATALOG_SIZES', '1000,10000,100000').split(','))  # продуктов
+CATALOG_TARGET_INDEX = int(os.getenv('E2E_CATALOG_TARGET_INDEX', '100'))  # элемент N для time-to-item
+CATALOG_PAGE_SIZE = 20  # size запроса ProductStore
+CATALOG_MAX_EXPONENT = float(os.getenv('E2E_CATALOG_MAX_EXPONENT', '0.3'))  # показатель роста времени от размера каталога
+CATALOG_MAX_EXTRA_PAGES = int(os.getenv('E2E_CATALOG_MAX_EXTRA_PAGES', '1'))  # страниц сверх нужных для элемента N
+
+# Image Cache (заглушка картинок продуктов, см. utilities/image_stub.py)
+IMAGE_STUB_PORT = int(os.getenv('E2E_IMAGE_STUB_PORT', '8081'))
+IMAGE_STUB_PUBLIC_HOST = os.getenv('E2E_IMAGE_STUB_PUBLIC_HOST', '10.0.2.2')  # адрес этой машины с устройства (10.0.2.2 - эмулятор)
+IMAGE_STUB_SIZE = (320, 320)  # px, картинка карточки продукта
+IMAGE_STUB_MAX_AGE = 86400  # Cache-Control: max-age, секунды
+IMAGE_CATALOG_SIZE = 40  # продуктов с картинками для прокрутки
+IMAGE_MIN_HIT_RATIO = float(os.getenv('E2E_IMAGE_MIN_HIT_RATIO', '0.9'))  # повторных показов без запроса
+IMAGE_MAX_DUPLICATE_PERCENT = float(os.getenv('E2E_IMAGE_MAX_DUPLICATE_PERCENT', '5'))  # повторных загрузок от числа URL
+
+# Media Fixtures (изображения в галерее устройства для анализа фото, см. utilities/media_fixtures.py)
+MEDIA_REMOTE_DIR = os.getenv('E2E_MEDIA_DIR', '/sdcard/Pictures/e2e')
+MEDIA_CACHE_DIR = 'media_fixtures'  # сгенерированные и уменьшенные изображения между прогонами
+MEDIA_SOURCE_DIR = os.getenv('E2E_MEDIA_SOURCE')  # свои фото вместо синтетических
+MEDIA_FIXTURE_COUNT = int(os.getenv('E2E_MEDIA_COUNT', '12'))
+MEDIA_FIXTURE_SIZE = tuple(int(side) for side in os.getenv('E2E_MEDIA_SIZE', '3024x4032').split('x'))  # как у камеры 12 Мп
+MEDIA_FIXTURE_QUALITY = 92  # JPEG-качество исходных снимков
+# Пределы загрузки на /meal_element/analyze-photo: приложение сжимает снимок с quality 0.8
+MEDIA_MAX_UPLOAD_KB = int(os.getenv('E2E_MEDIA_MAX_UPLOAD_KB', '2048'))  # изображение без base64
+MEDIA_MAX_UPLOAD_SIDE = int(os.getenv('E2E_MEDIA_MAX_UPLOAD_SIDE', '4032'))  # px
+MEDIA_MAX_UPLOAD_QUALITY = 85  # оценка JPEG-качества по таблицам квантования
+
+# Network Profiles (условия сети на заглушке бэкенда, см. utilities/network_conditions.py)
+NETWORK_PROFILE = os.getenv('E2E_NETWORK_PROFILE')  # имя или список через запятую, то же, что --network-profile
+NETWORK_HANG_SECONDS = 35  # зависший запрос держится дольше таймаута axios (REQUEST_TIMEOUT = 30 с)
+NETWORK_PROFILES = {
+    'wifi': {'latency_ms': 20, 'jitter_ms': 5, 'down_kbps': 30000, 'up_kbps': 15000},
+    '4g': {'latency_ms': 60, 'jitter_ms': 20, 'down_kbps': 9000, 'up_kbps': 3000},
+    '3g': {'latency_ms': 200, 'jitter_ms': 80, 'down_kbps': 750, 'up_kbps': 250},
+    'edge': {'latency_ms': 650, 'jitter_ms': 200, 'down_kbps': 240, 'up_kbps': 100},
+    '3g-lossy': {'latency_ms': 200, 'jitter_ms': 150, 'down_kbps': 750, 'up_kbps': 250,
+                 'error_rate': 0.05, 'timeout_rate': 0.02},
+}
+
+# Network Idle (ожидание ответов бэкенда по журналу заглушки вместо пауз)
+NETWORK_IDLE_URL = os.getenv('E2E_NETWORK_IDLE_URL')  # заглушка в другом процессе, например http://localhost:8080
+NETWORK_IDLE_QUIET = float(os.getenv('E2E_NETWORK_IDLE_QUIET', '0.5'))  # секунд без запросов
+NETWORK_IDLE_POLL = 0.2  # секунды между опросами
+
+# Duration Scheduling (LPT-планировщик xdist по истории длительности тестов)
+DURATION_HISTORY_FILE = os.getenv('E2E_DURATION_HISTORY', 'durations.sqlite')
+DURATION_SCHEDULING = os.getenv('E2E_LPT', '0') == '1'  # то же, что --lpt
+DEVICE_CLASS = os.getenv('E2E_DEVICE_CLASS')  # None - платформа, устройство и версия ОС из capabilities
+DURATION_ALPHA = 0.3  # вес нового замера в EWMA
+DURATION_DEFAULT = 10.0  # секунд для теста без истории, пока история пуста
+
+# Streaming Report (results.jsonl + статический просмотрщик вместо self-contained HTML)
+REPORT_DIR = os.getenv('E2E_REPORT_DIR')  # None - отчет не пишется
+REPORT_THUMB_WIDTH = 240  # px
+REPORT_MAX_MB = int(os.getenv('E2E_REPORT_MAX_MB', '500'))  # полноразмерные скриншоты сверх этого не копируются
+REPORT_MAX_LOG_CHARS = int(os.getenv('E2E_REPORT_MAX_LOG_CHARS', '20000'))  # текст ошибки и каждой секции вывода
+
+# Visual Regression (сравнение скриншотов шагов с baseline)
+VISUAL_CHECK = os.getenv('E2E_VISUAL_CHECK', '0') == '1'
+VISUAL_BASELINE_DIR = os.getenv('E2E_VISUAL_BASELINE_DIR', 'visual_baselines')
+VISUAL_PENDING_DIR = os.getenv('E2E_VISUAL_PENDING_DIR', 'visual_pending')  # кандидаты в baseline
+VISUAL_WIDTH = 270  # ширина уменьшенного кадра, px
+VISUAL_TILE = 6  # сторона плитки, px уменьшенного кадра
+VISUAL_PIXEL_THRESHOLD = 12  # средняя разница яркости в плитке (0-255)
+VISUAL_TOLERANCE = float(os.getenv('E2E_VISUAL_TOLERANCE', '0.005'))  # доля отличающихся плиток
+VISUAL_HASH_DISTANCE = 6  # бит dHash для поиска baseline без точного имени
+
+# APK Install Cache (установка только при смене сборки, см. utilities/app_installer.py)
+APK_INSTALL_CACHE = os.getenv('E2E_APK_INSTALL_CACHE', '1') != '0'
+APK_INSTALL_MARKER_DIR = '/data/local/tmp'
+APK_INSTALL_TIMEOUT = float(os.getenv('E2E_APK_INSTALL_TIMEOUT', '120'))  # секунды
+APK_INSTALL_METRICS_FILE = os.getenv('E2E_APK_INSTALL_METRICS', 'install_metrics.json')
+
+# Distributed Runner (координатор раздает тесты агентам на нескольких машинах)
+DISTRIBUTED_PORT = int(os.getenv('E2E_COORDINATOR_PORT', '5555'))
+DISTRIBUTED_MAX_BATCH = int(os.getenv('E2E_DISTRIBUTED_BATCH', '4'))  # максимум тестов в одной выдаче
+DISTRIBUTED_RESULTS_FILE = os.getenv('E2E_DISTRIBUTED_RESULTS', 'distributed_results.json')
+DISTRIBUTED_JUNIT_FILE = os.getenv('E2E_DISTRIBUTED_JUNIT', 'distributed_junit.xml')
+DISTRIBUTED_ARTIFACTS_DIR = os.getenv('E2E_DISTRIBUTED_ARTIFACTS', 'distributed_artifacts')
+
+# Backend Load Generation (нагрузка на /my-food/* API)
+BACKEND_BASE_URL = os.getenv('E2E_BACKEND_BASE_URL', 'http://localhost:8080/my-food')
+LOAD_USERS = int(os.getenv('E2E_LOAD_USERS', '1000'))
+LOAD_CONCURRENCY = int(os.getenv('E2E_LOAD_CONCURRENCY', '100'))  # closed loop: одновременных пользователей
+LOAD_ARRIVAL_RATE = float(os.getenv('E2E_LOAD_RATE', '50'))  # open loop: новых пользователей в секунду
+LOAD_POOL_SIZE = int(os.getenv('E2E_LOAD_POOL_SIZE', '100'))  # соединений в пуле
+LOAD_REQUEST_TIMEOUT = 30  # секунды
+LOAD_RESULTS_FILE = 'load_results.json'
+
+# Backend Stub (приложение должно смотреть на него: API_BASE_URL в src/api/endpoints.ts)
+BACKEND_STUB_HOST = os.getenv('E2E_BACKEND_STUB_HOST', '0.0.0.0')
+BACKEND_STUB_PORT = int(os.getenv('E2E_BACKEND_STUB_PORT', '8080'))
+
+# Search-as-you-type Configuration
+SEARCH_TYPING_CADENCE = float(os.getenv('E2E_SEARCH_TYPING_CADENCE', '0.15'))  # секунды между символами
+SEARCH_MAX_WASTED_REQUESTS = int(os.getenv('E2E_SEARCH_MAX_WASTED', '1'))  # лишних запросов на один ввод
 
 # Test Data
 TEST_USER_EMAIL = os.getenv('TEST_USER_EMAIL', 'test@example.com')
@@ -2,8 +2,10 @@
 Pytest configuration and fixtures
 """
 import pytest
+import json
 import os
 import sys
+import time
 from dotenv import load_dotenv
 
 # Добавляем текущую директорию в PYTHONPATH
@@ -17,12 +19,141 @@ if os.path.exists(env_file):
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.options.ios import XCUITestOptions
-from config.appium_config import APPIUM_SERVER_URL, ANDROID_CAPABILITIES, IOS_CAPABILITIES, TEST_TIMEOUT
+from config.appium_config import (
+    APPIUM_SERVER_URL, ANDROID_CAPABILITIES, IOS_CAPABILITIES, TEST_TIMEOUT,
+    STEP_SCREENSHOTS, RECORD_VIDEO, LOGCAT_CAPTURE,
+    KPI_ITERATIONS, KPI_RESULTS_FILE, KPI_BASELINE_FILE, KPI_TOLERANCE,
+    RESOURCE_SAMPLING, RESOURCE_SAMPLE_INTERVAL, BACKEND_STUB_HOST, BACKEND_STUB_PORT, ROUTER_COSTS_FILE,
+    SESSION_WATCHDOG, APK_INSTALL_CACHE, VISUAL_CHECK, REPORT_DIR,
+    DURATION_HISTORY_FILE, DURATION_SCHEDULING, DEVICE_CLASS, NETWORK_PROFILE, IMAGE_STUB_PORT,
+)
+from utilities.result_cache import ResultCache, CACHED_PASS_REASON
+from utilities.screen_recorder import ScreenRecorder
+from utilities.logcat_buffer import LogcatReader
+from utilities.kpi import KpiRecorder, load_json
+from utilities.gfxinfo import JankSampler
+from utilities.resource_sampler import ResourceSampler
+from utilities.test_data import DEFAULT_PROFILE, generate_test_user
+from utilities.backend_stub import BackendStub, IdleProbe
+from utilities.network_conditions import NetworkProfile, format_profile_table, profile_table
+from utilities import base_page, element_cache, visual
+from utilities.screen_router import EdgeCosts, Router
+from utilities.session_watchdog import SessionDead, SessionWatchdog
+from utilities.app_installer import AppInstaller, append_metrics
+from utilities.report import StreamingReport, drain_screenshots
+from utilities.duration_scheduler import DurationPlugin, SchedulerHook, format_summary
+from utilities.cassette import Cassette, Recorder, ReplayServer, diff_counts, format_diff
+from utilities.media_fixtures import DeviceGallery, MediaFixtures
+from utilities.image_stub import ImageStub
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.profile_page import ProfilePage
 
+# user_properties с метриками производительности, которые попадают в отчет
+PERF_PROPERTIES = ('jank', 'resources', 'search_typing', 'network_profile', 'photo_upload', 'image_cache',
+                   'catalog_scaling')
 
-@pytest.fixture(scope='session')
-def driver():
-    """Создает и возвращает Appium driver"""
+
+def pytest_addoption(parser):
+    """Дополнительные опции командной строки"""
+    group = parser.getgroup('mealrush')
+    group.addoption(
+        '--no-cache', action='store_true', default=False, dest='no_result_cache',
+        help='Не пропускать тесты, уже прошедшие на той же сборке APK и устройстве'
+    )
+    group.addoption(
+        '--record-video', action='store_true', default=RECORD_VIDEO, dest='record_video',
+        help='Записывать видео экрана на время теста (сохраняется только при падении)'
+    )
+    group.addoption(
+        '--sample-resources', action='store_true', default=RESOURCE_SAMPLING, dest='sample_resources',
+        help='Собирать PSS и CPU приложения во время каждого теста'
+    )
+    group.addoption(
+        '--resource-interval', type=float, default=RESOURCE_SAMPLE_INTERVAL,
+        help='Интервал опроса памяти и CPU, секунды'
+    )
+    group.addoption(
+        '--record-cassette', default=None, metavar='DIR',
+        help='Записать команды WebDriver и ответы прогона в кассету'
+    )
+    group.addoption(
+        '--replay-cassette', default=None, metavar='DIR',
+        help='Прогон без устройства: ответы Appium из кассеты, сравнение числа команд с записью'
+    )
+    group.addoption(
+        '--network-profile', default=NETWORK_PROFILE, metavar='NAME[,NAME...]',
+        help='Профили сети заглушки бэкенда (NETWORK_PROFILES); несколько - тесты с фикстурой '
+             'network_profile повторяются под каждым'
+    )
+    group.addoption(
+        '--lpt', action='store_true', default=DURATION_SCHEDULING,
+        help='С -n: раздавать тесты воркерам по истории длительности (самые долгие первыми)'
+    )
+    group.addoption(
+        '--report-dir', default=REPORT_DIR, metavar='DIR',
+        help='Потоковый отчет: results.jsonl, скриншоты файлами, статический index.html'
+    )
+    group.addoption(
+        '--visual', action='store_true', default=VISUAL_CHECK,
+        help='Сравнивать скриншоты шагов с baseline (utilities/visual.py)'
+    )
+    group.addoption(
+        '--visual-update', action='store_true', default=False,
+        help='Записать новые и изменившиеся скриншоты шагов в baseline'
+    )
+    group.addoption(
+        '--kpi', action='store_true', default=False,
+        help='Запустить KPI-замеры задержек экранов (тесты с маркером kpi)'
+    )
+    group.addoption(
+        '--kpi-iterations', type=int, default=KPI_ITERATIONS,
+        help='Сколько раз повторять каждый KPI-поток'
+    )
+    group.addoption(
+        '--kpi-output', default=KPI_RESULTS_FILE,
+        help='Файл для результатов KPI (JSON)'
+    )
+    group.addoption(
+        '--kpi-baseline', default=KPI_BASELINE_FILE,
+        help='Файл baseline для сравнения KPI'
+    )
+    group.addoption(
+        '--kpi-update-baseline', action='store_true', default=False,
+        help='Сохранить текущие результаты KPI как новый baseline'
+    )
+
+
+def _device_profile():
+    """Профиль устройства для ключа кеша результатов"""
+    platform = os.getenv('PLATFORM', 'android').lower()
+    caps = IOS_CAPABILITIES if platform == 'ios' else ANDROID_CAPABILITIES
+    return f"{platform}:{caps['deviceName']}:{caps['platformVersion']}"
+
+
+def _network_profiles(config):
+    """Профили сети из --network-profile (пустой список, если не заданы)"""
+    value = config.getoption('network_profile') or ''
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _app_path():
+    """Путь к сборке приложения (относительно текущей директории или e2e_tests)"""
+    platform = os.getenv('PLATFORM', 'android').lower()
+    path = (IOS_CAPABILITIES if platform == 'ios' else ANDROID_CAPABILITIES)['app']
+    if not os.path.isabs(path) and not os.path.exists(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    return path
+
+
+def _install_cache_enabled():
+    """APK ставит AppInstaller (только при смене сборки), а не Appium при каждой сессии"""
+    platform = os.getenv('PLATFORM', 'android').lower()
+    return APK_INSTALL_CACHE and platform == 'android' and os.path.isfile(_app_path())
+
+
+def _driver_options():
+    """Options новой сессии Appium для текущей платформы"""
     # Определяем платформу
     platform = os.getenv('PLATFORM', 'android').lower()
     
@@ -32,7 +163,11 @@ def driver():
         options.platform_name = ANDROID_CAPABILITIES['platformName']
         options.platform_version = ANDROID_CAPABILITIES['platformVersion']
         options.device_name = ANDROID_CAPABILITIES['deviceName']
-        options.app = ANDROID_CAPABILITIES['app']
+        if _install_cache_enabled():
+            # Приложение запускается после проверки установленной сборки (см. driver)
+            options.set_capability('autoLaunch', False)
+        else:
+            options.app = ANDROID_CAPABILITIES['app']
         options.app_package = ANDROID_CAPABILITIES['appPackage']
         options.app_activity = ANDROID_CAPABILITIES['appActivity']
         options.automation_name = ANDROID_CAPABILITIES['automationName']
@@ -54,48 +189,289 @@ def driver():
         options.new_command_timeout = IOS_CAPABILITIES['newCommandTimeout']
     else:
         raise ValueError(f"Unsupported platform: {platform}")
+    return options
+
+
+def _configure_session(driver):
+    """Настройка новой сессии (в том числе пересозданной сторожем)"""
+    driver.implicitly_wait(10)
+    if _install_cache_enabled():
+        driver.activate_app(ANDROID_CAPABILITIES['appPackage'])
+
+
+@pytest.fixture(scope='session')
+def driver(request):
+    """Создает и возвращает Appium driver"""
+    # Создаем driver с Options (при воспроизведении кассеты - на ее сервере)
+    replay = getattr(request.config, '_cassette_replay', None)
+    driver = webdriver.Remote(replay.url if replay else APPIUM_SERVER_URL, options=_driver_options())
     
-    # Создаем driver с Options
-    driver = webdriver.Remote(APPIUM_SERVER_URL, options=options)
+    # Ставим APK, только если на устройстве другая сборка
+    if _install_cache_enabled():
+        result = AppInstaller(driver).ensure(_app_path())
+        request.config._app_install = result
+        append_metrics([result])
     
     # Устанавливаем таймауты
-    driver.implicitly_wait(10)
+    _configure_session(driver)
     
     yield driver
     
-    # Закрываем driver после всех тестов
-    driver.quit()
+    # Закрываем driver после всех тестов (сессия может быть уже потеряна - см. session_watchdog)
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Failed to quit driver: {e}")
+
+
+@pytest.fixture(scope='session')
+def session_watchdog(driver, request):
+    """Heartbeat сессии между тестами; пересоздает упавшую сессию на том же драйвере"""
+    watchdog = SessionWatchdog(driver, _driver_options(), on_recreate=_configure_session)
+    request.config._session_watchdog = watchdog
+    return watchdog
+
+
+@pytest.fixture(autouse=True)
+def session_health(request):
+    """Проверяет сессию Appium перед тестом; с мертвой сессией тест падает сразу"""
+    if not SESSION_WATCHDOG or 'driver' not in request.fixturenames:
+        yield
+        return
+    
+    try:
+        request.getfixturevalue('session_watchdog').check()
+    except SessionDead as e:
+        pytest.fail(f"Сессия Appium потеряна, тест не запускался: {e}", pytrace=False)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def cassette_test(request, monkeypatch):
+    """Относит команды WebDriver к текущему тесту; при воспроизведении паузы не нужны"""
+    recorder = getattr(request.config, '_cassette_recorder', None)
+    if recorder is None:
+        yield
+        return
+    
+    if getattr(request.config, '_cassette_replay', None) is not None:
+        monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    recorder.current_test = request.node.nodeid
+    yield
+
+
+@pytest.fixture(autouse=True)
+def visual_regression(request):
+    """Тест падает, если скриншот шага отличается от baseline"""
+    if visual.checker is None or 'driver' not in request.fixturenames:
+        yield
+        return
+    
+    start = len(visual.checker.results)
+    yield
+    results = visual.checker.results[start:]
+    request.node.user_properties.append(('visual', results))
+    changed = [r['name'] for r in results if r['status'] == visual.CHANGED]
+    if changed and not visual.checker.update:
+        pytest.fail(f"Скриншоты отличаются от baseline: {', '.join(changed)} "
+                    f"(различия: {visual.checker.store.pending_dir}/, принять: python -m utilities.visual approve)",
+                    pytrace=False)
+
+
+@pytest.fixture(scope='session')
+def logcat_reader(driver):
+    """Фоновый сбор logcat приложения в кольцевой буфер"""
+    reader = LogcatReader(driver).start()
+    yield reader
+    reader.stop()
+
+
+@pytest.fixture(autouse=True)
+def logcat_window(request):
+    """Отмечает начало теста, чтобы при падении приложить его окно logcat"""
+    platform = os.getenv('PLATFORM', 'android').lower()
+    if not LOGCAT_CAPTURE or platform != 'android' or 'driver' not in request.fixturenames:
+        yield
+        return
+    
+    request.node._logcat_reader = request.getfixturevalue('logcat_reader')
+    request.node._logcat_start = time.time()
+    yield
+
+
+@pytest.fixture(scope='session')
+def kpi_recorder(request):
+    """Накопитель KPI-замеров на всю сессию (результаты пишутся в pytest_sessionfinish)"""
+    recorder = KpiRecorder(label=_device_profile())
+    request.config._kpi_recorder = recorder
+    return recorder
+
+
+@pytest.fixture(scope='session')
+def backend_stub(request):
+    """Локальная заглушка бэкенда на E2E_BACKEND_STUB_HOST:PORT на всю сессию
+
+    Приложение должно быть собрано с API_BASE_URL (src/api/endpoints.ts),
+    указывающим на E2E_BACKEND_STUB_HOST:E2E_BACKEND_STUB_PORT этой машины.
+    """
+    profiles = _network_profiles(request.config)
+    stub = BackendStub(BACKEND_STUB_HOST, BACKEND_STUB_PORT, profile=profiles[0] if len(profiles) == 1 else None)
+    stub.start()
+    # Ожидания page objects по запросам приложения (BasePage.wait_for_network_idle)
+    previous_probe = base_page.network_probe
+    base_page.network_probe = IdleProbe(f"http://127.0.0.1:{stub.port}")
+    yield stub
+    base_page.network_probe = previous_probe
+    stub.stop()
+
+
+def _ensure_signed_out(driver, max_backs=3):
+    """Выходит из аккаунта, если в него вошел предыдущий тест
+
+    Экраны стека (поиск, продукт, анализ фото) закрываются назад до
+    нижних вкладок, затем выход через профиль.
+    """
+    sign_in, main = SignInPage(driver), MainPage(driver)
+    for _ in range(max_backs):
+        if sign_in.is_displayed_multiple(sign_in.LOGIN_BUTTON, timeout=2):
+            return
+        if main.is_displayed(main.PROFILE_TAB, timeout=2):
+            break
+        driver.back()
+    main.navigate_to_profile()
+    profile = ProfilePage(driver)
+    profile.scroll_to_logout()
+    profile.click_logout()
+    assert sign_in.is_page_loaded(), "Не удалось выйти из аккаунта перед тестом"
+
+
+@pytest.fixture
+def stub_user(driver, backend_stub, test_user):
+    """Пользователь с профилем в заглушке бэкенда; приложение на экране входа"""
+    backend_stub.create_user(test_user['email'], test_user['password'], test_user['name'], DEFAULT_PROFILE)
+    _ensure_signed_out(driver)
+    return test_user
+
+
+@pytest.fixture(scope='session')
+def image_stub(backend_stub):
+    """Заглушка картинок продуктов на E2E_BACKEND_STUB_HOST:E2E_IMAGE_STUB_PORT на всю сессию"""
+    stub = ImageStub(BACKEND_STUB_HOST, IMAGE_STUB_PORT).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def network_profile(request, backend_stub):
+    """Профиль сети заглушки на время теста: параметр из --network-profile или маркера network_profile"""
+    name = getattr(request, 'param', None)
+    previous = backend_stub.profile
+    backend_stub.set_profile(name)
+    yield name or 'none'
+    backend_stub.set_profile(previous)
+
+
+def pytest_generate_tests(metafunc):
+    """Тесты с фикстурой network_profile повторяются под каждым профилем (CLI важнее маркера)"""
+    if 'network_profile' not in metafunc.fixturenames:
+        return
+    names = _network_profiles(metafunc.config)
+    marker = metafunc.definition.get_closest_marker('network_profile')
+    if not names and marker is not None:
+        names = list(marker.args)
+    if names:
+        metafunc.parametrize('network_profile', names, indirect=True, ids=names)
+
+
+@pytest.fixture(scope='session')
+def device_gallery(driver):
+    """Снимки MediaFixtures в галерее устройства (недостающие - одним пакетом и одним сканированием)"""
+    gallery = DeviceGallery(driver)
+    gallery.sync(MediaFixtures().build())
+    return gallery
+
+
+@pytest.fixture(scope='session')
+def navigation_costs():
+    """Стоимости переходов между экранами из прошлых прогонов; обновленные сохраняются в конце сессии"""
+    costs = EdgeCosts(ROUTER_COSTS_FILE)
+    yield costs
+    costs.save()
+
+
+@pytest.fixture
+def router(driver, navigation_costs):
+    """Переходы по графу экранов: `router.go(ProfilePage)`"""
+    return Router(driver, costs=navigation_costs)
+
+
+@pytest.fixture
+def jank_sampler(driver, request):
+    """Замер плавности вокруг жеста: `with jank_sampler('swipe_up'): page.swipe_up()`"""
+    sampler = JankSampler(driver)
+    return lambda label: sampler.measure(label, sink=request.node.user_properties)
+
+
+@pytest.fixture
+def resource_sampler(driver, request):
+    """Фоновый сбор памяти и CPU приложения на время теста"""
+    sampler = ResourceSampler(driver, interval=request.config.getoption('resource_interval')).start()
+    yield sampler
+    sampler.stop()
+    request.node.user_properties.append(('resources', sampler.to_dict()))
+
+
+@pytest.fixture(autouse=True)
+def resource_sampling(request):
+    """Включает resource_sampler для всех тестов на устройстве с --sample-resources"""
+    platform = os.getenv('PLATFORM', 'android').lower()
+    if request.config.getoption('sample_resources') and platform == 'android' and 'driver' in request.fixturenames:
+        request.getfixturevalue('resource_sampler')
+    yield
 
 
 @pytest.fixture(scope='function')
 def setup_test_environment(driver):
     """Настройка окружения для каждого теста"""
     # Делаем скриншот начала теста
-    driver.save_screenshot('screenshots/test_start.png')
+    if STEP_SCREENSHOTS:
+        driver.save_screenshot('screenshots/test_start.png')
     
     yield
     
     # Делаем скриншот конца теста
-    driver.save_screenshot('screenshots/test_end.png')
+    if STEP_SCREENSHOTS:
+        driver.save_screenshot('screenshots/test_end.png')
+
+
+@pytest.fixture(autouse=True)
+def screen_recording(request):
+    """Записывает видео экрана на время теста, если включено --record-video"""
+    if not request.config.getoption('record_video') or 'driver' not in request.fixturenames:
+        yield
+        return
+    
+    recorder = ScreenRecorder(request.getfixturevalue('driver'))
+    recorder.start(request.node.name)
+    
+    yield
+    
+    reports = [getattr(request.node, f'rep_{when}', None) for when in ('setup', 'call')]
+    failed = any(rep is not None and rep.failed for rep in reports)
+    try:
+        video_path = recorder.stop(save=failed)
+        if video_path:
+            request.node.user_properties.append(('video', video_path))
+            print(f"\nVideo saved: {video_path}")
+    except Exception as e:
+        print(f"Failed to save screen recording: {e}")
 
 
 @pytest.fixture(scope='function')
 def test_user():
     """Возвращает тестового пользователя"""
-    import random
-    import string
-    
     # Генерируем случайные данные для теста
-    random_string = ''.join(random.choices(string.ascii_lowercase, k=6))
-    email = f"test_{random_string}@example.com"
-    password = "Test123456"
-    name = f"Test User {random_string}"
-    
-    return {
-        'email': email,
-        'password': password,
-        'name': name
-    }
+    return generate_test_user()
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -104,8 +480,46 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     rep = outcome.get_result()
     
+    # Сохраняем отчет по фазе для фикстур (rep_setup, rep_call, rep_teardown)
+    setattr(item, f"rep_{rep.when}", rep)
+    
+    # Обновляем кеш результатов
+    result_cache = getattr(item.config, '_result_cache', None)
+    key = getattr(item, '_result_cache_key', None)
+    if result_cache is not None and key is not None:
+        if rep.failed:
+            result_cache.forget(key)
+        elif rep.when == "call" and rep.passed:
+            result_cache.store_pass(key, item.nodeid)
+    
+    # Прикладываем метрики производительности, собранные тестом
+    if rep.when == "call":
+        perf = [(name, value) for name, value in item.user_properties if name in PERF_PROPERTIES]
+        if perf:
+            rep.sections.append(("perf", '\n'.join(f"{name}: {json.dumps(value, ensure_ascii=False)}"
+                                                      for name, value in perf)))
+            if item.config.pluginmanager.hasplugin('html'):
+                import pytest_html
+                extras = getattr(rep, 'extras', [])
+                for name, value in perf:
+                    extras.append(pytest_html.extras.json(value, name=name))
+                rep.extras = extras
+    
+    # Прикладываем окно logcat этого теста
+    reader = getattr(item, '_logcat_reader', None)
+    if rep.failed and reader is not None:
+        reader.poll()
+        lines = reader.buffer.window(item._logcat_start)
+        rep.sections.append(("logcat", '\n'.join(lines) if lines else "(нет строк приложения)"))
+    
+    # Падение из-за потерянной сессии: время теста потеряно, скриншот снять не получится
+    watchdog = getattr(item.config, '_session_watchdog', None)
+    session_lost = False
+    if rep.when == "call" and rep.failed and watchdog is not None and call.excinfo is not None:
+        session_lost = watchdog.record_failure(call.excinfo.value, rep.duration) is not None
+    
     # Если тест упал, делаем скриншот
-    if rep.when == "call" and rep.failed:
+    if rep.when == "call" and rep.failed and not session_lost:
         try:
             # Получаем driver из фикстуры
             driver = item.funcargs.get('driver')
@@ -113,8 +527,13 @@ def pytest_runtest_makereport(item, call):
                 screenshot_name = f"failure_{item.name}"
                 driver.save_screenshot(f'screenshots/{screenshot_name}.png')
                 print(f"\nScreenshot saved: screenshots/{screenshot_name}.png")
+                item.user_properties.append(('screenshot', f'screenshots/{screenshot_name}.png'))
         except Exception as e:
             print(f"Failed to take screenshot: {e}")
+    
+    # Скриншоты шагов этого теста - в потоковый отчет
+    for path in drain_screenshots():
+        item.user_properties.append(('screenshot', path))
 
 
 # Pytest configuration
@@ -129,4 +548,185 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "integration: marks tests as integration tests"
     )
+    config.addinivalue_line(
+        "markers", "unit: offline tests of the framework itself (no device needed)"
+    )
+    config.addinivalue_line(
+        "markers", "kpi: latency measurements, run only with --kpi"
+    )
+    config.addinivalue_line(
+        "markers", "network_profile(*names): network profiles of the backend stub (see NETWORK_PROFILES)"
+    )
+    for name in _network_profiles(config):
+        try:
+            NetworkProfile.named(name)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+    
+    # Кассеты WebDriver
+    config._cassette_recorder = None
+    config._cassette_replay = None
+    if config.getoption('replay_cassette'):
+        config._cassette_replay = ReplayServer(Cassette(config.getoption('replay_cassette'))).start()
+        config._cassette_recorder = Recorder().install()
+    elif config.getoption('record_cassette'):
+        config._cassette_recorder = Recorder(Cassette(config.getoption('record_cassette'))).install()
+    
+    # История длительности тестов и LPT-планировщик (только главный процесс)
+    config._durations = None
+    if not hasattr(config, 'workerinput'):
+        config._durations = DurationPlugin(DURATION_HISTORY_FILE, DEVICE_CLASS or _device_profile())
+        config.pluginmanager.register(config._durations, 'duration-history')
+        if config.getoption('lpt') and config.pluginmanager.hasplugin('xdist'):
+            config.pluginmanager.register(SchedulerHook(config._durations), 'lpt-scheduler')
+    
+    # Потоковый отчет (при xdist пишет только главный процесс)
+    config._streaming_report = None
+    if config.getoption('report_dir') and not hasattr(config, 'workerinput'):
+        config._streaming_report = StreamingReport(config.getoption('report_dir')).start()
+        config.pluginmanager.register(config._streaming_report, 'streaming-report')
+    
+    # Визуальная регрессия
+    if config.getoption('visual') or config.getoption('visual_update'):
+        visual.checker = visual.VisualChecker(update=config.getoption('visual_update'))
+    
+    # Кеш результатов по сборке APK
+    config._result_cache = None
+    if not config.getoption('no_result_cache') and getattr(config, 'cache', None) is not None:
+        config._result_cache = ResultCache(config.cache, _app_path(), _device_profile())
+
+
+def pytest_collection_modifyitems(config, items):
+    """Пропускает KPI-тесты без --kpi и тесты, уже прошедшие с идентичным ключом кеша"""
+    if not config.getoption('kpi'):
+        skip_kpi = pytest.mark.skip(reason="KPI-замеры запускаются с --kpi")
+        for item in items:
+            if item.get_closest_marker('kpi'):
+                item.add_marker(skip_kpi)
+    
+    result_cache = config._result_cache
+    if result_cache is None or not result_cache.enabled:
+        return
+    for item in items:
+        # Кешируем только функциональные тесты на устройстве
+        if 'driver' not in item.fixturenames or item.get_closest_marker('kpi'):
+            continue
+        key = result_cache.key_for(item.nodeid, item.path)
+        item._result_cache_key = key
+        if result_cache.is_cached_pass(key):
+            result_cache.hits += 1
+            item.add_marker(pytest.mark.skip(reason=f"{CACHED_PASS_REASON}: APK и исходники не менялись"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Пишет результаты KPI и сравнивает их с baseline"""
+    config = session.config
+    if config._durations is not None:
+        config._durations.finish()
+    
+    if config._streaming_report is not None:
+        config._streaming_report_summary = config._streaming_report.finish()
+    
+    cassette_recorder = config._cassette_recorder
+    if cassette_recorder is not None:
+        cassette_recorder.uninstall()
+        replay = config._cassette_replay
+        if replay is not None:
+            replay.stop()
+            config._cassette_diff = format_diff(
+                diff_counts(replay.cassette.counts(), cassette_recorder.counts), replay.misses
+            )
+    
+    recorder = getattr(config, '_kpi_recorder', None)
+    if recorder is None or not recorder.samples:
+        return
+    
+    baseline_path = config.getoption('kpi_baseline')
+    regressions = recorder.write(
+        config.getoption('kpi_output'), load_json(baseline_path).get('flows', {}), KPI_TOLERANCE
+    )
+    if config.getoption('kpi_update_baseline'):
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'label': recorder.label, 'flows': recorder.summary()}, f, ensure_ascii=False, indent=2)
+        regressions = []
+    config._kpi_regressions = regressions
+    if regressions and session.exitstatus == 0:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Итоги по кешу результатов и KPI"""
+    recorder = getattr(config, '_kpi_recorder', None)
+    if recorder is not None:
+        table = profile_table(recorder.summary())
+        if table:
+            terminalreporter.write_line(format_profile_table(table))
+    
+    for regression in getattr(config, '_kpi_regressions', []):
+        terminalreporter.write_line(
+            f"KPI regression: {regression['flow']} {regression['metric']} = {regression['value']:.0f} мс "
+            f"(baseline {regression['baseline']:.0f} мс, предел {regression['limit']:.0f} мс)",
+            red=True,
+        )
+    
+    result_cache = getattr(config, '_result_cache', None)
+    if result_cache is not None and result_cache.enabled and result_cache.hits:
+        terminalreporter.write_line(
+            f"Result cache: {result_cache.hits} тестов пропущено как {CACHED_PASS_REASON} "
+            f"(отключить: --no-cache)"
+        )
+    
+    if getattr(config, '_cassette_diff', None):
+        terminalreporter.write_line(config._cassette_diff)
+    
+    durations = getattr(config, '_durations', None)
+    if durations is not None and durations.summary is not None and durations.summary['workers'] > 1:
+        terminalreporter.write_line(format_summary(durations.summary))
+    
+    streaming = getattr(config, '_streaming_report_summary', None)
+    if streaming is not None:
+        terminalreporter.write_line(
+            f"Report: {os.path.join(config.getoption('report_dir'), 'index.html')} ({streaming['tests']} тестов, "
+            f"скриншоты {streaming['screenshots_mb']} МБ)"
+        )
+    
+    if visual.checker is not None and visual.checker.results:
+        summary = visual.checker.summary()
+        terminalreporter.write_line(
+            f"Visual: {summary['frames']} кадров - совпало {summary['match']}, отличается {summary['changed']}, "
+            f"новых {summary['new']}; сравнение {summary['compare_ms']:.1f} мс/кадр "
+            f"(+ декодирование {summary['decode_ms']:.1f} мс)",
+            red=bool(summary['changed']) and not visual.checker.update,
+        )
+    
+    install = getattr(config, '_app_install', None)
+    if install is not None:
+        if install['action'] == 'installed':
+            terminalreporter.write_line(
+                f"APK install: установлено ({install['reason']}) за {install['install_ms'] / 1000:.1f} с, "
+                f"versionCode {install['versionCode']}"
+            )
+        else:
+            terminalreporter.write_line(
+                f"APK install: та же сборка уже установлена, проверка {install['check_ms']} мс "
+                f"(отключить: E2E_APK_INSTALL_CACHE=0)"
+            )
+    
+    watchdog = getattr(config, '_session_watchdog', None)
+    if watchdog is not None and (watchdog.events or watchdog.lost_seconds):
+        summary = watchdog.summary()
+        terminalreporter.write_line(
+            f"Session watchdog: пересоздано сессий {summary['recreations']}, "
+            f"потеряно {summary['lost_seconds']:.0f} с, сразу провалено тестов {summary['fast_failed']}",
+            red=watchdog.dead,
+        )
+        for event in summary['events']:
+            terminalreporter.write_line(f"  {event['action']}: {event['message']}")
+    
+    if element_cache.totals['hits'] or element_cache.totals['misses']:
+        terminalreporter.write_line(
+            f"Element cache: {element_cache.totals['hits']} попаданий, {element_cache.totals['misses']} поисков, "
+            f"{element_cache.totals['stale_retries']} повторов после stale - "
+            f"сэкономлено {element_cache.totals['hits']} запросов (отключить: E2E_ELEMENT_CACHE=0)"
+        )
 
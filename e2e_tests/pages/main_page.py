@@ -10,6 +10,8 @@ from selenium.webdriver.common.by import By
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utilities.base_page import BasePage
+from utilities.element_cache import content_change, navigation
+from utilities.list_navigator import ListNavigator, marker_items
 
 
 class MainPage(BasePage):
@@ -25,6 +27,12 @@ class MainPage(BasePage):
     PROFILE_TAB = (By.XPATH, "//*[@content-desc='Профиль']")
     SEARCH_TAB = (By.XPATH, "//*[@content-desc='Поиск']")
     HOME_TAB = (By.XPATH, "//*[@content-desc='Главная']")
+    PRODUCTS_TAB = (By.XPATH, "//android.widget.TextView[@text='Продукты']")
+    LOADING_INDICATOR = (By.XPATH, "//*[contains(@text, 'Загрузка приемов пищи')]")
+    DATE_TEXT = (By.XPATH, "//android.widget.TextView[contains(@text, ' 20')]")
+    
+    # Дата меняется каждый день - не сравнивается с baseline
+    visual_masks = (DATE_TEXT,)
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -34,21 +42,31 @@ class MainPage(BasePage):
         """Проверяет, загрузилась ли главная страница"""
         return self.is_displayed(self.ADD_MEAL_BUTTON)
     
+    @navigation
     def click_add_meal_button(self):
         """Кликает на кнопку добавления приема пищи"""
         self.click(self.ADD_MEAL_BUTTON)
         time.sleep(2)
         return self
     
+    @content_change
     def change_date(self, direction='next'):
-        """Меняет дату (prev/next)"""
+        """Меняет дату (prev/next) и ждет приемы пищи за новый день"""
+        clicked = time.time()
         if direction == 'prev':
             self.click(self.DATE_PREV_BUTTON)
         else:
             self.click(self.DATE_NEXT_BUTTON)
-        time.sleep(1)
+        self._wait_for_data(clicked, fallback=1)
         return self
     
+    def get_selected_date(self):
+        """Получает выбранную дату в виде текста ('18 октября 2026')"""
+        try:
+            return self.get_text(self.DATE_TEXT)
+        except Exception:
+            return None
+    
     def get_daily_calories(self):
         """Получает значение дневных калорий"""
         try:
@@ -68,37 +86,52 @@ class MainPage(BasePage):
         except Exception:
             return 0
     
+    def meal_list(self):
+        """Навигатор по списку приемов пищи (карточка - узел с 'ккал', как MEAL_CARD)"""
+        return ListNavigator(self.driver, marker_items('ккал'))
+    
+    @navigation
     def click_meal_card(self, index=0):
-        """Кликает на карточку приема пищи по индексу"""
-        meals = self.find_elements(self.MEAL_CARD)
-        if meals and index < len(meals):
-            meals[index].click()
-            time.sleep(2)
+        """Кликает на карточку приема пищи по индексу, прокручивая список до нее"""
+        self.meal_list().click(index)
+        time.sleep(2)
         return self
     
+    @navigation
     def navigate_to_profile(self):
         """Переходит на вкладку профиля"""
         self.click(self.PROFILE_TAB)
         time.sleep(2)
         return self
     
+    @navigation
     def navigate_to_search(self):
         """Переходит на вкладку поиска"""
         self.click(self.SEARCH_TAB)
         time.sleep(2)
         return self
     
+    @navigation
+    def navigate_to_products(self):
+        """Переходит на вкладку 'Продукты' (ProductsScreen)"""
+        self.click(self.PRODUCTS_TAB)
+        time.sleep(2)
+        return self
+    
+    @navigation
     def navigate_to_home(self):
         """Переходит на вкладку главной"""
         self.click(self.HOME_TAB)
         time.sleep(2)
         return self
     
+    @content_change
     def wait_for_meals_loaded(self, timeout=20):
-        """Ожидает загрузки приемов пищи"""
+        """Ожидает загрузки приемов пищи (с заглушкой бэкенда - до ответа на запросы)"""
         try:
             self.find_element(self.ADD_MEAL_BUTTON, timeout)
-            return True
         except Exception:
             return False
+        self._wait_for_data(None, fallback=0, timeout=timeout)
+        return True
 
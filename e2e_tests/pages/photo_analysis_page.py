@@ -0,0 +1,129 @@
+"""
+Page Object для анализа фото: выбор источника, системная галерея и экран результата
+"""
+import os
+import re
+import sys
+import time
+from selenium.webdriver.common.by import By
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.base_page import BasePage
+from utilities.element_cache import content_change, navigation
+
+
+class ImageSourceDialog(BasePage):
+    """Модальное окно 'Выберите источник' (камера или галерея)"""
+
+    # Locators
+    TITLE = (By.XPATH, "//android.widget.TextView[@text='Выберите источник']")
+    CAMERA_OPTION = (By.XPATH, "//android.widget.TextView[@text='Камера']")
+    GALLERY_OPTION = (By.XPATH, "//android.widget.TextView[@text='Галерея']")
+    CANCEL_BUTTON = (By.XPATH, "//android.widget.TextView[@text='Отмена']")
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.page_identifier = self.TITLE
+
+    def is_page_loaded(self):
+        """Проверяет, открыт ли диалог"""
+        return self.is_displayed(self.TITLE, timeout=5)
+
+    @navigation
+    def choose_gallery(self):
+        """Открывает системный выбор фото"""
+        self.find_element(self.GALLERY_OPTION).click()
+        return self
+
+    @navigation
+    def choose_camera(self):
+        """Открывает камеру"""
+        self.find_element(self.CAMERA_OPTION).click()
+        return self
+
+    @navigation
+    def cancel(self):
+        """Закрывает диалог"""
+        self.click(self.CANCEL_BUTTON)
+        return self
+
+
+class SystemImagePicker(BasePage):
+    """Системный выбор фото (Photo Picker / DocumentsUI) и экран обрезки expo-image-picker"""
+
+    # Locators
+    THUMBNAIL = (By.XPATH, "//android.widget.ImageView[contains(@resource-id, ':id/icon_thumb')]")
+    CROP_BUTTON = (By.XPATH, "//android.widget.TextView[contains(@resource-id, 'crop_image_menu_crop') or @content-desc='Crop' or @text='CROP' or @text='ОБРЕЗАТЬ']")
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.page_identifier = self.THUMBNAIL
+
+    def is_page_loaded(self):
+        """Проверяет, открыт ли список фото"""
+        return self.is_displayed(self.THUMBNAIL, timeout=10)
+
+    @navigation
+    def pick(self, index=0):
+        """Выбирает фото по индексу (новые снимки в начале списка)"""
+        self.find_elements(self.THUMBNAIL)[index].click()
+        return self
+
+    @navigation
+    def confirm_crop(self, timeout=10):
+        """Подтверждает обрезку (allowsEditing: true); возвращает момент нажатия (time.time())"""
+        button = self.find_element(self.CROP_BUTTON, timeout)
+        confirmed = time.time()
+        button.click()
+        return confirmed
+
+
+class PhotoAnalysisPage(BasePage):
+    """Класс для работы с экраном результата анализа фото"""
+
+    # Locators
+    HEADER = (By.XPATH, "//android.widget.TextView[@text='Анализ фото']")
+    CONFIDENCE_LABEL = (By.XPATH, "//android.widget.TextView[@text='Уверенность анализа']")
+    CONFIDENCE_VALUE = (By.XPATH, "//android.widget.TextView[@text='Уверенность анализа']/following-sibling::android.widget.TextView")
+    INGREDIENTS_TITLE = (By.XPATH, "//android.widget.TextView[starts-with(@text, 'Ингредиенты (')]")
+    SAVE_BUTTON = (By.XPATH, "//android.widget.TextView[@text='Сохранить блюда']")
+    MEAL_TYPE_OPTIONS = ('Завтрак', 'Обед', 'Ужин', 'Перекус', 'Поздний перекус')
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.page_identifier = self.CONFIDENCE_LABEL
+
+    def is_page_loaded(self):
+        """Проверяет, загрузился ли экран результата"""
+        return self.is_displayed(self.CONFIDENCE_LABEL, timeout=20)
+
+    def get_confidence(self):
+        """Уверенность анализа в процентах (None, если не найдена)"""
+        for element in self.find_elements(self.CONFIDENCE_VALUE):
+            match = re.fullmatch(r'(\d+)%', element.text.strip())
+            if match:
+                return int(match.group(1))
+        return None
+
+    def get_ingredients_count(self):
+        """Число ингредиентов из заголовка 'Ингредиенты (N)'"""
+        match = re.search(r'\((\d+)\)', self.get_text(self.INGREDIENTS_TITLE))
+        return int(match.group(1)) if match else 0
+
+    @content_change
+    def select_meal_type(self, label):
+        """Выбирает тип приема пищи по подписи"""
+        if label not in self.MEAL_TYPE_OPTIONS:
+            raise ValueError(f"Неизвестный тип приема пищи '{label}'")
+        self.click((By.XPATH, f"//android.widget.TextView[@text='{label}']"))
+        return self
+
+    @navigation
+    def save(self):
+        """Сохраняет блюда и возвращается на предыдущий экран"""
+        self.scroll_to_element(self.SAVE_BUTTON)
+        self.click(self.SAVE_BUTTON)
+        self._wait_for_data(None, fallback=2)
+        return self
@@ -10,6 +10,7 @@ from selenium.webdriver.common.by import By
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utilities.base_page import BasePage
+from utilities.element_cache import navigation
 
 
 class ProfilePage(BasePage):
@@ -18,31 +19,35 @@ class ProfilePage(BasePage):
     # Locators
     EDIT_PROFILE_BUTTON = (By.XPATH, "//android.widget.Button[contains(@text, 'Редактировать') or contains(@text, 'Изменить')]")
     SETTINGS_BUTTON = (By.XPATH, "//*[@content-desc='⚙️' or contains(@content-desc, 'Настройки')]")
-    LOGOUT_BUTTON = (By.XPATH, "//android.widget.Button[contains(@text, 'Выйти') or contains(@text-east, 'Выход')]")
+    LOGOUT_BUTTON = (By.XPATH, "//android.widget.Button[contains(@text, 'Выйти') or contains(@text, 'Выход')]")
     LOGOUT_CONFIRM_BUTTON = (By.XPATH, "//*[contains(@text, 'Выйти')]/parent::*/following-sibling::*/android.widget.Button[contains(@text, 'Выйти')]")
     USER_NAME = (By.XPATH, "//android.widget.TextView[contains(@text, 'USER') or contains(@text, 'User')]")
     BMI_VALUE = (By.XPATH, "//android.widget.TextView[contains(@text, 'ИМТ') or contains(@text, 'BMI')]/following-sibling::android.widget.TextView")
-    CALORIES_GOAL = (By.XPATH, "//choose_following[contains(@text, 'ккал')]/ancestor::android.view.ViewGroup//android.widget.TextView[1]")
+    CALORIES_GOAL = (By.XPATH, "//android.widget.TextView[contains(@text, 'ккал')]/ancestor::android.view.ViewGroup[1]//android.widget.TextView[1]")
     
     def __init__(self, driver):
         super().__init__(driver)
+        self.page_identifier = self.SETTINGS_BUTTON
     
     def is_page_loaded(self):
         """Проверяет, загрузилась ли страница профиля"""
         return self.is_displayed(self.SETTINGS_BUTTON, timeout=20)
     
+    @navigation
     def click_edit_profile(self):
         """Кликает на кнопку редактирования профиля"""
         self.click(self.EDIT_PROFILE_BUTTON)
         time.sleep(2)
         return self
     
+    @navigation
     def click_settings(self):
         """Кликает на кнопку настроек"""
         self.click(self.SETTINGS_BUTTON)
         time.sleep(2)
         return self
     
+    @navigation
     def click_logout(self):
         """Кликает на кнопку выхода"""
         self.click(self.LOGOUT_BUTTON)
@@ -11,6 +11,7 @@ from selenium.webdriver.common.by import By
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utilities.base_page import BasePage
+from utilities.element_cache import navigation
 
 
 class RegistrationPage(BasePage):
@@ -52,6 +53,7 @@ class RegistrationPage(BasePage):
         self.send_keys(self.CONFIRM_PASSWORD_INPUT, password)
         return self
     
+    @navigation
     def click_create_account(self):
         """Кликает на кнопку создания аккаунта"""
         self.click(self.CREATE_ACCOUNT_BUTTON)
@@ -59,6 +61,7 @@ class RegistrationPage(BasePage):
         time.sleep(3)
         return self
     
+    @navigation
     def click_back(self):
         """Кликает на кнопку назад"""
         self.click(self.BACK_BUTTON)
@@ -67,6 +70,7 @@ class RegistrationPage(BasePage):
         from pages.sign_in_page import SignInPage
         return SignInPage(self.driver)
     
+    @navigation
     def register(self, name, email, password):
         """Выполняет полный процесс регистрации"""
         self.enter_name(name)
@@ -10,6 +10,9 @@ from selenium.webdriver.common.by import By
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utilities.base_page import BasePage
+from utilities.element_cache import content_change, navigation
+from utilities.list_navigator import ListNavigator, marker_items
+from config.appium_config import SEARCH_TYPING_CADENCE
 
 
 class SearchPage(BasePage):
@@ -20,6 +23,8 @@ class SearchPage(BasePage):
     PRODUCT_ITEM = (By.XPATH, "//*[contains(@text, 'ккал') or contains(@content-desc, 'ккал')]/ancestor::android.view.ViewGroup[1]")
     FAVORITE_BUTTON = (By.XPATH, "//*[@content-desc='Избранное' or contains(@content-desc, '❤️')]")
     SCANNER_BUTTON = (By.XPATH, "//android.widget.Button[contains(@text, 'Сканер') or contains(@content-desc, 'Сканер')]")
+    PHOTO_ANALYSIS_BUTTON = (By.XPATH, "//android.widget.TextView[contains(@text, 'Анализ фото')]")
+    ANALYZING_INDICATOR = (By.XPATH, "//android.widget.TextView[@text='Анализ фотографии...']")
     CREATE_PRODUCT_BUTTON = (By.XPATH, "//android.widget.Button[contains(@text, 'Создать продукт') or contains(@text, 'Добавить продукт')]")
     LOADING_INDICATOR = (By.XPATH, "//*[contains(@text, 'Загрузка')]")
     
@@ -31,13 +36,38 @@ class SearchPage(BasePage):
         """Проверяет, загрузилась ли страница поиска"""
         return self.is_displayed(self.SEARCH_INPUT)
     
+    @content_change
     def enter_search_query(self, query):
         """Вводит поисковый запрос"""
+        typed = time.time()
         self.send_keys(self.SEARCH_INPUT, query)
-        # Ждем завершения поиска
-        time.sleep(2)
+        # Ждем завершения поиска (тишина считается от ввода - запрос уходит после debounce)
+        self._wait_for_data(typed, fallback=2)
         return self
     
+    @content_change
+    def type_query_by_prefix(self, query, cadence=SEARCH_TYPING_CADENCE, on_keystroke=None):
+        """Вводит запрос по одному символу с шагом cadence (секунды)
+
+        UiAutomator2 заменяет текст поля целиком, поэтому на каждом шаге
+        отправляется очередной префикс - приложение видит обычный onChangeText.
+        Возвращает [(time.time(), префикс)]; on_keystroke вызывается после
+        каждого символа в пределах шага.
+        """
+        search_input = self.find_element(self.SEARCH_INPUT)
+        keystrokes = []
+        for i in range(1, len(query) + 1):
+            step_start = time.time()
+            search_input.send_keys(query[:i])
+            keystrokes.append((step_start, query[:i]))
+            if on_keystroke:
+                on_keystroke()
+            remaining = cadence - (time.time() - step_start)
+            if remaining > 0 and i < len(query):
+                time.sleep(remaining)
+        return keystrokes
+    
+    @content_change
     def clear_search(self):
         """Очищает поисковый запрос"""
         try:
@@ -50,8 +80,11 @@ class SearchPage(BasePage):
             pass
         return self
     
+    @content_change
     def wait_for_search_results(self, timeout=10):
         """Ожидает появления результатов поиска"""
+        if self._wait_for_data(None, fallback=0, timeout=timeout):
+            return True
         try:
             # Ждем исчезновения индикатора загрузки
             self.wait_for_element_invisible(self.LOADING_INDICATOR, timeout)
@@ -68,20 +101,31 @@ class SearchPage(BasePage):
         except Exception:
             return 0
     
+    def product_list(self, on_snapshot=None):
+        """Навигатор по списку результатов (карточка - ViewGroup с 'ккал', как PRODUCT_ITEM)"""
+        return ListNavigator(self.driver, marker_items('ккал', 'android.view.ViewGroup'), on_snapshot=on_snapshot)
+    
+    @navigation
     def click_product(self, index=0):
-        """Кликает на продукт по индексу"""
-        products = self.find_elements(self.PRODUCT_ITEM)
-        if products and index < len(products):
-            products[index].click()
-            time.sleep(2)
+        """Кликает на продукт по индексу, прокручивая список до него"""
+        self.product_list().click(index)
+        time.sleep(2)
         return self
     
+    @navigation
     def click_scanner(self):
         """Кликает на кнопку сканера"""
         self.click(self.SCANNER_BUTTON)
         time.sleep(2)
         return self
     
+    @navigation
+    def click_photo_analysis(self):
+        """Открывает диалог выбора источника фото для анализа"""
+        self.find_element(self.PHOTO_ANALYSIS_BUTTON).click()
+        return self
+    
+    @navigation
     def click_create_product(self):
         """Кликает на кнопку создания продукта"""
         self.click(self.CREATE_PRODUCT_BUTTON)
@@ -11,6 +11,7 @@ from selenium.webdriver.common.by import By
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utilities.base_page import BasePage
+from utilities.element_cache import navigation
 
 
 class SignInPage(BasePage):
@@ -73,6 +74,7 @@ class SignInPage(BasePage):
         self.click_multiple(self.PASSWORD_TOGGLE)
         return self
     
+    @navigation
     def click_login_button(self):
         """Кликает на кнопку входа"""
         self.click_multiple(self.LOGIN_BUTTON)
@@ -80,6 +82,7 @@ class SignInPage(BasePage):
         time.sleep(2)
         return self
     
+    @navigation
     def click_register_button(self):
         """Кликает на кнопку регистрации"""
         self.click_multiple(self.REGISTER_BUTTON)
@@ -88,11 +91,13 @@ class SignInPage(BasePage):
         from pages.registration_page import RegistrationPage
         return RegistrationPage(self.driver)
     
+    @navigation
     def click_forgot_password(self):
         """Кликает на кнопку 'Забыли пароль'"""
         self.click_multiple(self.FORGOT_PASSWORD_BUTTON)
         return self
     
+    @navigation
     def login(self, email, password):
         """Выполняет полный процесс входа"""
         self.enter_email(email)
@@ -8,6 +8,8 @@ set PLATFORM=android
 set MARKERS=
 set VERBOSE=
 set WORKERS=1
+set COORDINATOR_PORT=
+set AGENT_OF=
 
 REM Парсинг аргументов
 :parse
@@ -35,6 +37,18 @@ if /i "%~1"=="--workers" (
     shift
     goto parse
 )
+if /i "%~1"=="--coordinator" (
+    set COORDINATOR_PORT=%~2
+    shift
+    shift
+    goto parse
+)
+if /i "%~1"=="--agent" (
+    set AGENT_OF=%~2
+    shift
+    shift
+    goto parse
+)
 if /i "%~1"=="--help" (
     echo Использование: %~nx0 [options]
     echo.
@@ -43,6 +57,8 @@ if /i "%~1"=="--help" (
     echo   --markers MARKERS      Запуск тестов с определенными маркерами ^(smoke^|regression^|integration^)
     echo   --workers N            Количество параллельных процессов [default: 1]
     echo   --verbose              Подробный вывод
+    echo   --coordinator PORT     Раздавать тесты агентам на других машинах ^(без Appium и устройств^)
+    echo   --agent HOST:PORT      Брать тесты у координатора и выполнять на устройстве этой машины
     echo   --help                 Показать эту справку
     exit /b 0
 )
@@ -72,6 +88,14 @@ if errorlevel 1 (
 )
 echo OK Зависимости установлены
 
+REM Координатор распределенного прогона: устройство и Appium не нужны
+if not "%COORDINATOR_PORT%"=="" (
+    echo.
+    echo Координатор на порту %COORDINATOR_PORT%, маркеры: %MARKERS%
+    python -m utilities.distributed coordinator --port %COORDINATOR_PORT% -- %MARKERS%
+    exit /b !ERRORLEVEL!
+)
+
 REM Установка переменных окружения
 set PLATFORM=%PLATFORM%
 
@@ -91,7 +115,7 @@ echo OK Appium найден
 REM Запуск Appium в фоне
 echo.
 echo Запуск Appium Server...
-start /B appium
+start /B appium --allow-insecure adb_shell
 timeout /t 5 /nobreak >nul
 
 echo OK Appium запущен
@@ -103,17 +127,25 @@ echo Запуск тестов
 echo ==================================================
 echo Платформа: %PLATFORM%
 echo Маркеры: %MARKERS%
+echo Процессов: %WORKERS%
 echo.
 
-set CMD=pytest %VERBOSE% %MARKERS% --html=report.html --self-contained-html
+set WORKER_ARG=
+if not "%WORKERS%"=="1" set WORKER_ARG=-n %WORKERS% --lpt
+
+REM Агент: список тестов задает координатор, отчет собирается у него
+if not "%AGENT_OF%"=="" set WORKER_ARG=-p utilities.distributed --coordinator %AGENT_OF%
+
+set CMD=pytest %VERBOSE% %MARKERS% %WORKER_ARG% --report-dir report
 
 echo Команда: %CMD%
 echo.
 
 REM Запуск тестов
 %CMD%
+set TEST_EXIT_CODE=%ERRORLEVEL%
 
-if errorlevel 1 (
+if not "%TEST_EXIT_CODE%"=="0" (
     echo.
     echo ==================================================
     echo ER Тесты завершились с ошибками
@@ -126,12 +158,11 @@ if errorlevel 1 (
 )
 
 REM Открытие отчета
-if exist report.html (
+if exist report\index.html (
     echo.
-    echo Отчет сохранен: report.html
-    start report.html
+    echo Отчет сохранен: report\index.html
+    start "" report\index.html
 )
 
-endlocal
-exit /b %ERRORLEVEL%
+endlocal & exit /b %TEST_EXIT_CODE%
 
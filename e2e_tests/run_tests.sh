@@ -16,6 +16,8 @@ PLATFORM="android"
 MARKERS=""
 WORKERS="1"
 VERBOSE=""
+COORDINATOR_PORT=""
+AGENT_OF=""
 
 # Парсинг аргументов
 while [[ $# -gt 0 ]]; do
@@ -36,6 +38,14 @@ while [[ $# -gt 0 ]]; do
       VERBOSE="-v -s"
       shift
       ;;
+    --coordinator)
+      COORDINATOR_PORT="$2"
+      shift 2
+      ;;
+    --agent)
+      AGENT_OF="$2"
+      shift 2
+      ;;
     --help)
       echo "Использование: $0 [options]"
       echo ""
@@ -44,6 +54,8 @@ while [[ $# -gt 0 ]]; do
       echo "  --markers MARKERS      Запуск тестов с определенными маркерами (smoke|regression|integration)"
       echo "  --workers N            Количество параллельных процессов [default: 1]"
       echo "  --verbose              Подробный вывод"
+      echo "  --coordinator PORT     Раздавать тесты агентам на других машинах (без Appium и устройств)"
+      echo "  --agent HOST:PORT      Брать тесты у координатора и выполнять на устройстве этой машины"
       echo "  --help                 Показать эту справку"
       exit 0
       ;;
@@ -84,6 +96,14 @@ fi
 
 echo "✓ Зависимости установлены"
 
+# Координатор распределенного прогона: устройство и Appium не нужны
+if [ -n "$COORDINATOR_PORT" ]; then
+    echo ""
+    echo "Координатор на порту $COORDINATOR_PORT, маркеры: $MARKERS"
+    python3 -m utilities.distributed coordinator --port "$COORDINATOR_PORT" -- $MARKERS
+    exit $?
+fi
+
 # Проверка наличия Appium
 if ! command -v appium &> /dev/null; then
     echo -e "${YELLOW}Appium не найден, попытка установки...${NC}"
@@ -126,7 +146,8 @@ mkdir -p screenshots
 # Запуск Appium в фоне
 echo ""
 echo -e "${YELLOW}Запуск Appium Server...${NC}"
-appium &
+# adb_shell нужен для mobile: shell (бенчмарки запуска, dumpsys)
+appium --allow-insecure adb_shell &
 APPIUM_PID=$!
 
 # Ожидание запуска Appium
@@ -160,13 +181,18 @@ echo "Процессов: $WORKERS"
 echo ""
 
 if [ "$WORKERS" != "1" ]; then
-    WORKER_ARG="-n $WORKERS"
+    WORKER_ARG="-n $WORKERS --lpt"
 else
     WORKER_ARG=""
 fi
 
+# Агент: список тестов задает координатор, отчет собирается у него
+if [ -n "$AGENT_OF" ]; then
+    WORKER_ARG="-p utilities.distributed --coordinator $AGENT_OF"
+fi
+
 # Команда для запуска pytest
-CMD="pytest $VERBOSE $MARKERS $WORKER_ARG --html=report.html --self-contained-html"
+CMD="pytest $VERBOSE $MARKERS $WORKER_ARG --report-dir report"
 
 echo "Команда: $CMD"
 echo ""
@@ -185,13 +211,13 @@ fi
 echo "=================================================="
 
 # Открытие отчета
-if [ -f "report.html" ]; then
+if [ -f "report/index.html" ]; then
     echo ""
-    echo "Отчет сохранен: report.html"
+    echo "Отчет сохранен: report/index.html"
     if command -v xdg-open &> /dev/null; then
-        xdg-open report.html
+        xdg-open report/index.html
     elif command -v open &> /dev/null; then
-        open report.html
+        open report/index.html
     fi
 fi
 
@@ -0,0 +1,38 @@
+"""
+Общие фикстуры тестов фреймворка на фейковом Appium-сервере (без устройства)
+"""
+import os
+import sys
+from collections import Counter
+import pytest
+from appium import webdriver
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import element_cache
+from utilities.fake_appium import FakeAppiumServer, fake_options
+
+
+@pytest.fixture
+def fake_appium():
+    """Фейковый Appium-сервер на свободном порту"""
+    server = FakeAppiumServer().start()
+    yield server
+    server.kill()
+
+
+@pytest.fixture
+def fake_session_options():
+    """Опции сессии fake_session (модуль может переопределить)"""
+    return fake_options()
+
+
+@pytest.fixture
+def fake_session(fake_appium, fake_session_options, monkeypatch):
+    """(сервер, сессия) на фейковом Appium; счетчики element_cache - свои на тест"""
+    monkeypatch.setattr(element_cache, 'totals', Counter())
+    session = webdriver.Remote(fake_appium.url, options=fake_session_options)
+    yield fake_appium, session
+    if fake_appium.server is not None:
+        session.quit()
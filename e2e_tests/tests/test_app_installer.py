@@ -0,0 +1,110 @@
+"""
+Тесты установки APK по хешу сборки на фейковом Appium-сервере (без устройства)
+"""
+import os
+import sys
+import time
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.app_installer import (
+    INSTALLED, SKIPPED, AppInstaller, install_on_pool, install_session_options, parse_dumpsys_package,
+)
+from utilities.fake_appium import FakeAppiumServer
+
+PACKAGE = 'com.l423r.FoodApp'
+
+
+@pytest.fixture
+def apk(tmp_path):
+    path = tmp_path / 'app-debug.apk'
+    path.write_bytes(b'PK build 1')
+    return str(path)
+
+
+@pytest.fixture
+def fake_appium(fake_appium, apk):
+    fake_appium.apks[apk] = (PACKAGE, 1, 'a1b2c3d4')
+    return fake_appium
+
+
+@pytest.fixture
+def fake_session_options():
+    return install_session_options('fake')
+
+
+def rebuild(apk, server, version_code, signature='a1b2c3d4'):
+    with open(apk, 'wb') as f:
+        f.write(f'PK build {version_code}'.encode())
+    server.apks[apk] = (PACKAGE, version_code, signature)
+
+
+@pytest.mark.unit
+class TestAppInstaller:
+    """Решение об установке и маркер на устройстве"""
+
+    def test_parse_dumpsys(self):
+        output = ('    versionCode=42 minSdk=24 targetSdk=34\n    lastUpdateTime=2024-05-01 10:00:00\n'
+                  '    signatures=PackageSignatures{9fe3c2 version:2, signatures:[b2, a1], past signatures:[]}\n')
+        assert parse_dumpsys_package(output) == {
+            'versionCode': 42, 'signatures': ['a1', 'b2'], 'lastUpdateTime': '2024-05-01 10:00:00',
+        }
+        assert parse_dumpsys_package('') is None
+
+    def test_installs_once_per_build(self, apk, fake_session):
+        server, session = fake_session
+        installer = AppInstaller(session, PACKAGE)
+        first = installer.ensure(apk)
+        assert (first['action'], first['reason'], first['versionCode']) == (INSTALLED, 'not_installed', 1)
+        second = installer.ensure(apk)
+        assert (second['action'], second['reason']) == (SKIPPED, None)
+        assert server.installs == [apk]
+
+        rebuild(apk, server, 2)
+        third = installer.ensure(apk)
+        assert (third['action'], third['reason'], third['versionCode']) == (INSTALLED, 'apk_changed', 2)
+
+    def test_app_installed_without_marker(self, apk, fake_session):
+        server, session = fake_session
+        server.packages[PACKAGE] = {'versionCode': 1, 'signature': 'a1b2c3d4', 'lastUpdateTime': 'old'}
+        assert AppInstaller(session, PACKAGE).ensure(apk)['reason'] == 'no_marker'
+
+    def test_reinstall_outside_the_framework_invalidates_marker(self, apk, fake_session):
+        server, session = fake_session
+        installer = AppInstaller(session, PACKAGE)
+        installer.ensure(apk)
+        # Кто-то поставил другую сборку вручную (adb install)
+        server.packages[PACKAGE] = dict(server.packages[PACKAGE], versionCode=7)
+        assert installer.ensure(apk)['reason'] == 'installed_elsewhere'
+
+    def test_signature_change_reinstalls(self, apk, fake_session):
+        server, session = fake_session
+        installer = AppInstaller(session, PACKAGE)
+        installer.ensure(apk)
+        rebuild(apk, server, 2, signature='ffee0011')
+        result = installer.ensure(apk)
+        assert result['action'] == INSTALLED
+        assert server.packages[PACKAGE]['signature'] == 'ffee0011'
+
+
+@pytest.mark.unit
+def test_parallel_install_on_pool(apk):
+    servers = [FakeAppiumServer().start() for _ in range(3)]
+    try:
+        for server in servers:
+            server.apks[apk] = (PACKAGE, 1, 'a1b2c3d4')
+            server.install_delay = 0.5
+        started = time.perf_counter()
+        results = install_on_pool([server.url for server in servers], apk, ['emulator-5554'])
+        elapsed = time.perf_counter() - started
+        again = install_on_pool([server.url for server in servers], apk)
+    finally:
+        for server in servers:
+            server.kill()
+    assert [result['action'] for result in results] == [INSTALLED] * 3
+    assert elapsed < 1.4  # параллельно, а не 3 x 0.5 с
+    assert results[0]['device'] == 'emulator-5554'
+    assert [result['action'] for result in again] == [SKIPPED] * 3
+    assert all(len(server.installs) == 1 for server in servers)
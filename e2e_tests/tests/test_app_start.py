@@ -0,0 +1,109 @@
+"""
+Тесты разбора `am start -W` и статистики запуска (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.app_start import (
+    parse_am_start, reject_outliers, summarize_runs, append_history, load_history, render_trend_svg,
+)
+
+COLD_START_OUTPUT = """Starting: Intent { act=android.intent.action.MAIN cat=[android.intent.category.LAUNCHER] cmp=com.l423r.FoodApp/.MainActivity }
+Status: ok
+LaunchState: COLD
+Activity: com.l423r.FoodApp/.MainActivity
+TotalTime: 1874
+WaitTime: 1880
+Complete
+"""
+
+HOT_START_OUTPUT = """Starting: Intent { cmp=com.l423r.FoodApp/.MainActivity }
+Warning: Activity not started, its current task has been brought to the front
+Status: ok
+LaunchState: HOT
+Activity: com.l423r.FoodApp/.MainActivity
+TotalTime: 143
+WaitTime: 150
+Complete
+"""
+
+LEGACY_OUTPUT = """Starting: Intent { cmp=com.l423r.FoodApp/.MainActivity }
+Status: ok
+Activity: com.l423r.FoodApp/.MainActivity
+ThisTime: 610
+TotalTime: 610
+WaitTime: 655
+Complete
+"""
+
+ERROR_OUTPUT = """Starting: Intent { cmp=com.l423r.FoodApp/.Missing }
+Error type 3
+Error: Activity class {com.l423r.FoodApp/com.l423r.FoodApp.Missing} does not exist.
+"""
+
+
+@pytest.mark.unit
+def test_parse_cold_start():
+    """Тест: разбор cold start"""
+    run = parse_am_start(COLD_START_OUTPUT)
+
+    assert run['status'] == 'ok'
+    assert run['launch_state'] == 'COLD'
+    assert run['total_time'] == 1874
+    assert run['wait_time'] == 1880
+    assert not run['brought_to_front']
+
+
+@pytest.mark.unit
+def test_parse_hot_and_legacy_output():
+    """Тест: hot start и вывод старых версий Android (ThisTime, без LaunchState)"""
+    hot = parse_am_start(HOT_START_OUTPUT)
+    legacy = parse_am_start(LEGACY_OUTPUT)
+
+    assert hot['brought_to_front'] and hot['launch_state'] == 'HOT'
+    assert legacy['launch_state'] is None
+    assert legacy['this_time'] == 610 and legacy['wait_time'] == 655
+
+
+@pytest.mark.unit
+def test_parse_error():
+    """Тест: ошибка запуска"""
+    run = parse_am_start(ERROR_OUTPUT)
+
+    assert run['error'].startswith('Error')
+    assert run['total_time'] is None
+
+
+@pytest.mark.unit
+def test_outliers_rejected():
+    """Тест: выбросы (например, первый запуск после установки) отбрасываются"""
+    kept, rejected = reject_outliers([610, 620, 605, 630, 615, 4200])
+
+    assert rejected == [4200]
+    assert len(kept) == 5
+    assert reject_outliers([100, 5000]) == ([100, 5000], [])
+
+
+@pytest.mark.unit
+def test_summary_and_trend_chart(tmp_path):
+    """Тест: сводка по сериям, история и SVG-график"""
+    runs = [dict(parse_am_start(COLD_START_OUTPUT), kind='cold', logged_in=False, ready_time=2500.0)
+            for _ in range(5)]
+    runs.append(dict(parse_am_start(HOT_START_OUTPUT), kind='hot', logged_in=True, ready_time=300.0))
+
+    summary = summarize_runs(runs)
+    assert summary['cold_logged_out']['total_time']['p50'] == 1874
+    assert summary['hot_logged_in']['ready_time']['n'] == 1
+
+    history = tmp_path / 'history.jsonl'
+    append_history(str(history), summary)
+    append_history(str(history), summary)
+    chart = render_trend_svg(load_history(str(history)), str(tmp_path / 'trend.svg'))
+
+    svg = open(chart, encoding='utf-8').read()
+    assert svg.count('<polyline') == 2
+    assert 'cold_logged_out' in svg
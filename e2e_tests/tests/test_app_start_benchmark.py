@@ -0,0 +1,66 @@
+"""
+Бенчмарк запуска приложения: cold / warm / hot, с авторизацией и без (запуск: pytest --kpi)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.profile_page import ProfilePage
+from utilities.app_start import AppStartBenchmark, START_KINDS
+from utilities.kpi import ScreenProbe
+from config.appium_config import (
+    TEST_USER_EMAIL, TEST_USER_PASSWORD, IMPLICIT_WAIT,
+    APP_START_RESULTS_FILE, APP_START_HISTORY_FILE, APP_START_CHART_FILE,
+)
+
+
+@pytest.fixture(scope='module')
+def benchmark(driver, kpi_recorder):
+    """Бенчмарк на модуль; результаты, история и график пишутся в конце"""
+    bench = AppStartBenchmark(driver, ready_probe=None)
+    yield bench
+    if bench.runs:
+        bench.write(APP_START_RESULTS_FILE, APP_START_HISTORY_FILE, APP_START_CHART_FILE, kpi_recorder.label)
+        print(f"\nApp start results: {APP_START_RESULTS_FILE}, trend: {APP_START_CHART_FILE}")
+
+
+def ensure_login_state(driver, logged_in):
+    """Авторизует пользователя или выходит из аккаунта"""
+    sign_in = SignInPage(driver)
+    main = MainPage(driver)
+    if logged_in and sign_in.is_page_loaded():
+        sign_in.login(TEST_USER_EMAIL, TEST_USER_PASSWORD)
+        assert main.is_page_loaded(), "Не удалось войти перед замером"
+    elif not logged_in and not sign_in.is_page_loaded():
+        main.navigate_to_profile()
+        profile = ProfilePage(driver)
+        profile.scroll_to_logout()
+        profile.click_logout()
+        assert sign_in.is_page_loaded(), "Не удалось выйти перед замером"
+
+
+@pytest.mark.kpi
+@pytest.mark.parametrize('kind', START_KINDS)
+@pytest.mark.parametrize('logged_in', [False, True], ids=['logged_out', 'logged_in'])
+def test_app_start(driver, benchmark, request, kind, logged_in):
+    """KPI: время запуска приложения до готовности первого экрана"""
+    ensure_login_state(driver, logged_in)
+
+    # Целевой экран: вход для неавторизованного, главный - для авторизованного
+    target = MainPage.ADD_MEAL_BUTTON if logged_in else SignInPage.LOGIN_BUTTON
+    probe = ScreenProbe(driver)
+    benchmark.ready_probe = lambda: probe.present(target)
+
+    driver.implicitly_wait(0)
+    try:
+        for _ in range(request.config.getoption('kpi_iterations')):
+            run = benchmark.measure(kind, logged_in)
+            assert run['error'] is None and run['status'] == 'ok', f"am start завершился с ошибкой: {run}"
+            assert run['ready_time'] is not None, f"Экран не загрузился после {kind} start"
+    finally:
+        driver.implicitly_wait(IMPLICIT_WAIT)
@@ -0,0 +1,117 @@
+"""
+Тесты записи и воспроизведения кассет WebDriver на фейковом Appium-сервере
+"""
+import base64
+import os
+import sys
+import pytest
+from appium import webdriver
+from selenium.common.exceptions import NoSuchElementException
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.cassette import (
+    Cassette, Recorder, ReplayServer, command_name, diff_counts, format_diff, normalize_path,
+)
+from utilities.fake_appium import fake_options
+
+PAGE_SOURCE = '<hierarchy>' + '<android.widget.TextView text="Продукт"/>' * 100 + '</hierarchy>'
+SCREENSHOT = base64.b64encode(b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 16).decode('ascii')
+
+
+def scenario(session, extra_find=False):
+    """Команды, которые выполнил бы тест"""
+    results = [session.find_element('accessibility id', 'sign_in_login_button').text]
+    if extra_find:
+        session.find_element('accessibility id', 'sign_in_login_button')
+    with pytest.raises(NoSuchElementException):
+        session.find_element('accessibility id', 'missing')
+    results.append(session.get_screenshot_as_base64())
+    results.append(session.get_screenshot_as_base64())
+    results.append(session.page_source)
+    results.append(session.page_source)
+    return results
+
+
+@pytest.fixture
+def recorded(tmp_path, fake_appium):
+    """Кассета одного "теста", записанная с фейкового устройства"""
+    fake_appium.present.add('sign_in_login_button')
+    fake_appium.page_source = PAGE_SOURCE
+    fake_appium.screenshot = SCREENSHOT
+    cassette = Cassette(str(tmp_path / 'cassette'))
+    recorder = Recorder(cassette).install()
+    try:
+        recorder.current_test = 'tests/test_login.py::test_login'
+        session = webdriver.Remote(fake_appium.url, options=fake_options())
+        results = scenario(session)
+        session.quit()
+    finally:
+        recorder.uninstall()
+    return cassette, results
+
+
+def replay_scenario(cassette, **kwargs):
+    replay = ReplayServer(Cassette(cassette.directory)).start()
+    recorder = Recorder().install()
+    try:
+        recorder.current_test = 'tests/test_login.py::test_login'
+        session = webdriver.Remote(replay.url, options=fake_options())
+        results = scenario(session, **kwargs)
+        session.quit()
+    finally:
+        recorder.uninstall()
+        replay.stop()
+    return replay, recorder, results
+
+
+@pytest.mark.unit
+class TestCassette:
+    """Запись, воспроизведение и diff числа команд"""
+
+    def test_paths_and_command_names(self):
+        path = normalize_path('http://127.0.0.1:4723/session/5f2a/element/el-1/click')
+        assert path == '/session/:id/element/el-1/click'
+        assert command_name('POST', path) == 'POST /element/:el/click'
+        assert command_name('POST', '/session') == 'POST /session'
+
+    def test_blobs_are_deduplicated(self, recorded):
+        cassette, _ = recorded
+        stats = cassette.stats()
+        assert stats['tests'] == 1
+        # Два одинаковых скриншота и два одинаковых page_source - два файла
+        assert stats['blobs'] == 2
+        assert cassette.blob_refs == 4
+        assert stats['commands_bytes'] < len(PAGE_SOURCE)
+        # Скриншот хранится как PNG, а не base64
+        assert stats['blob_bytes'] == len(base64.b64decode(SCREENSHOT)) + len(PAGE_SOURCE.encode('utf-8'))
+
+    def test_replay_returns_recorded_responses(self, recorded):
+        cassette, results = recorded
+        replay, recorder, replayed = replay_scenario(cassette)
+        assert replayed == results
+        assert not replay.misses
+        rows = diff_counts(cassette.counts(), recorder.counts)
+        assert [row['changes'] for row in rows] == [{}]
+        assert rows[0]['recorded'] == rows[0]['replayed'] == 9
+
+    def test_diff_shows_extra_commands(self, recorded):
+        cassette, _ = recorded
+        replay, recorder, _ = replay_scenario(cassette, extra_find=True)
+        rows = diff_counts(cassette.counts(), recorder.counts)
+        assert rows[0]['changes'] == {'POST /element': 1}
+        report = format_diff(rows, replay.misses)
+        assert '+1 POST /element' in report
+        assert 'команд 9 в записи, 10 при воспроизведении (+1)' in report
+
+    def test_command_missing_from_cassette(self, recorded):
+        cassette, _ = recorded
+        replay = ReplayServer(Cassette(cassette.directory)).start()
+        try:
+            session = webdriver.Remote(replay.url, options=fake_options())
+            with pytest.raises(Exception, match='нет в кассете'):
+                session.get_window_size()
+        finally:
+            replay.stop()
+        assert replay.misses == {'GET /window/rect': 1}
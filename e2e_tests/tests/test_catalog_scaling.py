@@ -0,0 +1,100 @@
+"""
+Тесты большого каталога заглушки и сводки масштабирования (без устройства)
+"""
+import json
+import os
+import sys
+import urllib.parse
+import urllib.request
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.backend_stub import BackendStub
+from utilities.catalog_scaling import (
+    CATALOG_PREFIX, check_scaling, fetch_summary, grow_catalog, page_records, scaling_exponent, scaling_report,
+)
+
+USER = {'email': 'catalog@example.com', 'password': 'Test123456'}
+
+
+def request_json(url, body=None, token=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read())
+
+
+def page_record(page, size=20):
+    return {'query': {'name': CATALOG_PREFIX, 'page': str(page), 'size': str(size)},
+            'started': 0.0, 'finished': 0.01, 'response_bytes': 2048}
+
+
+def measurement(size, item_ms, pages=(0,), reached=True, shown=20):
+    return {'size': size, 'target': 30, 'reached': reached, 'first_ms': 500.0, 'item_ms': item_ms,
+            'pss_growth_kb': None, 'fetch': fetch_summary([page_record(p) for p in pages], size, shown, 30)}
+
+
+@pytest.fixture
+def catalog_stub():
+    stub = BackendStub().start()
+    stub.create_user(USER['email'], USER['password'])
+    yield stub
+    stub.stop()
+
+
+@pytest.mark.unit
+def test_catalog_pages_from_stub(catalog_stub):
+    assert grow_catalog(catalog_stub, 1000) == 1000
+    assert grow_catalog(catalog_stub, 1500) == 500
+    assert grow_catalog(catalog_stub, 1200) == 0
+
+    token = request_json(catalog_stub.url + '/auth/token', USER)['jwt_token']
+    url = catalog_stub.url + '/product/search/name?' + urllib.parse.urlencode({'name': CATALOG_PREFIX})
+    first = request_json(url + '&page=0&size=20', token=token)
+    last = request_json(url + '&page=74&size=20', token=token)
+    assert (first['totalElements'], first['totalPages'], first['first'], first['last']) == (1500, 75, True, False)
+    assert last['last'] and [p['name'] for p in last['content']][-1] == f"{CATALOG_PREFIX} 001499"
+    # Результат поиска запомнен и сбрасывается, когда каталог растет
+    assert len(catalog_stub._search_cache) == 1
+    grow_catalog(catalog_stub, 1510)
+    assert request_json(url + '&page=75&size=20', token=token)['content'][-1]['name'] == f"{CATALOG_PREFIX} 001509"
+
+    records = page_records(catalog_stub, since=0)
+    summary = fetch_summary(records, 1510, shown=40, target_index=30)
+    assert (summary['pages'], summary['order'], summary['fetched_items']) == (3, [0, 74, 75], 50)
+    assert (summary['needed_pages'], summary['extra_pages'], summary['over_fetch']) == (2, 1, 10)
+
+
+@pytest.mark.unit
+class TestScaling:
+    """Показатель роста и пределы"""
+
+    def test_exponent(self):
+        sizes = [1000, 10000, 100000]
+        assert scaling_exponent([(n, 800) for n in sizes]) == (0.0, 1.0)
+        assert scaling_exponent([(n, n * 0.05) for n in sizes])[0] == 1.0
+        assert scaling_exponent([(n, n * n) for n in sizes]) == (2.0, 1.0)
+        assert scaling_exponent([(1000, 5), (1000, 7)]) == (None, None)
+        assert scaling_exponent([(1000, 0), (10000, 5)]) == (None, None)
+
+    def test_check_scaling(self):
+        flat = [measurement(1000, 900, (0, 1)), measurement(100000, 950, (0, 1))]
+        assert check_scaling(scaling_report(flat), flat) == []
+
+        growing = [measurement(1000, 900, (0, 1)), measurement(100000, 9000, (0, 1, 1, 2, 3, 4))]
+        report = scaling_report(growing)
+        assert report['item_ms']['verdict'] == 'сублинейно'
+        assert report['pss_growth_kb']['exponent'] is None
+        assert check_scaling(report, growing, max_exponent=0.3, max_extra_pages=1) == [
+            '100000: лишних страниц 4 > 1 (порядок [0, 1, 1, 2, 3, 4])',
+            'item_ms растет с каталогом: показатель 0.5 > 0.3 (сублинейно)',
+        ]
+
+        stuck = [measurement(10000, None, reached=False)]
+        assert check_scaling(scaling_report(stuck), stuck) == [
+            '10000: элемент 30 недоступен, список обрывается на 20 из 10000 (страниц 1)',
+        ]
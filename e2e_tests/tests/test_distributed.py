@@ -0,0 +1,196 @@
+"""
+Тесты распределенного прогона: координатор и агенты на localhost
+с фейковыми Appium-серверами (без устройств)
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from utilities.distributed import Connection, Coordinator, agent_command, format_report, write_junit
+from utilities.fake_appium import FakeAppiumServer
+
+SUITE = textwrap.dedent('''
+    import os
+    import time
+    import pytest
+    from appium import webdriver
+    from utilities.fake_appium import fake_options
+
+
+    @pytest.fixture(scope='session')
+    def driver():
+        session = webdriver.Remote(os.environ['APPIUM_SERVER_URL'], options=fake_options())
+        yield session
+        session.quit()
+
+
+    @pytest.mark.parametrize('n', range(10))
+    def test_screen(driver, n):
+        time.sleep(0.05)
+        assert driver.get_window_size()['width'] == 1080
+
+
+    def test_with_artifact(driver, record_property, tmp_path):
+        path = tmp_path / 'video.mp4'
+        path.write_bytes(b'fake video')
+        record_property('video', str(path))
+
+
+    def test_broken(driver):
+        assert driver.get_window_size()['width'] == 720
+''')
+
+
+def suite_ids():
+    return [f'test_suite.py::test_screen[{n}]' for n in range(10)] + \
+        ['test_suite.py::test_with_artifact', 'test_suite.py::test_broken']
+
+
+def connect(coordinator, name):
+    conn = Connection(socket.create_connection(('127.0.0.1', coordinator.port)))
+    conn.send({'type': 'hello', 'agent': name})
+    return conn
+
+
+def result(conn, nodeid, outcome='passed', duration=1.0):
+    conn.send({'type': 'result', 'nodeid': nodeid, 'outcome': outcome, 'duration': duration})
+
+
+@pytest.fixture
+def coordinator_factory(tmp_path):
+    started = []
+
+    def start(ids, **kwargs):
+        coordinator = Coordinator(ids, host='127.0.0.1', port=0, artifacts_dir=str(tmp_path / 'artifacts'), **kwargs)
+        started.append(coordinator.start())
+        return coordinator
+
+    yield start
+    for coordinator in started:
+        coordinator.stop()
+
+
+@pytest.mark.unit
+class TestCoordinator:
+    """Протокол раздачи тестов"""
+
+    def test_batches_shrink_towards_the_end(self, coordinator_factory):
+        coordinator = coordinator_factory([f't{i}' for i in range(20)], max_batch=4)
+        conn = connect(coordinator, 'a')
+        sizes = []
+        while True:
+            conn.send({'type': 'want', 'n': 4})
+            message = conn.receive(timeout=5)
+            if message['type'] == 'done':
+                break
+            sizes.append(len(message['ids']))
+            for nodeid in message['ids']:
+                result(conn, nodeid)
+        conn.send({'type': 'bye'})
+        assert sum(sizes) == 20
+        assert sizes[0] == 4 and sizes[-1] == 1
+        assert coordinator.wait(agent_timeout=5) and len(coordinator.results) == 20
+
+    def test_idle_agent_steals_from_busy_one(self, coordinator_factory):
+        coordinator = coordinator_factory([f't{i}' for i in range(8)], max_batch=8)
+        busy = connect(coordinator, 'busy')
+        busy.send({'type': 'want', 'n': 8})
+        taken = busy.receive(timeout=5)['ids']
+        assert len(taken) == 4  # половина очереди на одного агента
+        while coordinator.queue:
+            busy.send({'type': 'want', 'n': 8})
+            taken += busy.receive(timeout=5)['ids']
+        assert len(taken) == 8
+
+        idle = connect(coordinator, 'idle')
+        idle.send({'type': 'want', 'n': 8})
+        steal = busy.receive(timeout=5)
+        assert steal == {'type': 'steal', 'count': (len(taken) - 1) // 2}
+        # Агент отдает хвост своей очереди
+        busy.send({'type': 'returned', 'ids': taken[-steal['count']:]})
+        stolen = idle.receive(timeout=5)['ids']
+        assert stolen == taken[-steal['count']:][:len(stolen)]
+        assert coordinator.stolen == steal['count']
+
+    def test_disconnected_agent_tests_are_requeued(self, coordinator_factory):
+        coordinator = coordinator_factory(['t0', 't1', 't2'], max_batch=1)
+        first = connect(coordinator, 'a')
+        first.send({'type': 'want', 'n': 1})
+        assert first.receive(timeout=5)['ids'] == ['t0']
+        first.close()
+        second = connect(coordinator, 'b')
+        received = []
+        while True:
+            second.send({'type': 'want', 'n': 1})
+            message = second.receive(timeout=5)
+            if message['type'] == 'done':
+                break
+            received += message['ids']
+            for nodeid in message['ids']:
+                result(second, nodeid)
+        assert sorted(received) == ['t0', 't1', 't2']
+        assert coordinator.reassigned == 1
+
+    def test_report_and_junit(self, coordinator_factory, tmp_path):
+        coordinator = coordinator_factory(['a.py::t0', 'a.py::t1'])
+        conn = connect(coordinator, 'host-0')
+        conn.send({'type': 'want', 'n': 2})
+        conn.receive(timeout=5)
+        result(conn, 'a.py::t0', duration=2.0)
+        conn.send({'type': 'result', 'nodeid': 'a.py::t1', 'outcome': 'failed', 'duration': 1.0,
+                   'longrepr': 'AssertionError: boom', 'artifacts': []})
+        coordinator.wait(agent_timeout=5)
+        report = coordinator.report()
+        assert report['totals'] == {'passed': 1, 'failed': 1}
+        assert report['agents']['host-0']['tests'] == 2
+        assert report['agents']['host-0']['busy_seconds'] == 3.0
+        assert 'FAILED a.py::t1 [host-0]' in format_report(report)
+        junit = tmp_path / 'junit.xml'
+        write_junit(report, str(junit))
+        assert '<failure message="AssertionError: boom">' in junit.read_text(encoding='utf-8')
+
+
+@pytest.mark.unit
+def test_agents_on_localhost(coordinator_factory, tmp_path):
+    """Два агента, каждый со своим (фейковым) Appium: тесты поделены, отчет общий"""
+    (tmp_path / 'test_suite.py').write_text(SUITE, encoding='utf-8')
+    coordinator = coordinator_factory(suite_ids(), max_batch=3)
+    servers = [FakeAppiumServer().start() for _ in range(2)]
+    agents = []
+    try:
+        for i, server in enumerate(servers):
+            env = dict(os.environ, APPIUM_SERVER_URL=server.url, PYTHONPATH=ROOT_DIR)
+            command = agent_command(f'127.0.0.1:{coordinator.port}', f'agent-{i}', ['-q', '-p', 'no:cacheprovider'])
+            agents.append(subprocess.Popen(command, cwd=tmp_path, env=env, stdout=subprocess.PIPE,
+                                           stderr=subprocess.STDOUT, text=True))
+        waiter = threading.Thread(target=coordinator.wait, kwargs={'agent_timeout': 30})
+        waiter.start()
+        waiter.join(60)
+        outputs = [agent.communicate(timeout=30)[0] for agent in agents]
+    finally:
+        for agent in agents:
+            if agent.poll() is None:
+                agent.kill()
+        for server in servers:
+            server.kill()
+
+    report = coordinator.report()
+    assert [test['nodeid'] for test in report['tests']] == suite_ids(), outputs
+    assert report['totals'] == {'passed': 11, 'failed': 1}
+    assert set(report['agents']) == {'agent-0', 'agent-1'}
+    # Каждое устройство получило работу и одну сессию на весь прогон
+    assert all(server.sessions_created == 1 for server in servers)
+    broken = next(test for test in report['tests'] if test['nodeid'].endswith('test_broken'))
+    assert 'AssertionError' in broken['longrepr']
+    artifact = next(test for test in report['tests'] if test['nodeid'].endswith('test_with_artifact'))['artifacts']
+    assert len(artifact) == 1 and open(artifact[0], 'rb').read() == b'fake video'
+    json.dumps(report)
@@ -0,0 +1,155 @@
+"""
+Тесты LPT-планировщика xdist и истории длительности (без устройства)
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.duration_scheduler import DurationHistory, LptScheduling, makespan
+
+E2E_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DURATIONS = {'t::login': 30, 't::search': 20, 't::cart': 20, 't::profile': 10, 't::menu': 10, 't::sign_in': 10}
+
+
+class FakeConfig:
+    def __init__(self, workers):
+        self.workers = workers
+
+    def getvalue(self, name):
+        return [f'{self.workers}*popen'] if name == 'tx' else None
+
+
+class FakeNode:
+    """Воркер xdist: запоминает команды планировщика"""
+
+    def __init__(self, name):
+        self.gateway = type('Gateway', (), {'id': name})()
+        self.shutting_down = False
+        self.sent = []
+        self.steal_requests = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def send_steal(self, indices):
+        self.steal_requests.append(list(indices))
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def start(workers, estimates=DURATIONS):
+    scheduler = LptScheduling(FakeConfig(workers), estimates=estimates, default=5)
+    nodes = [FakeNode(f'gw{i}') for i in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, list(DURATIONS))
+    scheduler.schedule()
+    return scheduler, nodes
+
+
+def load(scheduler, node):
+    return sum(DURATIONS[scheduler.collection[i]] for i in node.sent)
+
+
+@pytest.mark.unit
+class TestLptScheduling:
+    """Раздача от долгих к коротким и кража с хвоста"""
+
+    def test_longest_first_balances_load(self):
+        scheduler, nodes = start(2)
+        assert [load(scheduler, node) for node in nodes] == [50, 50]
+        assert scheduler.predicted == 50
+        # Очередь каждого воркера начинается с самого долгого теста
+        assert scheduler.collection[nodes[0].sent[0]] == 't::login'
+
+    def test_unknown_tests_use_default(self):
+        scheduler, nodes = start(2, estimates={'t::login': 30})
+        assert scheduler.durations[scheduler.collection.index('t::cart')] == 5
+        assert [len(node.sent) for node in nodes] == [1, 5]
+
+    def test_idle_worker_steals_short_tests_from_tail(self):
+        scheduler, (fast, slow) = start(2, estimates=dict(DURATIONS, **{'t::cart': 1, 't::search': 1}))
+        for index in list(fast.sent):
+            scheduler.mark_test_complete(fast, index)
+        assert slow.steal_requests
+        stolen = slow.steal_requests[-1]
+        assert set(stolen) <= set(slow.sent[2:])
+        assert stolen == slow.sent[-len(stolen):]
+        scheduler.remove_pending_tests_from_node(slow, stolen)
+        assert fast.sent[-len(stolen):] == stolen
+        assert not fast.shutting_down
+
+    def test_nothing_to_steal_shuts_idle_worker_down(self):
+        scheduler, nodes = start(6)
+        for index in list(nodes[0].sent):
+            scheduler.mark_test_complete(nodes[0], index)
+        assert nodes[0].shutting_down
+        assert not any(node.steal_requests for node in nodes)
+
+
+@pytest.mark.unit
+def test_history_and_makespan(tmp_path):
+    history = DurationHistory(str(tmp_path / 'durations.sqlite'), alpha=0.5)
+    history.record('android:Pixel_6:13', {'t::login': 30, 't::menu': 4})
+    history.record('android:Pixel_6:13', {'t::login': 20})
+    history.record('android:Pixel_4:11', {'t::login': 60, 't::search': 12})
+    estimates, default = history.estimates('android:Pixel_6:13')
+    assert estimates == {'t::login': 25, 't::menu': 4, 't::search': 12}
+    assert default == 14.5
+    history.close()
+
+    summary = makespan({'gw0': [(30, 132), (10, 140)], 'gw1': [(20, 125), (10, 150)]}, started=100)
+    assert (summary['makespan'], summary['lower_bound'], summary['overhead_percent']) == (50, 35, 42.9)
+    assert summary['loads'] == {'gw0': 40, 'gw1': 30}
+
+
+@pytest.mark.unit
+def test_xdist_run_uses_history(tmp_path):
+    """Реальный `pytest -n 2 --lpt`: долгий тест один на воркере, остальные - на другом"""
+    (tmp_path / 'test_sample.py').write_text(
+        'import time, pytest\n'
+        '@pytest.mark.parametrize("n", range(4))\n'
+        'def test_short(n): time.sleep(0.2)\n'
+        'def test_long(): time.sleep(0.8)\n'
+    )
+    history_path = str(tmp_path / 'durations.sqlite')
+    history = DurationHistory(history_path)
+    history.record('ci', dict({f'test_sample.py::test_short[{n}]': 0.2 for n in range(4)},
+                              **{'test_sample.py::test_long': 0.8}))
+    history.close()
+    (tmp_path / 'conftest.py').write_text(
+        'import json, sys\n'
+        f'sys.path.insert(0, {E2E_DIR!r})\n'
+        'from utilities.duration_scheduler import DurationPlugin, SchedulerHook\n'
+        'def pytest_configure(config):\n'
+        '    if hasattr(config, "workerinput"):\n'
+        '        return\n'
+        f'    config._d = DurationPlugin({history_path!r}, "ci")\n'
+        '    config.pluginmanager.register(config._d)\n'
+        '    config.pluginmanager.register(SchedulerHook(config._d))\n'
+        'def pytest_sessionfinish(session):\n'
+        '    if hasattr(session.config, "_d"):\n'
+        '        summary = session.config._d.finish()\n'
+        '        summary["workers_of"] = {k: v["worker"] for k, v in session.config._d.tests.items()}\n'
+        '        open("summary.json", "w").write(json.dumps(summary))\n'
+    )
+    result = subprocess.run([sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider', '-n', '2'],
+                            cwd=str(tmp_path), capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stdout + result.stderr
+    with open(tmp_path / 'summary.json') as f:
+        summary = json.load(f)
+    workers = summary['workers_of']
+    long_worker = workers['test_sample.py::test_long']
+    assert [nodeid for nodeid, worker in workers.items() if worker == long_worker] == ['test_sample.py::test_long']
+    assert summary['predicted'] == pytest.approx(0.8)
+    assert summary['workers'] == 2
+    # История обновилась замерами этого прогона
+    history = DurationHistory(history_path)
+    assert len(history.durations('ci')) == 5
+    history.close()
@@ -0,0 +1,145 @@
+"""
+Тесты кеша элементов page objects на фейковом драйвере (без устройства)
+"""
+import os
+import sys
+from collections import Counter
+import pytest
+from appium.webdriver.webelement import WebElement
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.base_page import BasePage
+import utilities.element_cache as element_cache
+from utilities.element_cache import ElementCache, content_change, navigation
+
+
+class FakeDriver:
+    """Драйвер с хендлами элементов: findElement(s) считаются, хендлы можно "устарить" """
+
+    def __init__(self):
+        self.finds = 0
+        self.commands = []
+        self.screen = {'Войти': 1, 'ккал': 3}  # текст -> количество элементов
+        self.generation = 0  # смена - все старые хендлы устаревают
+        self.implicit_wait = None
+
+    def implicitly_wait(self, seconds):
+        self.implicit_wait = seconds
+
+    def _handles(self, value):
+        return [f"{self.generation}:{value}:{i}" for i in range(self.screen.get(value, 0))]
+
+    def find_element(self, by, value):
+        self.finds += 1
+        handles = self._handles(value)
+        if not handles:
+            raise NoSuchElementException(value)
+        return WebElement(self, handles[0])
+
+    def find_elements(self, by, value):
+        self.finds += 1
+        return [WebElement(self, handle) for handle in self._handles(value)]
+
+    def execute(self, command, params=None):
+        element_id = params['id']
+        if not element_id.startswith(f"{self.generation}:"):
+            raise StaleElementReferenceException(element_id)
+        self.commands.append((command, element_id))
+        return {'value': element_id.split(':')[1]}
+
+
+class CounterPage(BasePage):
+    LOGIN_BUTTON = (By.XPATH, "//android.widget.Button[@text='Войти']")
+    CARD = (By.XPATH, "//android.widget.TextView[contains(@text, 'ккал')]")
+
+    @navigation
+    def click_login(self):
+        self.click(self.LOGIN_BUTTON)
+
+    @content_change
+    def refresh(self):
+        pass
+
+
+@pytest.fixture
+def fake_driver(monkeypatch):
+    import utilities.base_page as base_page
+    monkeypatch.setattr(base_page.time, 'sleep', lambda seconds: None)
+    # Не смешиваем со счетчиками сессии в итогах pytest
+    monkeypatch.setattr(element_cache, 'totals', Counter())
+    return FakeDriver()
+
+
+def locator_value(locator):
+    return locator[1].split("'")[1]
+
+
+@pytest.fixture
+def page(fake_driver, monkeypatch):
+    page = CounterPage(fake_driver)
+    # Поиск без WebDriverWait: по тексту из локатора
+    monkeypatch.setattr(page, '_wait_for_element',
+                        lambda locator, timeout: fake_driver.find_element(*locator[:1], locator_value(locator)))
+    monkeypatch.setattr(page, '_wait_for_elements',
+                        lambda locator, timeout: fake_driver.find_elements(*locator[:1], locator_value(locator)))
+    return page
+
+
+@pytest.mark.unit
+class TestElementCache:
+    """Повторное использование хендлов и сброс по смене экрана"""
+
+    def test_repeated_lookup_is_served_from_cache(self, page, fake_driver):
+        for _ in range(3):
+            assert page.get_text(page.LOGIN_BUTTON) == 'Войти'
+        assert fake_driver.finds == 1
+        assert page.elements.summary()['saved_round_trips'] == 2
+
+    def test_navigation_invalidates_all_pages_of_driver(self, page, fake_driver):
+        other = CounterPage(fake_driver)
+        other._wait_for_element = page._wait_for_element
+        other.find_element(other.LOGIN_BUTTON)
+        page.click_login()
+        other.find_element(other.LOGIN_BUTTON)
+        assert fake_driver.finds == 3
+        assert other.elements.stats['invalidations'] == 1
+
+    def test_content_change_keeps_single_elements(self, page, fake_driver):
+        page.find_element(page.LOGIN_BUTTON)
+        assert len(page.find_elements(page.CARD)) == 3
+        page.refresh()
+        page.find_element(page.LOGIN_BUTTON)
+        page.find_elements(page.CARD)
+        assert fake_driver.finds == 3
+
+    def test_stale_handle_is_resolved_again(self, page, fake_driver):
+        page.find_element(page.LOGIN_BUTTON)
+        fake_driver.generation += 1  # перерисовка без вызова помеченного метода
+        assert page.get_text(page.LOGIN_BUTTON) == 'Войти'
+        assert fake_driver.commands[-1] == ('getElementText', '1:Войти:0')
+        assert page.elements.stats['stale_retries'] == 1
+        # Хендл обновлен в кеше: следующий вызов без повторного поиска
+        page.get_text(page.LOGIN_BUTTON)
+        assert page.elements.stats['stale_retries'] == 1
+
+    def test_stale_list_item_keeps_index(self, page, fake_driver):
+        cards = page.find_elements(page.CARD)
+        fake_driver.generation += 1
+        cards[2].click()
+        assert fake_driver.commands[-1] == ('clickElement', '1:ккал:2')
+
+    def test_empty_lists_are_not_cached(self, page, fake_driver):
+        fake_driver.screen['ккал'] = 0
+        assert page.find_elements(page.CARD) == []
+        fake_driver.screen['ккал'] = 2
+        assert len(page.find_elements(page.CARD)) == 2
+
+    def test_disabled_cache(self, fake_driver):
+        cache = ElementCache(fake_driver, enabled=False)
+        for _ in range(2):
+            cache.element(('xpath', "//*[@text='Войти']"), lambda: fake_driver.find_element('xpath', 'Войти'))
+        assert fake_driver.finds == 2
@@ -0,0 +1,106 @@
+"""
+Тесты разбора dumpsys gfxinfo framestats (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.gfxinfo import JankSampler, analyze_framestats, parse_framestats
+
+# Фрагмент `dumpsys gfxinfo com.l423r.FoodApp framestats` (Android 12):
+# кадры 8, 10, 25, 40 (2 пропущенных vsync) и 12 мс, первый кадр с Flags=1
+FRAMESTATS_OUTPUT = """Applications Graphics Acceleration Info:
+Uptime: 12345678 Realtime: 12345678
+
+** Graphics info for pid 4321 [com.l423r.FoodApp] **
+
+Stats since: 12000000000000ns
+Total frames rendered: 6
+Janky frames: 2 (33.33%)
+90th percentile: 34ms
+Number Missed Vsync: 2
+
+Window: com.l423r.FoodApp/com.l423r.FoodApp.MainActivity
+---PROFILEDATA---
+Flags,FrameTimelineVsyncId,IntendedVsync,Vsync,InputEventId,HandleInputStart,AnimationStart,PerformTraversalsStart,DrawStart,FrameDeadline,FrameInterval,FrameStartTime,SyncQueued,SyncStart,IssueDrawCommandsStart,SwapBuffers,FrameCompleted,DequeueBufferDuration,QueueBufferDuration,GpuCompleted,SwapBuffersCompleted,DisplayPresentTime,
+1,1000,12000000000000,12000000000000,0,12000000100000,12000000200000,12000000300000,12000000400000,12000016666667,16666667,12000000000000,12000000500000,12000000600000,12000000700000,12000000800000,12000005000000,50000,60000,12000005000000,12000005000000,-1,
+0,1001,12000050000001,12000050000001,0,12000050100001,12000050200001,12000050300001,12000050400001,12000066666668,16666667,12000050000001,12000050500001,12000050600001,12000050700001,12000050800001,12000058000001,50000,60000,12000058000001,12000058000001,-1,
+0,1002,12000100000002,12000100000002,0,12000100100002,12000100200002,12000100300002,12000100400002,12000116666669,16666667,12000100000002,12000100500002,12000100600002,12000100700002,12000100800002,12000110000002,50000,60000,12000110000002,12000110000002,-1,
+0,1003,12000150000003,12000150000003,0,12000150100003,12000150200003,12000150300003,12000150400003,12000166666670,16666667,12000150000003,12000150500003,12000150600003,12000150700003,12000150800003,12000175000003,50000,60000,12000175000003,12000175000003,-1,
+0,1004,12000200000004,12000233333338,0,12000233433338,12000233533338,12000233633338,12000233733338,12000216666671,16666667,12000233333338,12000233833338,12000233933338,12000234033338,12000234133338,12000240000004,50000,60000,12000240000004,12000240000004,-1,
+0,1005,12000250000005,12000250000005,0,12000250100005,12000250200005,12000250300005,12000250400005,12000266666672,16666667,12000250000005,12000250500005,12000250600005,12000250700005,12000250800005,12000262000005,50000,60000,12000262000005,12000262000005,-1,
+---PROFILEDATA---
+
+View hierarchy:
+"""
+
+# Старый формат (Android 8): без FrameInterval, кадры 10 и 30 мс
+LEGACY_OUTPUT = """---PROFILEDATA---
+Flags,IntendedVsync,Vsync,OldestInputEvent,NewestInputEvent,HandleInputStart,AnimationStart,PerformTraversalsStart,DrawStart,SyncQueued,SyncStart,IssueDrawCommandsStart,SwapBuffers,FrameCompleted,DequeueBufferDuration,QueueBufferDuration,
+0,5000000000,5000000000,9223372036854775807,0,5000100000,5000200000,5000300000,5000400000,5000500000,5000600000,5000700000,5000800000,5010000000,40000,50000,
+0,5050000000,5050000000,9223372036854775807,0,5050100000,5050200000,5050300000,5050400000,5050500000,5050600000,5050700000,5050800000,5080000000,40000,50000,
+---PROFILEDATA---
+"""
+
+
+class FakeShellDriver:
+    """Отвечает на mobile: shell dumpsys gfxinfo"""
+
+    def __init__(self, output):
+        self.output = output
+        self.commands = []
+
+    def execute_script(self, script, args):
+        self.commands.append(args['args'])
+        return self.output if args['args'][-1] == 'framestats' else ''
+
+
+@pytest.mark.unit
+def test_parse_table():
+    """Тест: таблица framestats разбирается в массив"""
+    columns, table = parse_framestats(FRAMESTATS_OUTPUT)
+
+    assert columns[0] == 'Flags' and 'FrameInterval' in columns
+    assert table.shape == (6, len(columns))
+
+
+@pytest.mark.unit
+def test_jank_metrics():
+    """Тест: доля janky-кадров, перцентили и пропущенные vsync"""
+    result = analyze_framestats(FRAMESTATS_OUTPUT)
+
+    assert result['frames'] == 5
+    assert result['janky_frames'] == 2
+    assert result['janky_percent'] == pytest.approx(40.0)
+    assert result['p90_ms'] == pytest.approx(34.0, abs=0.01)
+    assert result['max_ms'] == pytest.approx(40.0, abs=0.01)
+    assert result['missed_vsync'] == 2
+    assert result['summary'] == {'total_frames': 6, 'janky_frames': 2, 'missed_vsync': 2}
+
+
+@pytest.mark.unit
+def test_legacy_format_and_empty_output():
+    """Тест: старый формат без FrameInterval и пустой вывод"""
+    legacy = analyze_framestats(LEGACY_OUTPUT)
+    empty = analyze_framestats('No process found for: com.l423r.FoodApp')
+
+    assert legacy['frames'] == 2 and legacy['janky_frames'] == 1
+    assert empty['frames'] == 0 and empty['p90_ms'] is None
+
+
+@pytest.mark.unit
+def test_measure_resets_and_attaches():
+    """Тест: контекстный менеджер сбрасывает статистику и прикладывает результат"""
+    driver = FakeShellDriver(FRAMESTATS_OUTPUT)
+    sink = []
+
+    with JankSampler(driver).measure('swipe_up', sink=sink) as result:
+        pass
+
+    assert driver.commands == [['gfxinfo', 'com.l423r.FoodApp', 'reset'],
+                               ['gfxinfo', 'com.l423r.FoodApp', 'framestats']]
+    assert sink == [('jank', result)]
+    assert result['label'] == 'swipe_up' and result['janky_frames'] == 2
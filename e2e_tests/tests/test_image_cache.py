@@ -0,0 +1,112 @@
+"""
+Кеш картинок продуктов: повторные загрузки при прокрутке и возврате на экран (запуск: pytest --kpi)
+
+Картинки продуктов отдает заглушка image_stub, адрес которой с
+устройства задается E2E_IMAGE_STUB_PUBLIC_HOST. Списки SearchScreen и
+ProductsScreen прокручиваются до конца и обратно, затем экран
+покидается и открывается снова. Каждая полная повторная загрузка
+картинки - промах кеша. Пределы IMAGE_MIN_HIT_RATIO и
+IMAGE_MAX_DUPLICATE_PERCENT проверяются только по SearchScreen
+(CachedImage); ProductsScreen рисует обычный Image, его отрезки идут в
+отчет для сравнения.
+"""
+import os
+import sys
+import time
+from collections import Counter
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from utilities.image_stub import ViewCounter, cache_stats, check_cache, format_stats
+from config.appium_config import IMAGE_CATALOG_SIZE, IMAGE_STUB_PUBLIC_HOST
+
+CATALOG_QUERY = 'Каталожный'
+
+
+@pytest.fixture
+def image_catalog(backend_stub, image_stub):
+    """IMAGE_CATALOG_SIZE продуктов с картинками на image_stub; {название: URL}"""
+    if not any(p['name'].startswith(CATALOG_QUERY) for p in backend_stub.products):
+        backend_stub.seed_products([
+            (f"{CATALOG_QUERY} продукт {i:02d}", 100 + i, 5.0, 3.0, 12.0, f"21{i:011d}")
+            for i in range(IMAGE_CATALOG_SIZE)
+        ])
+    products = [p for p in backend_stub.products if p['name'].startswith(CATALOG_QUERY)]
+    return image_stub.assign(products, IMAGE_STUB_PUBLIC_HOST)
+
+
+class Phases:
+    """Отрезки сценария: показы карточек и сводка журнала заглушки по каждому"""
+
+    def __init__(self, image_stub, urls):
+        self.image_stub = image_stub
+        self.urls = urls
+        self.started = time.time()
+        self.stats = {}
+        self.views = {}  # отрезок -> Counter показов
+        self.spans = {}  # отрезок -> (начало, конец)
+
+    def url_of(self, key):
+        return next((self.urls[text] for text in key.split(' | ') if text in self.urls), None)
+
+    def run(self, name, page, passes=1):
+        """Прокрутка списка до конца и обратно passes раз"""
+        known = {record['url'] for record in self.image_stub.requests() if record['status'] == 200}
+        since = time.time()
+        counter = ViewCounter(self.url_of)
+        navigator = page.product_list(on_snapshot=counter)
+        for _ in range(passes):
+            navigator.count()
+            navigator.scroll_to(0)
+        self.views[name] = counter.views
+        self.spans[name] = (since, time.time())
+        self.stats[name] = cache_stats(self.image_stub.requests(since), counter.views, known)
+
+    def combined(self, label, names):
+        """Сводка по нескольким отрезкам (повторные загрузки - и между ними)"""
+        spans = [self.spans[name] for name in names]
+        records = [r for r in self.image_stub.requests(self.started)
+                   if any(start <= r['started'] <= end for start, end in spans)]
+        self.stats[label] = cache_stats(records, sum((self.views[name] for name in names), Counter()))
+        return self.stats[label]
+
+
+@pytest.mark.kpi
+def test_product_images_are_not_refetched(driver, stub_user, image_catalog, image_stub, request):
+    """Прокрутка туда-обратно и возврат на экран не загружают картинки повторно"""
+    main, search = MainPage(driver), SearchPage(driver)
+    phases = Phases(image_stub, image_catalog)
+    SignInPage(driver).login(stub_user['email'], stub_user['password'])
+
+    # SearchScreen (CachedImage): прокрутка, уход на карточку продукта и возврат
+    main.click_add_meal_button()
+    search.enter_search_query(CATALOG_QUERY)
+    assert search.wait_for_search_results() and search.get_products_count() > 0, "Нет продуктов каталога"
+    phases.run('search_scroll', search, passes=2)
+    search.click_product(0)
+    driver.back()
+    phases.run('search_return', search)
+
+    # ProductsScreen (Image): те же картинки уже должны быть в кеше
+    driver.back()
+    main.navigate_to_products()
+    search.enter_search_query(CATALOG_QUERY)
+    search.wait_for_search_results()
+    phases.run('products_scroll', search, passes=2)
+    main.navigate_to_profile()
+    main.navigate_to_products()
+    phases.run('products_return', search)
+
+    # Пределы - только для CachedImage; ProductsScreen (Image) для сравнения
+    search_stats = phases.combined('search', ['search_scroll', 'search_return'])
+    phases.combined('products', ['products_scroll', 'products_return'])
+    request.node.user_properties.append(('image_cache', phases.stats))
+    report = '\n'.join(format_stats(name, stats) for name, stats in phases.stats.items())
+    assert search_stats['unique'] > 0, f"SearchScreen не загрузил ни одной картинки с {IMAGE_STUB_PUBLIC_HOST}\n{report}"
+    problems = check_cache(search_stats)
+    assert not problems, f"Регрессия кеша картинок CachedImage: {'; '.join(problems)}\n{report}"
@@ -0,0 +1,86 @@
+"""
+Тесты заглушки картинок и сводки кеша (без устройства)
+"""
+import os
+import sys
+import urllib.request
+from collections import Counter
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.backend_stub import BackendStub
+from utilities.image_stub import ImageStub, cache_stats, check_cache, format_stats
+
+
+def fetch(url, etag=None):
+    request = urllib.request.Request(url, headers={'If-None-Match': etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def record(url, status=200, size=1000):
+    return {'url': url, 'started': 0, 'status': status, 'bytes': size, 'conditional': status == 304}
+
+
+@pytest.fixture
+def image_stub():
+    stub = ImageStub(size=(64, 64)).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.mark.unit
+def test_stub_serves_cacheable_images(image_stub):
+    backend = BackendStub()
+    urls = image_stub.assign(backend.products, public_host='10.0.2.2')
+    first = backend.products[0]
+    assert first['imageUrl'] == f"http://10.0.2.2:{image_stub.port}/img/product_{first['id']}.jpg"
+    assert urls[first['name']] == first['imageUrl']
+
+    url = image_stub.image_url(f"product_{first['id']}")
+    status, headers, body = fetch(url)
+    assert (status, headers['Content-Type'], body[:2]) == (200, 'image/jpeg', b'\xff\xd8')
+    assert headers['Cache-Control'] == f'public, max-age={image_stub.max_age}'
+    # Картинка стабильна: тот же ключ - те же байты
+    assert fetch(url)[2] == body
+    assert fetch(url, etag=headers['ETag'])[0] == 304
+    assert fetch(f"{image_stub.url}/other.png")[0] == 404
+
+    stats = cache_stats(image_stub.requests())
+    assert (stats['requests'], stats['unique'], stats['duplicates'], stats['revalidations']) == (3, 1, 1, 1)
+    assert stats['bytes'] == stats['duplicate_bytes'] * 2 == len(body) * 2
+
+
+@pytest.mark.unit
+class TestCacheStats:
+    """Повторные загрузки, перепроверки и hit ratio"""
+
+    def test_hit_ratio_over_repeat_views(self):
+        records = [record('/img/a.jpg'), record('/img/b.jpg'), record('/img/a.jpg'), record('/img/b.jpg', 304)]
+        # a показана 5 раз, b - 5 раз: 2 первых показа, 8 повторных, из них 2 мимо кеша
+        stats = cache_stats(records, views=Counter({'http://h/img/a.jpg': 5, 'http://h/img/b.jpg': 5}))
+        assert (stats['fetches'], stats['duplicates'], stats['revalidations']) == (3, 1, 1)
+        assert stats['hit_ratio'] == 0.75
+        assert stats['duplicate_percent'] == 50.0
+        assert stats['worst'] == [('/img/a.jpg', 1)]
+
+    def test_known_urls_count_as_duplicates(self):
+        stats = cache_stats([record('/img/a.jpg')], known=['http://10.0.2.2:8081/img/a.jpg'])
+        assert (stats['duplicates'], stats['unique']) == (1, 1)
+        assert cache_stats([record('/img/a.jpg')])['duplicates'] == 0
+
+    def test_check_cache(self):
+        good = cache_stats([record('/img/a.jpg')], views=Counter({'a': 3}))
+        assert good['hit_ratio'] == 1.0
+        assert check_cache(good) == []
+        bad = cache_stats([record('/img/a.jpg')] * 3, views=Counter({'a': 3}))
+        assert check_cache(bad, min_hit_ratio=0.9, max_duplicate_percent=5) == [
+            'повторные загрузки 2 (200.0% URL > 5%): /img/a.jpg x3',
+            'hit ratio 0.00 < 0.9',
+        ]
+        assert format_stats('search', bad).startswith('search: 3 запросов, 1 URL, повторных 2')
@@ -0,0 +1,46 @@
+"""
+Замер плавности прокрутки (запуск: pytest --kpi)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.main_page import MainPage
+from pages.profile_page import ProfilePage
+from config.appium_config import JANK_MAX_PERCENT
+
+
+@pytest.mark.kpi
+class TestScrollJank:
+    """Jank при прокрутке основных экранов"""
+
+    def test_main_page_swipes(self, driver, jank_sampler):
+        """KPI: свайпы по главному экрану"""
+        main_page = MainPage(driver)
+        assert main_page.is_page_loaded(), "Главная страница не загрузилась"
+
+        with jank_sampler('MainPage.swipe_up') as up:
+            main_page.swipe_up()
+        with jank_sampler('MainPage.swipe_down') as down:
+            main_page.swipe_down()
+
+        print(f"\nswipe_up: {up}\nswipe_down: {down}")
+        assert up['janky_percent'] <= JANK_MAX_PERCENT
+        assert down['janky_percent'] <= JANK_MAX_PERCENT
+
+    def test_profile_scroll_to_logout(self, driver, jank_sampler):
+        """KPI: прокрутка профиля до кнопки выхода"""
+        main_page = MainPage(driver)
+        main_page.navigate_to_profile()
+        profile_page = ProfilePage(driver)
+        assert profile_page.is_page_loaded(), "Страница профиля не загрузилась"
+
+        with jank_sampler('ProfilePage.scroll_to_logout') as scroll:
+            profile_page.scroll_to_logout()
+
+        print(f"\nscroll_to_logout: {scroll}")
+        assert scroll['janky_percent'] <= JANK_MAX_PERCENT
+        main_page.navigate_to_home()
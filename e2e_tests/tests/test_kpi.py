@@ -0,0 +1,141 @@
+"""
+KPI-замеры задержек экранов (запуск: pytest --kpi)
+
+Заполнение полей и возврат на исходный экран не замеряются; замеряется
+только действие (клик/ввод) до готовности целевого экрана, без фиксированных
+пауз из page objects.
+"""
+import os
+import sys
+import pytest
+from types import SimpleNamespace
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from pages.profile_page import ProfilePage
+from utilities.kpi import ScreenProbe
+from config.appium_config import TEST_USER_EMAIL, TEST_USER_PASSWORD, IMPLICIT_WAIT
+
+SEARCH_QUERIES = ['гречка', 'молоко', 'яблоко']
+
+
+@pytest.fixture
+def kpi(driver, kpi_recorder, request):
+    """Page objects, проба готовности экрана и число повторов"""
+    pages = SimpleNamespace(
+        sign_in=SignInPage(driver),
+        main=MainPage(driver),
+        search=SearchPage(driver),
+        profile=ProfilePage(driver),
+        probe=ScreenProbe(driver),
+        recorder=kpi_recorder,
+        iterations=request.config.getoption('kpi_iterations'),
+    )
+    # Проверки готовности не должны ждать implicit wait
+    driver.implicitly_wait(0)
+    yield pages
+    driver.implicitly_wait(IMPLICIT_WAIT)
+
+
+def main_ready(kpi):
+    return kpi.probe.ready([kpi.main.ADD_MEAL_BUTTON], [kpi.main.LOADING_INDICATOR])
+
+
+def date_changed(kpi, previous):
+    """Готовность после смены даты: дата сменилась и приемы пищи загружены"""
+    loaded = main_ready(kpi)
+
+    def check():
+        labels = kpi.main.driver.find_elements(*kpi.main.DATE_TEXT)
+        return bool(labels) and labels[0].text != previous and loaded()
+    return check
+
+
+def go_home(kpi):
+    kpi.recorder.time_flow(
+        'navigate_to_home',
+        lambda: kpi.main.find_element(kpi.main.HOME_TAB).click(),
+        main_ready(kpi),
+    )
+
+
+@pytest.mark.kpi
+class TestScreenLatency:
+    """Задержки основных переходов"""
+
+    def test_login_latency(self, kpi):
+        """KPI: нажатие 'Войти' -> главный экран загружен"""
+        for _ in range(kpi.iterations):
+            assert kpi.sign_in.is_page_loaded(), "Нужен экран входа (пользователь не авторизован)"
+            kpi.sign_in.enter_email(TEST_USER_EMAIL)
+            kpi.sign_in.enter_password(TEST_USER_PASSWORD)
+            kpi.sign_in.hide_keyboard()
+
+            elapsed = kpi.recorder.time_flow(
+                'login',
+                lambda: kpi.sign_in.find_element_multiple(kpi.sign_in.LOGIN_BUTTON).click(),
+                main_ready(kpi),
+            )
+            assert elapsed is not None, "Главный экран не загрузился после входа"
+
+            # Выходим, чтобы повторить вход
+            kpi.main.navigate_to_profile()
+            kpi.profile.scroll_to_logout()
+            kpi.profile.click_logout()
+
+        # Оставляем пользователя авторизованным для следующих потоков
+        kpi.sign_in.login(TEST_USER_EMAIL, TEST_USER_PASSWORD)
+
+    def test_navigate_to_search_latency(self, kpi):
+        """KPI: вкладка 'Поиск' -> поле поиска на экране"""
+        for _ in range(kpi.iterations):
+            elapsed = kpi.recorder.time_flow(
+                'navigate_to_search',
+                lambda: kpi.main.find_element(kpi.main.SEARCH_TAB).click(),
+                kpi.probe.ready([kpi.search.SEARCH_INPUT]),
+            )
+            assert elapsed is not None, "Экран поиска не загрузился"
+            go_home(kpi)
+
+    def test_navigate_to_profile_latency(self, kpi):
+        """KPI: вкладка 'Профиль' -> экран профиля"""
+        for _ in range(kpi.iterations):
+            elapsed = kpi.recorder.time_flow(
+                'navigate_to_profile',
+                lambda: kpi.main.find_element(kpi.main.PROFILE_TAB).click(),
+                kpi.probe.ready([kpi.profile.SETTINGS_BUTTON]),
+            )
+            assert elapsed is not None, "Экран профиля не загрузился"
+            go_home(kpi)
+
+    def test_change_date_latency(self, kpi):
+        """KPI: смена даты -> приемы пищи за новую дату загружены"""
+        for i in range(kpi.iterations):
+            button = kpi.main.DATE_NEXT_BUTTON if i % 2 == 0 else kpi.main.DATE_PREV_BUTTON
+            previous = kpi.main.get_selected_date()
+            elapsed = kpi.recorder.time_flow(
+                'change_date',
+                lambda: kpi.main.find_element(button).click(),
+                date_changed(kpi, previous),
+            )
+            assert elapsed is not None, "Приемы пищи не загрузились после смены даты"
+
+    def test_search_product_latency(self, kpi):
+        """KPI: ввод запроса -> результаты поиска на экране"""
+        kpi.main.navigate_to_search()
+        for i in range(kpi.iterations):
+            query = SEARCH_QUERIES[i % len(SEARCH_QUERIES)]
+            kpi.search.clear_search()
+            # Ждем, пока исчезнут результаты предыдущего запроса
+            kpi.search.wait_for_element_invisible(kpi.search.PRODUCT_ITEM, timeout=5)
+            elapsed = kpi.recorder.time_flow(
+                'search_product',
+                lambda: kpi.search.find_element(kpi.search.SEARCH_INPUT).send_keys(query),
+                kpi.probe.ready([kpi.search.PRODUCT_ITEM], [kpi.search.LOADING_INDICATOR]),
+            )
+            assert elapsed is not None, f"Нет результатов поиска для '{query}'"
+        go_home(kpi)
@@ -0,0 +1,64 @@
+"""
+Тесты статистики KPI и сравнения с baseline (без устройства)
+"""
+import json
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.kpi import KpiRecorder, compare_with_baseline, percentile, summarize
+
+
+@pytest.mark.unit
+def test_percentile_interpolation():
+    """Тест: перцентили с интерполяцией"""
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+@pytest.mark.unit
+def test_summary_fields():
+    """Тест: сводка содержит p50/p95/p99"""
+    stats = summarize([100.0, 200.0, 300.0])
+
+    assert stats['n'] == 3
+    assert stats['p50'] == 200.0
+    assert stats['min'] == 100.0 and stats['max'] == 300.0
+
+
+@pytest.mark.unit
+def test_regression_detected_beyond_tolerance():
+    """Тест: ухудшение больше допуска считается регрессией"""
+    baseline = {'search_product': {'p50': 1000.0, 'p95': 1500.0}}
+    slower = {'search_product': {'n': 10, 'p50': 1100.0, 'p95': 2000.0}}
+
+    regressions = compare_with_baseline(slower, baseline, tolerance=0.2)
+
+    assert [(r['flow'], r['metric']) for r in regressions] == [('search_product', 'p95')]
+    assert compare_with_baseline(slower, {}, tolerance=0.2) == []
+
+
+@pytest.mark.unit
+def test_time_flow_waits_for_ready(tmp_path):
+    """Тест: замер идет до готовности экрана, неудачи считаются отдельно"""
+    recorder = KpiRecorder()
+    checks = iter([False, False, True])
+
+    elapsed = recorder.time_flow('navigate_to_search', lambda: None, lambda: next(checks), poll=0.001)
+    missing = recorder.time_flow('navigate_to_profile', lambda: None, lambda: False, timeout=0.01, poll=0.001)
+
+    assert elapsed > 0
+    assert missing is None
+    assert recorder.failures['navigate_to_profile'] == 1
+
+    path = tmp_path / 'kpi.json'
+    recorder.write(str(path))
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert report['flows']['navigate_to_search']['n'] == 1
@@ -0,0 +1,91 @@
+"""
+Большой каталог: время до элемента N, страницы и память (запуск: pytest --kpi)
+
+Каталог заглушки бэкенда растет по CATALOG_SIZES (10^3..10^5
+продуктов), на каждом размере список SearchScreen / ProductsScreen
+прокручивается до элемента CATALOG_TARGET_INDEX. Время до первого
+результата - проба экрана (ScreenProbe), без ожидания тишины сети.
+Время сервера заглушки вычитается, так что
+показатель роста от размера каталога (scaling_exponent) относится к
+приложению: при постраничной загрузке он около нуля, линейный рост
+значит, что ProductStore обрабатывает каталог целиком.
+"""
+import os
+import sys
+import time
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from utilities.kpi import ScreenProbe
+from utilities.catalog_scaling import (
+    CATALOG_PREFIX, check_scaling, fetch_summary, format_measurement, grow_catalog, page_records, scaling_report,
+)
+from config.appium_config import CATALOG_SIZES, CATALOG_TARGET_INDEX, IMPLICIT_WAIT
+
+
+def measure(search, flow, kpi_recorder, resource_sampler, backend_stub, size, target=CATALOG_TARGET_INDEX):
+    """Один размер каталога: поиск с нуля и прокрутка до элемента target"""
+    grow_catalog(backend_stub, size)
+    search.clear_search()
+    search.wait_for_element_invisible(search.PRODUCT_ITEM, timeout=5)
+    pss_before = resource_sampler.sample()
+    search.driver.implicitly_wait(0)
+    try:
+        typed = time.time()
+        first_ms = kpi_recorder.time_flow(
+            flow,
+            lambda: search.find_element(search.SEARCH_INPUT).send_keys(CATALOG_PREFIX),
+            ScreenProbe(search.driver).ready([search.PRODUCT_ITEM], [search.LOADING_INDICATOR]),
+        )
+        navigator = search.product_list()
+        item = navigator.scroll_to(target)
+        done = time.time()
+    finally:
+        search.driver.implicitly_wait(IMPLICIT_WAIT)
+    pss_after = resource_sampler.sample()
+
+    records = page_records(backend_stub, typed)
+    fetch = fetch_summary(records, size, len(navigator.tops), target)
+    first_page = next((r for r in records if int(r['query'].get('page', 0)) == 0 and r['finished']), None)
+    first_server_ms = (first_page['finished'] - first_page['started']) * 1000 if first_page else 0
+    return {
+        'size': size,
+        'target': target,
+        'reached': item is not None,
+        'first_ms': round(first_ms - first_server_ms, 1) if first_ms is not None else None,
+        'item_ms': round((done - typed) * 1000 - fetch['server_ms'], 1) if item is not None else None,
+        'pss_growth_kb': pss_after - pss_before if pss_before is not None and pss_after is not None else None,
+        'fetch': fetch,
+    }
+
+
+@pytest.mark.kpi
+@pytest.mark.parametrize('screen', ['search', 'products'])
+def test_time_to_item_does_not_grow_with_catalogue(driver, stub_user, backend_stub, resource_sampler, kpi_recorder,
+                                                   screen, request):
+    """Время до элемента N, число страниц и рост PSS не зависят от размера каталога"""
+    main, search = MainPage(driver), SearchPage(driver)
+    SignInPage(driver).login(stub_user['email'], stub_user['password'])
+    if screen == 'search':
+        main.click_add_meal_button()
+    else:
+        main.navigate_to_products()
+    assert search.is_page_loaded(), "Экран со списком продуктов не открылся"
+
+    measurements = [measure(search, f"catalog_{screen}_{size}", kpi_recorder, resource_sampler, backend_stub, size)
+                    for size in sorted(CATALOG_SIZES)]
+    report = scaling_report(measurements)
+    request.node.user_properties.append(
+        ('catalog_scaling', {'screen': screen, 'measurements': measurements, 'scaling': report})
+    )
+    summary = '\n'.join(format_measurement(m) for m in measurements)
+    summary += ''.join(f"\n{metric}: показатель {value['exponent']} (R^2 {value['r2']}) - {value['verdict']}"
+                       for metric, value in report.items())
+    print(f"\n{screen}:\n{summary}")
+    problems = check_scaling(report, measurements)
+    assert not problems, f"Список не масштабируется с каталогом: {'; '.join(problems)}\n{summary}"
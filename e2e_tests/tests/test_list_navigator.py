@@ -0,0 +1,162 @@
+"""
+Тесты навигации по виртуализированному списку на фейковом драйвере (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.list_navigator import ListNavigator, marker_items, parse_bounds
+from utilities.image_stub import ViewCounter
+
+
+class FakeVirtualizedList:
+    """Драйвер, имитирующий FlatList: рендерятся только элементы рядом с экраном
+
+    Жест сдвигает контент на длину движения пальца минус touch slop,
+    инерции нет (перед отпусканием есть пауза). Тапы запоминаются.
+    """
+
+    WIDTH = 1080
+    TOP, BOTTOM = 300, 1800  # контейнер списка
+    TOUCH_SLOP = 24
+
+    def __init__(self, count, item_height=210, window=1.0, header=True):
+        self.count = count
+        self.item_height = item_height
+        self.window = window  # буфер рендеринга в высотах экрана (windowSize FlatList)
+        self.header = header
+        self.scroll = 0
+        self.page_source_calls = 0
+        self.gestures = []
+        self.taps = []
+
+    @property
+    def max_scroll(self):
+        return max(0, self.count * self.item_height - (self.BOTTOM - self.TOP))
+
+    def item_bounds(self, i):
+        y1 = self.TOP + i * self.item_height - self.scroll
+        return 0, y1, self.WIDTH, y1 + self.item_height
+
+    def rendered(self):
+        buffer = (self.BOTTOM - self.TOP) * self.window
+        for i in range(self.count):
+            _, y1, _, y2 = self.item_bounds(i)
+            if y2 >= self.TOP - buffer and y1 <= self.BOTTOM + buffer:
+                yield i
+
+    @property
+    def page_source(self):
+        self.page_source_calls += 1
+        rows = []
+        for i in self.rendered():
+            x1, y1, x2, y2 = self.item_bounds(i)
+            rows.append(
+                f'<android.view.ViewGroup bounds="[{x1},{y1}][{x2},{y2}]">'
+                f'<android.widget.TextView text="Продукт {i}" bounds="[{x1},{y1}][{x2},{y1 + 100}]"/>'
+                f'<android.widget.TextView text="{100 + i} ккал" bounds="[{x1},{y1 + 100}][{x2},{y2}]"/>'
+                f'</android.view.ViewGroup>'
+            )
+        header = ('<android.widget.TextView text="2100 ккал" bounds="[0,100][1080,200]"/>' if self.header else '')
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><hierarchy>'
+            f'<android.widget.FrameLayout bounds="[0,0][{self.WIDTH},2400]">{header}'
+            f'<android.widget.ScrollView scrollable="true" bounds="[0,{self.TOP}][{self.WIDTH},{self.BOTTOM}]">'
+            f'<android.view.ViewGroup bounds="[0,{self.TOP}][{self.WIDTH},{self.BOTTOM}]">{"".join(rows)}'
+            '</android.view.ViewGroup></android.widget.ScrollView></android.widget.FrameLayout></hierarchy>'
+        )
+
+    def get_window_size(self):
+        return {'width': self.WIDTH, 'height': 2400}
+
+    def execute(self, command, params):
+        assert command == 'actions'
+        steps = params['actions'][0]['actions']
+        moves = [step for step in steps if step['type'] == 'pointerMove']
+        start, end = moves[0]['y'], moves[-1]['y']
+        if start == end:
+            self.taps.append(next((i for i in self.rendered()
+                                   if self.item_bounds(i)[1] <= start < self.item_bounds(i)[3]), None))
+            return
+        assert steps[-2]['type'] == 'pause', "Жест без паузы перед отпусканием даст инерцию"
+        drag = start - end
+        shift = max(abs(drag) - self.TOUCH_SLOP, 0) * (1 if drag > 0 else -1)
+        self.scroll = min(max(self.scroll + shift, 0), self.max_scroll)
+        self.gestures.append(drag)
+
+
+def product_items():
+    return marker_items('ккал', 'android.view.ViewGroup')
+
+
+@pytest.mark.unit
+class TestListNavigator:
+    """Прокрутка до элемента N"""
+
+    def test_visible_item_needs_no_gestures(self):
+        driver = FakeVirtualizedList(50)
+        navigator = ListNavigator(driver, product_items())
+        item = navigator.click(2)
+        assert item.key == 'Продукт 2 | 102 ккал'
+        assert driver.gestures == []
+        assert driver.taps == [2]
+
+    def test_reach_far_item_in_minimum_gestures(self):
+        driver = FakeVirtualizedList(200)
+        navigator = ListNavigator(driver, product_items())
+        item = navigator.click(120)
+        assert item.key.startswith('Продукт 120 ')
+        assert driver.taps == [120]
+        # Нужно прокрутить ~120 * 210 px жестами не длиннее 0.8 * 1500 px
+        needed = 120 * 210 / (0.8 * 1500 - FakeVirtualizedList.TOUCH_SLOP)
+        assert len(driver.gestures) <= int(needed) + 2
+        assert navigator.snapshots == len(driver.gestures) + 1
+        x1, y1, x2, y2 = item.bounds
+        assert FakeVirtualizedList.TOP <= y1 and y2 <= FakeVirtualizedList.BOTTOM
+
+    def test_known_items_are_not_rescanned(self):
+        driver = FakeVirtualizedList(200)
+        navigator = ListNavigator(driver, product_items())
+        navigator.click(60)
+        gestures = len(driver.gestures)
+        # Элемент выше уже в индексе: прокрутка назад по известной позиции
+        item = navigator.click(10)
+        assert item.key.startswith('Продукт 10 ')
+        assert driver.taps == [60, 10]
+        assert len(driver.gestures) - gestures <= int(50 * 210 / 1176) + 2
+
+    def test_end_of_list(self):
+        driver = FakeVirtualizedList(25)
+        navigator = ListNavigator(driver, product_items())
+        assert navigator.scroll_to(24).key.startswith('Продукт 24 ')
+        assert navigator.scroll_to(25) is None
+        assert navigator.end_reached
+        with pytest.raises(IndexError):
+            navigator.click(30)
+        assert navigator.count() == 25
+
+    def test_items_outside_list_are_ignored(self):
+        """Карточка - сам узел с маркером; итог 'ккал' над списком - не элемент"""
+        driver = FakeVirtualizedList(3)
+        navigator = ListNavigator(driver, marker_items('ккал'))
+        items = navigator.snapshot()
+        assert [item.key for item in items] == ['100 ккал', '101 ккал', '102 ккал']
+        assert navigator.container == (0, FakeVirtualizedList.TOP, 1080, FakeVirtualizedList.BOTTOM)
+
+    def test_snapshots_feed_view_counter(self):
+        """Карточка, ушедшая с экрана и вернувшаяся, показана дважды"""
+        driver = FakeVirtualizedList(25, window=0)
+        counter = ViewCounter(lambda key: key.split(' | ')[0])
+        navigator = ListNavigator(driver, product_items(), on_snapshot=counter)
+        navigator.count()
+        navigator.scroll_to(0)
+        assert counter.views['Продукт 0'] == 2
+        assert counter.views['Продукт 24'] == 1
+        assert set(counter.views) == {f'Продукт {i}' for i in range(25)}
+
+    def test_parse_bounds(self):
+        assert parse_bounds('[0,300][1080,1800]') == (0, 300, 1080, 1800)
+        assert parse_bounds('') is None
@@ -0,0 +1,130 @@
+"""
+Тесты гистограммы задержек и нагрузочного генератора на локальной заглушке бэкенда
+"""
+import asyncio
+import json
+import os
+import sys
+import urllib.request
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.backend_stub import BackendStub
+from utilities.histogram import LatencyHistogram, bucket_index, bucket_range
+from utilities.load_generator import run_load
+
+
+@pytest.fixture
+def local_stub():
+    stub = BackendStub().start()
+    yield stub
+    stub.stop()
+
+
+def request_json(url, method='GET', body=None, token=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+@pytest.mark.unit
+class TestLatencyHistogram:
+    """HDR-гистограмма"""
+
+    def test_bucket_relative_error(self):
+        for value in [0, 1, 127, 128, 255, 256, 1000, 12345, 10 ** 6, 10 ** 9]:
+            low, high = bucket_range(bucket_index(value))
+            assert low <= value <= high
+            assert high - low <= max(1, value / 128)
+
+    def test_percentiles(self):
+        hist = LatencyHistogram()
+        for value in range(1, 10001):
+            hist.record(value)
+        assert hist.total == 10000
+        assert hist.percentile(50) == pytest.approx(5000, rel=0.01)
+        assert hist.percentile(99) == pytest.approx(9900, rel=0.01)
+        assert hist.percentile(100) == 10000
+        assert hist.mean == pytest.approx(5000.5)
+
+    def test_merge(self):
+        left, right = LatencyHistogram(), LatencyHistogram()
+        for value in range(1000):
+            left.record(value)
+            right.record(value + 1000)
+        left.merge(right)
+        assert left.total == 2000
+        assert left.min == 0 and left.max == 1999
+        assert left.percentile(50) == pytest.approx(1000, rel=0.01)
+
+    def test_empty(self):
+        assert LatencyHistogram().to_dict()['p99_ms'] is None
+
+
+@pytest.mark.unit
+class TestBackendStub:
+    """Заглушка бэкенда по API_CONTRACT.md"""
+
+    def test_auth_and_search(self, local_stub):
+        user = {'email': 'stub@example.com', 'password': 'Test123456', 'name': 'Stub'}
+        assert request_json(local_stub.url + '/auth/user', 'POST', user)[0] == 201
+        assert request_json(local_stub.url + '/auth/user', 'POST', user)[0] == 409
+
+        status, token = request_json(local_stub.url + '/auth/token', 'POST',
+                                     {'email': user['email'], 'password': 'wrong-password'})
+        assert status == 401
+        status, token = request_json(local_stub.url + '/auth/token', 'POST',
+                                     {'email': user['email'], 'password': user['password']})
+        assert status == 200
+
+        assert request_json(local_stub.url + '/product/search/name?name=x')[0] == 401
+        status, page = request_json(local_stub.url + '/product/search/name?name=%D0%B3%D1%80%D0%B5%D1%87',
+                                    token=token['jwt_token'])
+        assert status == 200
+        assert page['totalElements'] == 2
+
+    def test_meals_by_date(self, local_stub):
+        user = {'email': 'meal@example.com', 'password': 'Test123456'}
+        request_json(local_stub.url + '/auth/user', 'POST', user)
+        token = request_json(local_stub.url + '/auth/token', 'POST', user)[1]['jwt_token']
+        meal = {'mealType': 'LUNCH', 'dateTime': '2024-10-20T12:00:00'}
+        assert request_json(local_stub.url + '/meal', 'POST', meal, token)[0] == 201
+        assert len(request_json(local_stub.url + '/meal/findByDate?date=2024-10-20', token=token)[1]) == 1
+        assert request_json(local_stub.url + '/meal/findByDate?date=2024-10-21', token=token)[1] == []
+
+
+@pytest.mark.unit
+class TestLoadGenerator:
+    """Closed и open loop против заглушки"""
+
+    def test_closed_loop(self, local_stub):
+        report = asyncio.run(run_load(local_stub.url, 'closed', users=40, concurrency=10, pool_size=10, seed=1))
+        assert report['completed'] == 40
+        assert report['failed'] == 0
+        assert report['errors'] == {}
+        assert report['operations']['register']['count'] == 40
+        assert report['operations']['meal_find_by_date']['count'] == 40
+        assert report['requests'] == 40 * 8
+        assert len(local_stub.users) == 40
+        assert report['flow']['p50_ms'] > 0
+
+    def test_open_loop(self, local_stub):
+        report = asyncio.run(run_load(local_stub.url, 'open', users=30, rate=200, pool_size=20, seed=2))
+        assert report['completed'] == 30
+        assert report['arrival_rate'] == 200
+        assert report['concurrency'] is None
+        assert len(local_stub.meals) == 30
+
+    def test_errors_are_counted(self, local_stub):
+        report = asyncio.run(run_load(local_stub.url + '/missing', 'closed', users=5, concurrency=5, seed=3))
+        assert report['completed'] == 0
+        assert report['failed'] == 5
+        assert report['errors'] == {'register: HTTP 404': 5}
@@ -0,0 +1,100 @@
+"""
+Тесты проверки локаторов page objects (без устройства)
+"""
+import os
+import sys
+import pytest
+from selenium.webdriver.common.by import By
+from appium.webdriver.common.appiumby import AppiumBy
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.locators import LocatorError, LocatorRegistry, check_locator, check_xpath, main, registry
+import utilities.base_page as base_page
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pages')
+
+
+@pytest.mark.unit
+class TestCheckXpath:
+    """Правила проверки XPath"""
+
+    def test_impossible_node_test(self):
+        errors, _ = check_xpath("//choose_following[contains(@text, 'ккал')]/ancestor::android.view.ViewGroup")
+        assert errors == ['узлов <choose_following> не бывает: ожидается класс вида android.widget.TextView']
+
+    def test_unknown_attribute(self):
+        errors, _ = check_xpath("//android.widget.Button[contains(@text, 'Выйти') or contains(@text-east, 'Выход')]")
+        assert errors == ['атрибута @text-east нет в page_source']
+
+    def test_syntax_error_and_unknown_function(self):
+        assert check_xpath("//android.widget.Button[")[0][0].startswith('синтаксическая ошибка XPath')
+        assert check_xpath("//android.widget.Button[matches(@text, 'a')]")[0] == \
+            ['функция matches() не входит в XPath 1.0']
+
+    def test_literals_are_not_parsed(self):
+        assert check_xpath("//*[@text='@foo // bar()']") == ([], [])
+
+    def test_valid_locators(self):
+        for expression in [
+            "//android.widget.EditText[contains(@hint, 'пароль') and not(contains(@hint, 'Подтвердите'))]",
+            "//android.widget.TextView[contains(@text, 'ИМТ')]/following-sibling::android.widget.TextView",
+            "//android.widget.TabWidget/*",
+            "//*[text()='a']",
+            "//XCUIElementTypeButton[@name='Войти']",
+        ]:
+            assert check_xpath(expression)[0] == [], expression
+
+    def test_expensive_patterns(self):
+        _, warnings = check_xpath("//*[contains(@text, 'ккал')]/ancestor::android.view.ViewGroup[1]")
+        assert warnings == ['//* с contains(): обход всего дерева со сравнением подстрок',
+                            'ось ancestor:: проходит всех предков']
+
+    def test_other_strategies(self):
+        assert check_locator((AppiumBy.ACCESSIBILITY_ID, 'sign_in_login_button')) == ([], [])
+        assert check_locator((AppiumBy.ACCESSIBILITY_ID, ' '))[0] == ['пустое значение локатора']
+        assert check_locator((By.ID, 'login'))[1]
+        assert check_locator(('xpath',))[0]
+
+
+@pytest.mark.unit
+class TestLocatorRegistry:
+    """Регистрация при импорте page objects"""
+
+    def test_page_objects_are_valid(self):
+        import pages.main_page, pages.profile_page, pages.registration_page, pages.search_page, pages.sign_in_page
+        assert registry.errors() == []
+        assert 'ProfilePage.CALORIES_GOAL' in registry.locators
+        assert 'SignInPage.LOGIN_BUTTON' in registry.locators
+
+    def test_bad_locator_rejected_at_class_creation(self, monkeypatch):
+        monkeypatch.setattr(base_page, 'registry', LocatorRegistry())
+        with pytest.raises(LocatorError, match='BrokenPage.LOGOUT_BUTTON'):
+            class BrokenPage(base_page.BasePage):
+                LOGOUT_BUTTON = (By.XPATH, "//android.widget.Button[@text-east='Выход']")
+
+    def test_lists_and_non_locators(self):
+        class Page:
+            LOGIN_BUTTON = [(AppiumBy.ACCESSIBILITY_ID, 'login'), (By.XPATH, "//bogus[@text='Войти']")]
+            TIMEOUT = 10
+            TITLE = ('Заголовок', 'не локатор')
+
+        reg = LocatorRegistry(strict=False)
+        reg.register_page(Page)
+        assert list(reg.locators) == ['Page.LOGIN_BUTTON']
+        assert [issue.message for issue in reg.errors()] == \
+            ['узлов <bogus> не бывает: ожидается класс вида android.widget.TextView']
+
+    def test_compiled_xpath_matches_snapshot(self):
+        from lxml import etree
+        reg = LocatorRegistry()
+        locator = (By.XPATH, "//android.widget.TextView[contains(@text, 'ккал')]")
+        reg.register('Page', 'CALORIES', locator)
+        root = etree.fromstring('<hierarchy><android.widget.TextView text="100 ккал"/></hierarchy>')
+        assert len(reg.compiled(locator)(root)) == 1
+
+    def test_cli(self, monkeypatch, capsys):
+        monkeypatch.setattr(registry, 'strict', True)
+        assert main([PAGES_DIR]) == 0
+        assert 'ошибок: 0' in capsys.readouterr().out
@@ -0,0 +1,80 @@
+"""
+Тесты кольцевого буфера logcat на синтетическом потоке (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.logcat_buffer import LogcatRingBuffer, LogcatReader, parse_logcat_line
+
+
+def line(tag, message, level='I'):
+    return f"10-18 12:00:00.123  4321  4350 {level} {tag}: {message}"
+
+
+class FakeLogDriver:
+    """Отдает заранее заготовленные пачки записей Appium log API"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def get_log(self, log_type):
+        assert log_type == 'logcat'
+        return self.batches.pop(0) if self.batches else []
+
+
+@pytest.mark.unit
+def test_parse_threadtime_line():
+    """Тест: разбор строки формата threadtime"""
+    parsed = parse_logcat_line(line('ReactNativeJS', 'API Base URL: http://x', 'D'))
+
+    assert parsed['tag'] == 'ReactNativeJS'
+    assert parsed['level'] == 'D'
+    assert parsed['message'] == 'API Base URL: http://x'
+    assert parse_logcat_line('--------- beginning of main') is None
+
+
+@pytest.mark.unit
+def test_filters_app_lines():
+    """Тест: остаются только строки приложения"""
+    buffer = LogcatRingBuffer(maxlen=100)
+    buffer.feed([
+        line('ReactNativeJS', 'render MainScreen'),
+        line('ActivityManager', 'Start proc com.l423r.FoodApp'),
+        line('WifiService', 'scan results'),
+        line('AndroidRuntime', 'FATAL EXCEPTION: main', 'E'),
+    ], timestamp=100.0)
+
+    lines = buffer.window(0)
+    assert len(lines) == 3
+    assert not any('WifiService' in text for text in lines)
+
+
+@pytest.mark.unit
+def test_memory_bounded_on_long_stream():
+    """Тест: размер буфера постоянен на длинном потоке"""
+    buffer = LogcatRingBuffer(maxlen=500, max_line=80)
+    for batch in range(200):
+        buffer.feed((line('ReactNativeJS', f'tick {batch}-{i} ' + 'x' * 500) for i in range(100)),
+                    timestamp=float(batch))
+
+    assert len(buffer) == 500
+    assert buffer.received == 20000
+    assert all(len(text) <= 80 for text in buffer.window(0))
+    assert buffer.window(199.0)[-1].startswith(line('ReactNativeJS', 'tick 199-99')[:60])
+
+
+@pytest.mark.unit
+def test_window_of_failing_test():
+    """Тест: окно выбирается по времени теста"""
+    reader = LogcatReader(FakeLogDriver([
+        [{'timestamp': 1000000, 'message': line('ReactNativeJS', 'previous test')}],
+        [{'timestamp': 1005000, 'message': line('ReactNativeJS', 'TypeError: undefined')}],
+    ]))
+    reader.poll()
+    reader.poll()
+
+    assert reader.buffer.window(1002.0) == [line('ReactNativeJS', 'TypeError: undefined')]
@@ -20,14 +20,11 @@ class TestMainFeatures:
     """Тесты для основных функций приложения"""
     
     @pytest.fixture(autouse=True)
-    def login_user(self, driver):
+    def login_user(self, router):
         """Фикстура для автоматического входа перед каждым тестом"""
-        # Здесь должна быть логика входа
-        # Пока просто ждем загрузки главного экрана
-        time.sleep(3)
+        # Входит, если нужно, и ждет главный экран
+        router.go(MainPage)
         yield
-        # Cleanup после теста
-        pass
     
     def test_main_page_loaded(self, driver, setup_test_environment, login_user):
         """Тест: проверка загрузки главного экрана"""
@@ -107,10 +104,9 @@ class TestSearchFunctionality:
     """Тесты для функциональности поиска"""
     
     @pytest.fixture(autouse=True)
-    def navigate_to_search(self, driver):
+    def navigate_to_search(self, router):
         """Фикстура для автоматического перехода на поиск"""
-        time.sleep(3)
-        # Здесь должна быть логика перехода на экран поиска
+        router.go(SearchPage)
         yield
     
     def test_search_page_loaded(self, driver, setup_test_environment):
@@ -0,0 +1,149 @@
+"""
+Тесты подготовки снимков, загрузки в галерею и разбора загрузок анализа фото (без устройства)
+"""
+import base64
+import io
+import json
+import os
+import sys
+import urllib.request
+import pytest
+from PIL import Image
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.backend_stub import BackendStub
+from utilities.media_fixtures import (
+    MANIFEST, DeviceGallery, MediaFixtures, check_upload, downscale, encode_jpeg, image_info, synthetic_photo,
+    upload_report,
+)
+
+REMOTE_DIR = '/sdcard/Pictures/e2e'
+USER = {'email': 'photo@example.com', 'password': 'Test123456'}
+
+
+def request_json(url, method='GET', body=None, token=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+def executed(server):
+    """Число вызовов execute (mobile: pushFile, mobile: shell)"""
+    return sum(1 for method, command in server.commands if command == '/execute/sync')
+
+
+@pytest.mark.unit
+class TestImages:
+    """Синтетические снимки, уменьшение и оценка JPEG-качества"""
+
+    def test_synthetic_photo_is_deterministic_jpeg(self):
+        photo = synthetic_photo(3, size=(300, 400), quality=90)
+        assert photo == synthetic_photo(3, size=(300, 400), quality=90)
+        assert photo != synthetic_photo(4, size=(300, 400), quality=90)
+        info = image_info(photo)
+        assert (info['format'], info['width'], info['height'], info['quality']) == ('JPEG', 300, 400, 90)
+
+    def test_quality_estimate(self):
+        image = Image.open(io.BytesIO(synthetic_photo(1, size=(160, 120))))
+        for quality in (30, 50, 80, 95):
+            assert image_info(encode_jpeg(image, quality))['quality'] == quality
+        png = io.BytesIO()
+        image.save(png, 'PNG')
+        assert image_info(png.getvalue())['quality'] is None
+
+    def test_downscale_keeps_aspect_and_exif_rotation(self):
+        image = Image.open(io.BytesIO(synthetic_photo(2, size=(800, 600))))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: повернуть на 90 по часовой
+        original = io.BytesIO()
+        image.save(original, 'JPEG', quality=95, exif=exif)
+        info = image_info(downscale(original.getvalue(), size=(200, 200), quality=70))
+        assert (info['width'], info['height'], info['quality']) == (150, 200, 70)
+
+
+@pytest.mark.unit
+def test_fixtures_are_cached(tmp_path):
+    fixtures = MediaFixtures(str(tmp_path / 'cache'), size=(120, 160), quality=85)
+    paths = fixtures.build(count=3, source_dir=None)
+    assert [os.path.basename(p) for p in paths] == [f"meal_{i:03d}_120x160_q85.jpg" for i in range(3)]
+    assert fixtures.generated == 3
+    fixtures.build(count=4, source_dir=None)
+    assert fixtures.generated == 4
+
+    source = tmp_path / 'photos'
+    source.mkdir()
+    (source / 'dinner.jpg').write_bytes(synthetic_photo(9, size=(1200, 900)))
+    (source / 'notes.txt').write_text('не фото')
+    [path] = fixtures.build(count=5, source_dir=str(source))
+    assert os.path.basename(path).startswith('photo_')
+    assert image_info(open(path, 'rb').read())['width'] == 120
+
+
+@pytest.mark.unit
+def test_gallery_sync_pushes_missing_files_and_scans_once(tmp_path, fake_session):
+    server, session = fake_session
+    paths = MediaFixtures(str(tmp_path), size=(64, 48)).build(count=5, source_dir=None)
+    gallery = DeviceGallery(session, REMOTE_DIR)
+
+    first = gallery.sync(paths)
+    assert (first['pushed'], first['skipped']) == (5, 0)
+    assert first['bytes'] == sum(os.path.getsize(p) for p in paths)
+    assert server.files[f"{REMOTE_DIR}/{os.path.basename(paths[0])}"] == open(paths[0], 'rb').read()
+    # Одно сканирование папки на весь пакет
+    assert server.media_scans == [REMOTE_DIR]
+    assert len(json.loads(server.files[f"{REMOTE_DIR}/{MANIFEST}"])) == 5
+
+    # Повторный прогон: все на месте - только cat манифеста и ls, без push_file и сканирования
+    calls = executed(server)
+    second = gallery.sync(paths)
+    assert (second['pushed'], second['skipped']) == (0, 5)
+    assert executed(server) - calls == 2
+    assert server.media_scans == [REMOTE_DIR]
+
+    # Файл удалили с устройства - отправляется только он, манифест и одно сканирование
+    del server.files[f"{REMOTE_DIR}/{os.path.basename(paths[2])}"]
+    calls = executed(server)
+    assert gallery.sync(paths)['pushed'] == 1
+    assert executed(server) - calls == 5
+
+    gallery.clear()
+    assert not [p for p in server.files if p.startswith(REMOTE_DIR)]
+    assert server.media_scans[-1] == REMOTE_DIR
+
+
+@pytest.mark.unit
+def test_upload_report_from_stub_log():
+    with BackendStub() as stub:
+        stub.create_user(USER['email'], USER['password'])
+        token = request_json(stub.url + '/auth/token', 'POST', USER)[1]['jwt_token']
+        image = Image.open(io.BytesIO(synthetic_photo(5, size=(600, 800))))
+        uploads = []
+        for quality in (80, 100):
+            encoded = 'data:image/jpeg;base64,' + base64.b64encode(encode_jpeg(image, quality)).decode('ascii')
+            body = {'image_base64': encoded, 'language': 'ru'}
+            status, payload = request_json(stub.url + '/meal_element/analyze-photo', 'POST', body, token)
+            assert status == 200 and payload['ingredients']
+            uploads.append(len(json.dumps(body)))
+        assert request_json(stub.url + '/meal_element/analyze-photo', 'POST', {}, token)[0] == 400
+
+        report = upload_report(stub)
+    compressed, original, empty = report
+    assert [compressed['request_bytes'], original['request_bytes']] == uploads
+    assert (compressed['mime'], compressed['width'], compressed['height'], compressed['quality']) == \
+        ('image/jpeg', 600, 800, 80)
+    assert compressed['server_ms'] is not None and compressed['status'] == 200
+    assert check_upload(compressed) == []
+    # Регрессия: приложение перестало сжимать снимок
+    assert check_upload(original, max_kb=compressed['image_bytes'] // 1024 + 1) == [
+        f"изображение {original['image_bytes'] / 1024:.0f} КБ > {compressed['image_bytes'] // 1024 + 1} КБ",
+        'JPEG-качество ~100 > 85',
+    ]
+    assert check_upload(empty) == ['изображение не дошло до обработчика']
@@ -0,0 +1,52 @@
+"""
+Поиск утечек памяти на повторяющихся потоках (запуск: pytest --kpi)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from config.appium_config import LEAK_ITERATIONS
+
+SEARCH_QUERIES = ['гречка', 'молоко', 'яблоко', 'курица']
+
+
+@pytest.mark.kpi
+class TestMemoryLeaks:
+    """PSS не должен устойчиво расти при повторении одного и того же потока"""
+
+    def test_change_date_no_leak(self, driver, resource_sampler):
+        """KPI: 50 смен даты на главном экране"""
+        main_page = MainPage(driver)
+        assert main_page.is_page_loaded(), "Главная страница не загрузилась"
+
+        for i in range(LEAK_ITERATIONS):
+            main_page.change_date('next' if i % 2 == 0 else 'prev')
+            main_page.wait_for_meals_loaded()
+            resource_sampler.mark_iteration()
+
+        report = resource_sampler.leak_report()
+        print(f"\nchange_date leak report: {report}")
+        assert not report['leak'], f"PSS растет на {report['slope_kb_per_iteration']:.0f} КБ за итерацию"
+
+    def test_search_product_no_leak(self, driver, resource_sampler):
+        """KPI: 50 поисков продукта"""
+        main_page = MainPage(driver)
+        main_page.navigate_to_search()
+        search_page = SearchPage(driver)
+        assert search_page.is_page_loaded(), "Страница поиска не загрузилась"
+
+        for i in range(LEAK_ITERATIONS):
+            search_page.clear_search()
+            search_page.enter_search_query(SEARCH_QUERIES[i % len(SEARCH_QUERIES)])
+            search_page.wait_for_search_results()
+            resource_sampler.mark_iteration()
+
+        main_page.navigate_to_home()
+        report = resource_sampler.leak_report()
+        print(f"\nsearch_product leak report: {report}")
+        assert not report['leak'], f"PSS растет на {report['slope_kb_per_iteration']:.0f} КБ за итерацию"
@@ -0,0 +1,121 @@
+"""
+Тесты профилей сети заглушки бэкенда (без устройства)
+"""
+import json
+import os
+import random
+import socket
+import sys
+import time
+import urllib.request
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.backend_stub import BackendStub, IdleProbe
+from utilities.network_conditions import (
+    NetworkProfile, format_profile_table, network_busy_ms, profile_flow, profile_table,
+)
+
+
+def get(url, timeout=5):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def local_stub():
+    stub = BackendStub(seed=7).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.mark.unit
+class TestNetworkProfile:
+    """Задержка, скорость, ошибки и зависания профиля"""
+
+    def test_plan_latency_and_bandwidth(self):
+        profile = NetworkProfile('slow', latency_ms=200, jitter_ms=50, down_kbps=800, up_kbps=200)
+        rng = random.Random(1)
+        delays = [profile.plan(rng)[1] for _ in range(500)]
+        assert 0.15 <= min(delays) and max(delays) <= 0.25
+        # 100 КБ ответа на 800 кбит/с - еще 1 с, 10 КБ запроса на 200 кбит/с - 0.4 с
+        fate, delay = NetworkProfile('bw', down_kbps=800, up_kbps=200).plan(rng, 10000, 100000)
+        assert fate == 'ok' and delay == pytest.approx(1.4)
+
+    def test_error_and_timeout_rates(self):
+        profile = NetworkProfile('lossy', error_rate=0.1, timeout_rate=0.05, hang_s=35)
+        rng = random.Random(2)
+        fates = [profile.plan(rng)[0] for _ in range(10000)]
+        assert fates.count('error') == pytest.approx(1000, rel=0.15)
+        assert fates.count('timeout') == pytest.approx(500, rel=0.2)
+
+    def test_named_profiles(self):
+        assert NetworkProfile.named('none') is None
+        assert NetworkProfile.named('3g').latency_ms == 200
+        with pytest.raises(ValueError, match='Неизвестный профиль'):
+            NetworkProfile.named('5g')
+
+
+@pytest.mark.unit
+class TestStubUnderProfile:
+    """Заглушка применяет профиль к запросам API"""
+
+    def test_latency_is_applied(self, local_stub):
+        started = time.perf_counter()
+        assert get(local_stub.url + '/actuator/health')[0] == 200
+        fast = time.perf_counter() - started
+        local_stub.set_profile(NetworkProfile('slow', latency_ms=300))
+        started = time.perf_counter()
+        assert get(local_stub.url + '/actuator/health')[0] == 200
+        assert time.perf_counter() - started >= fast + 0.28
+        assert local_stub.requests(route='health')[-1]['profile'] == 'slow'
+
+    def test_errors_and_hangs(self, local_stub):
+        local_stub.set_profile(NetworkProfile('down', error_rate=1.0))
+        status, payload = get(local_stub.url + '/actuator/health')
+        assert (status, payload['error']) == (503, 'Service Unavailable')
+        local_stub.set_profile(NetworkProfile('hang', timeout_rate=1.0, hang_s=5))
+        with pytest.raises((socket.timeout, urllib.error.URLError)):
+            get(local_stub.url + '/actuator/health', timeout=0.5)
+        time.sleep(0.2)
+        record = local_stub.requests(route='health')[-1]
+        assert (record['fate'], record['cancelled']) == ('timeout', True)
+        assert local_stub.fate_counts[('down', 'error')] == 1
+
+    def test_profile_switched_over_http(self, local_stub):
+        probe = IdleProbe(local_stub.url)
+        assert probe.set_profile('3g')['latency_ms'] == 200
+        assert local_stub.profile.name == '3g'
+        # Служебные эндпоинты профилю не подчиняются
+        started = time.perf_counter()
+        probe.state()
+        assert time.perf_counter() - started < 0.15
+        assert probe.set_profile('none') is None
+        assert local_stub.profile is None
+
+
+@pytest.mark.unit
+def test_network_busy_and_profile_table():
+    records = [
+        {'started': 10.0, 'finished': 10.4},
+        {'started': 10.2, 'finished': 10.6},
+        {'started': 11.0, 'finished': 11.1},
+        {'started': 12.5, 'finished': None},
+    ]
+    assert network_busy_ms(records, 10.1, 13.0) == pytest.approx(500 + 100 + 500)
+
+    summary = {
+        profile_flow('login', 'none'): {'n': 3, 'p50': 900},
+        profile_flow('login', '3g'): {'n': 3, 'p50': 2400},
+        'navigate_to_profile': {'n': 3, 'p50': 300},
+    }
+    table = profile_table(summary)
+    assert table == {'login': {'none': 900, '3g': 2400}}
+    text = format_profile_table(table)
+    assert text.splitlines()[1].split() == ['none', '3g']
+    assert text.splitlines()[2].split() == ['login', '900', '2400']
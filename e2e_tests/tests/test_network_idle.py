@@ -0,0 +1,130 @@
+"""
+Тесты ожидания тишины в сети по заглушке бэкенда (без устройства)
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import base_page
+from utilities.backend_stub import BackendStub, IdleProbe
+from pages.search_page import SearchPage
+
+USER = {'email': 'idle@example.com', 'password': 'Test123456'}
+
+
+def request_json(url, method='GET', body=None, token=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+@pytest.fixture
+def slow_stub():
+    stub = BackendStub(delays={'search_by_name': 0.6}).start()
+    stub.create_user(USER['email'], USER['password'])
+    yield stub
+    stub.stop()
+
+
+def login(stub, email=USER['email']):
+    return request_json(stub.url + '/auth/token', 'POST', {'email': email, 'password': USER['password']})[1]['jwt_token']
+
+
+def search_in_background(stub, token):
+    thread = threading.Thread(target=request_json, args=(stub.url + '/product/search/name?name=a',),
+                              kwargs={'token': token})
+    thread.start()
+    time.sleep(0.2)
+    return thread
+
+
+
+def settled(stub, session=None, timeout=1.0):
+    """Состояние сети после ответа: обработчик закрывает запрос уже после записи ответа клиенту"""
+    deadline = time.time() + timeout
+    state = stub.network_state(session)
+    while state['in_flight'] and time.time() < deadline:
+        time.sleep(0.01)
+        state = stub.network_state(session)
+    return state
+
+
+@pytest.mark.unit
+class TestNetworkState:
+    """Незавершенные запросы по сессиям и эндпоинт /__stub/idle"""
+
+    def test_in_flight_per_session(self, slow_stub):
+        other = 'other@example.com'
+        slow_stub.create_user(other, USER['password'])
+        token = login(slow_stub)
+        login(slow_stub, other)
+        thread = search_in_background(slow_stub, token)
+        probe = IdleProbe(slow_stub.url)
+        busy = probe.state(session=USER['email'])
+        assert (busy['in_flight'], busy['idle_since']) == (1, None)
+        assert probe.state(session=other)['in_flight'] == 0
+        assert probe.state()['in_flight'] == 1
+        thread.join()
+        idle = settled(slow_stub, USER['email'])
+        assert idle['in_flight'] == 0
+        assert idle['requests'] == 2
+        # Служебные запросы не попадают в журнал
+        assert all(not r['path'].startswith('/__stub') for r in slow_stub.requests())
+
+    def test_quiet_period_starts_after_action(self, slow_stub):
+        login(slow_stub)
+        time.sleep(0.3)
+        assert slow_stub.network_state()['idle_ms'] >= 300
+        assert slow_stub.network_state(since=time.time())['idle_ms'] < 100
+
+    def test_handler_error_does_not_leak_in_flight(self, slow_stub):
+        token = login(slow_stub)
+        # Тело-список: обработчик падает с AttributeError
+        assert request_json(slow_stub.url + '/meal', 'POST', [1], token)[0] == 500
+        assert settled(slow_stub)['in_flight'] == 0
+
+
+@pytest.mark.unit
+def test_wait_for_network_idle_ends_after_response(slow_stub, monkeypatch, fake_session):
+    _, session = fake_session
+    monkeypatch.setattr(base_page, 'network_probe', IdleProbe(slow_stub.url, session=USER['email']))
+    page = SearchPage(session)
+    token = login(slow_stub)
+    thread = search_in_background(slow_stub, token)
+    page.wait_for_network_idle(timeout=5, quiet=0.3)
+    # Тишина отсчитывается от ответа, а не от начала ожидания
+    finished = slow_stub.requests(route='search_by_name')[0]['finished']
+    assert finished + 0.3 <= time.time()
+    thread.join()
+    # Длинный запрос не успевает за timeout
+    slow_stub.delays['search_by_name'] = 3
+    thread = search_in_background(slow_stub, token)
+    with pytest.raises(TimeoutException):
+        page.wait_for_network_idle(timeout=0.5)
+    thread.join()
+
+
+@pytest.mark.unit
+def test_wait_for_data_falls_back_when_stub_is_down(monkeypatch, fake_session):
+    _, session = fake_session
+    stub = BackendStub().start()
+    url = stub.url
+    stub.stop()
+    monkeypatch.setattr(base_page, 'network_probe', IdleProbe(url))
+    started = time.time()
+    assert SearchPage(session)._wait_for_data(started, fallback=0.3) is False
+    assert time.time() - started >= 0.3
@@ -0,0 +1,114 @@
+"""
+KPI-потоки под профилями сети заглушки бэкенда (запуск: pytest --kpi)
+
+По умолчанию потоки меряются без искажений, на 4G и 3G; другой набор -
+через --network-profile none,edge,3g-lossy.
+"""
+import os
+import sys
+import time
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from pages.profile_page import ProfilePage
+from utilities.kpi import ScreenProbe
+from utilities.network_conditions import network_busy_ms, profile_flow
+from config.appium_config import IMPLICIT_WAIT
+
+SEARCH_QUERIES = ['гречка', 'молоко', 'яблоко']
+
+
+@pytest.fixture
+def screens(driver):
+    """Page objects и проба готовности; implicit wait 0 на время замеров"""
+    pages = dict(sign_in=SignInPage(driver), main=MainPage(driver), search=SearchPage(driver),
+                 profile=ProfilePage(driver), probe=ScreenProbe(driver))
+    driver.implicitly_wait(0)
+    yield pages
+    driver.implicitly_wait(IMPLICIT_WAIT)
+
+
+def timed(flow, profile, action, ready, kpi_recorder, backend_stub, request):
+    """Замер потока: общее время и доля, когда у приложения висели запросы"""
+    started = time.time()
+    elapsed = kpi_recorder.time_flow(profile_flow(flow, profile), action, ready)
+    finished = time.time()
+    records = backend_stub.requests(since=started - 1)
+    result = {
+        'flow': flow,
+        'profile': profile,
+        'elapsed_ms': elapsed,
+        'network_ms': round(network_busy_ms(records, started, finished)),
+        'requests': sum(1 for r in records if started <= r['started'] <= finished),
+        'errors': sum(1 for r in records if started <= r['started'] <= finished and r['fate'] != 'ok'),
+    }
+    if elapsed is not None:
+        result['ui_ms'] = round(elapsed - result['network_ms'])
+    request.node.user_properties.append(('network_profile', result))
+    return elapsed
+
+
+@pytest.mark.kpi
+@pytest.mark.network_profile('none', '4g', '3g')
+class TestNetworkProfiles:
+    """Вход, поиск и смена даты под разными условиями сети"""
+
+    def test_login(self, screens, stub_user, network_profile, kpi_recorder, backend_stub, request):
+        """KPI: нажатие 'Войти' -> главный экран загружен"""
+        sign_in, main = screens['sign_in'], screens['main']
+        for _ in range(request.config.getoption('kpi_iterations')):
+            assert sign_in.is_page_loaded(), "Нужен экран входа (пользователь не авторизован)"
+            sign_in.enter_email(stub_user['email'])
+            sign_in.enter_password(stub_user['password'])
+            sign_in.hide_keyboard()
+            elapsed = timed(
+                'login', network_profile,
+                lambda: sign_in.find_element_multiple(sign_in.LOGIN_BUTTON).click(),
+                screens['probe'].ready([main.ADD_MEAL_BUTTON], [main.LOADING_INDICATOR]),
+                kpi_recorder, backend_stub, request,
+            )
+            assert elapsed is not None, f"Главный экран не загрузился после входа ({network_profile})"
+            main.navigate_to_profile()
+            screens['profile'].scroll_to_logout()
+            screens['profile'].click_logout()
+
+    def test_search_product(self, screens, stub_user, network_profile, kpi_recorder, backend_stub, request):
+        """KPI: ввод запроса -> результаты поиска на экране"""
+        search = screens['search']
+        screens['sign_in'].login(stub_user['email'], stub_user['password'])
+        screens['main'].navigate_to_search()
+        for i in range(request.config.getoption('kpi_iterations')):
+            query = SEARCH_QUERIES[i % len(SEARCH_QUERIES)]
+            search.clear_search()
+            search.wait_for_element_invisible(search.PRODUCT_ITEM, timeout=5)
+            elapsed = timed(
+                'search_product', network_profile,
+                lambda: search.find_element(search.SEARCH_INPUT).send_keys(query),
+                screens['probe'].ready([search.PRODUCT_ITEM], [search.LOADING_INDICATOR]),
+                kpi_recorder, backend_stub, request,
+            )
+            assert elapsed is not None, f"Нет результатов поиска для '{query}' ({network_profile})"
+
+    def test_change_date(self, screens, stub_user, network_profile, kpi_recorder, backend_stub, request):
+        """KPI: смена даты -> приемы пищи за новую дату загружены"""
+        main = screens['main']
+        screens['sign_in'].login(stub_user['email'], stub_user['password'])
+        loaded = screens['probe'].ready([main.ADD_MEAL_BUTTON], [main.LOADING_INDICATOR])
+        for i in range(request.config.getoption('kpi_iterations')):
+            button = main.DATE_NEXT_BUTTON if i % 2 == 0 else main.DATE_PREV_BUTTON
+            previous = main.get_selected_date()
+
+            def changed():
+                labels = main.driver.find_elements(*main.DATE_TEXT)
+                return bool(labels) and labels[0].text != previous and loaded()
+
+            elapsed = timed(
+                'change_date', network_profile, lambda: main.find_element(button).click(), changed,
+                kpi_recorder, backend_stub, request,
+            )
+            assert elapsed is not None, f"Приемы пищи не загрузились после смены даты ({network_profile})"
@@ -0,0 +1,67 @@
+"""
+KPI анализа фото: выбор снимка из галереи -> экран результата (запуск: pytest --kpi)
+
+Снимки размера камеры попадают в галерею пакетно (фикстура
+device_gallery), время потока раскладывается на подготовку снимка в
+приложении (чтение и base64 до начала запроса), загрузку с ответом
+заглушки и отрисовку результата; размер и качество загруженного
+изображения проверяются по MEDIA_MAX_UPLOAD_*.
+"""
+import os
+import sys
+import time
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from pages.photo_analysis_page import ImageSourceDialog, PhotoAnalysisPage, SystemImagePicker
+from utilities.kpi import ScreenProbe
+from utilities.media_fixtures import check_upload, upload_report
+from config.appium_config import IMPLICIT_WAIT
+
+
+@pytest.mark.kpi
+def test_photo_analysis_latency(driver, device_gallery, stub_user, kpi_recorder, backend_stub, request):
+    """KPI: подтверждение снимка -> экран 'Анализ фото' с результатом"""
+    search = SearchPage(driver)
+    dialog, picker, result = ImageSourceDialog(driver), SystemImagePicker(driver), PhotoAnalysisPage(driver)
+    probe = ScreenProbe(driver)
+    SignInPage(driver).login(stub_user['email'], stub_user['password'])
+    MainPage(driver).navigate_to_search()
+    request.node.user_properties.append(('photo_upload', {'gallery': device_gallery.last_sync}))
+
+    for i in range(request.config.getoption('kpi_iterations')):
+        search.click_photo_analysis()
+        assert dialog.is_page_loaded(), "Диалог выбора источника не открылся"
+        dialog.choose_gallery()
+        assert picker.is_page_loaded(), "Системный выбор фото не открылся"
+        picker.pick(i % device_gallery.last_sync['files'])
+
+        driver.implicitly_wait(0)
+        confirmed = []
+        elapsed = kpi_recorder.time_flow(
+            'photo_analysis',
+            lambda: confirmed.append(picker.confirm_crop()),
+            probe.ready([PhotoAnalysisPage.CONFIDENCE_LABEL], [SearchPage.ANALYZING_INDICATOR]),
+        )
+        ready = time.time()
+        driver.implicitly_wait(IMPLICIT_WAIT)
+        assert elapsed is not None, "Экран результата анализа не открылся"
+
+        [upload] = upload_report(backend_stub, since=confirmed[0])
+        upload.update(
+            elapsed_ms=round(elapsed),
+            prepare_ms=round((upload['started'] - confirmed[0]) * 1000),
+            render_ms=round((ready - upload['finished']) * 1000),
+        )
+        request.node.user_properties.append(('photo_upload', upload))
+        problems = check_upload(upload)
+        assert not problems, f"Регрессия сжатия снимка: {'; '.join(problems)}"
+        assert result.get_ingredients_count() > 0
+
+        driver.back()
+        assert search.is_page_loaded()
@@ -19,9 +19,9 @@ class TestProfile:
     """Тесты для профиля пользователя"""
     
     @pytest.fixture(autouse=True)
-    def navigate_to_profile(self, driver):
+    def navigate_to_profile(self, router):
         """Фикстура для автоматического перехода в профиль"""
-        time.sleep(3)
+        router.go(ProfilePage)
         yield
     
     def test_profile_page_loaded(self, driver, setup_test_environment):
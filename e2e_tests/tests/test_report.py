@@ -0,0 +1,113 @@
+"""
+Тесты потокового отчета (без устройства)
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from PIL import Image
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import report
+from utilities.report import StreamingReport, truncate
+
+E2E_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def shot(path, color=(33, 150, 243)):
+    Image.new('RGB', (1080, 2400), color).save(path)
+    return str(path)
+
+
+def phase(outcome='passed', longrepr=None, sections=None):
+    return {'outcome': outcome, 'duration': 1.25, 'longrepr': longrepr, 'sections': sections or {}}
+
+
+def read_results(directory):
+    with open(os.path.join(directory, 'results.jsonl'), encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.unit
+class TestStreamingReport:
+    """Построчная запись результатов, превью и ограничения размера"""
+
+    def test_results_are_written_per_test(self, tmp_path):
+        directory = str(tmp_path / 'report')
+        streaming = StreamingReport(directory).start()
+        streaming.add_result('tests/test_a.py::test_ok', phase(), [('screenshot', shot(tmp_path / 'step.png'))])
+        # Строка появляется на диске сразу, до конца сессии
+        assert [r['nodeid'] for r in read_results(directory)] == ['tests/test_a.py::test_ok']
+        streaming.add_result('tests/test_a.py::test_bad', phase('failed', 'AssertionError'), [('kpi', {'ms': 5})])
+        summary = streaming.finish()
+        assert summary['tests'] == 2 and summary['totals'] == {'passed': 1, 'failed': 1}
+        first, second = read_results(directory)
+        assert first['screenshots'] == [{'name': 'step.png', 'thumb': 'thumbs/step.jpg', 'full': 'shots/step.png'}]
+        with Image.open(os.path.join(directory, first['screenshots'][0]['thumb'])) as thumb:
+            assert thumb.size == (240, 533)
+        assert second['properties'] == {'kpi': {'ms': 5}}
+        with open(os.path.join(directory, 'results.js'), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert [line.split('(', 1)[0] for line in lines] == ['report.start', 'report.add', 'report.add', 'report.finish']
+
+    def test_screenshots_over_budget_keep_only_thumbs(self, tmp_path):
+        first, second = shot(tmp_path / 'a.png'), shot(tmp_path / 'b.png', (200, 0, 0))
+        streaming = StreamingReport(str(tmp_path / 'report'), max_mb=os.path.getsize(first) / 1024 / 1024).start()
+        streaming.add_result('t::one', phase(), [('screenshot', first), ('screenshot', second)])
+        summary = streaming.finish()
+        shots = read_results(streaming.directory)[0]['screenshots']
+        assert [s['full'] for s in shots] == ['shots/a.png', None]
+        assert all(os.path.exists(os.path.join(streaming.directory, s['thumb'])) for s in shots)
+        assert summary['screenshots_thumb_only'] == 1
+
+    def test_long_output_is_truncated(self, tmp_path):
+        text = 'x' * 50000
+        assert len(truncate(text, 1000)) < 1100
+        streaming = StreamingReport(str(tmp_path / 'report')).start()
+        streaming.add_result('t::log', phase('failed', text, {'Captured stdout call': text}))
+        streaming.finish()
+        entry = read_results(streaming.directory)[0]
+        assert 'обрезано' in entry['longrepr']
+        assert len(entry['sections']['Captured stdout call']) < 21000
+
+    def test_screenshots_are_drained_once(self):
+        report.screenshot_taken('screenshots/a.png')
+        report.screenshot_taken('screenshots/b.png')
+        assert report.drain_screenshots() == ['screenshots/a.png', 'screenshots/b.png']
+        assert report.drain_screenshots() == []
+
+
+@pytest.mark.unit
+def test_pytest_run_writes_report(tmp_path):
+    """Реальный прогон pytest: фазы собираются в одну строку на тест"""
+    (tmp_path / 'test_sample.py').write_text(
+        'import pytest\n'
+        'def test_ok(): print("hello")\n'
+        'def test_bad(): assert 1 == 2\n'
+        '@pytest.mark.skip(reason="later")\n'
+        'def test_skip(): pass\n'
+    )
+    directory = tmp_path / 'report'
+    plugin = (
+        'import sys\n'
+        f'sys.path.insert(0, {E2E_DIR!r})\n'
+        'from utilities.report import StreamingReport\n'
+        'def pytest_configure(config):\n'
+        f'    config._r = StreamingReport({str(directory)!r}).start()\n'
+        '    config.pluginmanager.register(config._r)\n'
+        'def pytest_sessionfinish(session):\n'
+        '    session.config._r.finish()\n'
+    )
+    (tmp_path / 'conftest.py').write_text(plugin)
+    subprocess.run([sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider', str(tmp_path)],
+                   cwd=str(tmp_path), capture_output=True, timeout=120)
+    results = {r['nodeid'].split('::')[1]: r for r in read_results(str(directory))}
+    assert {name: r['outcome'] for name, r in results.items()} == {
+        'test_ok': 'passed', 'test_bad': 'failed', 'test_skip': 'skipped'}
+    assert 'hello' in results['test_ok']['sections']['Captured stdout call']
+    assert 'assert 1 == 2' in results['test_bad']['longrepr']
+    assert results['test_skip']['longrepr'] == 'Skipped: later'
+    assert os.path.exists(directory / 'index.html')
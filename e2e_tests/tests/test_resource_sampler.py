@@ -0,0 +1,107 @@
+"""
+Тесты разбора meminfo и /proc/<pid>/stat и поиска утечек (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.resource_sampler import ResourceSampler, detect_leak, parse_meminfo, parse_proc_stat
+
+# Фрагмент `dumpsys meminfo com.l423r.FoodApp` (Android 13)
+MEMINFO_OUTPUT = """Applications Memory Usage (in Kilobytes):
+Uptime: 5303452 Realtime: 5303452
+
+** MEMINFO in pid 4321 [com.l423r.FoodApp] **
+                   Pss  Private  Private  SwapPss      Rss     Heap     Heap     Heap
+                 Total    Dirty    Clean    Dirty    Total     Size    Alloc     Free
+                ------   ------   ------   ------   ------   ------   ------   ------
+  Native Heap    41230    41180        0        0    42696    63488    46170    13221
+  Dalvik Heap    10512    10420        0        0    15880    24576    12288    12288
+        TOTAL   142351   101250    18828        0   218532    88064    58458    25509
+
+ App Summary
+                       Pss(KB)                        Rss(KB)
+                        ------                         ------
+           Java Heap:    16784                          28624
+         Native Heap:    41180                          42696
+                Code:    20396                          68828
+            Graphics:    21340                          21340
+               TOTAL PSS:   142351            TOTAL RSS:   218532      TOTAL SWAP PSS:        0
+"""
+
+# Старый формат без App Summary
+LEGACY_MEMINFO = """** MEMINFO in pid 4321 [com.l423r.FoodApp] **
+                 Pss  Private  Private  Swapped     Heap     Heap     Heap
+                Total    Dirty    Clean    Dirty     Size    Alloc     Free
+        TOTAL    98765    80000    10000        0    50000    40000    10000
+"""
+
+PROC_STAT = ("4321 (com.l423r.FoodApp) S 612 612 0 0 -1 1077952832 98234 0 1 0 "
+             "1520 340 0 0 10 -10 73 0 5123456 16123564032 54633 18446744073709551615")
+
+
+class FakeShellDriver:
+    """Отвечает на mobile: shell; PSS растет на каждом вызове meminfo"""
+
+    def __init__(self, pss_step=0):
+        self.pss = 100000
+        self.pss_step = pss_step
+        self.ticks = 1000
+
+    def execute_script(self, script, args):
+        command = args['command']
+        if command == 'pidof':
+            return '4321\n'
+        if command == 'dumpsys':
+            self.pss += self.pss_step
+            return f"TOTAL PSS:   {self.pss}  TOTAL RSS: 1"
+        if command == 'cat':
+            self.ticks += 50
+            return f"4321 (app) S {' '.join(['0'] * 10)} {self.ticks} 0 {' '.join(['0'] * 8)} 100"
+        return ''
+
+
+@pytest.mark.unit
+def test_parse_meminfo():
+    """Тест: PSS из App Summary и из старой таблицы"""
+    meminfo = parse_meminfo(MEMINFO_OUTPUT)
+
+    assert meminfo['total_pss_kb'] == 142351
+    assert meminfo['java_heap_kb'] == 16784
+    assert meminfo['graphics_kb'] == 21340
+    assert parse_meminfo(LEGACY_MEMINFO)['total_pss_kb'] == 98765
+    assert parse_meminfo('No process found for: com.l423r.FoodApp') is None
+
+
+@pytest.mark.unit
+def test_parse_proc_stat():
+    """Тест: utime + stime и rss"""
+    assert parse_proc_stat(PROC_STAT) == (1520 + 340, 54633)
+
+
+@pytest.mark.unit
+def test_leak_detected_on_steady_growth():
+    """Тест: устойчивый рост PSS - утечка, шум - нет"""
+    growing = [140000 + 400 * i + (i % 3) * 50 for i in range(50)]
+    noisy = [140000 + ((i * 7919) % 11) * 300 for i in range(50)]
+
+    assert detect_leak(growing)['leak']
+    assert detect_leak(growing)['slope_kb_per_iteration'] == pytest.approx(400, rel=0.05)
+    assert not detect_leak(noisy)['leak']
+
+
+@pytest.mark.unit
+def test_sampler_series_are_compact():
+    """Тест: ряды хранятся в array, отчет содержит итерации и утечку"""
+    sampler = ResourceSampler(FakeShellDriver(pss_step=1024), interval=60)
+    for _ in range(20):
+        sampler.mark_iteration()
+
+    report = sampler.to_dict()
+    assert sampler.pss_kb.typecode == 'd'
+    assert report['samples'] == 20
+    assert report['leak']['leak']
+    assert report['series']['cpu_percent'][0] is None
@@ -0,0 +1,90 @@
+"""
+Тесты кеша результатов (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.result_cache import ResultCache, file_sha256
+
+
+class DictCache:
+    """Замена config.cache на словаре"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+@pytest.fixture
+def apk(tmp_path):
+    path = tmp_path / 'app-debug.apk'
+    path.write_bytes(b'apk-v1')
+    return path
+
+
+@pytest.fixture
+def test_file(tmp_path):
+    path = tmp_path / 'test_sample.py'
+    path.write_text('def test_x():\n    pass\n')
+    return path
+
+
+@pytest.mark.unit
+def test_cached_pass_with_identical_key(apk, test_file):
+    """Тест: повторный прогон с тем же ключом попадает в кеш"""
+    cache = ResultCache(DictCache(), str(apk), 'android:emulator:13')
+    key = cache.key_for('tests/test_sample.py::test_x', test_file)
+
+    assert not cache.is_cached_pass(key)
+    cache.store_pass(key, 'tests/test_sample.py::test_x')
+    assert cache.is_cached_pass(key)
+
+
+@pytest.mark.unit
+def test_key_changes_with_apk_and_device(apk, test_file):
+    """Тест: новая сборка или другое устройство дают другой ключ"""
+    storage = DictCache()
+    cache = ResultCache(storage, str(apk), 'android:emulator:13')
+    key = cache.key_for('t::x', test_file)
+
+    other_device = ResultCache(storage, str(apk), 'android:pixel:14')
+    assert other_device.key_for('t::x', test_file) != key
+
+    apk.write_bytes(b'apk-v2-longer')
+    rebuilt = ResultCache(storage, str(apk), 'android:emulator:13')
+    assert rebuilt.key_for('t::x', test_file) != key
+
+
+@pytest.mark.unit
+def test_failure_forgets_pass(apk, test_file):
+    """Тест: падение теста сбрасывает запись кеша"""
+    cache = ResultCache(DictCache(), str(apk), 'android:emulator:13')
+    key = cache.key_for('t::x', test_file)
+    cache.store_pass(key, 't::x')
+    cache.forget(key)
+
+    assert not cache.is_cached_pass(key)
+
+
+@pytest.mark.unit
+def test_disabled_without_apk(tmp_path, test_file):
+    """Тест: без APK кеш отключен"""
+    cache = ResultCache(DictCache(), str(tmp_path / 'missing.apk'), 'android:emulator:13')
+
+    assert not cache.enabled
+    assert cache.key_for('t::x', test_file) is None
+
+
+@pytest.mark.unit
+def test_file_sha256_stable(apk):
+    """Тест: хеш файла стабилен"""
+    assert file_sha256(str(apk)) == file_sha256(str(apk))
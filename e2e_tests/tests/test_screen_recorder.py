@@ -0,0 +1,73 @@
+"""
+Тесты записи видео и маркеров шагов (без устройства)
+"""
+import base64
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.base_page import BasePage
+from utilities.screen_recorder import ScreenRecorder, steps_to_srt
+
+
+class FakeDriver:
+    """Имитация driver с записью экрана"""
+
+    def __init__(self):
+        self.recording = False
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def start_recording_screen(self, **options):
+        self.recording = True
+
+    def stop_recording_screen(self):
+        self.recording = False
+        return base64.b64encode(b'fake-mp4').decode('ascii')
+
+
+class DemoPage(BasePage):
+    def open_menu(self):
+        return self
+
+
+@pytest.mark.unit
+def test_video_saved_only_on_failure(tmp_path):
+    """Тест: видео сохраняется только при падении, с маркерами шагов"""
+    driver = FakeDriver()
+
+    passed = ScreenRecorder(driver, video_dir=str(tmp_path))
+    passed.start('test_ok')
+    assert passed.stop(save=False) is None
+    assert not os.listdir(tmp_path)
+
+    failed = ScreenRecorder(driver, video_dir=str(tmp_path))
+    failed.start('test_broken[param]')
+    DemoPage(driver).open_menu()
+    video_path = failed.stop(save=True)
+
+    assert not driver.recording
+    with open(video_path, 'rb') as f:
+        assert f.read() == b'fake-mp4'
+    with open(os.path.splitext(video_path)[0] + '.srt', encoding='utf-8') as f:
+        assert 'DemoPage.open_menu' in f.read()
+
+
+@pytest.mark.unit
+def test_no_markers_without_recording():
+    """Тест: без активной записи методы page objects работают как обычно"""
+    page = DemoPage(FakeDriver())
+    assert page.open_menu() is page
+
+
+@pytest.mark.unit
+def test_srt_format():
+    """Тест: формат субтитров"""
+    srt = steps_to_srt([(0.0, 'A.first'), (61.25, 'A.second')], 70.0)
+
+    assert '00:00:00,000 --> 00:01:01,250\nA.first' in srt
+    assert '00:01:01,250 --> 00:01:10,000\nA.second' in srt
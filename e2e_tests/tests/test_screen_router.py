@@ -0,0 +1,149 @@
+"""
+Тесты графа экранов и роутера на фейковом приложении (без устройства)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.main_page import MainPage
+from pages.profile_page import ProfilePage
+from pages.registration_page import RegistrationPage
+from pages.search_page import SearchPage
+from pages.sign_in_page import SignInPage
+from utilities.screen_router import EdgeCosts, NavigationError, Router, ScreenGraph, default_graph
+
+SCREENS = {
+    'sign_in': '<android.widget.Button content-desc="sign_in_login_button" text="Войти"/>',
+    'registration': '<android.widget.Button text="Создать аккаунт"/>',
+    'main': '<android.widget.Button text="Добавить прием пищи"/>',
+    'search': '<android.widget.EditText hint="Поиск продуктов"/>',
+    'profile': '<android.view.ViewGroup content-desc="Настройки"/>',
+    'splash': '<android.widget.TextView text="Проверка авторизации..."/>',
+}
+
+
+class FakeApp:
+    """Драйвер, у которого page_source показывает текущий экран"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.page_source_calls = 0
+        self.actions = []
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    @property
+    def page_source(self):
+        self.page_source_calls += 1
+        return f'<hierarchy><android.widget.FrameLayout>{SCREENS[self.screen]}</android.widget.FrameLayout></hierarchy>'
+
+
+def move(screen, name):
+    def action(driver):
+        driver.actions.append(name)
+        driver.screen = screen
+    action.__name__ = name
+    return action
+
+
+def app_graph(deep_link=False):
+    graph = ScreenGraph()
+    graph.add_screen(RegistrationPage, 'CREATE_ACCOUNT_BUTTON')
+    graph.add_screen(SignInPage, 'LOGIN_BUTTON')
+    graph.add_screen(SearchPage, 'SEARCH_INPUT')
+    graph.add_screen(ProfilePage, 'SETTINGS_BUTTON')
+    graph.add_screen(MainPage, 'ADD_MEAL_BUTTON')
+    graph.add_edge(SignInPage, RegistrationPage, move('registration', 'register'))
+    graph.add_edge(RegistrationPage, SignInPage, move('sign_in', 'back'))
+    graph.add_edge(SignInPage, MainPage, move('main', 'login'), cost=6.0)
+    graph.add_edge(MainPage, SearchPage, move('search', 'search_tab'))
+    graph.add_edge(SearchPage, ProfilePage, move('profile', 'profile_tab'))
+    graph.add_edge(MainPage, ProfilePage, move('profile', 'slow_profile'), cost=10.0)
+    if deep_link:
+        graph.add_edge(MainPage, ProfilePage, move('profile', 'deep_link'), cost=1.0)
+    return graph
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    import utilities.screen_router as screen_router
+    monkeypatch.setattr(screen_router.time, 'sleep', lambda seconds: None)
+
+
+@pytest.mark.unit
+class TestScreenRouter:
+    """Определение экрана и кратчайший путь"""
+
+    def test_detect_from_one_snapshot(self):
+        app = FakeApp('profile')
+        router = Router(app, graph=app_graph())
+        assert router.detect() is ProfilePage
+        assert app.page_source_calls == 1
+        app.screen = 'splash'
+        assert router.detect() is None
+
+    def test_go_takes_cheapest_path(self, no_sleep):
+        app = FakeApp('registration')
+        router = Router(app, graph=app_graph())
+        page = router.go(ProfilePage)
+        assert isinstance(page, ProfilePage)
+        assert app.actions == ['back', 'login', 'search_tab', 'profile_tab']
+        assert [entry['ok'] for entry in router.report()] == [True] * 4
+
+    def test_deep_link_is_preferred_when_cheaper(self, no_sleep):
+        app = FakeApp('main')
+        router = Router(app, graph=app_graph(deep_link=True))
+        router.go(ProfilePage)
+        assert app.actions == ['deep_link']
+
+    def test_learned_costs_change_the_route(self, tmp_path):
+        path = str(tmp_path / 'costs.json')
+        costs = EdgeCosts(path)
+        router = Router(FakeApp('main'), graph=app_graph(), costs=costs)
+        assert [edge.name for edge in router.plan(MainPage, ProfilePage)] == ['search_tab', 'profile_tab']
+        search_tab = router.plan(MainPage, ProfilePage)[0]
+        costs.record(search_tab, 12.0)
+        costs.save()
+        router = Router(FakeApp('main'), graph=app_graph(), costs=EdgeCosts(path))
+        assert [edge.name for edge in router.plan(MainPage, ProfilePage)] == ['slow_profile']
+
+    def test_ewma_and_failure_penalty(self):
+        costs = EdgeCosts(alpha=0.5)
+        edge = app_graph().edges[0]
+        costs.record(edge, 2.0)
+        assert costs.cost(edge) == 2.0
+        costs.record(edge, 4.0)
+        assert costs.cost(edge) == 3.0
+        costs.record(edge, 1.0, ok=False)
+        assert costs.cost(edge) == pytest.approx(0.5 * 3.0 + 0.5 * 6.0)
+        assert costs.data[edge.key]['failures'] == 1
+
+    def test_replan_after_landing_elsewhere(self, no_sleep):
+        graph = app_graph()
+        # Вкладка поиска иногда открывает профиль сразу
+        graph.edges = [e for e in graph.edges if e.name != 'search_tab']
+        graph.add_edge(MainPage, SearchPage, move('profile', 'search_tab'))
+        app = FakeApp('main')
+        router = Router(app, graph=graph, timeout=0)
+        router.go(ProfilePage)
+        assert app.actions == ['search_tab']
+        assert router.report()[0]['ok'] is False
+
+    def test_unknown_screen(self):
+        router = Router(FakeApp('splash'), graph=app_graph())
+        with pytest.raises(NavigationError):
+            router.go(MainPage)
+
+    def test_default_graph(self):
+        graph = default_graph()
+        router = Router(FakeApp('sign_in'), graph=graph)
+        for screen, page_cls in [('sign_in', SignInPage), ('registration', RegistrationPage), ('main', MainPage),
+                                 ('search', SearchPage), ('profile', ProfilePage)]:
+            router.driver.screen = screen
+            assert router.detect() is page_cls
+        assert [edge.name for edge in router.plan(RegistrationPage, ProfilePage)] == \
+            ['click_back', 'login', 'navigate_to_profile']
@@ -0,0 +1,54 @@
+"""
+Поиск по мере ввода: задержки и лишние запросы к бэкенду (запуск: pytest --kpi)
+"""
+import os
+import sys
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.sign_in_page import SignInPage
+from pages.main_page import MainPage
+from pages.search_page import SearchPage
+from utilities.search_typing import measure_search_typing
+from config.appium_config import IMPLICIT_WAIT, SEARCH_MAX_WASTED_REQUESTS
+
+SEARCH_QUERIES = ['гречка', 'молоко', 'куриная грудка']
+CADENCES = [0.1, 0.25, 0.4]  # быстрее, около и медленнее debounce приложения (300 мс)
+
+
+@pytest.fixture
+def search_screen(driver, stub_user):
+    """Пользователь заглушки авторизован, открыт экран поиска"""
+    SignInPage(driver).login(stub_user['email'], stub_user['password'])
+    MainPage(driver).navigate_to_search()
+    page = SearchPage(driver)
+    driver.implicitly_wait(0)
+    yield page
+    driver.implicitly_wait(IMPLICIT_WAIT)
+
+
+@pytest.mark.kpi
+class TestSearchAsYouType:
+    """Debounce поиска в SearchScreen.tsx"""
+
+    @pytest.mark.parametrize('cadence', CADENCES)
+    def test_search_typing(self, search_screen, backend_stub, kpi_recorder, request, cadence):
+        """KPI: посимвольный ввод -> финальные результаты; число запросов к /product/search/name"""
+        results = []
+        for query in SEARCH_QUERIES:
+            search_screen.clear_search()
+            search_screen.wait_for_element_invisible(search_screen.PRODUCT_ITEM, timeout=5)
+            result = measure_search_typing(search_screen, backend_stub, query, cadence)
+            result['cadence_ms'] = cadence * 1000
+            results.append(result)
+            request.node.user_properties.append(('search_typing', result))
+            kpi_recorder.add_sample('search_first_result', result['time_to_first_result_ms'])
+            kpi_recorder.add_sample('search_final_result', result['time_to_final_result_ms'])
+
+        for result in results:
+            assert result['time_to_final_result_ms'] is not None, \
+                f"Нет результатов для '{result['query']}'"
+            assert result['wasted_requests'] <= SEARCH_MAX_WASTED_REQUESTS, \
+                f"'{result['query']}': {result['requests']} запросов на один ввод ({result['request_queries']})"
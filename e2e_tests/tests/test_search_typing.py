@@ -0,0 +1,104 @@
+"""
+Тесты анализа поиска по мере ввода и журнала запросов заглушки (без устройства)
+"""
+import http.client
+import os
+import socket
+import sys
+import time
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.backend_stub import BackendStub
+from utilities.search_typing import SEARCH_ROUTE, analyze_search_typing, max_in_flight
+
+
+def search_record(name, started, finished, cancelled=False):
+    return {'route': SEARCH_ROUTE, 'query': {'name': name}, 'started': started, 'finished': finished,
+            'cancelled': cancelled}
+
+
+def wait_finished(stub, route, timeout=2):
+    """Запись журнала закрывается сразу после отправки ответа - ждем ее"""
+    deadline = time.time() + timeout
+    while time.time() < deadline and any(r['finished'] is None for r in stub.requests(route)):
+        time.sleep(0.01)
+    return stub.requests(route)
+
+
+KEYSTROKES = [(100.0 + 0.15 * i, 'гречка'[:i + 1]) for i in range(6)]  # последний символ в 100.75
+
+
+@pytest.mark.unit
+class TestAnalyzeSearchTyping:
+    """Сводка по одному вводу"""
+
+    def test_debounced_search(self):
+        requests = [search_record('гречка', 101.05, 101.15)]
+        result = analyze_search_typing('гречка', KEYSTROKES, requests, 101.2, 101.2)
+        assert result['requests'] == 1
+        assert result['wasted_requests'] == 0
+        assert result['debounce_ms'] == pytest.approx(300)
+        assert result['final_request_ms'] == pytest.approx(100)
+        assert result['time_to_first_result_ms'] == pytest.approx(1200)
+        assert result['time_to_final_result_ms'] == pytest.approx(450)
+        assert result['typing_ms'] == pytest.approx(750)
+
+    def test_flooding_search(self):
+        # Поиск на каждый символ начиная со второго, ответы на префиксы приходят поздно
+        requests = [
+            search_record('гр', 100.15, 100.9),
+            search_record('гре', 100.3, None, cancelled=True),
+            search_record('греч', 100.45, 100.5),
+            search_record('гречк', 100.6, 100.95),
+            search_record('гречка', 100.75, 100.85),
+        ]
+        result = analyze_search_typing('гречка', KEYSTROKES, requests, 100.55, 100.9)
+        assert result['requests'] == 5
+        assert result['wasted_requests'] == 4
+        assert result['cancelled_requests'] == 1
+        assert result['stale_responses'] == 2  # 'гр' и 'гречк' ответили после отправки финального
+        assert result['max_in_flight'] == 4
+        assert result['request_queries'] == ['гр', 'гре', 'греч', 'гречк', 'гречка']
+        assert result['debounce_ms'] == pytest.approx(0)
+
+    def test_final_query_never_sent(self):
+        result = analyze_search_typing('гречка', KEYSTROKES, [search_record('гре', 100.4, 100.5)])
+        assert result['wasted_requests'] == 1
+        assert result['debounce_ms'] is None
+        assert result['time_to_final_result_ms'] is None
+
+    def test_max_in_flight(self):
+        assert max_in_flight([]) == 0
+        assert max_in_flight([search_record('a', 0, 1), search_record('b', 1, 2)]) == 1
+
+
+@pytest.mark.unit
+class TestStubRequestLog:
+    """Журнал запросов, задержки и отмены в заглушке"""
+
+    def test_requests_are_logged(self):
+        with BackendStub() as stub:
+            since = time.time()
+            conn = http.client.HTTPConnection(stub.host, stub.port)
+            conn.request('GET', '/my-food/product/search/name?name=abc')
+            assert conn.getresponse().status == 401
+            conn.close()
+            records = wait_finished(stub, SEARCH_ROUTE)
+            assert len(records) == 1
+            assert records[0]['started'] >= since
+            assert records[0]['query'] == {'name': 'abc'}
+            assert records[0]['status'] == 401
+            assert not records[0]['cancelled']
+
+    def test_cancelled_request_detected(self):
+        with BackendStub(delays={'health': 0.5}) as stub:
+            sock = socket.create_connection((stub.host, stub.port))
+            sock.sendall(b'GET /my-food/actuator/health HTTP/1.1\r\nHost: stub\r\n\r\n')
+            time.sleep(0.1)
+            sock.close()  # клиент не дождался ответа
+            record = wait_finished(stub, 'health')[0]
+            assert record['cancelled']
+            assert record['finished'] - record['started'] < 0.5
@@ -0,0 +1,134 @@
+"""
+Тесты сторожа сессии на фейковом Appium-сервере (без устройства)
+"""
+import os
+import sys
+import time
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.element_cache import screen_state
+from utilities.fake_appium import fake_options
+from utilities.session_watchdog import (
+    COMMAND_ERROR, HUNG, SERVER_DOWN, SESSION_GONE, SessionDead, SessionWatchdog, classify,
+)
+
+
+def app_options():
+    """Опции сессии и ее пересоздания сторожем"""
+    return fake_options(appPackage='com.l423r.FoodApp')
+
+
+@pytest.fixture
+def fake_session_options():
+    return app_options()
+
+
+@pytest.mark.unit
+class TestClassify:
+    """Классификация ошибок команд"""
+
+    def test_session_errors(self):
+        assert classify(InvalidSessionIdException('A session is either terminated or not started')) == SESSION_GONE
+        assert classify(WebDriverException(
+            "'GET /window/rect' cannot be proxied to UiAutomator2 server because the instrumentation "
+            "process is not running (probably crashed)")) == SESSION_GONE
+        assert classify(WebDriverException('An element could not be located')) == COMMAND_ERROR
+
+    def test_transport_errors(self):
+        refused = MaxRetryError(None, '/session', NewConnectionError(None, 'Connection refused'))
+        assert classify(refused) == SERVER_DOWN
+        assert classify(ConnectionResetError()) == SERVER_DOWN
+        assert classify(TimeoutError()) == HUNG
+        assert classify(AssertionError('Главная страница не загрузилась')) is None
+
+
+@pytest.mark.unit
+class TestSessionWatchdog:
+    """Heartbeat, пересоздание сессии и быстрый отказ"""
+
+    def test_healthy_session(self, fake_session):
+        server, session = fake_session
+        watchdog = SessionWatchdog(session, app_options())
+        watchdog.check()
+        assert watchdog.heartbeats == 1
+        assert watchdog.recreations == 0
+        assert server.commands[-1] == ('GET', '/window/rect')
+
+    def test_uiautomator2_crash_recreates_session_in_place(self, fake_session):
+        server, session = fake_session
+        configured = []
+        watchdog = SessionWatchdog(session, app_options(), on_recreate=configured.append)
+        old_session = session.session_id
+        state = screen_state(session)
+        screen = state.screen
+        server.crash_uiautomator2()
+        watchdog.check()
+        assert watchdog.recreations == 1
+        assert session.session_id != old_session
+        assert server.sessions_created == 2
+        assert configured == [session]
+        assert state.screen == screen + 1
+        # Тот же объект драйвера снова работает
+        assert session.get_window_size() == {'width': 1080, 'height': 2400}
+        assert watchdog.summary()['events'][0]['kind'] == SESSION_GONE
+
+    def test_terminated_session_is_recreated(self, fake_session):
+        server, session = fake_session
+        watchdog = SessionWatchdog(session, app_options())
+        server.end_sessions()
+        watchdog.check()
+        assert watchdog.recreations == 1
+        watchdog.check()
+        assert watchdog.recreations == 1
+
+    def test_recreation_limit(self, fake_session):
+        server, session = fake_session
+        watchdog = SessionWatchdog(session, app_options(), max_recreations=1)
+        for _ in range(2):
+            server.crash_uiautomator2()
+            try:
+                watchdog.check()
+            except SessionDead:
+                break
+        assert watchdog.recreations == 1
+        assert watchdog.dead
+
+    def test_killed_server_fails_remaining_tests_fast(self, fake_session):
+        server, session = fake_session
+        watchdog = SessionWatchdog(session, app_options())
+        watchdog.check()
+        server.kill()
+        with pytest.raises(SessionDead, match=SERVER_DOWN):
+            watchdog.check()
+        started = time.time()
+        for _ in range(5):
+            with pytest.raises(SessionDead):
+                watchdog.check()
+        assert time.time() - started < 0.1
+        assert watchdog.fast_failed == 5
+        assert watchdog.heartbeats == 2
+
+    def test_hung_server(self, fake_session):
+        server, session = fake_session
+        watchdog = SessionWatchdog(session, app_options(), heartbeat_timeout=0.2)
+        server.hang(1.0)
+        with pytest.raises(SessionDead, match=HUNG):
+            watchdog.check()
+        server.hang(0)
+
+    def test_lost_time(self, fake_session):
+        server, session = fake_session
+        watchdog = SessionWatchdog(session, app_options())
+        server.crash_uiautomator2()
+        # Тест, в котором упал UiAutomator2, потратил свое время впустую
+        with pytest.raises(WebDriverException) as excinfo:
+            session.find_element('accessibility id', 'sign_in_login_button')
+        assert watchdog.record_failure(excinfo.value, 20.0) == SESSION_GONE
+        assert watchdog.record_failure(AssertionError(), 5.0) is None
+        watchdog.check()
+        assert 20.0 <= watchdog.summary()['lost_seconds'] < 21.0
@@ -0,0 +1,103 @@
+"""
+Тесты визуальной регрессии на синтетических скриншотах (без устройства)
+"""
+import base64
+import io
+import os
+import sys
+import numpy as np
+import pytest
+from PIL import Image
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import base_page, visual
+from utilities.visual import CHANGED, MATCH, NEW, BaselineStore, VisualChecker, compare, dhash, to_frame
+from pages.main_page import MainPage
+
+WIDTH, HEIGHT = 1080, 2400
+STATUS_BAR = (0.0, 0.0, 1.0, 0.04)
+DATE = (0.3, 0.1, 0.4, 0.05)
+
+
+def screen(button_color=(33, 150, 243), date_shade=0, clock_shade=0, layout=0):
+    """Синтетический экран: статус-бар, дата, карточки, кнопка"""
+    image = np.full((HEIGHT, WIDTH, 3), 250, dtype=np.uint8)
+    image[:96] = 30 + clock_shade  # статус-бар (часы)
+    image[240:360, 324:756] = 120 + date_shade  # дата
+    for i in range(4):
+        top = 500 + i * 300 + layout
+        image[top:top + 220, 60:1020] = (255, 255, 255)
+        image[top + 40:top + 80, 100:600] = 60
+    image[2000:2140, 200:880] = button_color
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BaselineStore(str(tmp_path / 'baselines'), str(tmp_path / 'pending'))
+
+
+@pytest.mark.unit
+class TestVisualRegression:
+    """Сравнение, маски, поиск baseline по dHash и принятие кандидатов"""
+
+    def test_new_frame_goes_to_pending_and_is_approved(self, store):
+        checker = VisualChecker(store)
+        assert checker.check('MainPage.opened', screen(), [STATUS_BAR, DATE])['status'] == NEW
+        assert store.pending() == ['MainPage.opened']
+        store.approve('MainPage.opened')
+        assert store.pending() == []
+        result = VisualChecker(BaselineStore(store.directory, store.pending_dir)).check('MainPage.opened', screen())
+        assert result['status'] == MATCH
+
+    def test_changed_button_is_detected(self, store):
+        VisualChecker(store, update=True).check('MainPage.opened', screen(), [STATUS_BAR, DATE])
+        result = VisualChecker(store).check('MainPage.opened', screen(button_color=(244, 67, 54)), [STATUS_BAR, DATE])
+        assert result['status'] == CHANGED
+        assert result['changed_ratio'] > 0.01
+        assert os.path.exists(os.path.join(store.pending_dir, 'MainPage.opened.diff.png'))
+
+    def test_masked_regions_are_ignored(self, store):
+        VisualChecker(store, update=True).check('MainPage.opened', screen(), [STATUS_BAR, DATE])
+        # Другие дата и время: маски baseline действуют, даже если кадр снят без них
+        result = VisualChecker(store).check('MainPage.opened', screen(date_shade=100, clock_shade=150))
+        assert result['status'] == MATCH
+        unmasked_frame, unmasked_baseline = to_frame(screen(date_shade=100)), to_frame(screen())
+        assert compare(unmasked_frame, unmasked_baseline)[0] > 0
+
+    def test_baseline_found_by_dhash(self, store):
+        VisualChecker(store, update=True).check('MainPage.opened', screen())
+        frame = to_frame(screen(date_shade=3))
+        assert store.find('MainPage.screenshot_20240101', dhash(frame)) == 'MainPage.opened'
+        other = 255 - to_frame(screen())
+        assert store.find('SearchPage.opened', dhash(other)) is None
+
+    def test_compare_takes_milliseconds(self, store):
+        checker = VisualChecker(store, update=True)
+        checker.check('MainPage.opened', screen(), [STATUS_BAR, DATE])
+        checker.update = False
+        png = screen(date_shade=50)
+        for _ in range(50):
+            checker.check('MainPage.opened', png, [STATUS_BAR, DATE])
+        summary = checker.summary()
+        assert (summary['new'], summary['match']) == (1, 50)
+        assert summary['compare_ms'] < 5.0
+
+
+@pytest.mark.unit
+def test_take_screenshot_checks_named_steps(store, tmp_path, monkeypatch, fake_session):
+    server, session = fake_session
+    server.screenshot = base64.b64encode(screen()).decode('ascii')
+    monkeypatch.setattr(base_page, 'SCREENSHOT_DIR', str(tmp_path))
+    monkeypatch.setattr(visual, 'checker', VisualChecker(store))
+    page = MainPage(session)
+    path = page.take_screenshot('1_main_opened')
+    page.take_screenshot('element_not_found_x')
+    assert os.path.getsize(path) > 0
+    assert [r['name'] for r in visual.checker.results] == ['MainPage.1_main_opened']
+    # mobile: getSystemBars нет - статус-бар по умолчанию
+    assert store.pending() == ['MainPage.1_main_opened']
@@ -0,0 +1,221 @@
+"""
+Установка APK только при смене сборки
+
+Если в capabilities указан `app`, Appium может переустанавливать APK при
+каждом создании сессии - на нескольких устройствах это минуты на прогон.
+AppInstaller решает сам, нужна ли установка:
+
+- sha256 локального APK сравнивается с маркером на устройстве
+  (APK_INSTALL_MARKER_DIR/e2e_install_<package>.txt), который пишется после
+  каждой нашей установки;
+- versionCode, подписи и lastUpdateTime из `dumpsys package` сравниваются с
+  записанными в маркер: если приложение переустановили в обход (другая
+  сборка, другой ключ), маркер недействителен.
+
+Установка через `mobile: installApp`; при несовместимой подписи приложение
+удаляется и ставится заново. На пул устройств установка идет параллельно,
+по одной короткой сессии на Appium-сервер. Время проверки и установки
+пишется в APK_INSTALL_METRICS_FILE.
+
+mobile: shell требует запуска Appium с `--allow-insecure adb_shell`.
+
+Запуск до прогона на всех устройствах машины:
+    python -m utilities.app_installer --appium http://localhost:4723 --appium http://localhost:4725
+"""
+import argparse
+import json
+import os
+import re
+import shlex
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from appium import webdriver
+from appium.options.android import UiAutomator2Options
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    ANDROID_CAPABILITIES, APK_INSTALL_MARKER_DIR, APK_INSTALL_METRICS_FILE, APK_INSTALL_TIMEOUT,
+)
+from utilities.result_cache import file_sha256
+
+SKIPPED = 'skipped'
+INSTALLED = 'installed'
+
+VERSION_CODE = re.compile(r'versionCode=(\d+)')
+LAST_UPDATE = re.compile(r'lastUpdateTime=([^\n]+)')
+SIGNATURES = re.compile(r'signatures:\[([^\]]*)\]')
+
+
+def parse_dumpsys_package(output):
+    """versionCode, подписи и lastUpdateTime из `dumpsys package <pkg>`; None - пакета нет"""
+    version = VERSION_CODE.search(output or '')
+    if version is None:
+        return None
+    last_update = LAST_UPDATE.search(output)
+    signatures = SIGNATURES.search(output)
+    return {
+        'versionCode': int(version.group(1)),
+        'signatures': sorted(s.strip() for s in signatures.group(1).split(',') if s.strip()) if signatures else [],
+        'lastUpdateTime': last_update.group(1).strip() if last_update else None,
+    }
+
+
+class AppInstaller:
+    """Проверка установленной сборки и установка APK на одно устройство"""
+
+    def __init__(self, driver, package=ANDROID_CAPABILITIES['appPackage'], marker_dir=APK_INSTALL_MARKER_DIR,
+                 timeout=APK_INSTALL_TIMEOUT):
+        self.driver = driver
+        self.package = package
+        self.marker_path = f"{marker_dir}/e2e_install_{package}.txt"
+        self.timeout = timeout
+
+    def shell(self, command, *args):
+        return self.driver.execute_script('mobile: shell', {'command': command, 'args': list(args)}) or ''
+
+    def installed(self):
+        """Состояние пакета на устройстве или None"""
+        if not self.driver.is_app_installed(self.package):
+            return None
+        return parse_dumpsys_package(self.shell('dumpsys', 'package', self.package))
+
+    def read_marker(self):
+        try:
+            return json.loads(self.shell('cat', self.marker_path).strip() or 'null')
+        except ValueError:
+            # "No such file or directory" или мусор
+            return None
+
+    def write_marker(self, apk_hash, state):
+        marker = json.dumps(dict(state, sha256=apk_hash), sort_keys=True, separators=(',', ':'))
+        self.shell('echo', shlex.quote(marker), '>', self.marker_path)
+
+    def reason_to_install(self, apk_hash, state, marker):
+        """Почему нужна установка; None - установлена та же сборка"""
+        if state is None:
+            return 'not_installed'
+        if marker is None:
+            return 'no_marker'
+        if marker.get('sha256') != apk_hash:
+            return 'apk_changed'
+        if any(marker.get(key) != state[key] for key in ('versionCode', 'signatures', 'lastUpdateTime')):
+            return 'installed_elsewhere'
+        return None
+
+    def ensure(self, apk_path, force=False):
+        """Ставит APK, если на устройстве другая сборка; возвращает метрики"""
+        started = time.perf_counter()
+        apk_hash = file_sha256(apk_path)
+        state = self.installed()
+        reason = 'forced' if force else self.reason_to_install(apk_hash, state, self.read_marker())
+        result = {
+            'device': self.driver.capabilities.get('deviceName') or self.driver.capabilities.get('udid'),
+            'package': self.package,
+            'apk_sha256': apk_hash[:12],
+            'apk_mb': round(os.path.getsize(apk_path) / 1024 / 1024, 1),
+            'action': SKIPPED,
+            'reason': reason,
+            'check_ms': round((time.perf_counter() - started) * 1000.0),
+            'install_ms': 0,
+            'versionCode': state['versionCode'] if state else None,
+        }
+        if reason is None:
+            return result
+
+        install_started = time.perf_counter()
+        self.install(apk_path)
+        state = self.installed()
+        self.write_marker(apk_hash, state or {})
+        result.update(action=INSTALLED, install_ms=round((time.perf_counter() - install_started) * 1000.0),
+                      versionCode=state['versionCode'] if state else None)
+        return result
+
+    def install(self, apk_path):
+        try:
+            self.driver.install_app(apk_path, replace=True, timeout=int(self.timeout * 1000), grantPermissions=True)
+        except Exception as e:
+            # Сборка подписана другим ключом: обновление невозможно, только переустановка
+            if 'INSTALL_FAILED_UPDATE_INCOMPATIBLE' not in str(e):
+                raise
+            self.driver.remove_app(self.package)
+            self.driver.install_app(apk_path, replace=True, timeout=int(self.timeout * 1000), grantPermissions=True)
+
+
+def install_session_options(device_name=None):
+    """Сессия только для установки: без `app` и без запуска приложения"""
+    options = UiAutomator2Options()
+    options.device_name = device_name or ANDROID_CAPABILITIES['deviceName']
+    options.platform_version = ANDROID_CAPABILITIES['platformVersion']
+    options.no_reset = True
+    options.set_capability('autoLaunch', False)
+    return options
+
+
+def install_on_device(url, apk_path, device_name=None, force=False):
+    driver = webdriver.Remote(url, options=install_session_options(device_name))
+    try:
+        result = AppInstaller(driver).ensure(apk_path, force=force)
+    finally:
+        driver.quit()
+    result['appium'] = url
+    return result
+
+
+def install_on_pool(urls, apk_path, devices=(), force=False):
+    """Параллельная установка на все устройства пула (по Appium-серверу на устройство)"""
+    devices = list(devices) + [None] * (len(urls) - len(devices))
+    with ThreadPoolExecutor(max_workers=max(1, len(urls))) as pool:
+        futures = [pool.submit(install_on_device, url, apk_path, device, force) for url, device in zip(urls, devices)]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({'appium': url, 'action': 'error', 'reason': f"{type(e).__name__}: {e}"})
+    return results
+
+
+def append_metrics(results, path=APK_INSTALL_METRICS_FILE):
+    """Дописывает метрики установки в историю (JSON-список)"""
+    history = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    history.extend(dict(result, time=time.time()) for result in results)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
+
+def format_result(result):
+    if result['action'] == 'error':
+        return f"{result['appium']}: ошибка - {result['reason']}"
+    if result['action'] == SKIPPED:
+        return f"{result['device']}: та же сборка ({result['apk_sha256']}), проверка {result['check_ms']} мс"
+    return (f"{result['device']}: установлено ({result['reason']}) за {result['install_ms']} мс, "
+            f"versionCode {result['versionCode']}, {result['apk_mb']} МБ")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Установка APK на устройства только при смене сборки')
+    parser.add_argument('--appium', action='append', required=True, help='URL Appium-сервера (по одному на устройство)')
+    parser.add_argument('--device', action='append', default=[], help='deviceName для соответствующего --appium')
+    parser.add_argument('--apk', default=ANDROID_CAPABILITIES['app'])
+    parser.add_argument('--force', action='store_true', help='Ставить даже ту же сборку')
+    parser.add_argument('--metrics', default=APK_INSTALL_METRICS_FILE)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = install_on_pool(args.appium, args.apk, args.device, args.force)
+    append_metrics(results, args.metrics)
+    for result in results:
+        print(format_result(result))
+    print(f"Итого {time.perf_counter() - started:.1f} с на {len(results)} устройствах")
+    return 1 if any(result['action'] == 'error' for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
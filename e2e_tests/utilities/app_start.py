@@ -0,0 +1,209 @@
+"""
+Бенчмарк запуска приложения: cold / warm / hot
+
+Запуск выполняется через `am start -W` (mobile: shell), из вывода берутся
+TotalTime/WaitTime. Дополнительно меряется время до готовности первого
+экрана (SignInPage или MainPage). Выбросы отбрасываются по правилу Тьюки,
+история прогонов пишется в JSONL, по ней строится SVG-график тренда.
+
+mobile: shell требует запуска Appium с `--allow-insecure adb_shell`.
+"""
+import json
+import os
+import re
+import sys
+import time
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import ANDROID_CAPABILITIES, EXPLICIT_WAIT, KPI_POLL_INTERVAL
+from utilities.kpi import percentile, summarize
+
+START_KINDS = ('cold', 'warm', 'hot')
+
+AM_START_FIELD = re.compile(r'^(Status|LaunchState|Activity|TotalTime|WaitTime|ThisTime):\s*(.+?)\s*$')
+
+
+def parse_am_start(output):
+    """Разбирает вывод `am start -W`; времена в мс (None, если их нет)"""
+    result = {
+        'status': None,
+        'launch_state': None,
+        'activity': None,
+        'total_time': None,
+        'wait_time': None,
+        'this_time': None,
+        'brought_to_front': 'brought to the front' in output,
+        'error': None,
+    }
+    for raw in output.splitlines():
+        line = raw.strip()
+        if line.startswith('Error'):
+            result['error'] = line
+            continue
+        match = AM_START_FIELD.match(line)
+        if not match:
+            continue
+        name, value = match.groups()
+        if name in ('TotalTime', 'WaitTime', 'ThisTime'):
+            key = {'TotalTime': 'total_time', 'WaitTime': 'wait_time', 'ThisTime': 'this_time'}[name]
+            result[key] = int(value)
+        elif name == 'LaunchState':
+            result['launch_state'] = value.upper()
+        else:
+            result[name.lower()] = value
+    return result
+
+
+def reject_outliers(values, k=1.5):
+    """Отбрасывает выбросы за пределами [Q1 - k*IQR, Q3 + k*IQR]"""
+    values = [v for v in values if v is not None]
+    if len(values) < 4:
+        return values, []
+    q1 = percentile(values, 25)
+    q3 = percentile(values, 75)
+    low = q1 - k * (q3 - q1)
+    high = q3 + k * (q3 - q1)
+    kept = [v for v in values if low <= v <= high]
+    rejected = [v for v in values if v < low or v > high]
+    return kept, rejected
+
+
+def series_name(kind, logged_in):
+    return f"{kind}_{'logged_in' if logged_in else 'logged_out'}"
+
+
+def summarize_runs(runs):
+    """Сводка по сериям: {series: {metric: stats}}; runs - список замеров"""
+    grouped = {}
+    for run in runs:
+        grouped.setdefault(series_name(run['kind'], run['logged_in']), []).append(run)
+
+    summary = {}
+    for name, series in grouped.items():
+        summary[name] = {}
+        for metric in ('total_time', 'wait_time', 'ready_time'):
+            kept, rejected = reject_outliers([run.get(metric) for run in series])
+            stats = summarize(kept)
+            stats['outliers'] = len(rejected)
+            summary[name][metric] = stats
+    return summary
+
+
+def append_history(path, summary, label=''):
+    """Добавляет сводку прогона в историю (JSONL)"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'timestamp': time.time(), 'label': label, 'summary': summary},
+                           ensure_ascii=False) + '\n')
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def render_trend_svg(history, path, metric='total_time', stat='p50', width=800, height=360):
+    """Рисует SVG-график тренда (одна линия на серию) по истории прогонов"""
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+    series = {}
+    for index, entry in enumerate(history):
+        for name, metrics in entry['summary'].items():
+            value = metrics.get(metric, {}).get(stat)
+            if value is not None:
+                series.setdefault(name, []).append((index, value))
+
+    margin = 50
+    values = [v for points in series.values() for _, v in points] or [0]
+    max_value = max(values) * 1.1 or 1
+    max_index = max(len(history) - 1, 1)
+
+    def x(i):
+        return margin + (width - 2 * margin) * i / max_index
+
+    def y(v):
+        return height - margin - (height - 2 * margin) * v / max_value
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" font-size="11">',
+        f'<text x="{margin}" y="20">{metric} {stat}, мс</text>',
+        f'<line x1="{margin}" y1="{height - margin}" x2="{width - margin}" y2="{height - margin}" stroke="#999"/>',
+        f'<line x1="{margin}" y1="{margin}" x2="{margin}" y2="{height - margin}" stroke="#999"/>',
+        f'<text x="5" y="{y(max_value / 1.1) + 4:.1f}">{max_value / 1.1:.0f}</text>',
+    ]
+    for n, (name, points) in enumerate(sorted(series.items())):
+        color = colors[n % len(colors)]
+        coords = ' '.join(f'{x(i):.1f},{y(v):.1f}' for i, v in points)
+        parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{coords}"/>')
+        parts.append(f'<text x="{width - margin + 5}" y="{margin + 14 * n}" fill="{color}">{name}</text>')
+    parts.append('</svg>')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+    return path
+
+
+class AppStartBenchmark:
+    """Замер запуска приложения на устройстве"""
+
+    def __init__(self, driver, ready_probe,
+                 package=ANDROID_CAPABILITIES['appPackage'], activity=ANDROID_CAPABILITIES['appActivity']):
+        self.driver = driver
+        self.ready_probe = ready_probe
+        self.package = package
+        self.component = f"{package}/{activity}"
+        self.runs = []
+
+    def shell(self, command, *args):
+        return self.driver.execute_script('mobile: shell', {'command': command, 'args': list(args)}) or ''
+
+    def _prepare(self, kind):
+        """Приводит приложение в состояние перед запуском нужного типа"""
+        if kind == 'cold':
+            self.shell('am', 'force-stop', self.package)
+            return []
+        # warm и hot: процесс жив, приложение в фоне
+        self.shell('am', 'start', '-W', '-n', self.component)
+        self.shell('input', 'keyevent', 'KEYCODE_HOME')
+        if kind == 'warm':
+            # Процесс остается, Activity пересоздается
+            return ['--activity-clear-task']
+        return []
+
+    def measure(self, kind, logged_in, timeout=EXPLICIT_WAIT):
+        """Один запуск; возвращает замер (времена в мс)"""
+        extra = self._prepare(kind)
+        time.sleep(1)  # даем системе успокоиться после остановки/сворачивания
+
+        start = time.perf_counter()
+        output = self.shell('am', 'start', '-W', *extra, '-n', self.component)
+        am_done = time.perf_counter()
+
+        deadline = start + timeout
+        ready_time = None
+        while time.perf_counter() < deadline:
+            if self.ready_probe():
+                ready_time = (time.perf_counter() - start) * 1000.0
+                break
+            time.sleep(KPI_POLL_INTERVAL)
+
+        run = parse_am_start(output)
+        run.update({
+            'kind': kind,
+            'logged_in': logged_in,
+            'am_call_time': (am_done - start) * 1000.0,
+            'ready_time': ready_time,
+        })
+        self.runs.append(run)
+        return run
+
+    def write(self, results_path, history_path, chart_path, label=''):
+        """Пишет результаты, дополняет историю и перерисовывает график"""
+        summary = summarize_runs(self.runs)
+        with open(results_path, 'w', encoding='utf-8') as f:
+            json.dump({'label': label, 'summary': summary, 'runs': self.runs}, f, ensure_ascii=False, indent=2)
+        append_history(history_path, summary, label)
+        render_trend_svg(load_history(history_path), chart_path)
+        return summary
@@ -0,0 +1,744 @@
+"""
+Локальная заглушка бэкенда /my-food/* (по docs/API_CONTRACT.md)
+
+Хранит данные в памяти и отвечает так же, как настоящий бэкенд, на
+эндпоинты, которые использует приложение: auth, user-profile, product,
+product_category, meal, meal_element, favorite. Нужна для нагрузочных
+прогонов и e2e-сценариев, где важно видеть и контролировать сетевой
+трафик приложения.
+
+Профиль сети (utilities/network_conditions.py: задержка, разброс,
+скорость, доля ошибок и зависаний) меняется через set_profile или
+POST /__stub/profile?name=3g.
+
+Заглушка считает незавершенные запросы по сессиям (пользователь по токену
+или email в теле запроса на вход) и отдает состояние на служебном
+эндпоинте вне API: GET /__stub/idle?session=<email>&since=<unix time> -
+по нему BasePage.wait_for_network_idle ждет, пока приложение получит данные.
+
+Размер тела запроса и ответа пишется в журнал; изображения, присланные
+на анализ фото, сохраняются в photo_uploads (utilities/media_fixtures.py
+разбирает по ним сжатие на стороне клиента).
+
+Запуск из командной строки:
+    python -m utilities.backend_stub --port 8080
+"""
+import argparse
+import base64
+import itertools
+import json
+import os
+import random
+import re
+import select
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.network_conditions import NetworkProfile
+
+API_PREFIX = '/my-food'
+CONTROL_PREFIX = '/__stub'
+ALL_SESSIONS = '*'
+REQUEST_LOG_SIZE = 10000  # последних запросов в журнале
+PHOTO_UPLOADS_SIZE = 100  # последних изображений анализа фото
+SEARCH_CACHE_SIZE = 64  # запомненных результатов поиска по названию
+
+DEFAULT_PRODUCTS = [
+    ('Гречка отварная', 110, 3.6, 1.3, 21.3, '4607065597924'),
+    ('Гречка ядрица', 313, 12.6, 3.3, 62.1, '4601234567890'),
+    ('Молоко 2.5%', 52, 2.8, 2.5, 4.7, '4607001234567'),
+    ('Молоко 3.2%', 59, 2.9, 3.2, 4.7, '4607001234568'),
+    ('Яблоко', 47, 0.4, 0.4, 9.8, '2000000000011'),
+    ('Куриная грудка', 113, 23.6, 1.9, 0.4, '2000000000028'),
+    ('Рис отварной', 116, 2.2, 0.5, 24.9, '2000000000035'),
+    ('Творог 5%', 121, 17.2, 5.0, 1.8, '4607002345678'),
+    ('Банан', 96, 1.5, 0.5, 21.0, '2000000000042'),
+    ('Овсяная каша', 88, 3.0, 1.7, 15.0, '2000000000059'),
+]
+
+DEFAULT_CATEGORIES = ['Крупы', 'Молочные продукты', 'Фрукты', 'Мясо', 'Готовые блюда']
+
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def page_of(items, query, default_size=20):
+    """Страница в формате API: content/page/size/totalElements/totalPages/first/last"""
+    page = int(query.get('page', 0))
+    size = int(query.get('size', default_size))
+    start = page * size
+    total_pages = (len(items) + size - 1) // size if size else 0
+    return {
+        'content': items[start:start + size],
+        'page': page,
+        'size': size,
+        'totalElements': len(items),
+        'totalPages': total_pages,
+        'first': page == 0,
+        'last': page >= total_pages - 1,
+    }
+
+
+class StubError(Exception):
+    """Ответ с ошибкой в формате API"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # тысячи одновременных подключений под нагрузкой
+
+
+class BackendStub:
+    """In-memory реализация /my-food/* API"""
+
+    def __init__(self, host='127.0.0.1', port=0, delays=None, profile=None, seed=None):
+        self.host = host
+        self.port = port
+        # Искусственная задержка ответа по имени обработчика, например {'search_by_name': 0.2}
+        self.delays = dict(delays or {})
+        # Условия сети (utilities/network_conditions.py) для всех запросов API
+        self.profile = None
+        self.rng = random.Random(seed)
+        self.fate_counts = Counter()
+        self.server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.set_profile(profile)
+        self._ids = itertools.count(1)
+        self.users = {}
+        self.tokens = {}
+        self.profiles = {}
+        self.products = []
+        self.products_by_id = {}
+        # (подстрока, пользователь) -> (число продуктов, найденные): страницы большого каталога без пересканирования
+        self._search_cache = {}
+        self.categories = [{'id': i + 1, 'name': name} for i, name in enumerate(DEFAULT_CATEGORIES)]
+        self.meals = {}
+        self.meal_elements = {}
+        self.favorites = {}
+        self.route_counts = Counter()
+        self.status_counts = Counter()
+        self.request_log = deque(maxlen=REQUEST_LOG_SIZE)
+        # Изображения анализа фото: {'request_id', 'received', 'base64_chars', 'mime', 'language', 'image'}
+        self.photo_uploads = deque(maxlen=PHOTO_UPLOADS_SIZE)
+        # Запись журнала запроса, который обрабатывает текущий поток
+        self._current = threading.local()
+        self.started = time.time()
+        # Сессия -> {'in_flight', 'requests', 'last_started', 'last_finished'}
+        self.activity = {}
+        self.seed_products(DEFAULT_PRODUCTS)
+        self.routes = [
+            ('POST', r'/auth/user', self.register, False),
+            ('GET', r'/auth/user', self.get_user, True),
+            ('POST', r'/auth/token', self.login, False),
+            ('POST', r'/auth/reset-password', self.reset_password, False),
+            ('GET', r'/actuator/health', self.health, False),
+            ('POST', r'/user-profile', self.create_profile, True),
+            ('PUT', r'/user-profile', self.update_profile, True),
+            ('GET', r'/user-profile', self.get_profile, True),
+            ('GET', r'/product/search/name', self.search_by_name, True),
+            ('GET', r'/product/search/barcode/(?P<barcode>[^/]+)', self.search_by_barcode, True),
+            ('GET', r'/product/(?P<product_id>\d+)', self.get_product, True),
+            ('GET', r'/product', self.list_products, True),
+            ('POST', r'/product', self.create_product, True),
+            ('GET', r'/product_category', self.list_categories, True),
+            ('GET', r'/meal/findByDate', self.meals_by_date, True),
+            ('GET', r'/meal/(?P<meal_id>\d+)', self.get_meal, True),
+            ('GET', r'/meal', self.list_meals, True),
+            ('POST', r'/meal', self.create_meal, True),
+            ('POST', r'/meal_element/analyze-photo', self.analyze_photo, True),
+            ('GET', r'/meal_element/meal/(?P<meal_id>\d+)', self.meal_elements_by_meal, True),
+            ('POST', r'/meal_element', self.create_meal_element, True),
+            ('GET', r'/favorite', self.list_favorites, True),
+            ('POST', r'/favorite/(?P<product_id>\d+)', self.add_favorite, True),
+            ('DELETE', r'/favorite/(?P<product_id>\d+)', self.remove_favorite, True),
+        ]
+        self._compiled = [(method, re.compile(pattern + '$'), handler, auth)
+                          for method, pattern, handler, auth in self.routes]
+
+    # --- Жизненный цикл ---
+
+    @property
+    def url(self):
+        """Base URL API (как API_BASE_URL в приложении)"""
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    def start(self):
+        """Запускает сервер в фоновом потоке"""
+        self.server = StubServer((self.host, self.port), make_handler(self))
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name='backend-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def set_profile(self, profile):
+        """Профиль сети по имени из NETWORK_PROFILES, NetworkProfile или None"""
+        if profile is None or isinstance(profile, str):
+            profile = NetworkProfile.named(profile)
+        with self._lock:
+            self.profile = profile
+        return profile
+
+    def network_plan(self, request_bytes, response_bytes):
+        """('ok' | 'error' | 'timeout', задержка) для запроса по текущему профилю"""
+        profile = self.profile
+        if profile is None:
+            return 'ok', 0.0
+        with self._lock:
+            fate, delay = profile.plan(self.rng, request_bytes, response_bytes)
+            self.fate_counts[(profile.name, fate)] += 1
+        return fate, delay
+
+    # --- Данные ---
+
+    def next_id(self):
+        return next(self._ids)
+
+    def seed_products(self, rows):
+        """Добавляет общие продукты: (name, calories, proteins, fats, carbohydrates, barcode)"""
+        with self._lock:
+            for name, calories, proteins, fats, carbohydrates, barcode in rows:
+                product = {
+                    'id': self.next_id(),
+                    'userId': None,
+                    'name': name,
+                    'calories': calories,
+                    'proteins': proteins,
+                    'fats': fats,
+                    'carbohydrates': carbohydrates,
+                    'quantity': 100,
+                    'measurementType': 'GRAM',
+                    'code': barcode,
+                    'source': 'stub',
+                    'imageUrl': None,
+                }
+                self.products.append(product)
+                self.products_by_id[product['id']] = product
+
+    # --- Журнал запросов ---
+
+    def begin_request(self, method, path, query, session=None, request_bytes=0):
+        """Заводит запись журнала; время - time.time(), чтобы сравнивать с тестом"""
+        record = {
+            'id': self.next_id(),
+            'method': method,
+            'path': path,
+            'route': None,
+            'query': query,
+            'session': session,
+            'request_bytes': request_bytes,
+            'response_bytes': None,
+            'started': time.time(),
+            'finished': None,
+            'status': None,
+            'cancelled': False,
+            'profile': self.profile.name if self.profile is not None else None,
+            'fate': 'ok',
+        }
+        with self._lock:
+            self.request_log.append(record)
+            for key in {ALL_SESSIONS, session or ALL_SESSIONS}:
+                activity = self.activity.setdefault(
+                    key, {'in_flight': 0, 'requests': 0, 'last_started': None, 'last_finished': self.started}
+                )
+                activity['in_flight'] += 1
+                activity['requests'] += 1
+                activity['last_started'] = record['started']
+        return record
+
+    def finish_request(self, record, status, cancelled=False, response_bytes=None):
+        with self._lock:
+            record['finished'] = time.time()
+            record['status'] = status
+            record['response_bytes'] = response_bytes
+            record['cancelled'] = cancelled
+            self.status_counts[status] += 1
+            for key in {ALL_SESSIONS, record['session'] or ALL_SESSIONS}:
+                activity = self.activity[key]
+                activity['in_flight'] -= 1
+                activity['last_finished'] = record['finished']
+
+    def session_key(self, headers, body):
+        """Сессия запроса: пользователь по Bearer-токену, для входа и регистрации - email из тела"""
+        header = headers.get('Authorization', '')
+        if header.startswith('Bearer '):
+            email = self.tokens.get(header[len('Bearer '):])
+            if email is not None:
+                return email
+        if isinstance(body, dict) and isinstance(body.get('email'), str):
+            return body['email']
+        return None
+
+    def network_state(self, session=None, since=None):
+        """Незавершенные запросы сессии и сколько она уже простаивает
+
+        since - время действия в тесте: тишина до него не считается, так
+        что запрос, отложенный приложением (debounce), не проскочит.
+        """
+        now = time.time()
+        with self._lock:
+            activity = dict(self.activity.get(session or ALL_SESSIONS) or {
+                'in_flight': 0, 'requests': 0, 'last_started': None, 'last_finished': self.started,
+            })
+        idle_since = None
+        if activity['in_flight'] == 0:
+            idle_since = max(activity['last_finished'], since or 0)
+        return {
+            'session': session or ALL_SESSIONS,
+            'in_flight': activity['in_flight'],
+            'requests': activity['requests'],
+            'last_started': activity['last_started'],
+            'idle_since': idle_since,
+            'idle_ms': round(max(now - idle_since, 0) * 1000) if idle_since is not None else 0,
+        }
+
+    def requests(self, route=None, since=None):
+        """Записи журнала (по обработчику и времени начала)"""
+        with self._lock:
+            records = list(self.request_log)
+        return [r for r in records
+                if (route is None or r['route'] == route) and (since is None or r['started'] >= since)]
+
+    # --- Диспетчеризация ---
+
+    def dispatch(self, method, path, query, body, headers, record=None):
+        """Возвращает (status, payload) для запроса"""
+        if not path.startswith(API_PREFIX):
+            raise StubError(404, 'Not Found')
+        route_path = path[len(API_PREFIX):] or '/'
+        for route_method, pattern, handler, auth in self._compiled:
+            match = pattern.match(route_path)
+            if match and route_method == method:
+                with self._lock:
+                    self.route_counts[f"{method} {pattern.pattern[:-1]}"] += 1
+                if record is not None:
+                    record['route'] = handler.__name__
+                self._current.record = record
+                user = self.authenticate(headers) if auth else None
+                return handler(user=user, query=query, body=body, **match.groupdict())
+        raise StubError(404, 'Not Found')
+
+    def authenticate(self, headers):
+        header = headers.get('Authorization', '')
+        token = header[len('Bearer '):] if header.startswith('Bearer ') else None
+        email = self.tokens.get(token)
+        if email is None:
+            raise StubError(401, 'Unauthorized')
+        return self.users[email]
+
+    # --- Auth ---
+
+    def register(self, user, query, body):
+        email = (body or {}).get('email')
+        password = (body or {}).get('password') or ''
+        if not email or '@' not in email or len(password) < 8:
+            raise StubError(400, 'Невалидные данные')
+        return 201, self.public_user(self.create_user(email, password, body.get('name')))
+
+    def create_user(self, email, password, name=None, profile=None):
+        """Заводит пользователя (и профиль, если передан) в обход HTTP"""
+        with self._lock:
+            if email in self.users:
+                raise StubError(409, 'Email уже зарегистрирован')
+            account = {
+                'id': self.next_id(),
+                'email': email,
+                'name': name,
+                'password': password,
+                'roles': ['USER'],
+                'createdAt': now_iso(),
+            }
+            self.users[email] = account
+            if profile is not None:
+                self.profiles[email] = dict(profile, id=account['id'], userId=account['id'],
+                                            createdAt=now_iso(), updatedAt=now_iso())
+        return account
+
+    def login(self, user, query, body):
+        body = body or {}
+        account = self.users.get(body.get('email'))
+        if account is None or account['password'] != body.get('password'):
+            raise StubError(401, 'Неверный email или пароль')
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens[token] = account['email']
+        return 200, {'jwt_token': token, 'token_type': 'Bearer', 'expires_in': 2592000}
+
+    def get_user(self, user, query, body):
+        return 200, self.public_user(user)
+
+    def reset_password(self, user, query, body):
+        return 200, {'message': 'Password reset email sent'}
+
+    def health(self, user, query, body):
+        return 200, {'status': 'UP'}
+
+    @staticmethod
+    def public_user(account):
+        return {key: value for key, value in account.items() if key != 'password'}
+
+    # --- Профиль ---
+
+    def create_profile(self, user, query, body):
+        with self._lock:
+            if user['email'] in self.profiles:
+                raise StubError(409, 'Профиль уже существует для этого пользователя')
+            profile = dict(body or {}, id=user['id'], userId=user['id'], createdAt=now_iso(), updatedAt=now_iso())
+            self.profiles[user['email']] = profile
+        return 201, profile
+
+    def update_profile(self, user, query, body):
+        with self._lock:
+            if user['email'] not in self.profiles:
+                raise StubError(404, 'Профиль не найден')
+            self.profiles[user['email']].update(body or {}, updatedAt=now_iso())
+        return 200, self.profiles[user['email']]
+
+    def get_profile(self, user, query, body):
+        profile = self.profiles.get(user['email'])
+        if profile is None:
+            raise StubError(404, 'Профиль не найден')
+        return 200, profile
+
+    # --- Продукты ---
+
+    def visible_products(self, user):
+        return [p for p in self.products if p['userId'] in (None, user['id'])]
+
+    def search_by_name(self, user, query, body):
+        needle = query.get('name', '').lower()
+        key = (needle, user['id'])
+        version = len(self.products)  # продукты только добавляются
+        cached = self._search_cache.get(key)
+        if cached is None or cached[0] != version:
+            found = [p for p in self.visible_products(user) if needle in p['name'].lower()]
+            found.sort(key=lambda p: p['userId'] is None)
+            cached = (version, found)
+            with self._lock:
+                if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                    self._search_cache.clear()
+                self._search_cache[key] = cached
+        return 200, page_of(cached[1], query)
+
+    def search_by_barcode(self, user, query, body, barcode):
+        found = [p for p in self.visible_products(user) if p.get('code') == barcode]
+        return 200, page_of(found, query)
+
+    def get_product(self, user, query, body, product_id):
+        product = self.products_by_id.get(int(product_id))
+        if product is None:
+            raise StubError(404, 'Продукт не найден')
+        return 200, product
+
+    def list_products(self, user, query, body):
+        own = [p for p in self.products if p['userId'] == user['id']]
+        return 200, page_of(own, query)
+
+    def create_product(self, user, query, body):
+        body = body or {}
+        if not body.get('name'):
+            raise StubError(400, 'Название обязательно')
+        product = dict(body, id=self.next_id(), userId=user['id'], source='user')
+        product.pop('image_base64', None)
+        with self._lock:
+            self.products.append(product)
+            self.products_by_id[product['id']] = product
+        return 201, product
+
+    def list_categories(self, user, query, body):
+        return 200, page_of(self.categories, query, default_size=100)
+
+    # --- Приемы пищи ---
+
+    def user_meals(self, user):
+        return [m for m in self.meals.values() if m['userId'] == user['id']]
+
+    def create_meal(self, user, query, body):
+        body = body or {}
+        if not body.get('mealType') or not body.get('dateTime'):
+            raise StubError(400, 'mealType и dateTime обязательны')
+        meal = {
+            'id': self.next_id(),
+            'userId': user['id'],
+            'mealType': body['mealType'],
+            'name': body.get('name'),
+            'dateTime': body['dateTime'],
+            'createdAt': now_iso(),
+        }
+        with self._lock:
+            self.meals[meal['id']] = meal
+        return 201, meal
+
+    def meals_by_date(self, user, query, body):
+        date = query.get('date', '')
+        return 200, [m for m in self.user_meals(user) if m['dateTime'].startswith(date)]
+
+    def get_meal(self, user, query, body, meal_id):
+        meal = self.meals.get(int(meal_id))
+        if meal is None or meal['userId'] != user['id']:
+            raise StubError(404, 'Прием пищи не найден')
+        return 200, meal
+
+    def list_meals(self, user, query, body):
+        return 200, page_of(self.user_meals(user), query)
+
+    def create_meal_element(self, user, query, body):
+        body = body or {}
+        meal = self.meals.get(int(body.get('mealId') or 0))
+        if meal is None or meal['userId'] != user['id']:
+            raise StubError(404, 'Прием пищи не найден')
+        element = dict(body, id=self.next_id())
+        element.pop('image_base64', None)
+        with self._lock:
+            self.meal_elements[element['id']] = element
+        return 201, element
+
+    def meal_elements_by_meal(self, user, query, body, meal_id):
+        elements = [e for e in self.meal_elements.values() if int(e['mealId']) == int(meal_id)]
+        return 200, page_of(elements, query, default_size=50)
+
+    def analyze_photo(self, user, query, body):
+        encoded = (body or {}).get('image_base64')
+        if not encoded:
+            raise StubError(400, 'Изображение не предоставлено')
+        # data:image/jpeg;base64,... - так отправляет imageUriToBase64
+        header, _, data = encoded.rpartition(',')
+        try:
+            image = base64.b64decode(data)
+        except ValueError:
+            raise StubError(400, 'Изображение не в base64')
+        record = getattr(self._current, 'record', None)
+        with self._lock:
+            self.photo_uploads.append({
+                'request_id': record['id'] if record is not None else None,
+                'received': time.time(),
+                'base64_chars': len(encoded),
+                'mime': header[len('data:'):].split(';')[0] if header.startswith('data:') else None,
+                'language': body.get('language'),
+                'image': image,
+            })
+        ingredient = {
+            'name': 'Рис отварной', 'quantity': 150, 'measurement_type': 'GRAM',
+            'proteins': 3.8, 'fats': 0.7, 'carbohydrates': 37.5, 'calories': 172.5,
+        }
+        return 200, {
+            'ingredients': [ingredient],
+            'total_nutrients': {'proteins': 3.8, 'fats': 0.7, 'carbohydrates': 37.5, 'calories': 172.5},
+            'confidence': 0.85,
+            'notes': 'Ответ заглушки',
+        }
+
+    # --- Избранное ---
+
+    def list_favorites(self, user, query, body):
+        ids = self.favorites.get(user['id'], [])
+        return 200, page_of([self.products_by_id[i] for i in ids if i in self.products_by_id], query)
+
+    def add_favorite(self, user, query, body, product_id):
+        with self._lock:
+            ids = self.favorites.setdefault(user['id'], [])
+            if int(product_id) not in ids:
+                ids.append(int(product_id))
+        return 201, {}
+
+    def remove_favorite(self, user, query, body, product_id):
+        with self._lock:
+            ids = self.favorites.get(user['id'], [])
+            if int(product_id) in ids:
+                ids.remove(int(product_id))
+        return 204, None
+
+
+def make_handler(stub):
+    """Создает класс обработчика HTTP-запросов для заглушки"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive для пулов соединений
+
+        def setup(self):
+            super().setup()
+            # Без Nagle: заголовки и тело уходят отдельными write, иначе +40 мс на delayed ACK
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def client_gone(self):
+            """Клиент закрыл соединение, не дождавшись ответа"""
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if not readable:
+                return False
+            try:
+                return self.connection.recv(1, socket.MSG_PEEK) == b''
+            except OSError:
+                return True
+
+        def wait_delay(self, delay):
+            """Задержка ответа; False, если клиент отменил запрос"""
+            deadline = time.monotonic() + delay
+            while time.monotonic() < deadline:
+                if self.client_gone():
+                    return False
+                time.sleep(min(0.01, max(deadline - time.monotonic(), 0)))
+            return not self.client_gone()
+
+        def _control(self, parts):
+            """Служебные эндпоинты заглушки (не попадают в журнал и счетчики)"""
+            query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            if parts.path == f"{CONTROL_PREFIX}/idle":
+                since = float(query['since']) if query.get('since') else None
+                return 200, stub.network_state(query.get('session'), since)
+            if parts.path == f"{CONTROL_PREFIX}/profile":
+                if self.command == 'POST':
+                    try:
+                        stub.set_profile(query.get('name'))
+                    except ValueError as e:
+                        return 400, {'error': str(e)}
+                profile = stub.profile
+                return 200, {'profile': profile.as_dict() if profile is not None else None}
+            return 404, {'error': 'Not Found'}
+
+        def _handle(self):
+            parts = urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            if parts.path.startswith(CONTROL_PREFIX + '/'):
+                self.send_json(*self._control(parts))
+                return
+            query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                body = raw
+            record = stub.begin_request(self.command, parts.path, query, stub.session_key(self.headers, body), len(raw))
+            try:
+                if isinstance(body, bytes):
+                    raise ValueError('Невалидный JSON')
+                status, payload = stub.dispatch(self.command, parts.path, query, body, self.headers, record)
+            except StubError as e:
+                status, payload = e.status, {
+                    'timestamp': now_iso(), 'status': e.status, 'error': e.message, 'path': parts.path,
+                }
+            except (ValueError, KeyError) as e:
+                status, payload = 400, {'timestamp': now_iso(), 'status': 400, 'error': str(e), 'path': parts.path}
+            except Exception as e:
+                # Запрос не должен навсегда остаться незавершенным в счетчике сессии
+                status, payload = 500, {'timestamp': now_iso(), 'status': 500, 'error': repr(e), 'path': parts.path}
+            data = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            fate, network_delay = stub.network_plan(len(raw), len(data))
+            record['fate'] = fate
+            if fate == 'timeout':
+                # Ответа не будет: ждем, пока приложение отменит запрос по таймауту
+                self.wait_delay(network_delay)
+                stub.finish_request(record, None, cancelled=True)
+                self.close_connection = True
+                return
+            if fate == 'error':
+                status = 503
+                data = json.dumps({'timestamp': now_iso(), 'status': 503, 'error': 'Service Unavailable',
+                                   'path': parts.path}).encode('utf-8')
+            delay = stub.delays.get(record['route'], 0) + network_delay
+            if delay and not self.wait_delay(delay):
+                stub.finish_request(record, status, cancelled=True)
+                self.close_connection = True
+                return
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                stub.finish_request(record, status, cancelled=True)
+                self.close_connection = True
+                return
+            stub.finish_request(record, status, response_bytes=len(data))
+
+        def send_json(self, status, payload):
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    return Handler
+
+
+class IdleProbe:
+    """Клиент /__stub/idle: заглушка может работать в другом процессе или на другой машине"""
+
+    def __init__(self, base_url, session=None, timeout=2):
+        parts = urlsplit(base_url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        self.session = session
+        self.timeout = timeout
+
+    def state(self, since=None, session=None):
+        query = {key: value for key, value in (('session', session or self.session), ('since', since)) if value}
+        url = f"{self.base_url}{CONTROL_PREFIX}/idle"
+        if query:
+            url += '?' + urlencode(query)
+        with urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def set_profile(self, name):
+        """Переключает профиль сети заглушки ('none' - без искажений)"""
+        url = f"{self.base_url}{CONTROL_PREFIX}/profile?" + urlencode({'name': name or 'none'})
+        with urlopen(Request(url, data=b'', method='POST'), timeout=self.timeout) as response:
+            return json.loads(response.read())['profile']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Локальная заглушка бэкенда MealRush (/my-food/*)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--delay', action='append', default=[], metavar='HANDLER=SECONDS',
+                        help='Задержка ответа обработчика, например search_by_name=0.3')
+    parser.add_argument('--profile', help='Профиль сети из NETWORK_PROFILES, например 3g')
+    parser.add_argument('--seed', type=int, help='Seed разброса задержек и ошибок профиля')
+    args = parser.parse_args()
+
+    delays = {name: float(seconds) for name, seconds in (item.split('=', 1) for item in args.delay)}
+    stub = BackendStub(args.host, args.port, delays, args.profile, args.seed).start()
+    print(f"Backend stub: {stub.url}" + (f" (профиль сети {args.profile})" if args.profile else ''))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 """
 Базовый класс для Page Object Pattern
 """
+import inspect
 import os
 import sys
 import time
@@ -13,19 +14,46 @@ from appium.webdriver.common.appiumby import AppiumBy
 # Добавляем родительскую директорию в PYTHONPATH
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.appium_config import EXPLICIT_WAIT, IMPLICIT_WAIT, SCREENSHOT_DIR, get_timestamp
+from config.appium_config import (
+    EXPLICIT_WAIT, IMPLICIT_WAIT, SCREENSHOT_DIR, STEP_SCREENSHOTS, get_timestamp,
+    NETWORK_IDLE_URL, NETWORK_IDLE_QUIET, NETWORK_IDLE_POLL,
+)
+from utilities.screen_recorder import step_marker
+from utilities.locators import registry
+from utilities.element_cache import ElementCache, track_screen_change
+from utilities import report, visual
+from utilities.backend_stub import IdleProbe
+
+# Состояние сети приложения по заглушке бэкенда (фикстура backend_stub или E2E_NETWORK_IDLE_URL)
+network_probe = IdleProbe(NETWORK_IDLE_URL) if NETWORK_IDLE_URL else None
 
 
 class BasePage:
     """Базовый класс для всех страниц"""
     
+    # Локаторы динамических областей, которые не сравниваются с baseline (utilities/visual.py)
+    visual_masks = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        """Проверяет локаторы класса; публичные методы оставляют маркеры шагов в видеозаписи,
+        методы с @navigation/@content_change сбрасывают кеш элементов"""
+        super().__init_subclass__(**kwargs)
+        registry.register_page(cls)
+        for name, value in list(vars(cls).items()):
+            if not name.startswith('_') and inspect.isfunction(value):
+                setattr(cls, name, step_marker(f"{cls.__name__}.{name}", track_screen_change(value)))
+    
     def __init__(self, driver):
         self.driver = driver
         self.wait = WebDriverWait(driver, EXPLICIT_WAIT)
         self.driver.implicitly_wait(IMPLICIT_WAIT)
+        self.elements = ElementCache(driver)
     
     def find_element(self, locator, timeout=EXPLICIT_WAIT):
-        """Находит элемент с явным ожиданием"""
+        """Находит элемент с явным ожиданием (хендл кешируется до смены экрана)"""
+        return self.elements.element(locator, lambda: self._wait_for_element(locator, timeout))
+    
+    def _wait_for_element(self, locator, timeout):
         try:
             by_type, value = locator
             if isinstance(by_type, str):
@@ -44,7 +72,10 @@ class BasePage:
             raise
     
     def find_elements(self, locator, timeout=EXPLICIT_WAIT):
-        """Находит все элементы"""
+        """Находит все элементы (список кешируется до смены экрана или содержимого)"""
+        return self.elements.elements(locator, lambda: self._wait_for_elements(locator, timeout))
+    
+    def _wait_for_elements(self, locator, timeout):
         try:
             by_type, value = locator
             elements = WebDriverWait(self.driver, timeout).until(
@@ -161,14 +192,64 @@ class BasePage:
         self.driver.tap([(x, y)], 500)
     
     def take_screenshot(self, name=None):
-        """Делает скриншот"""
+        """Делает скриншот (если пошаговые скриншоты не отключены);
+        именованный шаг сравнивается с baseline, если включена визуальная проверка"""
+        if not STEP_SCREENSHOTS:
+            return None
+        step = name
         if name is None:
             name = f"screenshot_{get_timestamp()}"
         screenshot_path = os.path.join(SCREENSHOT_DIR, f"{name}.png")
-        self.driver.save_screenshot(screenshot_path)
+        png = self.driver.get_screenshot_as_png()
+        with open(screenshot_path, 'wb') as f:
+            f.write(png)
         print(f"Screenshot saved: {screenshot_path}")
+        report.screenshot_taken(screenshot_path)
+        if visual.checker is not None and step is not None and not step.startswith('element_not_found_'):
+            result = visual.checker.check(f"{type(self).__name__}.{step}", png, visual.page_regions(self))
+            if result['status'] != visual.MATCH:
+                print(f"Visual {result['status']}: {result['name']} (отличается {result['changed_ratio']})")
         return screenshot_path
     
+    def wait_for_network_idle(self, timeout=EXPLICIT_WAIT, quiet=NETWORK_IDLE_QUIET, since=None, session=None):
+        """Ожидает, пока у приложения нет запросов к бэкенду quiet секунд и экран перестал меняться
+
+        since - время действия (time.time()): тишина до него не засчитывается.
+        Без заглушки бэкенда ждет только стабильности экрана (page_source
+        двух опросов подряд совпадает). Возвращает время ожидания, секунды.
+        """
+        started = time.time()
+        deadline = started + timeout
+        previous_source = None
+        while time.time() < deadline:
+            if network_probe is not None:
+                state = network_probe.state(since=since, session=session)
+                if state['in_flight'] or state['idle_ms'] < quiet * 1000:
+                    previous_source = None
+                    time.sleep(NETWORK_IDLE_POLL)
+                    continue
+            source = self.driver.page_source
+            if source == previous_source:
+                return time.time() - started
+            previous_source = source
+            time.sleep(NETWORK_IDLE_POLL)
+        raise TimeoutException(f"Сеть или экран не успокоились за {timeout} с")
+    
+    def _wait_for_data(self, since, fallback, timeout=EXPLICIT_WAIT):
+        """После действия, которое грузит данные: с заглушкой бэкенда - до ответа, без нее - пауза fallback"""
+        if network_probe is None:
+            time.sleep(fallback)
+            return False
+        try:
+            self.wait_for_network_idle(timeout, since=since)
+            return True
+        except TimeoutException:
+            return False
+        except OSError:
+            # Заглушка по E2E_NETWORK_IDLE_URL недоступна - как без нее
+            time.sleep(fallback)
+            return False
+    
     def wait_for_activity(self, activity_name, timeout=EXPLICIT_WAIT):
         """Ожидает появления активности (Android)"""
         try:
@@ -0,0 +1,358 @@
+"""
+Запись и воспроизведение трафика WebDriver (кассеты)
+
+Recorder подменяет RemoteConnection._request и пишет каждую команду и
+ответ прогона на реальном устройстве в кассету:
+
+    <кассета>/commands.jsonl  - одна команда на строку: тест, метод, путь
+                                (id сессии заменен на :id), тело, ответ, мс
+    <кассета>/blobs/          - скриншоты (PNG) и длинные строки (page_source),
+                                по одному файлу на уникальное содержимое
+
+ReplayServer отдает записанные ответы как Appium-сервер, без устройства и
+без ожиданий: команда сопоставляется по методу, пути и телу, одинаковые
+команды получают ответы в порядке записи (последний повторяется, если
+при воспроизведении команда выполнилась чаще). После рефакторинга
+BasePage и page objects прогон на кассете показывает, не изменилось ли
+поведение тестов и число команд: diff_counts сравнивает команды каждого
+теста в записи и при воспроизведении.
+
+Запись и воспроизведение из pytest:
+    pytest tests/test_simple_login.py --record-cassette cassettes/login
+    pytest tests/test_simple_login.py --replay-cassette cassettes/login
+
+Отдельный сервер и статистика кассеты:
+    python -m utilities.cassette serve cassettes/login --port 4723
+    python -m utilities.cassette stats cassettes/login
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+COMMANDS_FILE = 'commands.jsonl'
+BLOBS_DIR = 'blobs'
+BLOB_MIN_CHARS = 2048  # строки длиннее выносятся в blobs/
+SESSION_PATH = re.compile(r'^(?:/wd/hub)?/session/[^/]+')
+ELEMENT_ID = re.compile(r'/(element|shadow)/[^/]+')
+NO_TEST = '(вне тестов)'
+
+
+def normalize_path(url):
+    """Путь команды без хоста и id сессии: /session/:id/element"""
+    path = urlsplit(url).path.rstrip('/') or '/'
+    return SESSION_PATH.sub('/session/:id', path)
+
+
+def command_name(method, path):
+    """Имя команды для подсчета: id элементов заменены на :el"""
+    path = ELEMENT_ID.sub(r'/\1/:el', path.replace('/session/:id', '', 1)) or '/'
+    return f"{method} {path}"
+
+
+def body_key(method, path, body):
+    # Capabilities новой сессии зависят от машины - сессия сопоставляется без тела
+    if method == 'POST' and path in ('/session', '/wd/hub/session'):
+        return ''
+    return json.dumps(body, sort_keys=True, ensure_ascii=False)
+
+
+class Cassette:
+    """Файлы кассеты: команды и дедуплицированные blobs"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.blobs_dir = os.path.join(directory, BLOBS_DIR)
+        self.blob_refs = 0
+        self._known_blobs = set()
+
+    @property
+    def commands_path(self):
+        return os.path.join(self.directory, COMMANDS_FILE)
+
+    def store_blob(self, data, ext):
+        """Сохраняет содержимое один раз; возвращает имя файла"""
+        name = f"{hashlib.sha256(data).hexdigest()[:20]}{ext}"
+        self.blob_refs += 1
+        if name not in self._known_blobs:
+            path = os.path.join(self.blobs_dir, name)
+            if not os.path.exists(path):
+                os.makedirs(self.blobs_dir, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+            self._known_blobs.add(name)
+        return name
+
+    def load_blob(self, name):
+        with open(os.path.join(self.blobs_dir, name), 'rb') as f:
+            data = f.read()
+        if name.endswith('.png'):
+            return base64.b64encode(data).decode('ascii')
+        return data.decode('utf-8')
+
+    def pack_response(self, path, response):
+        """Ответ для записи: длинные строки (скриншоты, page_source) - ссылками на blobs"""
+        value = response.get('value') if isinstance(response, dict) else None
+        if not isinstance(value, str) or len(value) < BLOB_MIN_CHARS or 'status' in response:
+            return response
+        if path.endswith('/screenshot'):
+            name = self.store_blob(base64.b64decode(value), '.png')
+        else:
+            name = self.store_blob(value.encode('utf-8'), '.txt')
+        return dict(response, value={'$blob': name})
+
+    def unpack_response(self, response):
+        value = response.get('value') if isinstance(response, dict) else None
+        if isinstance(value, dict) and set(value) == {'$blob'}:
+            return dict(response, value=self.load_blob(value['$blob']))
+        return response
+
+    def entries(self):
+        with open(self.commands_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def counts(self):
+        """Команды каждого теста в записи: {тест: Counter}"""
+        counts = defaultdict(Counter)
+        for entry in self.entries():
+            counts[entry['test']][command_name(entry['method'], entry['path'])] += 1
+        return counts
+
+    def stats(self):
+        entries = self.entries()
+        blobs = os.listdir(self.blobs_dir) if os.path.isdir(self.blobs_dir) else []
+        return {
+            'commands': len(entries),
+            'tests': len({entry['test'] for entry in entries}),
+            'recorded_ms': round(sum(entry['ms'] for entry in entries)),
+            'blobs': len(blobs),
+            'blob_bytes': sum(os.path.getsize(os.path.join(self.blobs_dir, name)) for name in blobs),
+            'commands_bytes': os.path.getsize(self.commands_path),
+            'top': Counter(command_name(e['method'], e['path']) for e in entries).most_common(10),
+        }
+
+
+class Recorder:
+    """Перехват команд WebDriver: пишет их в кассету (если задана) и считает по тестам"""
+
+    def __init__(self, cassette=None):
+        self.cassette = cassette
+        self.current_test = NO_TEST
+        self.counts = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._file = None
+        self._original = None
+
+    def install(self):
+        if self.cassette is not None:
+            os.makedirs(self.cassette.directory, exist_ok=True)
+            self._file = open(self.cassette.commands_path, 'w', encoding='utf-8')
+        self._original = RemoteConnection._request
+        recorder = self
+
+        def _request(connection, method, url, body=None):
+            started = time.perf_counter()
+            response = recorder._original(connection, method, url, body=body)
+            recorder.record(method, url, body, response, (time.perf_counter() - started) * 1000.0)
+            return response
+
+        RemoteConnection._request = _request
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            RemoteConnection._request = self._original
+            self._original = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record(self, method, url, body, response, ms):
+        path = normalize_path(url)
+        with self._lock:
+            self.counts[self.current_test][command_name(method, path)] += 1
+            if self._file is None:
+                return
+            entry = {
+                'test': self.current_test,
+                'method': method,
+                'path': path,
+                'body': json.loads(body) if body and method in ('POST', 'PUT') else None,
+                'response': self.cassette.pack_response(path, response),
+                'ms': round(ms, 1),
+            }
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._file.flush()
+
+
+class ReplayServer:
+    """HTTP-сервер, отдающий записанные ответы"""
+
+    def __init__(self, cassette, host='127.0.0.1', port=0):
+        self.cassette = cassette
+        self.host = host
+        self.port = port
+        self.server = None
+        self._lock = threading.Lock()
+        self.exact = defaultdict(deque)  # (метод, путь, тело) -> ответы по порядку
+        self.by_path = defaultdict(deque)  # (метод, путь) -> ответы, если тело не совпало
+        self.last = {}
+        self.misses = Counter()  # команды, которых нет в кассете
+        self.inexact = Counter()  # команды, сопоставленные без тела
+        for entry in cassette.entries():
+            key = (entry['method'], entry['path'])
+            self.exact[key + (body_key(entry['method'], entry['path'], entry['body']),)].append(entry['response'])
+            self.by_path[key].append(entry['response'])
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, self.port), make_handler(self))
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), name='cassette-replay', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def respond(self, method, path, body):
+        """Записанный ответ на команду (в формате RemoteConnection._request)"""
+        key = (method, path)
+        exact_key = key + (body_key(method, path, body),)
+        with self._lock:
+            if self.exact[exact_key]:
+                response = self.exact[exact_key].popleft()
+                self.last[exact_key] = response
+            elif exact_key in self.last:
+                response = self.last[exact_key]
+            elif self.by_path[key]:
+                # Тело другое (например, новый локатор): ближайший ответ на тот же путь
+                response = self.by_path[key][0]
+                self.inexact[command_name(method, path)] += 1
+            else:
+                self.misses[command_name(method, path)] += 1
+                return None
+        return self.cassette.unpack_response(response)
+
+
+def make_handler(replay):
+    class Handler(BaseHTTPRequestHandler):
+        def _dispatch(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            body = json.loads(raw) if raw and method in ('POST', 'PUT') else None
+            response = replay.respond(method, normalize_path(self.path), body)
+            if response is None:
+                status, data = 404, json.dumps({'value': {
+                    'error': 'unknown command', 'message': f"{method} {self.path} нет в кассете", 'stacktrace': '',
+                }})
+            elif isinstance(response.get('status'), int) and response['status'] >= 400:
+                # Ошибки записаны так, как их вернул _request: статус и сырое тело
+                status, data = response['status'], response['value']
+            else:
+                status, data = 200, json.dumps(response, ensure_ascii=False)
+            data = data.encode('utf-8')
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_DELETE(self):
+            self._dispatch('DELETE')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def diff_counts(recorded, replayed):
+    """Разница числа команд по тестам: [{test, recorded, replayed, changes: {команда: delta}}]"""
+    rows = []
+    for test in sorted(set(recorded) | set(replayed)):
+        before, after = recorded.get(test, Counter()), replayed.get(test, Counter())
+        changes = {name: after[name] - before[name] for name in set(before) | set(after) if after[name] != before[name]}
+        rows.append({
+            'test': test,
+            'recorded': sum(before.values()),
+            'replayed': sum(after.values()),
+            'changes': dict(sorted(changes.items(), key=lambda item: (-abs(item[1]), item[0]))),
+        })
+    return rows
+
+
+def format_diff(rows, misses=None):
+    lines = []
+    changed = [row for row in rows if row['changes']]
+    recorded = sum(row['recorded'] for row in rows)
+    replayed = sum(row['replayed'] for row in rows)
+    lines.append(f"Кассета: команд {recorded} в записи, {replayed} при воспроизведении "
+                 f"({replayed - recorded:+d}), изменилось тестов: {len(changed)}")
+    for row in changed:
+        lines.append(f"  {row['test']}: {row['recorded']} -> {row['replayed']}")
+        for name, delta in row['changes'].items():
+            lines.append(f"    {delta:+d} {name}")
+    for name, count in (misses or Counter()).most_common():
+        lines.append(f"  нет в кассете: {name} x{count}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Кассеты трафика WebDriver')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help='Отдавать записанные ответы как Appium-сервер')
+    serve.add_argument('cassette')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=4723)
+    stats = commands.add_parser('stats', help='Размер кассеты и самые частые команды')
+    stats.add_argument('cassette')
+    args = parser.parse_args(argv)
+
+    cassette = Cassette(args.cassette)
+    if args.command == 'stats':
+        summary = cassette.stats()
+        print(f"Команд: {summary['commands']} в {summary['tests']} тестах, "
+              f"записано за {summary['recorded_ms'] / 1000:.1f} с")
+        print(f"commands.jsonl: {summary['commands_bytes'] / 1024:.0f} КБ, "
+              f"blobs: {summary['blobs']} файлов, {summary['blob_bytes'] / 1024:.0f} КБ")
+        for name, count in summary['top']:
+            print(f"  {count:6d} {name}")
+        return 0
+
+    replay = ReplayServer(cassette, args.host, args.port).start()
+    print(f"Replay: {replay.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        replay.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    main()
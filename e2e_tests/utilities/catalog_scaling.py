@@ -0,0 +1,181 @@
+"""
+Большой каталог в заглушке бэкенда: как список продуктов масштабируется
+
+Каталог заглушки растет до CATALOG_SIZES продуктов (grow_catalog: все
+находятся по одному запросу, порядок выдачи - порядок номеров). На
+каждом размере сценарий замеряет время до первого результата и до
+элемента CATALOG_TARGET_INDEX, запросы страниц (page/size) из журнала
+заглушки и рост PSS приложения.
+
+fetch_summary сводит страницы одного замера: сколько запрошено, какие
+повторно, сколько загружено сверх показанного (over-fetch) и сколько
+страниц сверх нужных для элемента N. scaling_exponent - наклон прямой в
+log-log координатах: ~0 - время не зависит от размера каталога (так и
+должно быть при постраничной загрузке), ~1 - линейный рост (приложение
+грузит или перебирает весь каталог), больше 1 - хуже линейного.
+
+Запуск из командной строки:
+    python -m utilities.catalog_scaling serve --size 100000 --port 8080
+    python -m utilities.catalog_scaling fit 1000=850 10000=870 100000=2400
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    CATALOG_MAX_EXPONENT, CATALOG_MAX_EXTRA_PAGES, CATALOG_PAGE_SIZE, CATALOG_SIZES, CATALOG_TARGET_INDEX,
+)
+
+CATALOG_PREFIX = 'Ассортимент'  # не подстрока других продуктов заглушки
+
+
+def catalog_rows(start, stop, prefix=CATALOG_PREFIX):
+    """Строки seed_products для продуктов с номерами start..stop-1"""
+    for i in range(start, stop):
+        yield (f"{prefix} {i:06d}", 40 + i % 400, round(1 + i % 30 * 0.5, 1), round(i % 20 * 0.5, 1),
+               round(i % 60 * 0.5, 1), f"29{i:011d}")
+
+
+def grow_catalog(stub, size, prefix=CATALOG_PREFIX):
+    """Доводит каталог заглушки до size продуктов (каталог только растет); возвращает число добавленных"""
+    have = sum(1 for product in stub.products if product['name'].startswith(prefix))
+    if have < size:
+        stub.seed_products(catalog_rows(have, size, prefix))
+    return max(size - have, 0)
+
+
+def page_records(stub, since, name=CATALOG_PREFIX):
+    """Запросы страниц поиска по name из журнала заглушки"""
+    return [r for r in stub.requests('search_by_name', since) if r['query'].get('name') == name]
+
+
+def fetch_summary(records, total, shown, target_index=CATALOG_TARGET_INDEX, page_size=CATALOG_PAGE_SIZE):
+    """Страницы одного замера
+
+    total - продуктов по запросу, shown - карточек, увиденных в списке.
+    """
+    pages = [int(r['query'].get('page', 0)) for r in records]
+    sizes = [int(r['query'].get('size', page_size)) for r in records]
+    fetched = sum(min(size, max(total - page * size, 0)) for page, size in zip(pages, sizes))
+    needed = min(target_index // page_size + 1, (total + page_size - 1) // page_size)
+    unique = set(pages)
+    return {
+        'pages': len(pages),
+        'order': pages,
+        'repeated': len(pages) - len(unique),
+        'deepest': max(pages) if pages else None,
+        'fetched_items': fetched,
+        'shown': shown,
+        'over_fetch': max(fetched - shown, 0),
+        'needed_pages': needed,
+        'extra_pages': max(len(pages) - needed, 0),
+        'server_ms': round(sum((r['finished'] - r['started']) * 1000 for r in records if r['finished']), 1),
+        'response_kb': round(sum(r['response_bytes'] or 0 for r in records) / 1024, 1),
+    }
+
+
+def scaling_exponent(points):
+    """Наклон и R^2 log(y) от log(x) по точкам (x, y); точки с x или y <= 0 пропускаются"""
+    logs = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    n = len(logs)
+    if n < 2:
+        return None, None
+    mean_x = sum(x for x, _ in logs) / n
+    mean_y = sum(y for _, y in logs) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in logs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in logs)
+    syy = sum((y - mean_y) ** 2 for _, y in logs)
+    if not sxx:
+        return None, None
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy else 1.0
+    return round(slope, 3), round(r2, 3)
+
+
+def classify(exponent):
+    if exponent is None:
+        return 'нет данных'
+    if exponent < 0.2:
+        return 'не зависит от размера'
+    if exponent < 0.8:
+        return 'сублинейно'
+    if exponent < 1.2:
+        return 'линейно'
+    return 'хуже линейного'
+
+
+def scaling_report(measurements, metrics=('first_ms', 'item_ms', 'pss_growth_kb')):
+    """Показатели роста метрик от размера каталога по замерам {'size', метрика: значение}"""
+    report = {}
+    for metric in metrics:
+        exponent, r2 = scaling_exponent(
+            [(m['size'], m[metric]) for m in measurements if m.get(metric) is not None]
+        )
+        report[metric] = {'exponent': exponent, 'r2': r2, 'verdict': classify(exponent)}
+    return report
+
+
+def check_scaling(report, measurements, max_exponent=CATALOG_MAX_EXPONENT, max_extra_pages=CATALOG_MAX_EXTRA_PAGES):
+    """Нарушения пределов (пустой список - все в норме)"""
+    problems = []
+    for m in measurements:
+        if not m['reached']:
+            problems.append(f"{m['size']}: элемент {m['target']} недоступен, список обрывается на "
+                            f"{m['fetch']['shown']} из {m['size']} (страниц {m['fetch']['pages']})")
+        if m['fetch']['extra_pages'] > max_extra_pages:
+            problems.append(f"{m['size']}: лишних страниц {m['fetch']['extra_pages']} > {max_extra_pages} "
+                            f"(порядок {m['fetch']['order']})")
+    for metric in ('first_ms', 'item_ms'):
+        exponent = report[metric]['exponent']
+        if exponent is not None and exponent > max_exponent:
+            problems.append(f"{metric} растет с каталогом: показатель {exponent} > {max_exponent} "
+                            f"({report[metric]['verdict']})")
+    return problems
+
+
+def format_measurement(m):
+    fetch = m['fetch']
+    first = f"{m['first_ms']:.0f} мс" if m['first_ms'] is not None else 'нет'
+    return (f"{m['size']:>7}: первый {first}, элемент {m['target']} "
+            f"{'%.0f мс' % m['item_ms'] if m['reached'] else 'недоступен'}, страниц {fetch['pages']} "
+            f"(нужно {fetch['needed_pages']}, повторных {fetch['repeated']}), загружено {fetch['fetched_items']} "
+            f"/ показано {fetch['shown']}, PSS +{m['pss_growth_kb'] or 0:.0f} КБ")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Большой каталог в заглушке бэкенда')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help='Заглушка бэкенда с каталогом')
+    serve.add_argument('--size', type=int, default=max(CATALOG_SIZES))
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8080)
+    fit = commands.add_parser('fit', help='Показатель роста по точкам РАЗМЕР=ЗНАЧЕНИЕ')
+    fit.add_argument('points', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        from utilities.backend_stub import BackendStub
+        started = time.perf_counter()
+        stub = BackendStub(args.host, args.port)
+        grow_catalog(stub, args.size)
+        stub.start()
+        print(f"Backend stub: {stub.url}, каталог {args.size} ('{CATALOG_PREFIX}') за "
+              f"{time.perf_counter() - started:.1f} с")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            stub.stop()
+    else:
+        points = [tuple(float(v) for v in point.split('=', 1)) for point in args.points]
+        exponent, r2 = scaling_exponent(points)
+        print(f"показатель {exponent}, R^2 {r2}: {classify(exponent)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,560 @@
+"""
+Распределенный прогон: координатор и агенты на нескольких машинах
+
+Координатор собирает id тестов (pytest --collect-only) и раздает их
+агентам по TCP (JSON, одно сообщение на строку). Агент - обычный pytest
+на машине с устройством и локальным Appium, запущенный с плагином этого
+модуля: он собирает те же тесты, берет у координатора порцию id, когда
+его очередь заканчивается, выполняет их и отправляет результаты вместе с
+артефактами (скриншоты, видео). Когда общая очередь пуста, координатор
+забирает еще не начатые тесты у самого загруженного агента и отдает
+простаивающему (work stealing). Тесты агента, который отключился, снова
+ставятся в очередь. Итог - один отчет (JSON + JUnit XML) с временем
+каждого теста и загрузкой агентов.
+
+Протокол (агент -> координатор): hello, want {n, wait}, result {...},
+returned {ids}, bye; (координатор -> агент): tests {ids}, steal {count},
+done.
+
+Запуск:
+    python -m utilities.distributed coordinator --port 5555 -- tests/ -m smoke
+    python -m utilities.distributed agent --coordinator build-host:5555 \\
+        --appium http://localhost:4723 --appium http://localhost:4725 -- tests/
+"""
+import argparse
+import base64
+import json
+import os
+import re
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+
+import pytest
+
+# Добавляем родительскую директорию в PYTHONPATH
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from config.appium_config import (
+    DISTRIBUTED_ARTIFACTS_DIR, DISTRIBUTED_JUNIT_FILE, DISTRIBUTED_MAX_BATCH, DISTRIBUTED_PORT,
+    DISTRIBUTED_RESULTS_FILE,
+)
+
+ARTIFACT_MAX_BYTES = 50 * 1024 * 1024
+MAX_ATTEMPTS = 2  # тест, во время которого агент пропал, перезапускается один раз
+AGENT_WAIT_TIMEOUT = 300  # секунд без агентов, после которых оставшиеся тесты считаются не выполненными
+
+
+class Connection:
+    """Сокет с сообщениями JSON по одному на строку"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        data = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            self.sock.sendall(data)
+
+    def receive(self, timeout=None):
+        """Следующее сообщение; None, если за timeout ничего не пришло"""
+        while b'\n' not in self._buffer:
+            self.sock.settimeout(timeout)
+            try:
+                chunk = self.sock.recv(65536)
+            except (socket.timeout, BlockingIOError):
+                return None
+            if not chunk:
+                raise ConnectionError('соединение закрыто')
+            self._buffer += chunk
+        line, _, rest = bytes(self._buffer).partition(b'\n')
+        self._buffer = bytearray(rest)
+        return json.loads(line)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+# --- Координатор ---
+
+class AgentState:
+    def __init__(self, name, conn):
+        self.name = name
+        self.conn = conn
+        self.assigned = []  # выданы, результата еще нет (в порядке выдачи)
+        self.stealing = False
+        self.connected_at = time.time()
+        self.busy_seconds = 0.0
+        self.tests = 0
+
+
+class Coordinator:
+    """Очередь тестов и сбор результатов"""
+
+    def __init__(self, test_ids, host='0.0.0.0', port=DISTRIBUTED_PORT, max_batch=DISTRIBUTED_MAX_BATCH,
+                 artifacts_dir=DISTRIBUTED_ARTIFACTS_DIR):
+        self.test_ids = list(test_ids)
+        self.queue = deque(self.test_ids)
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.artifacts_dir = artifacts_dir
+        self.agents = {}
+        self.results = {}  # nodeid -> результат
+        self.attempts = {}
+        self.reassigned = 0
+        self.stolen = 0
+        self.started = None
+        self.finished = None
+        self._cond = threading.Condition()
+        self.server = None
+
+    # Сервер
+
+    def start(self):
+        coordinator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                coordinator.serve_agent(Connection(self.request))
+
+        self.server = socketserver.ThreadingTCPServer((self.host, self.port), Handler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, args=(0.1,), name='coordinator', daemon=True).start()
+        self.started = time.time()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def wait(self, agent_timeout=AGENT_WAIT_TIMEOUT):
+        """Ждет результатов всех тестов; если агентов нет agent_timeout секунд - не выполненные становятся error"""
+        idle_since = time.time()
+        with self._cond:
+            while len(self.results) < len(self.test_ids):
+                if self.agents:
+                    idle_since = time.time()
+                elif time.time() - idle_since > agent_timeout:
+                    for nodeid in self.test_ids:
+                        if nodeid not in self.results:
+                            self.results[nodeid] = self._missing(nodeid, 'не выполнен: нет подключенных агентов')
+                    break
+                self._cond.wait(0.5)
+        self.finished = time.time()
+        return self.results
+
+    # Агенты
+
+    def serve_agent(self, conn):
+        try:
+            hello = conn.receive()
+        except (ConnectionError, OSError, ValueError):
+            conn.close()
+            return
+        with self._cond:
+            name = hello.get('agent') or 'agent'
+            while name in self.agents:
+                name += '+'
+            agent = AgentState(name, conn)
+            self.agents[name] = agent
+            self._cond.notify_all()
+        try:
+            while True:
+                message = conn.receive()
+                kind = message.get('type')
+                if kind == 'want':
+                    self._assign(agent, message.get('n') or self.max_batch, message.get('wait', True))
+                elif kind == 'result':
+                    self._record(agent, message)
+                elif kind == 'returned':
+                    self._returned(agent, message.get('ids', []))
+                elif kind == 'bye':
+                    break
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self._disconnect(agent)
+            conn.close()
+
+    def _batch_size(self, wanted):
+        agents = max(1, len(self.agents))
+        # Крупные порции в начале, по одному тесту к концу очереди
+        return max(1, min(wanted, self.max_batch, len(self.queue) // (2 * agents)))
+
+    def _assign(self, agent, wanted, wait=True):
+        """Выдает порцию; wait=False - предвыборка, при пустой очереди ответ пустой"""
+        with self._cond:
+            while True:
+                if self.queue:
+                    ids = [self.queue.popleft() for _ in range(self._batch_size(wanted))]
+                    agent.assigned.extend(ids)
+                    agent.conn.send({'type': 'tests', 'ids': ids})
+                    return
+                if not wait:
+                    agent.conn.send({'type': 'tests', 'ids': []})
+                    return
+                if len(self.results) >= len(self.test_ids):
+                    agent.conn.send({'type': 'done'})
+                    return
+                # Крадем у самого загруженного: один тест выполняется, один ждет следующим
+                others = [a for a in self.agents.values() if a is not agent]
+                victim = max(others, key=lambda a: len(a.assigned), default=None)
+                if victim is not None and not victim.stealing and len(victim.assigned) > 2:
+                    victim.stealing = True
+                    try:
+                        victim.conn.send({'type': 'steal', 'count': (len(victim.assigned) - 1) // 2})
+                    except OSError:
+                        victim.stealing = False
+                self._cond.wait(0.5)
+
+    def _returned(self, agent, ids):
+        with self._cond:
+            agent.stealing = False
+            for nodeid in reversed(ids):
+                if nodeid in agent.assigned:
+                    agent.assigned.remove(nodeid)
+                    self.queue.appendleft(nodeid)
+                    self.stolen += 1
+            self._cond.notify_all()
+
+    def _record(self, agent, message):
+        nodeid = message['nodeid']
+        artifacts = [self._save_artifact(agent, nodeid, artifact) for artifact in message.get('artifacts', [])]
+        with self._cond:
+            if nodeid in agent.assigned:
+                agent.assigned.remove(nodeid)
+            agent.tests += 1
+            agent.busy_seconds += message.get('duration', 0.0)
+            self.results[nodeid] = {
+                'nodeid': nodeid,
+                'outcome': message.get('outcome', 'error'),
+                'duration': message.get('duration', 0.0),
+                'agent': agent.name,
+                'longrepr': message.get('longrepr'),
+                'artifacts': [path for path in artifacts if path],
+            }
+            self._cond.notify_all()
+
+    def _save_artifact(self, agent, nodeid, artifact):
+        try:
+            data = base64.b64decode(artifact['data'])
+        except (KeyError, ValueError):
+            return None
+        safe_test = re.sub(r'[^\w.-]+', '_', nodeid.split('::', 1)[-1])[:80]
+        directory = os.path.join(self.artifacts_dir, re.sub(r'[^\w.-]+', '_', agent.name))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{safe_test}__{os.path.basename(artifact['name'])}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _disconnect(self, agent):
+        with self._cond:
+            if self.agents.get(agent.name) is agent:
+                del self.agents[agent.name]
+            for nodeid in reversed(agent.assigned):
+                self.attempts[nodeid] = self.attempts.get(nodeid, 0) + 1
+                if self.attempts[nodeid] >= MAX_ATTEMPTS:
+                    self.results[nodeid] = self._missing(nodeid, f"агент {agent.name} отключился во время теста")
+                else:
+                    self.queue.appendleft(nodeid)
+                    self.reassigned += 1
+            agent.assigned = []
+            self._cond.notify_all()
+
+    def _missing(self, nodeid, reason):
+        return {'nodeid': nodeid, 'outcome': 'error', 'duration': 0.0, 'agent': None, 'longrepr': reason,
+                'artifacts': []}
+
+    # Отчет
+
+    def report(self):
+        results = [self.results[nodeid] for nodeid in self.test_ids if nodeid in self.results]
+        wall = (self.finished or time.time()) - (self.started or time.time())
+        totals = {}
+        for result in results:
+            totals[result['outcome']] = totals.get(result['outcome'], 0) + 1
+        agents = {}
+        for result in results:
+            if result['agent'] is None:
+                continue
+            stats = agents.setdefault(result['agent'], {'tests': 0, 'busy_seconds': 0.0})
+            stats['tests'] += 1
+            stats['busy_seconds'] += result['duration']
+        for stats in agents.values():
+            stats['busy_seconds'] = round(stats['busy_seconds'], 2)
+            stats['utilization'] = round(stats['busy_seconds'] / wall, 3) if wall else 0.0
+        return {
+            'wall_seconds': round(wall, 2),
+            'total_test_seconds': round(sum(r['duration'] for r in results), 2),
+            'totals': totals,
+            'agents': agents,
+            'reassigned': self.reassigned,
+            'stolen': self.stolen,
+            'tests': results,
+        }
+
+
+def write_junit(report, path):
+    totals = report['totals']
+    suite = ET.Element('testsuite', {
+        'name': 'distributed', 'tests': str(len(report['tests'])), 'failures': str(totals.get('failed', 0)),
+        'errors': str(totals.get('error', 0)), 'skipped': str(totals.get('skipped', 0)),
+        'time': str(report['wall_seconds']),
+    })
+    for result in report['tests']:
+        path_part, _, name = result['nodeid'].rpartition('::')
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': path_part.replace('/', '.').replace('::', '.').removesuffix('.py'),
+            'name': name, 'time': f"{result['duration']:.3f}",
+        })
+        if result['outcome'] in ('failed', 'error', 'skipped'):
+            tag = {'failed': 'failure', 'error': 'error', 'skipped': 'skipped'}[result['outcome']]
+            ET.SubElement(case, tag, {'message': (result['longrepr'] or '').splitlines()[-1:][0]
+                                      if result['longrepr'] else ''}).text = result['longrepr']
+        ET.SubElement(case, 'properties').extend(
+            [ET.Element('property', {'name': 'agent', 'value': result['agent'] or ''})] +
+            [ET.Element('property', {'name': 'artifact', 'value': path}) for path in result['artifacts']]
+        )
+    ET.ElementTree(suite).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def format_report(report):
+    lines = [
+        f"Тестов: {len(report['tests'])} за {report['wall_seconds']:.1f} с "
+        f"(суммарно {report['total_test_seconds']:.1f} с), "
+        + ', '.join(f"{outcome}: {count}" for outcome, count in sorted(report['totals'].items())),
+        f"Перераспределено после отключения агентов: {report['reassigned']}, украдено из очередей: {report['stolen']}",
+    ]
+    for name, stats in sorted(report['agents'].items()):
+        lines.append(f"  {name}: {stats['tests']} тестов, занят {stats['busy_seconds']:.1f} с "
+                     f"({stats['utilization'] * 100:.0f}%)")
+    for result in report['tests']:
+        if result['outcome'] in ('failed', 'error'):
+            lines.append(f"  {result['outcome'].upper()} {result['nodeid']} [{result['agent']}]")
+    return '\n'.join(lines)
+
+
+def collect_test_ids(pytest_args, cwd=ROOT_DIR):
+    """id тестов так, как их собрал бы pytest с этими аргументами"""
+    output = subprocess.run(
+        [sys.executable, '-m', 'pytest', '--collect-only', '-q', '-p', 'no:cacheprovider', *pytest_args],
+        cwd=cwd, capture_output=True, text=True,
+    ).stdout
+    return [line.strip() for line in output.splitlines() if '::' in line and not line.startswith(' ')]
+
+
+# --- Агент (плагин pytest) ---
+
+def pytest_addoption(parser):
+    group = parser.getgroup('distributed')
+    group.addoption('--coordinator', default=None, help='host:port координатора: брать тесты у него')
+    group.addoption('--agent-name', default=os.getenv('E2E_AGENT_NAME') or socket.gethostname(),
+                    help='Имя агента в отчете')
+
+
+def pytest_configure(config):
+    address = config.getoption('coordinator', None)
+    if address and not config.option.collectonly:
+        config.pluginmanager.register(AgentSession(config, address), 'distributed-agent')
+
+
+class AgentSession:
+    """Выполняет тесты, выданные координатором"""
+
+    def __init__(self, config, address, prefetch=DISTRIBUTED_MAX_BATCH):
+        self.config = config
+        self.address = parse_address(address)
+        self.name = config.getoption('agent_name')
+        self.prefetch = prefetch
+        self.conn = None
+        self.pending = deque()
+        self.finished = False
+        self.reports = {}
+
+    def _fetch(self, wait=True):
+        """Берет порцию у координатора; wait=False - не ждать, если очередь пуста"""
+        self.conn.send({'type': 'want', 'n': self.prefetch, 'wait': wait})
+        while True:
+            message = self.conn.receive()
+            if message['type'] == 'tests':
+                self.pending.extend(message['ids'])
+                return
+            if message['type'] == 'done':
+                self.finished = True
+                return
+            self._handle(message)
+
+    def _handle(self, message):
+        if message['type'] == 'steal':
+            # Первый в очереди уже назначен следующим (nextitem) - его не отдаем
+            count = min(message['count'], max(0, len(self.pending) - 1))
+            ids = [self.pending.pop() for _ in range(count)][::-1]
+            self.conn.send({'type': 'returned', 'ids': ids})
+
+    def _poll(self):
+        while True:
+            message = self.conn.receive(timeout=0)
+            if message is None:
+                return
+            self._handle(message)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            raise session.Interrupted(f"{session.testsfailed} ошибок при сборе тестов")
+        items = {item.nodeid: item for item in session.items}
+        self.conn = Connection(socket.create_connection(self.address))
+        self.conn.send({'type': 'hello', 'agent': self.name, 'host': socket.gethostname(),
+                        'appium': os.getenv('APPIUM_SERVER_URL')})
+        try:
+            while True:
+                if not self.pending and not self.finished:
+                    self._fetch()
+                if not self.pending:
+                    break
+                nodeid = self.pending.popleft()
+                if not self.pending and not self.finished:
+                    # Следующий тест нужен заранее: с nextitem=None pytest закрывает session-фикстуры (драйвер)
+                    self._fetch(wait=False)
+                item = items.get(nodeid)
+                if item is None:
+                    self._send_result(nodeid, 'error', 0.0, f"{nodeid} не найден среди тестов агента {self.name}")
+                    continue
+                nextitem = items.get(self.pending[0]) if self.pending else None
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+                if session.shouldfail or session.shouldstop:
+                    break
+                self._poll()
+            self.conn.send({'type': 'bye'})
+        finally:
+            self.conn.close()
+        return True
+
+    def pytest_runtest_logreport(self, report):
+        entry = self.reports.setdefault(report.nodeid, {'outcome': 'passed', 'duration': 0.0, 'longrepr': None})
+        entry['duration'] += report.duration
+        if report.failed and entry['outcome'] not in ('failed', 'error'):
+            entry['outcome'] = 'failed' if report.when == 'call' else 'error'
+            entry['longrepr'] = str(report.longrepr)
+        elif report.skipped and entry['outcome'] == 'passed':
+            entry['outcome'] = 'skipped'
+            entry['longrepr'] = report.longrepr[2] if isinstance(report.longrepr, tuple) else str(report.longrepr)
+        if report.when == 'teardown':
+            entry = self.reports.pop(report.nodeid)
+            self._send_result(report.nodeid, entry['outcome'], entry['duration'], entry['longrepr'],
+                              self._artifacts(report))
+
+    def _artifacts(self, report):
+        """Файлы из user_properties теста и скриншот падения"""
+        paths = [value for _, value in report.user_properties if isinstance(value, str) and os.path.isfile(value)]
+        screenshot = os.path.join('screenshots', f"failure_{report.nodeid.rpartition('::')[2]}.png")
+        if os.path.isfile(screenshot):
+            paths.append(screenshot)
+        artifacts = []
+        for path in dict.fromkeys(paths):
+            if os.path.getsize(path) <= ARTIFACT_MAX_BYTES:
+                with open(path, 'rb') as f:
+                    artifacts.append({'name': os.path.basename(path), 'data': base64.b64encode(f.read()).decode()})
+        return artifacts
+
+    def _send_result(self, nodeid, outcome, duration, longrepr, artifacts=()):
+        self.conn.send({'type': 'result', 'nodeid': nodeid, 'outcome': outcome, 'duration': duration,
+                        'longrepr': longrepr, 'artifacts': list(artifacts)})
+
+
+# --- Командная строка ---
+
+def run_coordinator(args, pytest_args):
+    test_ids = collect_test_ids(pytest_args)
+    if not test_ids:
+        print("Тесты не найдены")
+        return 5
+    coordinator = Coordinator(test_ids, args.host, args.port, args.batch, args.artifacts).start()
+    print(f"Координатор: {len(test_ids)} тестов, порт {coordinator.port}")
+    try:
+        coordinator.wait(args.agent_timeout)
+    finally:
+        coordinator.stop()
+    report = coordinator.report()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    write_junit(report, args.junit)
+    print(format_report(report))
+    print(f"Отчет: {args.output}, {args.junit}")
+    return 1 if report['totals'].get('failed') or report['totals'].get('error') else 0
+
+
+def agent_command(coordinator, name, pytest_args):
+    return [sys.executable, '-m', 'pytest', '-p', 'utilities.distributed', '--coordinator', coordinator,
+            '--agent-name', name, *pytest_args]
+
+
+def run_agents(args, pytest_args):
+    """Один pytest-агент на каждый Appium-сервер (устройство) этой машины"""
+    host = socket.gethostname()
+    devices = args.device or []
+    processes = []
+    for i, url in enumerate(args.appium or ['http://localhost:4723']):
+        env = dict(os.environ, APPIUM_SERVER_URL=url, E2E_AGENT_NAME=f"{host}-{i}")
+        if i < len(devices):
+            env['ANDROID_DEVICE_NAME'] = devices[i]
+        processes.append(subprocess.Popen(agent_command(args.coordinator, env['E2E_AGENT_NAME'], pytest_args),
+                                          cwd=ROOT_DIR, env=env))
+    codes = [process.wait() for process in processes]
+    return max(codes) if codes else 0
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    pytest_args = []
+    if '--' in argv:
+        index = argv.index('--')
+        argv, pytest_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description='Распределенный прогон e2e-тестов')
+    commands = parser.add_subparsers(dest='command', required=True)
+    coordinator = commands.add_parser('coordinator', help='Раздавать тесты агентам и собрать отчет')
+    coordinator.add_argument('--host', default='0.0.0.0')
+    coordinator.add_argument('--port', type=int, default=DISTRIBUTED_PORT)
+    coordinator.add_argument('--batch', type=int, default=DISTRIBUTED_MAX_BATCH, help='Максимум тестов за раз')
+    coordinator.add_argument('--agent-timeout', type=float, default=AGENT_WAIT_TIMEOUT)
+    coordinator.add_argument('--output', default=DISTRIBUTED_RESULTS_FILE)
+    coordinator.add_argument('--junit', default=DISTRIBUTED_JUNIT_FILE)
+    coordinator.add_argument('--artifacts', default=DISTRIBUTED_ARTIFACTS_DIR)
+    agent = commands.add_parser('agent', help='Выполнять тесты координатора на устройствах этой машины')
+    agent.add_argument('--coordinator', required=True, help='host:port')
+    agent.add_argument('--appium', action='append', help='URL Appium-сервера (по одному на устройство)')
+    agent.add_argument('--device', action='append', help='ANDROID_DEVICE_NAME для соответствующего --appium')
+    args = parser.parse_args(argv)
+
+    if args.command == 'coordinator':
+        return run_coordinator(args, pytest_args)
+    return run_agents(args, pytest_args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
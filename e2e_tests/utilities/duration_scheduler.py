@@ -0,0 +1,324 @@
+"""
+Планировщик xdist по истории длительности тестов
+
+Стандартный `-n N` раздает тесты воркерам поровну по количеству, не зная,
+что test_login_existing_user идет 30 с, а test_sign_in_page_loaded - 3 с:
+один воркер заканчивает на минуту позже остальных. Здесь:
+
+- DurationHistory - длительность каждого теста (setup + call + teardown)
+  по классам устройств в локальной SQLite (EWMA по прогонам). Пишет
+  только главный процесс в конце сессии.
+- LptScheduling - планировщик xdist поверх WorkStealingScheduling:
+  тесты раздаются от самого долгого к самому короткому, каждый - воркеру
+  с наименьшей суммарной оценкой (longest processing time first). Если
+  оценки ошиблись и воркер освободился раньше, он забирает с хвоста
+  очереди самого загруженного воркера короткие тесты - столько, чтобы
+  оба закончили примерно одновременно.
+- makespan - фактическое время прогона по воркерам против нижней
+  границы идеальной балансировки: max(сумма длительностей / воркеров,
+  самый долгий тест).
+
+Запуск:
+    pytest -n 4 --lpt
+    python -m utilities.duration_scheduler show --limit 20
+"""
+import argparse
+import heapq
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+from xdist.scheduler import WorkStealingScheduling
+from xdist.scheduler.worksteal import MIN_PENDING, NodePending
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import DURATION_ALPHA, DURATION_DEFAULT, DURATION_HISTORY_FILE
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS durations (
+    device_class TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    last REAL NOT NULL,
+    runs INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (device_class, nodeid)
+)
+'''
+
+
+class DurationHistory:
+    """Длительности тестов по классам устройств (SQLite)"""
+
+    def __init__(self, path=DURATION_HISTORY_FILE, alpha=DURATION_ALPHA):
+        self.path = path
+        self.alpha = alpha
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def record(self, device_class, durations):
+        """Добавляет замеры прогона {nodeid: секунды} одной транзакцией"""
+        now = time.time()
+        with self._db:
+            for nodeid, seconds in durations.items():
+                row = self._db.execute(
+                    'SELECT seconds, runs FROM durations WHERE device_class = ? AND nodeid = ?',
+                    (device_class, nodeid),
+                ).fetchone()
+                if row is None:
+                    mean, runs = seconds, 1
+                else:
+                    mean, runs = row[0] + self.alpha * (seconds - row[0]), row[1] + 1
+                self._db.execute(
+                    'INSERT OR REPLACE INTO durations VALUES (?, ?, ?, ?, ?, ?)',
+                    (device_class, nodeid, mean, seconds, runs, now),
+                )
+
+    def durations(self, device_class):
+        rows = self._db.execute('SELECT nodeid, seconds FROM durations WHERE device_class = ?', (device_class,))
+        return dict(rows)
+
+    def estimates(self, device_class, default=DURATION_DEFAULT):
+        """Оценки {nodeid: секунды} и оценка для неизвестного теста
+
+        Тест, которого нет в истории этого класса устройств, оценивается
+        средним по другим классам, а совсем новый - медианой известных.
+        """
+        known = self.durations(device_class)
+        rows = self._db.execute(
+            'SELECT nodeid, AVG(seconds) FROM durations WHERE device_class != ? GROUP BY nodeid', (device_class,)
+        )
+        estimates = {nodeid: seconds for nodeid, seconds in rows}
+        estimates.update(known)
+        if estimates:
+            default = statistics.median(known.values() if known else estimates.values())
+        return estimates, default
+
+    def classes(self):
+        return [row[0] for row in self._db.execute('SELECT DISTINCT device_class FROM durations ORDER BY 1')]
+
+
+def makespan(worker_tests, started):
+    """Фактический makespan против нижней границы идеальной балансировки
+
+    worker_tests: {воркер: [(длительность, время окончания), ...]}.
+    """
+    loads = {worker: sum(duration for duration, _ in tests) for worker, tests in worker_tests.items()}
+    finished = {worker: max(stop for _, stop in tests) - started for worker, tests in worker_tests.items()}
+    durations = [duration for tests in worker_tests.values() for duration, _ in tests]
+    if not durations:
+        return None
+    lower_bound = max(sum(durations) / len(worker_tests), max(durations))
+    actual = max(finished.values())
+    return {
+        'workers': len(worker_tests),
+        'tests': len(durations),
+        'makespan': round(actual, 1),
+        'lower_bound': round(lower_bound, 1),
+        'overhead_percent': round((actual / lower_bound - 1) * 100, 1) if lower_bound else 0.0,
+        'loads': {worker: round(load, 1) for worker, load in sorted(loads.items())},
+        'finished': {worker: round(seconds, 1) for worker, seconds in sorted(finished.items())},
+    }
+
+
+class LptScheduling(WorkStealingScheduling):
+    """Longest processing time first с work stealing по оценкам длительности"""
+
+    def __init__(self, config, log=None, estimates=None, default=DURATION_DEFAULT):
+        super().__init__(config, log)
+        self.estimates = estimates or {}
+        self.default = default
+        self.durations = []
+        self.predicted = None
+
+    def _load(self, indices):
+        return sum(self.durations[i] for i in indices)
+
+    def _assign(self, nodes, indices):
+        """LPT: от самого долгого теста к короткому, каждый - наименее загруженному узлу"""
+        heap = [(self._load(self.node2pending[node]), n, node) for n, node in enumerate(nodes)]
+        heapq.heapify(heap)
+        plan = {node: [] for node in nodes}
+        for index in sorted(indices, key=lambda i: -self.durations[i]):
+            load, n, node = heapq.heappop(heap)
+            plan[node].append(index)
+            heapq.heappush(heap, (load + self.durations[index], n, node))
+        for node, assigned in plan.items():
+            if assigned:
+                self.node2pending[node].extend(assigned)
+                node.send_runtest_some(assigned)
+        return max(load for load, _, _ in heap)
+
+    def schedule(self):
+        assert self.collection_is_completed
+        if self.collection is not None:
+            self.check_schedule()
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+        self.collection = list(self.node2collection.values())[0]
+        self.durations = [self.estimates.get(nodeid, self.default) for nodeid in self.collection]
+        if not self.collection:
+            return
+        nodes = [node for node in self.node2pending if not node.shutting_down]
+        self.predicted = self._assign(nodes, range(len(self.collection)))
+        self.check_schedule()
+
+    def check_schedule(self):
+        nodes_up = [
+            NodePending(node, pending)
+            for node, pending in self.node2pending.items()
+            if not node.shutting_down
+        ]
+
+        def get_idle_nodes():
+            return [node for node, pending in nodes_up if len(pending) < MIN_PENDING]
+
+        idle_nodes = get_idle_nodes()
+        if not idle_nodes:
+            return
+
+        # Тесты, возвращенные после steal или упавшим воркером
+        if self.pending:
+            indices, self.pending[:] = list(self.pending), []
+            self._assign(idle_nodes, indices)
+            idle_nodes = get_idle_nodes()
+            if not idle_nodes:
+                return
+
+        if self.steal_requested_from_node is not None:
+            return
+
+        # Самая большая оценка еще не начатых тестов (текущий и следующий не отдаются)
+        steal_from = max(
+            nodes_up, key=lambda node_pending: self._load(node_pending.pending[MIN_PENDING:]), default=None
+        )
+        stealable = steal_from.pending[MIN_PENDING:] if steal_from is not None else []
+
+        # С хвоста (короткие), пока простаивающий не станет загруженнее того, у кого забираем
+        thief_load = min(self._load(self.node2pending[node]) for node in idle_nodes)
+        remaining = self._load(steal_from.pending) if steal_from is not None else 0.0
+        steal, taken = [], 0.0
+        for index in reversed(stealable):
+            duration = self.durations[index]
+            if thief_load + taken + duration > remaining - taken - duration:
+                break
+            steal.insert(0, index)
+            taken += duration
+        if not steal:
+            # Забирать нечего или невыгодно: простаивающие выполняют последний тест и завершаются
+            for node in idle_nodes:
+                node.shutdown()
+            return
+        steal_from.node.send_steal(steal)
+        self.steal_requested_from_node = steal_from.node
+
+
+class DurationPlugin:
+    """Замеры длительности в главном процессе и планировщик для `pytest -n N --lpt`"""
+
+    def __init__(self, history_path, device_class):
+        self.history_path = history_path
+        self.device_class = device_class
+        self.scheduler = None
+        self.started = time.time()
+        self.tests = {}
+        self.summary = None
+
+    def make_scheduler(self, config, log):
+        history = DurationHistory(self.history_path)
+        try:
+            estimates, default = history.estimates(self.device_class)
+        finally:
+            history.close()
+        self.scheduler = LptScheduling(config, log, estimates, default)
+        return self.scheduler
+
+    def pytest_sessionstart(self, session):
+        self.started = time.time()
+
+    def pytest_runtest_logreport(self, report):
+        node = getattr(report, 'node', None)
+        worker = node.gateway.id if node is not None else 'main'
+        test = self.tests.setdefault(report.nodeid, {'worker': worker, 'duration': 0.0, 'stop': 0.0,
+                                                     'skipped': False})
+        test['duration'] += report.duration
+        test['stop'] = max(test['stop'], getattr(report, 'stop', time.time()))
+        test['skipped'] = test['skipped'] or report.skipped
+
+    def finish(self):
+        """Сохраняет длительности в историю и считает makespan"""
+        measured = {nodeid: test['duration'] for nodeid, test in self.tests.items() if not test['skipped']}
+        if measured:
+            history = DurationHistory(self.history_path)
+            try:
+                history.record(self.device_class, measured)
+            finally:
+                history.close()
+        worker_tests = {}
+        for test in self.tests.values():
+            worker_tests.setdefault(test['worker'], []).append((test['duration'], test['stop']))
+        self.summary = makespan(worker_tests, self.started)
+        if self.summary is not None and self.scheduler is not None:
+            self.summary['predicted'] = round(self.scheduler.predicted or 0.0, 1)
+        return self.summary
+
+
+class SchedulerHook:
+    """Хук xdist отдельно: без xdist (-p no:xdist) его спецификации нет"""
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def pytest_xdist_make_scheduler(self, config, log):
+        return self.plugin.make_scheduler(config, log)
+
+
+def format_summary(summary):
+    line = (
+        f"Makespan: {summary['makespan']:.0f} с на {summary['workers']} воркерах, нижняя граница "
+        f"{summary['lower_bound']:.0f} с (+{summary['overhead_percent']:.0f}%)"
+    )
+    if 'predicted' in summary:
+        line += f", прогноз LPT {summary['predicted']:.0f} с"
+    finish = ', '.join(f"{worker} {seconds:.0f} с" for worker, seconds in summary['finished'].items())
+    return f"{line}\n  окончание воркеров: {finish}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='История длительности тестов для планировщика xdist')
+    parser.add_argument('--history', default=DURATION_HISTORY_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('show', help='Самые долгие тесты по классам устройств')
+    show.add_argument('--device-class')
+    show.add_argument('--limit', type=int, default=20)
+    sub.add_parser('classes', help='Классы устройств в истории')
+    args = parser.parse_args(argv)
+
+    history = DurationHistory(args.history)
+    try:
+        if args.command == 'classes':
+            for device_class in history.classes():
+                print(device_class)
+            return 0
+        for device_class in [args.device_class] if args.device_class else history.classes():
+            durations = history.durations(device_class)
+            print(f"{device_class}: {len(durations)} тестов, сумма {sum(durations.values()):.0f} с")
+            for nodeid, seconds in sorted(durations.items(), key=lambda item: -item[1])[:args.limit]:
+                print(f"  {seconds:7.1f} с  {nodeid}")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Кеш WebElement-хендлов page objects
+
+BasePage.find_element/find_elements возвращают закешированный хендл, пока
+состояние экрана не изменилось: повторный поиск того же локатора не идет
+на сервер. Состояние экрана ведется на драйвер (общее для всех page
+objects) и меняется методами page objects, помеченными декораторами:
+
+- @navigation - переход на другой экран: сбрасываются все хендлы;
+- @content_change - тот же экран, но меняется содержимое (поиск, смена
+  даты): сбрасываются только списки find_elements.
+
+Если хендл все же устарел (StaleElementReferenceException), элемент
+прозрачно ищется заново по тому же локатору и команда повторяется.
+"""
+import functools
+import os
+import sys
+import weakref
+from collections import Counter
+
+from appium.webdriver.webelement import WebElement
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import ELEMENT_CACHE
+
+NAVIGATION = 'navigation'
+CONTENT_CHANGE = 'content'
+
+# Счетчики за всю сессию (для итогов pytest)
+totals = Counter()
+
+
+class ScreenState:
+    """Номера состояния экрана драйвера"""
+
+    def __init__(self):
+        self.screen = 0
+        self.content = 0
+
+    def bump(self, kind):
+        if kind == NAVIGATION:
+            self.screen += 1
+        self.content += 1
+
+
+_states = weakref.WeakKeyDictionary()
+
+
+def screen_state(driver):
+    if driver not in _states:
+        _states[driver] = ScreenState()
+    return _states[driver]
+
+
+def navigation(func):
+    """Метод page object переходит на другой экран"""
+    func._screen_change = NAVIGATION
+    return func
+
+
+def content_change(func):
+    """Метод page object меняет содержимое текущего экрана"""
+    func._screen_change = CONTENT_CHANGE
+    return func
+
+
+def track_screen_change(func):
+    """Оборачивает помеченный метод: после вызова (даже неудачного) экран считается измененным"""
+    kind = getattr(func, '_screen_change', None)
+    if kind is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            screen_state(self.driver).bump(kind)
+    return wrapper
+
+
+class CachedElement(WebElement):
+    """WebElement, который сам ищется заново, если хендл устарел"""
+
+    def __init__(self, element, resolve, stats):
+        super().__init__(element.parent, element.id)
+        self._resolve = resolve
+        self._stats = stats
+
+    def _execute(self, command, params=None):
+        try:
+            return super()._execute(command, params)
+        except StaleElementReferenceException:
+            self._id = self._resolve().id
+            self._stats['stale_retries'] += 1
+            totals['stale_retries'] += 1
+            return super()._execute(command, params)
+
+
+class ElementCache:
+    """Хендлы элементов одного page object"""
+
+    def __init__(self, driver, enabled=ELEMENT_CACHE):
+        self.driver = driver
+        self.enabled = enabled
+        self.state = screen_state(driver)
+        self._screen = self.state.screen
+        self._content = self.state.content
+        self._elements = {}
+        self._lists = {}
+        self.stats = Counter()
+
+    def count(self, name):
+        self.stats[name] += 1
+        totals[name] += 1
+
+    def _sync(self):
+        """Сбрасывает хендлы, если экран сменился после их получения"""
+        if self.state.screen != self._screen:
+            if self._elements or self._lists:
+                self.count('invalidations')
+            self._elements.clear()
+            self._lists.clear()
+        elif self.state.content != self._content:
+            self._lists.clear()
+        self._screen = self.state.screen
+        self._content = self.state.content
+
+    def element(self, locator, resolve):
+        """Хендл по локатору; resolve() - обычный поиск (с ожиданием)"""
+        if not self.enabled:
+            return resolve()
+        self._sync()
+        key = tuple(locator)
+        if key in self._elements:
+            self.count('hits')
+            return self._elements[key]
+        self.count('misses')
+        element = CachedElement(resolve(), resolve, self.stats)
+        self._elements[key] = element
+        return element
+
+    def elements(self, locator, resolve_all):
+        """Список хендлов по локатору; пустые результаты не кешируются"""
+        if not self.enabled:
+            return resolve_all()
+        self._sync()
+        key = tuple(locator)
+        if key in self._lists:
+            self.count('hits')
+            return list(self._lists[key])
+        self.count('misses')
+        found = resolve_all()
+
+        def resolver(index):
+            def resolve():
+                fresh = resolve_all()
+                if index >= len(fresh):
+                    raise NoSuchElementException(f"{locator[1]} [{index}] больше не найден")
+                return fresh[index]
+            return resolve
+
+        cached = [CachedElement(element, resolver(i), self.stats) for i, element in enumerate(found)]
+        if cached:
+            self._lists[key] = cached
+        return list(cached)
+
+    def invalidate(self, kind=NAVIGATION):
+        """Отмечает смену экрана (для всех page objects этого драйвера)"""
+        self.state.bump(kind)
+
+    def summary(self):
+        return {
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'stale_retries': self.stats['stale_retries'],
+            'invalidations': self.stats['invalidations'],
+            # Каждое попадание экономит минимум один findElement(s)
+            'saved_round_trips': self.stats['hits'],
+        }
@@ -0,0 +1,308 @@
+"""
+Фейковый Appium-сервер (W3C WebDriver) для тестов фреймворка без устройства
+
+Поддерживает создание/удаление сессии, GET /status, window/rect,
+timeouts, screenshot, source, поиск элементов по набору "видимых" значений локаторов и
+модель устройства для mobile: installApp/removeApp/isAppInstalled/pushFile/
+pullFile/shell (пакеты, файлы, `dumpsys package`, `cat`, `echo ... > файл`,
+`ls`, `rm -rf`, `am broadcast` сканирования медиа).
+Отказы, которые бывают на реальной ферме:
+
+- crash_uiautomator2() - сессия есть, но команды падают с ошибкой
+  "instrumentation process is not running" (до создания новой сессии);
+- end_sessions() - все сессии завершены (invalid session id);
+- hang(seconds) - ответы задерживаются;
+- kill() - сервер остановлен, соединения отклоняются.
+
+Запуск из командной строки:
+    python -m utilities.fake_appium --port 4723
+"""
+import argparse
+import base64
+import json
+import re
+import shlex
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_PATH = re.compile(r'^/session/([^/]+)(/.*)?$')
+
+UIA2_CRASH_MESSAGE = (
+    "An unknown server-side error occurred while processing the command. Original error: "
+    "'{command}' cannot be proxied to UiAutomator2 server because the instrumentation process "
+    "is not running (probably crashed). Check the server log and/or the logcat output for more details"
+)
+
+# Пустой PNG 1x1
+FAKE_PNG = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+
+
+class FakeAppiumServer:
+    """W3C-сервер в фоновом потоке"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sessions = {}  # id -> capabilities
+        self.present = set()  # значения локаторов, которые "есть на экране"
+        self.uia2_crashed = False
+        self.delay = 0.0
+        self.commands = []  # [(метод, путь без id сессии)]
+        self.sessions_created = 0
+        # Модель устройства
+        self.apks = {}  # путь к APK -> (package, versionCode, подпись)
+        self.packages = {}  # package -> {'versionCode', 'signature', 'lastUpdateTime'}
+        self.files = {}  # путь на устройстве -> содержимое (str или bytes для pushFile)
+        self.media_scans = []  # пути из MEDIA_SCANNER_SCAN_FILE
+        self.install_delay = 0.0
+        self.screenshot = FAKE_PNG
+        self.page_source = '<hierarchy rotation="0"></hierarchy>'
+        self.installs = []  # пути установленных APK
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, self.port), make_handler(self))
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), name='fake-appium', daemon=True)
+        self._thread.start()
+        return self
+
+    def kill(self):
+        """Останавливает сервер: дальше соединения отклоняются"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    stop = kill
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.kill()
+
+    # --- Отказы ---
+
+    def crash_uiautomator2(self):
+        self.uia2_crashed = True
+
+    def end_sessions(self):
+        with self._lock:
+            self.sessions.clear()
+
+    def hang(self, seconds):
+        self.delay = seconds
+
+    # --- Команды ---
+
+    def handle(self, method, path, body):
+        """Возвращает (HTTP-статус, value)"""
+        if self.delay:
+            time.sleep(self.delay)
+        if path == '/status' and method == 'GET':
+            return 200, {'ready': True, 'message': 'fake appium'}
+        if path == '/session' and method == 'POST':
+            return self.new_session(body)
+        match = SESSION_PATH.match(path)
+        if not match:
+            return 404, error('unknown command', f"{method} {path}")
+        session_id, command = match.group(1), match.group(2) or ''
+        self.commands.append((method, command or '/'))
+        with self._lock:
+            if session_id not in self.sessions:
+                return 404, error('invalid session id', 'A session is either terminated or not started')
+            if method == 'DELETE' and not command:
+                del self.sessions[session_id]
+                return 200, None
+        if self.uia2_crashed:
+            return 500, error('unknown error', UIA2_CRASH_MESSAGE.format(command=f"{method} {command}"))
+        return self.command(method, command, body)
+
+    def new_session(self, body):
+        capabilities = (body or {}).get('capabilities', {}).get('alwaysMatch', {})
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self.sessions[session_id] = capabilities
+            self.sessions_created += 1
+            # Новая сессия поднимает UiAutomator2 заново
+            self.uia2_crashed = False
+        # Как и Appium, отвечает capabilities без префикса appium:
+        returned = {name.split(':', 1)[-1]: value for name, value in capabilities.items()}
+        return 200, {'sessionId': session_id, 'capabilities': dict(returned, platformName='Android')}
+
+    def command(self, method, command, body):
+        if command == '/window/rect':
+            return 200, {'x': 0, 'y': 0, 'width': 1080, 'height': 2400}
+        if command == '/timeouts':
+            return 200, None
+        if command == '/screenshot':
+            return 200, self.screenshot
+        if command == '/source':
+            return 200, self.page_source
+        if command in ('/element', '/elements') and method == 'POST':
+            value = body.get('value')
+            found = [{'element-6066-11e4-a52e-4f735466cecf': f"el-{value}"}] if value in self.present else []
+            if command == '/elements':
+                return 200, found
+            if not found:
+                return 404, error('no such element', f"An element could not be located using {body.get('using')}={value}")
+            return 200, found[0]
+        if command.startswith('/element/') and command.endswith('/text'):
+            return 200, command.split('/')[2][len('el-'):]
+        if command.startswith('/element/') and command.endswith('/click'):
+            return 200, None
+        if command == '/execute/sync' and method == 'POST':
+            args = (body.get('args') or [{}])[0]
+            return self.mobile(body.get('script', ''), args)
+        return 404, error('unknown command', f"{method} {command}")
+
+    # --- Устройство ---
+
+    def mobile(self, script, args):
+        if script == 'mobile: isAppInstalled':
+            return 200, args.get('appId') in self.packages
+        if script == 'mobile: installApp':
+            return self.install(args.get('app'))
+        if script == 'mobile: removeApp':
+            return 200, self.packages.pop(args.get('appId'), None) is not None
+        if script == 'mobile: pushFile':
+            self.files[args.get('remotePath')] = base64.b64decode(args.get('payload', ''))
+            return 200, None
+        if script == 'mobile: pullFile':
+            content = self.files.get(args.get('remotePath'))
+            if content is None:
+                return 500, error('unknown error', f"Remote path '{args.get('remotePath')}' does not exist")
+            content = content.encode('utf-8') if isinstance(content, str) else content
+            return 200, base64.b64encode(content).decode('ascii')
+        if script == 'mobile: shell':
+            return 200, self.shell(' '.join([args.get('command', '')] + [str(a) for a in args.get('args', [])]))
+        return 404, error('unknown method', f"Unsupported execute method '{script}'")
+
+    def install(self, path):
+        if path not in self.apks:
+            return 500, error('unknown error', f"The application at '{path}' does not exist or is not accessible")
+        package, version_code, signature = self.apks[path]
+        time.sleep(self.install_delay)
+        installed = self.packages.get(package)
+        if installed is not None and installed['signature'] != signature:
+            return 500, error('unknown error', f"Error executing adbExec. Failure [INSTALL_FAILED_UPDATE_INCOMPATIBLE: "
+                                               f"Package {package} signatures do not match previously installed version]")
+        self.installs.append(path)
+        self.packages[package] = {
+            'versionCode': version_code, 'signature': signature,
+            'lastUpdateTime': time.strftime('%Y-%m-%d %H:%M:%S') + f".{len(self.installs)}",
+        }
+        return 200, None
+
+    def shell(self, line):
+        """Команда adb shell (строка, как ее собирает Appium из command и args)"""
+        words = shlex.split(line)
+        if words[:2] == ['dumpsys', 'package'] and len(words) == 3:
+            info = self.packages.get(words[2])
+            if info is None:
+                return ''
+            return (f"Packages:\n  Package [{words[2]}] (1a2b3c):\n    versionCode={info['versionCode']} minSdk=24 "
+                    f"targetSdk=34\n    versionName=1.0.0\n    lastUpdateTime={info['lastUpdateTime']}\n"
+                    f"    signatures=PackageSignatures{{9fe3c2 version:2, signatures:[{info['signature']}], "
+                    f"past signatures:[]}}\n")
+        if words[:1] == ['cat'] and len(words) == 2:
+            if words[1] not in self.files:
+                return f"cat: {words[1]}: No such file or directory"
+            content = self.files[words[1]]
+            return content if isinstance(content, str) else content.decode('utf-8', 'replace')
+        if words[:1] == ['echo'] and len(words) == 4 and words[2] == '>':
+            self.files[words[3]] = words[1] + '\n'
+            return ''
+        if words[:1] == ['ls'] and len(words) == 2:
+            prefix = words[1].rstrip('/') + '/'
+            return ''.join(f"{name}\n" for name in sorted({p[len(prefix):].split('/')[0]
+                                                            for p in self.files if p.startswith(prefix)}))
+        if words[:2] == ['rm', '-rf']:
+            for target in words[2:]:
+                prefix = target.rstrip('/') + '/'
+                for path in [p for p in self.files if p == target or p.startswith(prefix)]:
+                    del self.files[path]
+            return ''
+        if words[:2] == ['am', 'broadcast'] and 'android.intent.action.MEDIA_SCANNER_SCAN_FILE' in words:
+            uri = words[words.index('-d') + 1]
+            self.media_scans.append(uri[len('file://'):])
+            return (f"Broadcasting: Intent {{ act=android.intent.action.MEDIA_SCANNER_SCAN_FILE dat={uri} "
+                    f"flg=0x400000 }}\nBroadcast completed: result=0\n")
+        return ''
+
+
+def error(name, message):
+    return {'error': name, 'message': message, 'stacktrace': ''}
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def _dispatch(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            body = json.loads(raw) if raw else {}
+            path = self.path.split('?', 1)[0].rstrip('/') or '/'
+            if path.startswith('/wd/hub'):
+                path = path[len('/wd/hub'):] or '/'
+            status, value = fake.handle(method, path, body)
+            data = json.dumps({'value': value}).encode('utf-8')
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_DELETE(self):
+            self._dispatch('DELETE')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def fake_options(**capabilities):
+    """Опции сессии на фейковом сервере; capabilities - дополнительные (appPackage=...)"""
+    from appium.options.android import UiAutomator2Options
+    options = UiAutomator2Options()
+    options.device_name = 'fake'
+    for name, value in capabilities.items():
+        options.set_capability(name, value)
+    return options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Фейковый Appium-сервер (W3C)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4723)
+    args = parser.parse_args(argv)
+    fake = FakeAppiumServer(args.host, args.port).start()
+    print(f"Fake Appium: {fake.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fake.kill()
+
+
+if __name__ == '__main__':
+    main()
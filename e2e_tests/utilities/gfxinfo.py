@@ -0,0 +1,141 @@
+"""
+Замер плавности (jank) вокруг жестов через dumpsys gfxinfo framestats
+
+Перед жестом статистика сбрасывается (`dumpsys gfxinfo <pkg> reset`), после -
+читается таблица framestats. Таблица разбирается в массив NumPy, все
+метрики считаются векторно: доля janky-кадров, p90/p99 времени кадра,
+пропущенные vsync.
+"""
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+import numpy as np
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import ANDROID_CAPABILITIES
+
+PROFILEDATA_MARKER = '---PROFILEDATA---'
+DEFAULT_FRAME_INTERVAL_NS = 16666667  # 60 Гц
+
+SUMMARY_FIELDS = {
+    'total_frames': re.compile(r'Total frames rendered:\s*(\d+)'),
+    'janky_frames': re.compile(r'Janky frames:\s*(\d+)'),
+    'missed_vsync': re.compile(r'Number Missed Vsync:\s*(\d+)'),
+}
+
+
+def parse_framestats(output):
+    """Возвращает (колонки, массив int64) по всем блокам PROFILEDATA"""
+    columns = None
+    rows = []
+    inside = False
+    for raw in output.splitlines():
+        line = raw.strip()
+        if line == PROFILEDATA_MARKER:
+            inside = not inside
+            continue
+        if not inside or not line:
+            continue
+        cells = [cell for cell in line.split(',') if cell != '']
+        if cells[0] == 'Flags':
+            if columns is None:
+                columns = cells
+            continue
+        if columns is not None and len(cells) >= len(columns):
+            rows.append(cells[:len(columns)])
+    if columns is None:
+        return [], np.empty((0, 0), dtype=np.int64)
+    return columns, np.array(rows, dtype=np.int64).reshape(-1, len(columns))
+
+
+def parse_summary(output):
+    """Разбирает сводку dumpsys gfxinfo (первый блок: окно приложения)"""
+    summary = {}
+    for name, pattern in SUMMARY_FIELDS.items():
+        match = pattern.search(output)
+        if match:
+            summary[name] = int(match.group(1))
+    return summary
+
+
+def analyze_framestats(output):
+    """Считает метрики плавности по выводу `dumpsys gfxinfo <pkg> framestats`"""
+    columns, table = parse_framestats(output)
+    result = {
+        'frames': 0,
+        'janky_frames': 0,
+        'janky_percent': 0.0,
+        'p50_ms': None,
+        'p90_ms': None,
+        'p99_ms': None,
+        'max_ms': None,
+        'missed_vsync': 0,
+        'summary': parse_summary(output),
+    }
+    if table.size == 0:
+        return result
+
+    col = {name: index for index, name in enumerate(columns)}
+    # Кадры с ненулевыми Flags (первый кадр окна, пропущенные) не учитываются
+    valid = table[table[:, col['Flags']] == 0]
+    if valid.size == 0:
+        return result
+
+    if 'FrameInterval' in col:
+        interval = valid[:, col['FrameInterval']].astype(np.float64)
+        interval[interval <= 0] = DEFAULT_FRAME_INTERVAL_NS
+    else:
+        interval = np.full(len(valid), DEFAULT_FRAME_INTERVAL_NS, dtype=np.float64)
+
+    duration_ns = (valid[:, col['FrameCompleted']] - valid[:, col['IntendedVsync']]).astype(np.float64)
+    late_vsync_ns = (valid[:, col['Vsync']] - valid[:, col['IntendedVsync']]).astype(np.float64)
+    janky = duration_ns > interval
+    missed = np.floor_divide(np.clip(late_vsync_ns, 0, None), interval)
+    p50, p90, p99 = np.percentile(duration_ns, [50, 90, 99]) / 1e6
+
+    result.update({
+        'frames': int(len(valid)),
+        'janky_frames': int(np.count_nonzero(janky)),
+        'janky_percent': float(np.count_nonzero(janky) * 100.0 / len(valid)),
+        'p50_ms': float(p50),
+        'p90_ms': float(p90),
+        'p99_ms': float(p99),
+        'max_ms': float(duration_ns.max() / 1e6),
+        'missed_vsync': int(missed.sum()),
+    })
+    return result
+
+
+class JankSampler:
+    """Сброс и чтение gfxinfo приложения через mobile: shell"""
+
+    def __init__(self, driver, package=ANDROID_CAPABILITIES['appPackage']):
+        self.driver = driver
+        self.package = package
+
+    def shell(self, *args):
+        return self.driver.execute_script('mobile: shell', {'command': 'dumpsys', 'args': list(args)}) or ''
+
+    def reset(self):
+        self.shell('gfxinfo', self.package, 'reset')
+
+    def read(self):
+        return analyze_framestats(self.shell('gfxinfo', self.package, 'framestats'))
+
+    @contextmanager
+    def measure(self, label, sink=None):
+        """Контекстный менеджер вокруг жеста; результат - dict с метриками
+
+        sink - список, куда добавляется пара ('jank', {...}), например
+        request.node.user_properties.
+        """
+        self.reset()
+        result = {'label': label}
+        yield result
+        result.update(self.read())
+        if sink is not None:
+            sink.append(('jank', result))
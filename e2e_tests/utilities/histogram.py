@@ -0,0 +1,100 @@
+"""
+Гистограмма задержек в стиле HdrHistogram
+
+Значения (микросекунды) раскладываются по лог-линейным корзинам: на каждую
+степень двойки - SUB_BUCKETS линейных корзин, поэтому относительная ошибка
+не превышает 1 / SUB_BUCKETS при фиксированной памяти, независимо от
+количества замеров. Гистограммы разных пользователей и процессов можно
+складывать (merge).
+"""
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS  # 128 -> точность ~0.8%
+REPORT_PERCENTILES = (50, 75, 90, 95, 99, 99.9)
+
+
+def bucket_index(value):
+    """Индекс корзины для неотрицательного целого значения"""
+    if value < SUB_BUCKETS:
+        return value
+    # Старшие SUB_BUCKET_BITS + 1 бит значения: [SUB_BUCKETS, 2 * SUB_BUCKETS)
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def bucket_range(index):
+    """Диапазон значений [low, high] корзины"""
+    if index < SUB_BUCKETS:
+        return index, index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    sub = SUB_BUCKETS + (index & (SUB_BUCKETS - 1))
+    low = sub << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Счетчики по корзинам + точные min/max/сумма"""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value_us, count=1):
+        value = max(int(value_us), 0)
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_seconds(self, seconds):
+        self.record(seconds * 1e6)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, p):
+        """Значение (мкс), не меньше которого p% замеров; верх корзины, но не больше max"""
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * p // 100))  # ceil без float-ошибок для целых p
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_range(index)[1], self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def distribution(self):
+        """Непустые корзины: [(low_us, high_us, count)]"""
+        return [bucket_range(index) + (self.counts[index],) for index in sorted(self.counts)]
+
+    def to_dict(self):
+        """Сводка в миллисекундах для отчета"""
+        def ms(value):
+            return round(value / 1000.0, 3) if value is not None else None
+
+        summary = {
+            'count': self.total,
+            'min_ms': ms(self.min),
+            'mean_ms': ms(self.mean),
+            'max_ms': ms(self.max),
+        }
+        for p in REPORT_PERCENTILES:
+            summary[f"p{p:g}_ms"] = ms(self.percentile(p))
+        return summary
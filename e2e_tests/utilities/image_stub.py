@@ -0,0 +1,265 @@
+"""
+Заглушка картинок продуктов: считает загрузки по URL
+
+Продукты заглушки бэкенда получают imageUrl на эту заглушку (assign),
+приложение грузит картинки карточек отсюда. Ответ - JPEG с ETag и
+Cache-Control: max-age, так что исправный кеш (CachedImage, Fresco) не
+должен запрашивать картинку повторно; запрос с If-None-Match получает
+304 и считается перепроверкой, а не загрузкой.
+
+cache_stats сводит журнал за отрезок сценария: запросы, уникальные URL,
+повторные полные загрузки (duplicates), перепроверки, байты и долю
+повторных показов карточки, обслуженных без запроса (hit_ratio). Показы
+считает ViewCounter по снимкам списка (ListNavigator on_snapshot):
+карточка, которой не было на предыдущем снимке, показана заново.
+
+Запуск из командной строки:
+    python -m utilities.image_stub --port 8081
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    IMAGE_MAX_DUPLICATE_PERCENT, IMAGE_MIN_HIT_RATIO, IMAGE_STUB_MAX_AGE, IMAGE_STUB_SIZE,
+)
+from utilities.media_fixtures import synthetic_photo
+
+IMAGE_PATH = re.compile(r'^/img/([\w.-]+)\.jpg$')
+IMAGE_QUALITY = 80
+
+
+class ImageStub:
+    """HTTP-сервер картинок в фоновом потоке"""
+
+    def __init__(self, host='127.0.0.1', port=0, size=IMAGE_STUB_SIZE, max_age=IMAGE_STUB_MAX_AGE, delay=0.0):
+        self.host = host
+        self.port = port
+        self.size = tuple(size)
+        self.max_age = max_age
+        self.delay = delay
+        self.server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._images = {}  # ключ -> JPEG
+        self.log = []  # {'url', 'started', 'status', 'bytes', 'conditional'}
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, self.port), make_handler(self))
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), name='image-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def image_url(self, key, public_host=None):
+        """URL картинки так, как его видит приложение"""
+        return f"http://{public_host or self.host}:{self.port}/img/{key}.jpg"
+
+    def assign(self, products, public_host=None):
+        """Проставляет продуктам imageUrl на эту заглушку; возвращает {название: URL}"""
+        urls = {}
+        for product in products:
+            product['imageUrl'] = self.image_url(f"product_{product['id']}", public_host)
+            urls[product['name']] = product['imageUrl']
+        return urls
+
+    def image(self, key):
+        """JPEG картинки (одинаковый для ключа между прогонами)"""
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = synthetic_photo(zlib.crc32(key.encode('utf-8')), self.size, IMAGE_QUALITY)
+            return self._images[key]
+
+    def record(self, path, status, size, conditional):
+        with self._lock:
+            self.log.append({
+                'url': path, 'started': time.time(), 'status': status, 'bytes': size, 'conditional': conditional,
+            })
+
+    def requests(self, since=None):
+        """Записи журнала (путь /img/<ключ>.jpg без хоста)"""
+        with self._lock:
+            records = list(self.log)
+        return [r for r in records if since is None or r['started'] >= since]
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            match = IMAGE_PATH.match(path)
+            if not match:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            data = stub.image(match.group(1))
+            etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+            conditional = self.headers.get('If-None-Match') is not None
+            if stub.delay:
+                time.sleep(stub.delay)
+            if self.headers.get('If-None-Match') == etag:
+                stub.record(path, 304, 0, conditional)
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            stub.record(path, 200, len(data), conditional)
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', f'public, max-age={stub.max_age}')
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ViewCounter:
+    """Показы карточек по снимкам списка: ключ карточки -> URL картинки"""
+
+    def __init__(self, url_of):
+        self.url_of = url_of
+        self.views = Counter()  # URL -> показов
+        self.previous = set()
+
+    def __call__(self, visible):
+        keys = {key for key, bounds in visible}
+        for key in keys - self.previous:
+            url = self.url_of(key)
+            if url:
+                self.views[url] += 1
+        self.previous = keys
+
+
+def url_path(url):
+    """http://host:port/img/x.jpg -> /img/x.jpg (журнал пишет путь без хоста)"""
+    return '/' + url.split('://', 1)[-1].split('/', 1)[-1] if '://' in url else url
+
+
+def cache_stats(records, views=None, known=()):
+    """Сводка кеша картинок за отрезок сценария
+
+    known - URL, загруженные до отрезка: их полная загрузка внутри
+    отрезка тоже повторная. views - Counter показов по URL (ViewCounter).
+    """
+    fetched = set(url_path(url) for url in known)
+    fetches = Counter()
+    duplicates = Counter()
+    revalidations = 0
+    total_bytes = duplicate_bytes = 0
+    for record in records:
+        total_bytes += record['bytes']
+        if record['status'] == 304:
+            revalidations += 1
+            continue
+        if record['status'] != 200:
+            continue
+        fetches[record['url']] += 1
+        if record['url'] in fetched:
+            duplicates[record['url']] += 1
+            duplicate_bytes += record['bytes']
+        fetched.add(record['url'])
+    first_fetches = sum(fetches.values()) - sum(duplicates.values())
+    stats = {
+        'requests': len(records),
+        'unique': len(fetches),
+        'fetches': sum(fetches.values()),
+        'duplicates': sum(duplicates.values()),
+        'revalidations': revalidations,
+        'bytes': total_bytes,
+        'duplicate_bytes': duplicate_bytes,
+        'duplicate_percent': round(sum(duplicates.values()) * 100.0 / len(fetches), 1) if fetches else 0.0,
+        'worst': duplicates.most_common(5),
+        'views': None,
+        'hit_ratio': None,
+    }
+    if views is not None:
+        total_views = sum(views.values())
+        # Повторный показ - все, кроме первого показа впервые загруженной картинки
+        repeat_views = total_views - first_fetches
+        misses = stats['duplicates'] + revalidations
+        stats['views'] = total_views
+        if repeat_views > 0:
+            stats['hit_ratio'] = round(max(0.0, 1 - misses / repeat_views), 3)
+    return stats
+
+
+def check_cache(stats, min_hit_ratio=IMAGE_MIN_HIT_RATIO, max_duplicate_percent=IMAGE_MAX_DUPLICATE_PERCENT):
+    """Нарушения пределов кеша картинок (пустой список - все в норме)"""
+    problems = []
+    if stats['duplicate_percent'] > max_duplicate_percent:
+        worst = ', '.join(f"{url} x{count + 1}" for url, count in stats['worst'])
+        problems.append(f"повторные загрузки {stats['duplicates']} ({stats['duplicate_percent']}% URL > "
+                        f"{max_duplicate_percent}%): {worst}")
+    if stats['hit_ratio'] is not None and stats['hit_ratio'] < min_hit_ratio:
+        problems.append(f"hit ratio {stats['hit_ratio']:.2f} < {min_hit_ratio}")
+    return problems
+
+
+def format_stats(name, stats):
+    hit = f"{stats['hit_ratio']:.2f}" if stats['hit_ratio'] is not None else '-'
+    return (f"{name}: {stats['requests']} запросов, {stats['unique']} URL, повторных {stats['duplicates']}, "
+            f"перепроверок {stats['revalidations']}, {stats['bytes'] / 1024:.0f} КБ "
+            f"(лишних {stats['duplicate_bytes'] / 1024:.0f} КБ), hit ratio {hit}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Заглушка картинок продуктов')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--delay', type=float, default=0.0, help='Задержка ответа, секунды')
+    args = parser.parse_args(argv)
+    stub = ImageStub(args.host, args.port, delay=args.delay).start()
+    print(f"Image stub: {stub.url}/img/<ключ>.jpg")
+    printed = 0
+    try:
+        while True:
+            time.sleep(5)
+            stats = cache_stats(stub.requests())
+            if stats['requests'] != printed:
+                print(format_stats('images', stats))
+                printed = stats['requests']
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
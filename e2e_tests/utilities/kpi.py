@@ -0,0 +1,147 @@
+"""
+KPI задержек экранов: время от действия до готовности целевого экрана
+
+Каждый поток (flow) повторяется N раз, время меряется через
+time.perf_counter. По результатам считаются p50/p95/p99, пишется JSON
+и выполняется сравнение с сохраненным baseline.
+"""
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import EXPLICIT_WAIT, KPI_POLL_INTERVAL, KPI_TOLERANCE
+
+
+def percentile(values, p):
+    """Перцентиль с линейной интерполяцией (p от 0 до 100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples):
+    """Сводка по выборке в миллисекундах"""
+    if not samples:
+        return {'n': 0}
+    return {
+        'n': len(samples),
+        'min': min(samples),
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples),
+    }
+
+
+def compare_with_baseline(summary, baseline, tolerance=KPI_TOLERANCE, metrics=('p50', 'p95')):
+    """Возвращает список регрессий относительно baseline"""
+    regressions = []
+    for flow, stats in summary.items():
+        base = baseline.get(flow)
+        if not base or not stats.get('n'):
+            continue
+        for metric in metrics:
+            if base.get(metric) is None or stats.get(metric) is None:
+                continue
+            limit = base[metric] * (1 + tolerance)
+            if stats[metric] > limit:
+                regressions.append({
+                    'flow': flow,
+                    'metric': metric,
+                    'value': stats[metric],
+                    'baseline': base[metric],
+                    'limit': limit,
+                })
+    return regressions
+
+
+def load_json(path):
+    """Читает JSON-файл; если файла нет - пустой словарь"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ScreenProbe:
+    """Быстрые проверки готовности экрана (один find_elements без ожиданий)
+
+    Перед замерами implicit wait должен быть выставлен в 0.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def present(self, locators):
+        """Есть ли элемент по локатору (или по любому из списка локаторов)"""
+        if isinstance(locators, tuple):
+            locators = [locators]
+        return any(self.driver.find_elements(*locator) for locator in locators)
+
+    def ready(self, present, absent=()):
+        """Возвращает проверку: найдены все локаторы present и ни одного из absent"""
+        def check():
+            return all(self.present(loc) for loc in present) and not any(self.present(loc) for loc in absent)
+        return check
+
+
+class KpiRecorder:
+    """Собирает замеры по потокам"""
+
+    def __init__(self, label=''):
+        self.label = label
+        self.samples = defaultdict(list)
+        self.failures = Counter()
+
+    def time_flow(self, flow, action, ready, timeout=EXPLICIT_WAIT, poll=KPI_POLL_INTERVAL):
+        """Выполняет действие и ждет готовности экрана; возвращает время в мс или None"""
+        start = time.perf_counter()
+        action()
+        deadline = start + timeout
+        while not ready():
+            if time.perf_counter() > deadline:
+                self.failures[flow] += 1
+                return None
+            time.sleep(poll)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.samples[flow].append(elapsed_ms)
+        return elapsed_ms
+
+    def add_sample(self, flow, elapsed_ms):
+        """Замер, сделанный вне time_flow (None считается неудачей)"""
+        if elapsed_ms is None:
+            self.failures[flow] += 1
+        else:
+            self.samples[flow].append(elapsed_ms)
+
+    def summary(self):
+        return {flow: summarize(samples) for flow, samples in self.samples.items()}
+
+    def write(self, path, baseline=None, tolerance=KPI_TOLERANCE):
+        """Пишет результаты (и регрессии, если есть baseline) в JSON"""
+        summary = self.summary()
+        regressions = compare_with_baseline(summary, baseline or {}, tolerance)
+        report = {
+            'label': self.label,
+            'timestamp': time.time(),
+            'flows': summary,
+            'failures': dict(self.failures),
+            'samples': dict(self.samples),
+            'regressions': regressions,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return regressions
@@ -0,0 +1,305 @@
+"""
+Навигация по виртуализированным спискам (FlatList) до элемента с индексом N
+
+FlatList рендерит только элементы рядом с видимой областью, поэтому
+find_elements не видит то, что ниже. ListNavigator работает по снимкам
+page_source (один запрос на снимок, разбор через ElementTree):
+
+- элементы списка запоминаются по ключу (тексты внутри карточки) вместе
+  с позицией в координатах контента - уже просмотренное не сканируется
+  повторно, индекс известного элемента берется из индекса ключей;
+- смещение за жест измеряется по общим ключам соседних снимков, отношение
+  "смещение / длина жеста" калибруется, поэтому до элемента N доходим
+  минимальным числом жестов максимальной длины;
+- конец списка - снимок после жеста не изменился;
+- жесты - W3C actions без инерции (пауза перед отпусканием пальца).
+"""
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import LIST_MAX_GESTURES, LIST_SWIPE_DURATION_MS
+
+BOUNDS = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+SWIPE_FRACTION = 0.8  # доля высоты контейнера на один жест
+EDGE_MARGIN = 0.1  # отступ начала/конца жеста от краев контейнера
+
+
+def parse_bounds(value):
+    match = BOUNDS.match(value or '')
+    return tuple(int(v) for v in match.groups()) if match else None
+
+
+def node_text(node):
+    return node.get('text') or node.get('content-desc') or ''
+
+
+def marker_items(marker, item_class=None):
+    """Элементы списка по тексту-маркеру внутри карточки
+
+    item_class=None - элементом считается сам узел с маркером, иначе -
+    ближайший предок этого класса (как ancestor::<class>[1] в XPath).
+    """
+    def find(root, parents):
+        items = []
+        for node in root.iter():
+            if marker not in node_text(node):
+                continue
+            item = node
+            if item_class is not None:
+                item = parents.get(node)
+                while item is not None and item.tag != item_class:
+                    item = parents.get(item)
+            if item is not None and item not in items:
+                items.append(item)
+        return items
+    return find
+
+
+def item_key(node):
+    """Ключ элемента - все тексты внутри него"""
+    return ' | '.join(text for text in (node_text(n) for n in node.iter()) if text)
+
+
+class ListItem:
+    """Элемент списка на текущем снимке"""
+
+    def __init__(self, key, index, bounds):
+        self.key = key
+        self.index = index
+        self.bounds = bounds
+
+    @property
+    def center(self):
+        x1, y1, x2, y2 = self.bounds
+        return (x1 + x2) // 2, (y1 + y2) // 2
+
+    def __repr__(self):
+        return f"ListItem({self.index}, {self.key!r})"
+
+
+class ListNavigator:
+    """Прокрутка списка до элемента по индексу"""
+
+    def __init__(self, driver, find_items, key_of=item_key, max_gestures=LIST_MAX_GESTURES,
+                 swipe_duration_ms=LIST_SWIPE_DURATION_MS, on_snapshot=None):
+        self.driver = driver
+        self.find_items = find_items
+        self.key_of = key_of
+        # Вызывается с [(ключ, bounds)] каждого снимка (например, счетчик показов карточек)
+        self.on_snapshot = on_snapshot
+        self.max_gestures = max_gestures
+        self.swipe_duration_ms = swipe_duration_ms
+        self.container = None
+        self.offset = 0.0  # прокрутка контента относительно первого снимка, px
+        self.ratio = 1.0  # смещение контента / длина жеста
+        self.tops = {}  # ключ -> верх элемента в координатах контента
+        self.heights = {}
+        self.visible = []  # [(ключ, bounds)] на последнем снимке
+        self.end_reached = False
+        self.start_reached = False
+        self.gestures = 0
+        self.snapshots = 0
+
+    # --- Снимки ---
+
+    def _parse(self):
+        root = ET.fromstring(self.driver.page_source.encode('utf-8'))
+        parents = {child: parent for parent in root.iter() for child in parent}
+        nodes = self._in_container(self.find_items(root, parents), parents)
+        visible = []
+        seen = {}
+        for node in nodes:
+            bounds = parse_bounds(node.get('bounds'))
+            if bounds is None:
+                continue
+            key = self.key_of(node)
+            # Одинаковые карточки различаем по порядку на экране
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                key = f"{key} #{seen[key]}"
+            visible.append((key, bounds))
+        visible.sort(key=lambda item: item[1][1])
+        self.snapshots += 1
+        if self.on_snapshot is not None:
+            self.on_snapshot(visible)
+        return visible
+
+    def _in_container(self, nodes, parents):
+        """Оставляет элементы внутри scrollable-контейнера, где их больше всего
+
+        Так итоговая строка 'ккал' над списком не считается карточкой.
+        """
+        owners = {}
+        for node in nodes:
+            parent = parents.get(node)
+            while parent is not None and parent.get('scrollable') != 'true':
+                parent = parents.get(parent)
+            owners[node] = parent
+        counts = Counter(owner for owner in owners.values() if owner is not None)
+        if not counts:
+            if self.container is None:
+                size = self.driver.get_window_size()
+                self.container = (0, 0, size['width'], size['height'])
+            return nodes
+        owner = counts.most_common(1)[0][0]
+        if self.container is None:
+            self.container = parse_bounds(owner.get('bounds'))
+        return [node for node in nodes if owners[node] is owner]
+
+    def snapshot(self):
+        """Снимает экран и дополняет индекс ключей; возвращает видимые элементы"""
+        visible = self._parse()
+        self._index(visible)
+        return self.items()
+
+    def _index(self, visible):
+        top = self.container[1]
+        for key, (x1, y1, x2, y2) in visible:
+            if key not in self.tops:
+                self.tops[key] = y1 - top + self.offset
+                self.heights[key] = y2 - y1
+        self.visible = visible
+
+    @property
+    def order(self):
+        """Все известные ключи в порядке списка"""
+        return sorted(self.tops, key=self.tops.get)
+
+    def items(self):
+        order = {key: i for i, key in enumerate(self.order)}
+        return [ListItem(key, order[key], bounds) for key, bounds in self.visible]
+
+    # --- Жесты ---
+
+    def _swipe(self, distance):
+        """Жест по контейнеру; distance > 0 - прокрутка вниз (палец вверх)"""
+        x1, y1, x2, y2 = self.container
+        x = (x1 + x2) // 2
+        height = y2 - y1
+        if distance > 0:
+            start = int(y2 - height * EDGE_MARGIN)
+        else:
+            start = int(y1 + height * EDGE_MARGIN)
+        end = int(start - distance)
+        self.driver.execute('actions', {'actions': [{
+            'type': 'pointer',
+            'id': 'finger1',
+            'parameters': {'pointerType': 'touch'},
+            'actions': [
+                {'type': 'pointerMove', 'duration': 0, 'x': x, 'y': start},
+                {'type': 'pointerDown', 'button': 0},
+                {'type': 'pointerMove', 'duration': self.swipe_duration_ms, 'origin': 'viewport', 'x': x, 'y': end},
+                # Пауза перед отпусканием гасит инерцию (fling)
+                {'type': 'pause', 'duration': 200},
+                {'type': 'pointerUp', 'button': 0},
+            ],
+        }]})
+        self.gestures += 1
+
+    def tap(self, item):
+        x, y = item.center
+        self.driver.execute('actions', {'actions': [{
+            'type': 'pointer',
+            'id': 'finger1',
+            'parameters': {'pointerType': 'touch'},
+            'actions': [
+                {'type': 'pointerMove', 'duration': 0, 'x': x, 'y': y},
+                {'type': 'pointerDown', 'button': 0},
+                {'type': 'pause', 'duration': 50},
+                {'type': 'pointerUp', 'button': 0},
+            ],
+        }]})
+
+    def _scroll(self, distance):
+        """Жест + снимок; обновляет смещение и калибровку. False - список не сдвинулся"""
+        previous = dict(self.visible)
+        self._swipe(distance)
+        visible = self._parse()
+        shifts = sorted(previous[key][1] - bounds[1] for key, bounds in visible if key in previous)
+        if shifts:
+            shift = shifts[len(shifts) // 2]
+            ratio = shift / distance
+            # Короткий сдвиг у края списка - не повод менять калибровку
+            if ratio >= 0.5 * self.ratio:
+                self.ratio = 0.5 * self.ratio + 0.5 * ratio
+        else:
+            # Общих элементов нет - жест увел дальше снимка, берем оценку
+            shift = distance * self.ratio
+        moved = shift != 0
+        self.offset += shift
+        self._index(visible)
+        if distance > 0:
+            self.end_reached = not moved
+        else:
+            self.start_reached = not moved
+        if moved:
+            self.start_reached = self.start_reached and distance < 0
+            self.end_reached = self.end_reached and distance > 0
+        return moved
+
+    # --- Навигация ---
+
+    def _pitch(self):
+        """Средняя высота шага списка по известным элементам"""
+        tops = sorted(self.tops.values())
+        if len(tops) < 2:
+            return max(self.heights.values()) if self.heights else self.container[3] - self.container[1]
+        return (tops[-1] - tops[0]) / (len(tops) - 1)
+
+    def _target_shift(self, index):
+        """Нужное смещение контента, чтобы элемент index встал у верхнего края контейнера"""
+        order = self.order
+        if index < len(order):
+            target_top = self.tops[order[index]]
+        else:
+            target_top = self.tops[order[-1]] + (index - len(order) + 1) * self._pitch()
+        margin = (self.container[3] - self.container[1]) * EDGE_MARGIN
+        return target_top - self.offset - margin
+
+    def _fully_visible(self, key):
+        for visible_key, (x1, y1, x2, y2) in self.visible:
+            if visible_key == key:
+                return y1 >= self.container[1] and y2 <= self.container[3]
+        return False
+
+    def scroll_to(self, index):
+        """Прокручивает список до элемента index; ListItem или None, если список короче"""
+        if self.container is None or not self.visible:
+            self.snapshot()
+        if not self.tops:
+            return None
+        max_swipe = (self.container[3] - self.container[1]) * SWIPE_FRACTION
+        for _ in range(self.max_gestures + 1):
+            order = self.order
+            if index < len(order) and self._fully_visible(order[index]):
+                return next(item for item in self.items() if item.index == index)
+            if index >= len(order) and self.end_reached:
+                return None
+            needed = self._target_shift(index)
+            if index < len(order) and abs(needed) < 1:
+                # Элемент у края контейнера, но обрезан - доводим на высоту элемента
+                needed = self.heights[order[index]]
+            distance = max(-max_swipe, min(max_swipe, needed / self.ratio))
+            if (distance < 0 and self.start_reached) or (distance > 0 and self.end_reached):
+                return None
+            self._scroll(distance)
+        return None
+
+    def click(self, index):
+        """Прокручивает к элементу и тапает по нему"""
+        item = self.scroll_to(index)
+        if item is None:
+            raise IndexError(f"В списке нет элемента с индексом {index} (найдено {len(self.tops)})")
+        self.tap(item)
+        return item
+
+    def count(self):
+        """Длина списка: прокрутка до конца"""
+        self.scroll_to(sys.maxsize)
+        return len(self.tops)
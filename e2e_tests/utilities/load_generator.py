@@ -0,0 +1,250 @@
+"""
+Нагрузочный генератор для бэкенда /my-food/* на asyncio + aiohttp
+
+Каждый синтетический пользователь создается так же, как фикстура test_user
+(utilities.test_data.generate_test_user), и проходит поток приложения:
+регистрация -> токен -> профиль -> поиск по названию и штрихкоду ->
+создание приема пищи -> приемы пищи за дату.
+
+Модели нагрузки:
+- closed: фиксированное число одновременных пользователей, новый
+  стартует, когда закончил предыдущий;
+- open: пользователи приходят пуассоновским потоком с заданной
+  интенсивностью независимо от того, успевает ли бэкенд. Время потока
+  считается от запланированного прихода (без coordinated omission).
+
+Запуск:
+    python -m utilities.load_generator --stub --users 2000 --model open --rate 200
+    python -m utilities.load_generator --base-url http://10.0.2.2:8080/my-food --users 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date
+
+import aiohttp
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    BACKEND_BASE_URL, LOAD_USERS, LOAD_CONCURRENCY, LOAD_ARRIVAL_RATE, LOAD_POOL_SIZE, LOAD_REQUEST_TIMEOUT,
+    LOAD_RESULTS_FILE,
+)
+from utilities.histogram import LatencyHistogram
+from utilities.test_data import DEFAULT_PROFILE, generate_test_user
+
+MODELS = ('closed', 'open')
+SEARCH_QUERIES = ['гречка', 'молоко', 'яблоко', 'рис', 'творог']
+BARCODES = ['4607065597924', '4607001234567', '2000000000011', '0000000000000']
+MEAL_TYPES = ['BREAKFAST', 'LUNCH', 'DINNER', 'SUPPER', 'LATE_SUPPER']
+
+
+class FlowError(Exception):
+    """Операция потока вернула неожиданный статус"""
+
+    def __init__(self, operation, status):
+        super().__init__(f"{operation}: HTTP {status}")
+        self.operation = operation
+        self.status = status
+
+
+class LoadStats:
+    """Гистограммы по операциям, ошибки и счетчики потока"""
+
+    def __init__(self):
+        self.operations = {}
+        self.flow = LatencyHistogram()
+        self.errors = Counter()
+        self.completed = 0
+        self.failed = 0
+
+    def histogram(self, operation):
+        if operation not in self.operations:
+            self.operations[operation] = LatencyHistogram()
+        return self.operations[operation]
+
+    def to_dict(self):
+        return {
+            'completed': self.completed,
+            'failed': self.failed,
+            'flow': self.flow.to_dict(),
+            'operations': {name: hist.to_dict() for name, hist in sorted(self.operations.items())},
+            'errors': dict(self.errors),
+        }
+
+
+class SyntheticUser:
+    """Один пользователь: данные как у test_user и поток запросов приложения"""
+
+    def __init__(self, session, base_url, stats, rng):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.rng = rng
+        # Длиннее суффикс, чтобы тысячи пользователей не пересекались по email
+        self.identity = generate_test_user(rng, length=12)
+        self.headers = {}
+
+    async def call(self, operation, method, path, expected=(200,), **kwargs):
+        """Один запрос; задержка пишется в гистограмму операции"""
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, self.base_url + path, headers=self.headers, **kwargs) as response:
+                payload = await response.json(content_type=None) if response.content_length != 0 else None
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats.errors[f"{operation}: {type(e).__name__}"] += 1
+            raise
+        self.stats.histogram(operation).record_seconds(time.perf_counter() - start)
+        if status not in expected:
+            self.stats.errors[f"{operation}: HTTP {status}"] += 1
+            raise FlowError(operation, status)
+        return payload
+
+    async def run(self):
+        credentials = {'email': self.identity['email'], 'password': self.identity['password']}
+        await self.call('register', 'POST', '/auth/user', expected=(201,), json=self.identity)
+        token = await self.call('token', 'POST', '/auth/token', json=credentials)
+        self.headers = {'Authorization': f"Bearer {token['jwt_token']}"}
+
+        await self.call('profile_create', 'POST', '/user-profile', expected=(201, 409), json=DEFAULT_PROFILE)
+        await self.call('profile_get', 'GET', '/user-profile')
+
+        query = self.rng.choice(SEARCH_QUERIES)
+        await self.call('search_name', 'GET', '/product/search/name', params={'name': query, 'page': 0, 'size': 20})
+        barcode = self.rng.choice(BARCODES)
+        await self.call('search_barcode', 'GET', f'/product/search/barcode/{barcode}')
+
+        today = date.today().isoformat()
+        meal = {'mealType': self.rng.choice(MEAL_TYPES), 'dateTime': f"{today}T12:00:00"}
+        await self.call('meal_create', 'POST', '/meal', expected=(201,), json=meal)
+        await self.call('meal_find_by_date', 'GET', '/meal/findByDate', params={'date': today})
+
+
+async def run_user(session, base_url, stats, rng, scheduled_at=None):
+    """Поток одного пользователя; время считается от scheduled_at (open loop)"""
+    start = scheduled_at if scheduled_at is not None else time.perf_counter()
+    try:
+        await SyntheticUser(session, base_url, stats, rng).run()
+    except (FlowError, aiohttp.ClientError, asyncio.TimeoutError, KeyError, TypeError):
+        stats.failed += 1
+        return False
+    stats.flow.record_seconds(time.perf_counter() - start)
+    stats.completed += 1
+    return True
+
+
+async def closed_loop(session, base_url, stats, rng, users, concurrency):
+    """concurrency воркеров по очереди прогоняют users пользователей"""
+    remaining = iter(range(users))
+
+    async def worker():
+        for _ in remaining:
+            await run_user(session, base_url, stats, rng)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, users))))
+
+
+async def open_loop(session, base_url, stats, rng, users, rate):
+    """Пользователи приходят пуассоновским потоком с интенсивностью rate в секунду"""
+    tasks = []
+    next_arrival = time.perf_counter()
+    for _ in range(users):
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(run_user(session, base_url, stats, rng, scheduled_at=next_arrival)))
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+async def run_load(base_url=BACKEND_BASE_URL, model='closed', users=LOAD_USERS, concurrency=LOAD_CONCURRENCY,
+                   rate=LOAD_ARRIVAL_RATE, pool_size=LOAD_POOL_SIZE, timeout=LOAD_REQUEST_TIMEOUT, seed=None):
+    """Прогоняет нагрузку и возвращает отчет (dict)"""
+    if model not in MODELS:
+        raise ValueError(f"Неизвестная модель нагрузки: {model}")
+    rng = random.Random(seed)
+    stats = LoadStats()
+    connector = aiohttp.TCPConnector(limit=pool_size)
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        if model == 'closed':
+            await closed_loop(session, base_url, stats, rng, users, concurrency)
+        else:
+            await open_loop(session, base_url, stats, rng, users, rate)
+    duration = time.perf_counter() - started
+
+    requests = sum(hist.total for hist in stats.operations.values())
+    report = {
+        'base_url': base_url,
+        'model': model,
+        'users': users,
+        'concurrency': concurrency if model == 'closed' else None,
+        'arrival_rate': rate if model == 'open' else None,
+        'pool_size': pool_size,
+        'duration_s': round(duration, 3),
+        'requests': requests,
+        'throughput_rps': round(requests / duration, 1) if duration else None,
+    }
+    report.update(stats.to_dict())
+    return report
+
+
+def format_report(report):
+    """Текстовая таблица перцентилей по операциям"""
+    lines = [
+        f"{report['model']} loop: {report['completed']}/{report['users']} пользователей, "
+        f"{report['requests']} запросов за {report['duration_s']} с ({report['throughput_rps']} rps)",
+        f"{'операция':<20}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}  мс",
+    ]
+    rows = list(report['operations'].items()) + [('flow', report['flow'])]
+    for name, stats in rows:
+        lines.append(f"{name:<20}{stats['count']:>8}{stats['p50_ms'] or 0:>10.1f}{stats['p90_ms'] or 0:>10.1f}"
+                     f"{stats['p99_ms'] or 0:>10.1f}{stats['p99.9_ms'] or 0:>10.1f}{stats['max_ms'] or 0:>10.1f}")
+    for error, count in sorted(report['errors'].items()):
+        lines.append(f"  ошибка {error}: {count}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный генератор для /my-food/* API')
+    parser.add_argument('--base-url', default=BACKEND_BASE_URL)
+    parser.add_argument('--stub', action='store_true', help='Поднять локальную заглушку бэкенда и грузить ее')
+    parser.add_argument('--model', choices=MODELS, default='closed')
+    parser.add_argument('--users', type=int, default=LOAD_USERS)
+    parser.add_argument('--concurrency', type=int, default=LOAD_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=LOAD_ARRIVAL_RATE)
+    parser.add_argument('--pool', type=int, default=LOAD_POOL_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=LOAD_RESULTS_FILE)
+    args = parser.parse_args()
+
+    stub = None
+    base_url = args.base_url
+    if args.stub:
+        from utilities.backend_stub import BackendStub
+        stub = BackendStub().start()
+        base_url = stub.url
+
+    try:
+        report = asyncio.run(run_load(base_url, args.model, args.users, args.concurrency, args.rate,
+                                      args.pool, seed=args.seed))
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(format_report(report))
+    print(f"Отчет: {args.output}")
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
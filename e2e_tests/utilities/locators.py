@@ -0,0 +1,233 @@
+"""
+Реестр локаторов page objects: проверка и предкомпиляция при импорте
+
+BasePage.__init_subclass__ регистрирует все локаторы класса (атрибуты
+в верхнем регистре вида (By.XPATH, '...') или списки таких пар). XPath
+компилируется через lxml; локатор, который заведомо ничего не найдет
+(синтаксическая ошибка, несуществующий атрибут или класс узла,
+неизвестная функция), отклоняется сразу - иначе каждый поиск тратит весь
+EXPLICIT_WAIT. Дорогие шаблоны (//* с contains(), оси ancestor/preceding/
+following) не запрещаются, а попадают в предупреждения.
+
+Проверка из командной строки:
+    python -m utilities.locators pages/
+"""
+import argparse
+import importlib
+import importlib.util
+import os
+import re
+import sys
+from collections import namedtuple
+
+from lxml import etree
+
+# Добавляем родительскую директорию в PYTHONPATH
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+XPATH = 'xpath'
+ID = 'id'
+ACCESSIBILITY_ID = 'accessibility id'
+STRATEGIES = {
+    XPATH, ID, ACCESSIBILITY_ID, 'class name', 'name', 'css selector', 'link text', 'partial link text',
+    'tag name', '-android uiautomator', '-android datamatcher', '-android viewtag', '-ios predicate string',
+    '-ios class chain', '-image',
+}
+
+# Атрибуты узлов в page_source UiAutomator2 и XCUITest
+KNOWN_ATTRIBUTES = {
+    'index', 'package', 'class', 'text', 'resource-id', 'checkable', 'checked', 'clickable', 'enabled',
+    'focusable', 'focused', 'long-clickable', 'password', 'scrollable', 'selected', 'bounds', 'displayed',
+    'content-desc', 'hint', 'showing-hint', 'a11y-important', 'a11y-focused', 'screen-reader-focusable',
+    'drawing-order', 'input-type', 'text-entry-key', 'multiline', 'dismissable', 'context-clickable',
+    'heading', 'live-region', 'max-text-length', 'content-invalid', 'error-text', 'pane-title',
+    'rotation', 'width', 'height', 'x', 'y',
+    'type', 'name', 'label', 'value', 'visible', 'accessible', 'placeholderValue',
+}
+
+XPATH1_FUNCTIONS = {
+    'last', 'position', 'count', 'id', 'local-name', 'namespace-uri', 'name', 'string', 'concat',
+    'starts-with', 'contains', 'substring-before', 'substring-after', 'substring', 'string-length',
+    'normalize-space', 'translate', 'boolean', 'not', 'true', 'false', 'lang', 'number', 'sum', 'floor',
+    'ceiling', 'round',
+}
+NODE_TYPE_TESTS = {'text', 'node', 'comment', 'processing-instruction'}
+EXPENSIVE_AXES = {
+    'ancestor': 'ось ancestor:: проходит всех предков',
+    'ancestor-or-self': 'ось ancestor-or-self:: проходит всех предков',
+    'preceding': 'ось preceding:: проходит весь документ до узла',
+    'following': 'ось following:: проходит весь документ после узла',
+}
+
+STRING_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"")
+ATTRIBUTE = re.compile(r'@([\w.\-]+)')
+AXIS = re.compile(r'([\w\-]+)\s*::')
+FUNCTION = re.compile(r'(?<![@\w.\-:])([A-Za-z_][\w.\-]*)\s*\(')
+NAME_TEST = re.compile(r'(?:^|/|::|\|)\s*([A-Za-z_][\w.\-]*)\s*(?=$|[\[/|)\]])')
+
+LocatorIssue = namedtuple('LocatorIssue', 'owner name severity message locator')
+
+
+class LocatorError(ValueError):
+    """Локатор никогда ничего не найдет"""
+
+
+def is_node_class(name):
+    """Имя узла в page_source: Java-класс Android, тип XCUITest или корень"""
+    return '.' in name or name.startswith('XCUIElementType') or name == 'hierarchy'
+
+
+def strip_literals(expression):
+    return STRING_LITERAL.sub("''", expression)
+
+
+def check_xpath(expression):
+    """Возвращает (errors, warnings) для XPath-выражения"""
+    try:
+        etree.XPath(expression)
+    except etree.XPathSyntaxError as e:
+        return [f"синтаксическая ошибка XPath: {e}"], []
+
+    errors, warnings = [], []
+    code = strip_literals(expression)
+    for attribute in sorted(set(ATTRIBUTE.findall(code))):
+        if attribute not in KNOWN_ATTRIBUTES:
+            errors.append(f"атрибута @{attribute} нет в page_source")
+    for function in sorted(set(FUNCTION.findall(code))):
+        if function not in XPATH1_FUNCTIONS and function not in NODE_TYPE_TESTS:
+            errors.append(f"функция {function}() не входит в XPath 1.0")
+    axes = set(AXIS.findall(code))
+    for name in sorted(set(NAME_TEST.findall(code)) - axes):
+        if not is_node_class(name):
+            errors.append(f"узлов <{name}> не бывает: ожидается класс вида android.widget.TextView")
+
+    if code.lstrip().startswith('//*') and 'contains(' in code:
+        warnings.append("//* с contains(): обход всего дерева со сравнением подстрок")
+    for axis in sorted(axes & set(EXPENSIVE_AXES)):
+        warnings.append(EXPENSIVE_AXES[axis])
+    if re.search(r'.//\*', code.strip()[2:]):
+        warnings.append("//* в середине пути: повторный обход поддерева")
+    return errors, warnings
+
+
+def check_locator(locator):
+    """Возвращает (errors, warnings) для пары (стратегия, значение)"""
+    if not (isinstance(locator, tuple) and len(locator) == 2 and all(isinstance(v, str) for v in locator)):
+        return [f"локатор должен быть парой (стратегия, значение), получено {locator!r}"], []
+    strategy, value = locator
+    if strategy not in STRATEGIES:
+        return [f"неизвестная стратегия поиска '{strategy}'"], []
+    if not value.strip():
+        return ["пустое значение локатора"], []
+    if strategy == XPATH:
+        return check_xpath(value)
+    if strategy == ID:
+        return [], ["By.ID не работает в этом приложении, используйте ACCESSIBILITY_ID (OPTIMAL_LOCATORS.md)"]
+    if strategy == '-android uiautomator' and value.count('(') != value.count(')'):
+        return ["несбалансированные скобки в UiSelector"], []
+    return [], []
+
+
+def looks_like_locator(value):
+    """Атрибут класса похож на локатор или список локаторов"""
+    if isinstance(value, tuple):
+        return len(value) == 2 and isinstance(value[0], str) and value[0] in STRATEGIES
+    if isinstance(value, list):
+        return bool(value) and all(looks_like_locator(v) for v in value if isinstance(v, tuple))
+    return False
+
+
+class LocatorRegistry:
+    """Все локаторы page objects и скомпилированные XPath"""
+
+    def __init__(self, strict=True):
+        self.strict = strict
+        self.locators = {}  # 'SearchPage.PRODUCT_ITEM' -> локатор или список
+        self.sources = {}  # 'SearchPage.PRODUCT_ITEM' -> файл
+        self.issues = []
+        self._compiled = {}
+
+    def register(self, owner, name, value, source=None):
+        qualified = f"{owner}.{name}"
+        errors = []
+        for locator in (value if isinstance(value, list) else [value]):
+            locator_errors, locator_warnings = check_locator(locator)
+            for message in locator_errors:
+                self.issues.append(LocatorIssue(owner, name, 'error', message, locator))
+                errors.append(message)
+            for message in locator_warnings:
+                self.issues.append(LocatorIssue(owner, name, 'warning', message, locator))
+            if not locator_errors and locator[0] == XPATH:
+                self.compiled(locator)
+        self.locators[qualified] = value
+        self.sources[qualified] = source
+        if errors and self.strict:
+            raise LocatorError(f"{qualified}: {'; '.join(errors)}")
+
+    def register_page(self, cls):
+        """Регистрирует локаторы класса (вызывается из BasePage.__init_subclass__)"""
+        source = sys.modules.get(cls.__module__)
+        source = getattr(source, '__file__', None)
+        for name, value in vars(cls).items():
+            if name.isupper() and looks_like_locator(value):
+                self.register(cls.__name__, name, value, source)
+
+    def compiled(self, locator):
+        """Скомпилированный lxml XPath для локатора (для разбора снимков page_source)"""
+        expression = locator[1]
+        if expression not in self._compiled:
+            self._compiled[expression] = etree.XPath(expression)
+        return self._compiled[expression]
+
+    def errors(self):
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    def warnings(self):
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+
+registry = LocatorRegistry()
+
+
+def import_modules(paths):
+    """Импортирует .py-файлы (page objects регистрируются при импорте)"""
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.endswith('.py') and name != '__init__.py'
+        )
+        for file_path in files:
+            relative = os.path.relpath(os.path.abspath(file_path), ROOT_DIR)
+            if relative.startswith('..'):
+                spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(file_path))[0], file_path)
+                spec.loader.exec_module(importlib.util.module_from_spec(spec))
+            else:
+                importlib.import_module(os.path.splitext(relative)[0].replace(os.sep, '.'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Проверка локаторов page objects')
+    parser.add_argument('paths', nargs='*', default=[os.path.join(ROOT_DIR, 'pages')])
+    parser.add_argument('--fail-on-warning', action='store_true', help='Считать дорогие шаблоны ошибкой')
+    args = parser.parse_args(argv)
+
+    # При запуске через -m этот модуль - __main__, а page objects регистрируются
+    # в utilities.locators: берем тот же реестр
+    shared = importlib.import_module('utilities.locators').registry
+    # Собираем все ошибки, а не падаем на первой
+    shared.strict = False
+    import_modules(args.paths)
+
+    for issue in shared.issues:
+        source = shared.sources.get(f"{issue.owner}.{issue.name}") or ''
+        location = os.path.relpath(source, ROOT_DIR) if source else '?'
+        print(f"{location}: {issue.owner}.{issue.name}: {issue.severity}: {issue.message}")
+        print(f"    {issue.locator[1] if isinstance(issue.locator, tuple) and len(issue.locator) == 2 else issue.locator}")
+    errors, warnings = len(shared.errors()), len(shared.warnings())
+    print(f"Локаторов: {len(shared.locators)}, ошибок: {errors}, предупреждений: {warnings}")
+    return 1 if errors or (args.fail_on_warning and warnings) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
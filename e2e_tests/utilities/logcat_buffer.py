@@ -0,0 +1,122 @@
+"""
+Кольцевой буфер logcat приложения для диагностики падений
+
+Фоновый поток забирает новые строки logcat через Appium log API
+(driver.get_log('logcat')), оставляет только строки приложения
+(ReactNativeJS, AndroidRuntime и т.п.) и хранит последние N строк.
+Память постоянна: буфер - deque фиксированной длины, строки обрезаются.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    ANDROID_CAPABILITIES, LOGCAT_BUFFER_SIZE, LOGCAT_POLL_INTERVAL, LOGCAT_TAGS, LOGCAT_MAX_LINE,
+)
+
+# Формат threadtime: "10-18 12:00:00.123  1234  1250 E ReactNativeJS: message"
+LOGCAT_LINE = re.compile(
+    r'^\s*\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3}\s+(?P<pid>\d+)\s+(?P<tid>\d+)\s+'
+    r'(?P<level>[VDIWEFA])\s+(?P<tag>[^:]*?)\s*:\s(?P<message>.*)$'
+)
+
+
+def parse_logcat_line(line):
+    """Разбирает строку logcat; возвращает dict или None"""
+    match = LOGCAT_LINE.match(line)
+    if not match:
+        return None
+    return match.groupdict()
+
+
+class LogcatRingBuffer:
+    """Потокобезопасный кольцевой буфер отфильтрованных строк logcat"""
+
+    def __init__(self, maxlen=LOGCAT_BUFFER_SIZE, tags=LOGCAT_TAGS,
+                 package=ANDROID_CAPABILITIES['appPackage'], max_line=LOGCAT_MAX_LINE):
+        self.entries = deque(maxlen=maxlen)
+        self.tags = frozenset(tags)
+        self.package = package
+        self.max_line = max_line
+        self.received = 0
+        self.accepted = 0
+        self._lock = threading.Lock()
+
+    def accepts(self, line):
+        """Проверяет, относится ли строка к приложению"""
+        parsed = parse_logcat_line(line)
+        if parsed is not None and parsed['tag'] in self.tags:
+            return True
+        return self.package in line
+
+    def feed(self, lines, timestamp=None):
+        """Добавляет строки (str или записи Appium log API) в буфер"""
+        accepted = []
+        count = 0
+        for entry in lines:
+            count += 1
+            if isinstance(entry, dict):
+                line = entry.get('message', '')
+                ts = entry['timestamp'] / 1000.0 if entry.get('timestamp') else timestamp
+            else:
+                line = entry
+                ts = timestamp
+            if not self.accepts(line):
+                continue
+            accepted.append((ts if ts is not None else time.time(), line[:self.max_line]))
+        with self._lock:
+            self.received += count
+            self.accepted += len(accepted)
+            self.entries.extend(accepted)
+        return len(accepted)
+
+    def window(self, start, end=None):
+        """Возвращает строки в интервале [start, end] (секунды epoch)"""
+        with self._lock:
+            snapshot = list(self.entries)
+        return [line for ts, line in snapshot if ts >= start and (end is None or ts <= end)]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class LogcatReader:
+    """Фоновый поток, забирающий logcat через driver.get_log('logcat')"""
+
+    def __init__(self, driver, buffer=None, interval=LOGCAT_POLL_INTERVAL):
+        self.driver = driver
+        self.buffer = buffer if buffer is not None else LogcatRingBuffer()
+        self.interval = interval
+        self.errors = 0
+        self._stop = threading.Event()
+        self._poll_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='logcat-reader', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def poll(self):
+        """Забирает новые строки logcat (можно вызывать и из теста)"""
+        with self._poll_lock:
+            try:
+                entries = self.driver.get_log('logcat')
+            except Exception:
+                self.errors += 1
+                return 0
+            return self.buffer.feed(entries)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=self.interval * 2 + 1)
@@ -0,0 +1,303 @@
+"""
+Изображения для сценариев анализа фото (PhotoAnalysisScreen)
+
+Галерея устройства заполняется пакетно:
+
+- MediaFixtures готовит MEDIA_FIXTURE_COUNT снимков размера камеры
+  (MEDIA_FIXTURE_SIZE): синтетические (тарелка с едой и шум матрицы,
+  чтобы JPEG сжимался как настоящее фото) или уменьшенные фото из
+  MEDIA_SOURCE_DIR (Pillow draft: JPEG декодируется сразу в меньшем
+  масштабе). Готовые файлы лежат в MEDIA_CACHE_DIR между прогонами;
+- DeviceGallery отправляет на устройство только недостающие файлы
+  (манифест с sha1 в папке) через push_file и затем один раз сканирует
+  всю папку (MEDIA_SCANNER_SCAN_FILE на каталог) вместо broadcast на
+  каждый файл.
+
+Загрузку снимка приложением разбирает upload_report по журналу
+заглушки бэкенда: размер запроса и изображения, разрешение, оценка
+JPEG-качества и время ответа /meal_element/analyze-photo. Пределы
+MEDIA_MAX_UPLOAD_* ловят регрессии сжатия на клиенте (quality 1.0,
+PNG вместо JPEG, апскейл).
+
+Запуск из командной строки:
+    python -m utilities.media_fixtures generate --count 12
+    python -m utilities.media_fixtures info media_fixtures/meal_000_3024x4032_q92.jpg
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    MEDIA_CACHE_DIR, MEDIA_FIXTURE_COUNT, MEDIA_FIXTURE_QUALITY, MEDIA_FIXTURE_SIZE, MEDIA_MAX_UPLOAD_KB,
+    MEDIA_MAX_UPLOAD_QUALITY, MEDIA_MAX_UPLOAD_SIDE, MEDIA_REMOTE_DIR, MEDIA_SOURCE_DIR,
+)
+
+MANIFEST = '.e2e_manifest.json'
+SCAN_ACTION = 'android.intent.action.MEDIA_SCANNER_SCAN_FILE'
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+NOISE_TILE = 256  # px; повтор шума не виден блокам JPEG 8x8
+
+# Стандартная таблица квантования яркости JPEG (качество 50)
+STANDARD_LUMINANCE = [
+    16, 11, 10, 16, 24, 40, 51, 61, 12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56, 14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77, 24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101, 72, 92, 95, 98, 112, 100, 103, 99,
+]
+
+
+def encode_jpeg(image, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def synthetic_photo(seed, size=MEDIA_FIXTURE_SIZE, quality=MEDIA_FIXTURE_QUALITY):
+    """JPEG (bytes): стол, тарелка и пятна еды; одинаковый seed - одинаковый файл"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    # Сцена рисуется в 1/8 разрешения и растягивается - плавные края, как у фото
+    small_w, small_h = max(width // 8, 1), max(height // 8, 1)
+    y, x = np.mgrid[0:small_h, 0:small_w].astype(np.float32)
+    scene = rng.uniform(60, 200, 3) + (x / small_w)[..., None] * rng.uniform(-40, 40, 3)
+    cx, cy, radius = small_w / 2, small_h / 2, min(small_w, small_h) * 0.42
+    plate = (x - cx) ** 2 + (y - cy) ** 2 < radius ** 2
+    scene[plate] = rng.uniform(225, 245)
+    for _ in range(rng.integers(3, 7)):
+        fx, fy = rng.uniform(cx - radius / 2, cx + radius / 2), rng.uniform(cy - radius / 2, cy + radius / 2)
+        food = (x - fx) ** 2 + (y - fy) ** 2 < (radius * rng.uniform(0.15, 0.35)) ** 2
+        scene[food & plate] = rng.uniform(30, 220, 3)
+    image = Image.fromarray(np.clip(scene, 0, 255).astype(np.uint8)).resize((width, height), Image.BICUBIC)
+    # Шум матрицы: без него JPEG сжимает сцену нереалистично сильно
+    tile = rng.normal(0, 4, (NOISE_TILE, NOISE_TILE, 1)).astype(np.int16)
+    noise = np.tile(tile, (-(-height // NOISE_TILE), -(-width // NOISE_TILE), 1))[:height, :width]
+    pixels = np.clip(np.asarray(image, dtype=np.int16) + noise, 0, 255).astype(np.uint8)
+    return encode_jpeg(Image.fromarray(pixels), quality)
+
+
+def downscale(data, size=MEDIA_FIXTURE_SIZE, quality=MEDIA_FIXTURE_QUALITY):
+    """Фото (bytes) -> JPEG, вписанный в size с учетом поворота из EXIF"""
+    image = Image.open(io.BytesIO(data))
+    # Декодирование JPEG сразу в уменьшенном масштабе (1/2, 1/4, 1/8), не меньше size
+    image.draft('RGB', (max(size), max(size)))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    image.thumbnail(size, Image.LANCZOS)
+    return encode_jpeg(image, quality)
+
+
+def jpeg_quality(image):
+    """Оценка JPEG-качества (1-100) по таблице квантования яркости; None не для JPEG"""
+    tables = getattr(image, 'quantization', None)
+    if not tables:
+        return None
+    if max(tables[0]) == 1:
+        return 100
+    # Отношение сумм не зависит от порядка коэффициентов (зигзаг или построчно)
+    scale = sum(tables[0]) * 100.0 / sum(STANDARD_LUMINANCE)
+    quality = (200 - scale) / 2 if scale <= 100 else 5000 / scale
+    return int(round(min(max(quality, 1), 100)))
+
+
+def image_info(data):
+    """Размер, формат, разрешение и JPEG-качество изображения (bytes)"""
+    image = Image.open(io.BytesIO(data))
+    return {
+        'bytes': len(data),
+        'format': image.format,
+        'width': image.width,
+        'height': image.height,
+        'quality': jpeg_quality(image),
+    }
+
+
+class MediaFixtures:
+    """Набор снимков для галереи; готовые файлы берутся из кеша"""
+
+    def __init__(self, cache_dir=MEDIA_CACHE_DIR, size=MEDIA_FIXTURE_SIZE, quality=MEDIA_FIXTURE_QUALITY):
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self.quality = quality
+        self.generated = 0
+
+    def build(self, count=MEDIA_FIXTURE_COUNT, source_dir=MEDIA_SOURCE_DIR):
+        """Пути к count снимкам: уменьшенные фото из source_dir или синтетические"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        suffix = f"{self.size[0]}x{self.size[1]}_q{self.quality}.jpg"
+        if source_dir:
+            sources = sorted(name for name in os.listdir(source_dir) if name.lower().endswith(SOURCE_EXTENSIONS))
+            jobs = []
+            for name in sources[:count]:
+                path = os.path.join(source_dir, name)
+                stat = os.stat(path)
+                key = hashlib.sha1(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8')).hexdigest()[:10]
+                jobs.append((f"photo_{key}_{suffix}", lambda path=path: self._downscale_file(path)))
+        else:
+            jobs = [(f"meal_{i:03d}_{suffix}", lambda i=i: synthetic_photo(i, self.size, self.quality))
+                    for i in range(count)]
+        paths = []
+        for name, make in jobs:
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.exists(path):
+                # Через временный файл: параллельный воркер не увидит недописанный JPEG
+                temporary = f"{path}.{os.getpid()}.tmp"
+                with open(temporary, 'wb') as f:
+                    f.write(make())
+                os.replace(temporary, path)
+                self.generated += 1
+            paths.append(path)
+        return paths
+
+    def _downscale_file(self, path):
+        with open(path, 'rb') as f:
+            return downscale(f.read(), self.size, self.quality)
+
+
+class DeviceGallery:
+    """Папка галереи на устройстве: push_file недостающих файлов и одно сканирование"""
+
+    def __init__(self, session, remote_dir=MEDIA_REMOTE_DIR):
+        self.session = session
+        self.remote_dir = remote_dir.rstrip('/')
+        self.last_sync = None
+
+    def shell(self, command, *args):
+        return self.session.execute_script('mobile: shell', {'command': command, 'args': list(args)}) or ''
+
+    def present(self):
+        """{имя: sha1} файлов, которые уже лежат в папке (по манифесту и ls)"""
+        try:
+            manifest = json.loads(self.shell('cat', f"{self.remote_dir}/{MANIFEST}"))
+        except ValueError:
+            return {}
+        names = set(self.shell('ls', self.remote_dir).split())
+        return {name: digest for name, digest in manifest.items() if name in names}
+
+    def sync(self, paths):
+        """Кладет файлы в папку; возвращает сводку (отправлено, пропущено, байт, время)"""
+        started = time.perf_counter()
+        present = self.present()
+        manifest = {}
+        pushed, skipped, sent_bytes = 0, 0, 0
+        for path in paths:
+            name = os.path.basename(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            manifest[name] = digest
+            if present.get(name) == digest:
+                skipped += 1
+                continue
+            self.session.push_file(f"{self.remote_dir}/{name}", base64.b64encode(data).decode('ascii'))
+            pushed += 1
+            sent_bytes += len(data)
+        push_ms = (time.perf_counter() - started) * 1000.0
+        scan_ms = 0.0
+        if pushed:
+            payload = json.dumps(dict(present, **manifest), sort_keys=True).encode('utf-8')
+            self.session.push_file(f"{self.remote_dir}/{MANIFEST}", base64.b64encode(payload).decode('ascii'))
+            scan_started = time.perf_counter()
+            self.scan()
+            scan_ms = (time.perf_counter() - scan_started) * 1000.0
+        self.last_sync = {
+            'files': len(paths),
+            'pushed': pushed,
+            'skipped': skipped,
+            'bytes': sent_bytes,
+            'push_ms': round(push_ms, 1),
+            'scan_ms': round(scan_ms, 1),
+        }
+        return self.last_sync
+
+    def scan(self):
+        """Одно сканирование всей папки медиасканером (MediaStore обходит каталог рекурсивно)"""
+        return self.shell('am', 'broadcast', '-a', SCAN_ACTION, '-d', f"file://{self.remote_dir}")
+
+    def clear(self):
+        """Удаляет папку и убирает ее снимки из MediaStore"""
+        self.shell('rm', '-rf', self.remote_dir)
+        self.scan()
+
+
+def upload_report(stub, since=None):
+    """Загрузки анализа фото по журналу заглушки (время - time.time())"""
+    uploads = {upload['request_id']: upload for upload in list(stub.photo_uploads)}
+    report = []
+    for record in stub.requests(route='analyze_photo', since=since):
+        upload = uploads.get(record['id'])
+        entry = {
+            'request_id': record['id'],
+            'started': record['started'],
+            'finished': record['finished'],
+            'status': record['status'],
+            'server_ms': round((record['finished'] - record['started']) * 1000.0, 1) if record['finished'] else None,
+            'request_bytes': record['request_bytes'],
+        }
+        if upload is not None:
+            info = image_info(upload['image'])
+            entry.update(
+                base64_chars=upload['base64_chars'], mime=upload['mime'], image_bytes=info['bytes'],
+                format=info['format'], width=info['width'], height=info['height'], quality=info['quality'],
+            )
+        report.append(entry)
+    return report
+
+
+def check_upload(entry, max_kb=MEDIA_MAX_UPLOAD_KB, max_side=MEDIA_MAX_UPLOAD_SIDE,
+                 max_quality=MEDIA_MAX_UPLOAD_QUALITY):
+    """Нарушения пределов сжатия для записи upload_report (пустой список - все в норме)"""
+    if 'image_bytes' not in entry:
+        return ['изображение не дошло до обработчика']
+    problems = []
+    if entry['format'] != 'JPEG':
+        problems.append(f"формат {entry['format']} вместо JPEG")
+    if entry['image_bytes'] > max_kb * 1024:
+        problems.append(f"изображение {entry['image_bytes'] / 1024:.0f} КБ > {max_kb} КБ")
+    if max(entry['width'], entry['height']) > max_side:
+        problems.append(f"разрешение {entry['width']}x{entry['height']} больше {max_side} px по стороне")
+    if entry['quality'] is not None and entry['quality'] > max_quality:
+        problems.append(f"JPEG-качество ~{entry['quality']} > {max_quality}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Изображения для сценариев анализа фото')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate', help='Подготовить снимки в кеше')
+    generate.add_argument('--count', type=int, default=MEDIA_FIXTURE_COUNT)
+    generate.add_argument('--size', default='x'.join(str(side) for side in MEDIA_FIXTURE_SIZE), help='ШИРИНАxВЫСОТА')
+    generate.add_argument('--quality', type=int, default=MEDIA_FIXTURE_QUALITY)
+    generate.add_argument('--source', default=MEDIA_SOURCE_DIR, help='Папка со своими фото')
+    generate.add_argument('--out', default=MEDIA_CACHE_DIR)
+    info = commands.add_parser('info', help='Размер, разрешение и JPEG-качество файлов')
+    info.add_argument('files', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        size = tuple(int(side) for side in args.size.split('x'))
+        fixtures = MediaFixtures(args.out, size, args.quality)
+        started = time.perf_counter()
+        paths = fixtures.build(args.count, args.source)
+        total = sum(os.path.getsize(path) for path in paths)
+        print(f"{len(paths)} снимков в {args.out} ({total / 1024 / 1024:.1f} МБ), новых {fixtures.generated} "
+              f"за {time.perf_counter() - started:.1f} с")
+    else:
+        for path in args.files:
+            with open(path, 'rb') as f:
+                entry = image_info(f.read())
+            print(f"{path}: {entry['format']} {entry['width']}x{entry['height']}, {entry['bytes'] / 1024:.0f} КБ, "
+                  f"качество ~{entry['quality']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Профили сети для локальной заглушки бэкенда
+
+Профиль задает задержку ответа, ее разброс, скорость отдачи и приема,
+долю ответов 503 и долю зависших запросов (заглушка держит соединение,
+пока приложение не сдастся по таймауту axios). Профили описаны в
+NETWORK_PROFILES (config/appium_config.py); заглушка применяет текущий
+профиль к каждому запросу /my-food/*.
+
+KPI-потоки под профилями пишутся как `<поток>@<профиль>`. Время потока
+раскладывается на сеть (пока у заглушки был хотя бы один незавершенный
+запрос) и остальное: если под 3G растет не только сеть, но и остальное,
+приложение блокирует интерфейс на медленных ответах (последовательные
+запросы, перерисовка после каждого ответа).
+
+Выбор профиля в тестах:
+    pytest --kpi --network-profile none,3g tests/test_network_profiles.py
+    @pytest.mark.network_profile('3g')
+"""
+import os
+import sys
+from collections import defaultdict
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import NETWORK_HANG_SECONDS, NETWORK_PROFILES
+
+NO_PROFILE = 'none'
+
+
+class NetworkProfile:
+    """Условия сети для ответов заглушки"""
+
+    def __init__(self, name, latency_ms=0, jitter_ms=0, down_kbps=None, up_kbps=None,
+                 error_rate=0.0, timeout_rate=0.0, hang_s=NETWORK_HANG_SECONDS):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.down_kbps = down_kbps
+        self.up_kbps = up_kbps
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_s = hang_s
+
+    @classmethod
+    def named(cls, name):
+        """Профиль из NETWORK_PROFILES; 'none' - без искажений"""
+        if name in (None, NO_PROFILE):
+            return None
+        if name not in NETWORK_PROFILES:
+            raise ValueError(f"Неизвестный профиль сети '{name}' (есть: {', '.join(sorted(NETWORK_PROFILES))})")
+        return cls(name, **NETWORK_PROFILES[name])
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def plan(self, rng, request_bytes=0, response_bytes=0):
+        """Судьба одного запроса: ('ok' | 'error' | 'timeout', задержка ответа в секундах)
+
+        Задержка - latency с равномерным разбросом +-jitter плюс передача тела
+        запроса и ответа на скорости профиля.
+        """
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return 'timeout', self.hang_s
+        delay = max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+        if self.up_kbps:
+            delay += request_bytes * 8 / (self.up_kbps * 1000.0)
+        if roll < self.timeout_rate + self.error_rate:
+            return 'error', delay
+        if self.down_kbps:
+            delay += response_bytes * 8 / (self.down_kbps * 1000.0)
+        return 'ok', delay
+
+
+def profile_flow(flow, profile):
+    """Имя KPI-потока под профилем сети"""
+    return flow if profile in (None, NO_PROFILE) else f"{flow}@{profile}"
+
+
+def network_busy_ms(records, start, end):
+    """Сколько из [start, end] у заглушки был хотя бы один незавершенный запрос, мс"""
+    intervals = sorted(
+        (max(r['started'], start), min(r['finished'] or end, end))
+        for r in records if r['started'] < end and (r['finished'] is None or r['finished'] > start)
+    )
+    busy, current_start, current_end = 0.0, None, None
+    for interval_start, interval_end in intervals:
+        if current_end is None or interval_start > current_end:
+            if current_end is not None:
+                busy += current_end - current_start
+            current_start, current_end = interval_start, interval_end
+        else:
+            current_end = max(current_end, interval_end)
+    if current_end is not None:
+        busy += current_end - current_start
+    return busy * 1000.0
+
+
+def profile_table(summary):
+    """{поток: {профиль: p50}} из сводки KpiRecorder.summary()"""
+    table = defaultdict(dict)
+    for flow, stats in summary.items():
+        name, _, profile = flow.partition('@')
+        if stats.get('n'):
+            table[name][profile or NO_PROFILE] = stats['p50']
+    return {flow: profiles for flow, profiles in table.items() if len(profiles) > 1 or NO_PROFILE not in profiles}
+
+
+def format_profile_table(table):
+    profiles = sorted({p for row in table.values() for p in row}, key=lambda p: (p != NO_PROFILE, p))
+    width = max(len(flow) for flow in table)
+    lines = ['Network profiles (p50, мс):', f"  {'':<{width}} " + ' '.join(f"{p:>8}" for p in profiles)]
+    for flow, row in sorted(table.items()):
+        cells = ' '.join(f"{row[p]:8.0f}" if p in row else f"{'-':>8}" for p in profiles)
+        lines.append(f"  {flow:<{width}} {cells}")
+    return '\n'.join(lines)
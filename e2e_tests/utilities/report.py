@@ -0,0 +1,319 @@
+"""
+Потоковый отчет о прогоне со скриншотами в отдельных файлах
+
+pytest-html с --self-contained-html встраивает каждый скриншот в один
+HTML в base64: на длинных прогонах отчет весит сотни МБ и собирается в
+конце сессии. StreamingReport пишет результат каждого теста сразу после
+его завершения:
+
+    <отчет>/results.jsonl  - одна строка JSON на тест (для скриптов)
+    <отчет>/results.js     - те же строки как `report.add({...});` (для просмотрщика)
+    <отчет>/shots/         - скриншоты в полном размере
+    <отчет>/thumbs/        - превью JPEG (REPORT_THUMB_WIDTH px) для списка
+    <отчет>/index.html     - статический просмотрщик, пишется один раз в начале
+
+Просмотрщик открывается из файла (file://) без сервера: results.js
+подключается тегом script, превью грузятся лениво (loading="lazy"),
+строки рисуются страницами. В конце сессии дописывается одна строка
+итогов - генерация отчета O(1) от числа тестов. Текст ошибок и вывода
+обрезается до REPORT_MAX_LOG_CHARS; когда скриншоты превысили
+REPORT_MAX_MB, полноразмерные больше не копируются (остаются превью).
+
+Запуск:
+    pytest --report-dir report
+"""
+import html
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PIL import Image
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import REPORT_MAX_LOG_CHARS, REPORT_MAX_MB, REPORT_THUMB_WIDTH
+
+# Скриншоты, снятые page objects во время текущего теста (забирает conftest)
+_screenshots = []
+_lock = threading.Lock()
+
+
+def screenshot_taken(path):
+    """Отмечает скриншот текущего теста (вызывается из BasePage.take_screenshot)"""
+    with _lock:
+        _screenshots.append(path)
+
+
+def drain_screenshots():
+    with _lock:
+        paths = list(_screenshots)
+        _screenshots.clear()
+    return paths
+
+
+def truncate(text, limit=REPORT_MAX_LOG_CHARS):
+    if text is None or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n... обрезано {len(text) - limit} символов ...\n{text[-half:]}"
+
+
+class StreamingReport:
+    """Пишет результаты тестов по мере завершения"""
+
+    def __init__(self, directory, title='MealRush E2E', max_mb=REPORT_MAX_MB, thumb_width=REPORT_THUMB_WIDTH):
+        self.directory = directory
+        self.title = title
+        self.max_bytes = max_mb * 1024 * 1024
+        self.thumb_width = thumb_width
+        self.shot_bytes = 0
+        self.skipped_shots = 0
+        self.totals = {}
+        self.count = 0
+        self.started = time.time()
+        self._phases = {}
+        self._lock = threading.Lock()
+        self._names = set()
+        # Превью делаются в фоне, чтобы не задерживать следующий тест
+        self._thumbs = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-thumbs')
+        self._pending_thumbs = []
+        self._jsonl = None
+        self._js = None
+
+    def start(self):
+        for sub in ('shots', 'thumbs'):
+            os.makedirs(os.path.join(self.directory, sub), exist_ok=True)
+        self._jsonl = open(os.path.join(self.directory, 'results.jsonl'), 'w', encoding='utf-8')
+        self._js = open(os.path.join(self.directory, 'results.js'), 'w', encoding='utf-8')
+        with open(os.path.join(self.directory, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(VIEWER.replace('{{title}}', html.escape(self.title)))
+        self._write_js('start', {'title': self.title, 'started': self.started})
+        return self
+
+    def _write_js(self, method, data):
+        self._js.write(f"report.{method}({json.dumps(data, ensure_ascii=False, default=str)});\n")
+        self._js.flush()
+
+    # Скриншоты
+
+    def _unique_name(self, path):
+        base = os.path.basename(path)
+        name, n = base, 1
+        while name in self._names:
+            stem, ext = os.path.splitext(base)
+            name = f"{stem}-{n}{ext}"
+            n += 1
+        self._names.add(name)
+        return name
+
+    def add_screenshot(self, path):
+        """Копирует скриншот в отчет и ставит превью в очередь; возвращает запись для results"""
+        if not os.path.isfile(path):
+            return None
+        name = self._unique_name(path)
+        thumb = f"thumbs/{os.path.splitext(name)[0]}.jpg"
+        size = os.path.getsize(path)
+        full = None
+        if self.shot_bytes + size <= self.max_bytes:
+            full = f"shots/{name}"
+            shutil.copyfile(path, os.path.join(self.directory, full))
+            self.shot_bytes += size
+        else:
+            self.skipped_shots += 1
+        self._pending_thumbs = [future for future in self._pending_thumbs if not future.done()]
+        self._pending_thumbs.append(self._thumbs.submit(self._make_thumb, path, os.path.join(self.directory, thumb)))
+        return {'name': os.path.basename(path), 'thumb': thumb, 'full': full}
+
+    def _make_thumb(self, source, target):
+        try:
+            with Image.open(source) as image:
+                image = image.convert('RGB')
+                height = max(1, round(image.height * self.thumb_width / image.width))
+                image.resize((self.thumb_width, height), Image.BILINEAR).save(target, 'JPEG', quality=70)
+        except (OSError, ValueError):
+            pass
+
+    # pytest
+
+    def pytest_runtest_logreport(self, report):
+        phase = self._phases.setdefault(report.nodeid, {'outcome': 'passed', 'duration': 0.0, 'longrepr': None,
+                                                        'sections': {}})
+        phase['duration'] += report.duration
+        if report.failed and phase['outcome'] not in ('failed', 'error'):
+            phase['outcome'] = 'failed' if report.when == 'call' else 'error'
+            phase['longrepr'] = str(report.longrepr)
+        elif report.skipped and phase['outcome'] == 'passed':
+            phase['outcome'] = 'skipped'
+            phase['longrepr'] = report.longrepr[2] if isinstance(report.longrepr, tuple) else str(report.longrepr)
+        for name, content in report.sections:
+            phase['sections'][name] = content
+        if report.when == 'teardown':
+            self.add_result(report.nodeid, self._phases.pop(report.nodeid), report.user_properties)
+
+    def add_result(self, nodeid, phase, user_properties=()):
+        shots, properties = [], {}
+        for name, value in user_properties:
+            if name == 'screenshot':
+                shot = self.add_screenshot(value)
+                if shot is not None:
+                    shots.append(shot)
+            elif isinstance(value, (str, int, float, bool, list, dict)) or value is None:
+                properties[name] = value
+        entry = {
+            'nodeid': nodeid,
+            'outcome': phase['outcome'],
+            'duration': round(phase['duration'], 3),
+            'longrepr': truncate(phase['longrepr']),
+            'sections': {name: truncate(content) for name, content in phase['sections'].items()},
+            'screenshots': shots,
+            'properties': properties,
+            'finished': time.time(),
+        }
+        with self._lock:
+            self.count += 1
+            self.totals[entry['outcome']] = self.totals.get(entry['outcome'], 0) + 1
+            self._jsonl.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            self._jsonl.flush()
+            self._write_js('add', entry)
+
+    def finish(self, timeout=30):
+        """Итоги прогона; ждет превью не дольше timeout секунд"""
+        wait(self._pending_thumbs, timeout)
+        self._thumbs.shutdown(wait=False, cancel_futures=True)
+        summary = {
+            'tests': self.count,
+            'totals': self.totals,
+            'duration': round(time.time() - self.started, 1),
+            'screenshots_mb': round(self.shot_bytes / 1024 / 1024, 1),
+            'screenshots_thumb_only': self.skipped_shots,
+        }
+        self._write_js('finish', summary)
+        self._jsonl.close()
+        self._js.close()
+        return summary
+
+
+VIEWER = '''<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>{{title}}</title>
+<style>
+body { font: 14px -apple-system, "Segoe UI", Roboto, sans-serif; margin: 0; color: #222; }
+header { position: sticky; top: 0; background: #fafafa; border-bottom: 1px solid #ddd; padding: 10px 16px; }
+header input { width: 320px; padding: 4px 8px; }
+header label { margin-left: 12px; }
+#summary { margin-top: 6px; color: #555; }
+.test { border-bottom: 1px solid #eee; padding: 6px 16px; }
+.test > .title { cursor: pointer; }
+.outcome { display: inline-block; width: 64px; font-weight: bold; }
+.passed .outcome { color: #2e7d32; } .failed .outcome, .error .outcome { color: #c62828; }
+.skipped .outcome { color: #888; }
+.duration { color: #777; float: right; }
+.details { display: none; margin: 8px 0 4px 64px; }
+.open .details { display: block; }
+pre { background: #f6f6f6; padding: 8px; overflow: auto; max-height: 400px; white-space: pre-wrap; }
+.shots img { height: 160px; margin: 0 6px 6px 0; border: 1px solid #ccc; }
+#more { margin: 12px 16px; }
+</style>
+</head>
+<body>
+<header>
+  <strong>{{title}}</strong>
+  <input id="filter" placeholder="Фильтр по имени теста">
+  <label><input type="checkbox" id="failedOnly"> только упавшие</label>
+  <div id="summary">Загрузка...</div>
+</header>
+<div id="tests"></div>
+<button id="more" hidden>Показать еще</button>
+<script>
+var PAGE = 200;
+var report = {
+  tests: [], meta: {}, summary: null,
+  start: function (meta) { this.meta = meta; },
+  add: function (test) { this.tests.push(test); },
+  finish: function (summary) { this.summary = summary; }
+};
+</script>
+<script src="results.js"></script>
+<script>
+(function () {
+  var list = document.getElementById('tests'), more = document.getElementById('more');
+  var filter = document.getElementById('filter'), failedOnly = document.getElementById('failedOnly');
+  var shown = 0, visible = [];
+
+  function esc(text) {
+    return String(text == null ? '' : text).replace(/[&<>"]/g, function (c) {
+      return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+    });
+  }
+
+  function details(test) {
+    var parts = [];
+    if (test.longrepr) parts.push('<pre>' + esc(test.longrepr) + '</pre>');
+    Object.keys(test.sections || {}).forEach(function (name) {
+      parts.push('<div>' + esc(name) + '</div><pre>' + esc(test.sections[name]) + '</pre>');
+    });
+    if (test.screenshots.length) {
+      parts.push('<div class="shots">' + test.screenshots.map(function (shot) {
+        var img = '<img loading="lazy" src="' + esc(shot.thumb) + '" title="' + esc(shot.name) + '">';
+        return shot.full ? '<a href="' + esc(shot.full) + '" target="_blank">' + img + '</a>' : img;
+      }).join('') + '</div>');
+    }
+    Object.keys(test.properties || {}).forEach(function (name) {
+      parts.push('<div>' + esc(name) + '</div><pre>' + esc(JSON.stringify(test.properties[name], null, 2)) + '</pre>');
+    });
+    return parts.join('');
+  }
+
+  function row(test) {
+    var div = document.createElement('div');
+    div.className = 'test ' + test.outcome;
+    div.innerHTML = '<div class="title"><span class="outcome">' + esc(test.outcome) + '</span>' + esc(test.nodeid) +
+      '<span class="duration">' + test.duration.toFixed(1) + ' с</span></div><div class="details"></div>';
+    div.firstChild.onclick = function () {
+      var box = div.lastChild;
+      if (!box.innerHTML) box.innerHTML = details(test);  // содержимое строится при первом раскрытии
+      div.classList.toggle('open');
+    };
+    return div;
+  }
+
+  function showMore() {
+    var end = Math.min(shown + PAGE, visible.length);
+    var fragment = document.createDocumentFragment();
+    for (; shown < end; shown++) fragment.appendChild(row(visible[shown]));
+    list.appendChild(fragment);
+    more.hidden = shown >= visible.length;
+  }
+
+  function render() {
+    var text = filter.value.toLowerCase();
+    visible = report.tests.filter(function (test) {
+      if (failedOnly.checked && test.outcome !== 'failed' && test.outcome !== 'error') return false;
+      return !text || test.nodeid.toLowerCase().indexOf(text) >= 0;
+    });
+    list.innerHTML = '';
+    shown = 0;
+    showMore();
+  }
+
+  var totals = {};
+  report.tests.forEach(function (test) { totals[test.outcome] = (totals[test.outcome] || 0) + 1; });
+  document.getElementById('summary').textContent = report.tests.length + ' тестов: ' +
+    Object.keys(totals).map(function (k) { return k + ' ' + totals[k]; }).join(', ') +
+    (report.summary ? ' за ' + report.summary.duration + ' с' : ' (прогон еще идет - обновите страницу)');
+  filter.oninput = render;
+  failedOnly.onchange = render;
+  more.onclick = showMore;
+  render();
+})();
+</script>
+</body>
+</html>
+'''
@@ -0,0 +1,184 @@
+"""
+Фоновый замер памяти и CPU приложения во время тестов
+
+Поток раз в N секунд читает `dumpsys meminfo <pkg>` (PSS) и
+`/proc/<pid>/stat` (utime + stime) через mobile: shell. Ряды хранятся в
+array('d'), а не в списках словарей. Для повторяющихся потоков
+(например, 50 раз MainPage.change_date) PSS снимается на каждой итерации,
+и по наклону линейной регрессии определяется утечка.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    ANDROID_CAPABILITIES, RESOURCE_SAMPLE_INTERVAL, LEAK_MIN_GROWTH_KB, LEAK_MIN_GROWTH_PERCENT, LEAK_MIN_R2,
+)
+
+CLOCK_TICKS_PER_SECOND = 100  # USER_HZ на Android
+
+TOTAL_PSS_SUMMARY = re.compile(r'TOTAL PSS:\s*(\d+)')
+TOTAL_PSS_TABLE = re.compile(r'^\s*TOTAL\s+(\d+)', re.MULTILINE)
+SUMMARY_ROW = re.compile(r'^\s*(Java Heap|Native Heap|Graphics):\s*(\d+)', re.MULTILINE)
+
+
+def parse_meminfo(output):
+    """Разбирает `dumpsys meminfo <pkg>`; значения в КБ (None, если процесса нет)"""
+    match = TOTAL_PSS_SUMMARY.search(output) or TOTAL_PSS_TABLE.search(output)
+    if not match:
+        return None
+    result = {'total_pss_kb': int(match.group(1))}
+    for name, value in SUMMARY_ROW.findall(output):
+        result[name.lower().replace(' ', '_') + '_kb'] = int(value)
+    return result
+
+
+def parse_proc_stat(line):
+    """Разбирает /proc/<pid>/stat; возвращает (utime + stime в тиках, rss в страницах)"""
+    # Имя процесса в скобках может содержать пробелы - режем по последней ')'
+    end = line.rfind(')')
+    if end < 0:
+        return None
+    fields = line[end + 2:].split()
+    # fields[0] - state (поле 3); utime - поле 14, stime - 15, rss - 24
+    utime, stime = int(fields[11]), int(fields[12])
+    rss_pages = int(fields[21])
+    return utime + stime, rss_pages
+
+
+def linear_trend(values):
+    """Наклон и R^2 линейной регрессии значения по номеру итерации"""
+    n = len(values)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(values) / n
+    sxx = sum((i - mean_x) ** 2 for i in range(n))
+    sxy = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    syy = sum((v - mean_y) ** 2 for v in values)
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy else 0.0
+    return slope, r2
+
+
+def detect_leak(pss_kb, min_growth_kb=LEAK_MIN_GROWTH_KB, min_growth_percent=LEAK_MIN_GROWTH_PERCENT,
+                min_r2=LEAK_MIN_R2):
+    """Определяет утечку по PSS на итерациях: устойчивый рост выше порогов"""
+    values = list(pss_kb)
+    slope, r2 = linear_trend(values)
+    growth_kb = slope * (len(values) - 1) if len(values) > 1 else 0.0
+    growth_percent = growth_kb * 100.0 / values[0] if values and values[0] else 0.0
+    return {
+        'iterations': len(values),
+        'slope_kb_per_iteration': slope,
+        'growth_kb': growth_kb,
+        'growth_percent': growth_percent,
+        'r2': r2,
+        'leak': growth_kb >= min_growth_kb and growth_percent >= min_growth_percent and r2 >= min_r2,
+    }
+
+
+class ResourceSampler:
+    """Фоновый сбор PSS и CPU процесса приложения"""
+
+    def __init__(self, driver, package=ANDROID_CAPABILITIES['appPackage'], interval=RESOURCE_SAMPLE_INTERVAL):
+        self.driver = driver
+        self.package = package
+        self.interval = interval
+        self.pid = None
+        # Компактные ряды: время (с от старта), PSS (КБ), CPU (%)
+        self.t = array('d')
+        self.pss_kb = array('d')
+        self.cpu_percent = array('d')
+        self.iteration_pss_kb = array('d')
+        self.errors = 0
+        self._last_cpu = None
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+
+    def shell(self, command, *args):
+        return self.driver.execute_script('mobile: shell', {'command': command, 'args': list(args)}) or ''
+
+    def _read_pss(self):
+        meminfo = parse_meminfo(self.shell('dumpsys', 'meminfo', self.package))
+        return meminfo['total_pss_kb'] if meminfo else None
+
+    def _read_cpu_ticks(self):
+        if self.pid is None:
+            self.pid = self.shell('pidof', self.package).strip().split(' ')[0] or None
+        if self.pid is None:
+            return None
+        parsed = parse_proc_stat(self.shell('cat', f'/proc/{self.pid}/stat'))
+        if parsed is None:
+            self.pid = None  # процесс перезапущен
+            return None
+        return parsed[0]
+
+    def sample(self):
+        """Один замер (вызывается потоком, можно и из теста)"""
+        with self._lock:
+            try:
+                now = time.monotonic() - self._started
+                pss = self._read_pss()
+                ticks = self._read_cpu_ticks()
+            except Exception:
+                self.errors += 1
+                return None
+            cpu = float('nan')
+            if ticks is not None and self._last_cpu is not None and now > self._last_cpu[0]:
+                cpu = (ticks - self._last_cpu[1]) * 100.0 / CLOCK_TICKS_PER_SECOND / (now - self._last_cpu[0])
+            self._last_cpu = (now, ticks) if ticks is not None else None
+            if pss is not None:
+                self.t.append(now)
+                self.pss_kb.append(pss)
+                self.cpu_percent.append(cpu)
+            return pss
+
+    def mark_iteration(self):
+        """Снимает PSS в конце итерации повторяющегося потока"""
+        pss = self.sample()
+        if pss is not None:
+            self.iteration_pss_kb.append(pss)
+        return pss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=self.interval * 2 + 5)
+
+    def leak_report(self):
+        return detect_leak(self.iteration_pss_kb)
+
+    def to_dict(self):
+        """Сводка и ряды для отчета"""
+        cpu = [v for v in self.cpu_percent if v == v]
+        return {
+            'samples': len(self.t),
+            'pss_kb_max': max(self.pss_kb) if self.pss_kb else None,
+            'pss_kb_last': self.pss_kb[-1] if self.pss_kb else None,
+            'cpu_percent_mean': sum(cpu) / len(cpu) if cpu else None,
+            'cpu_percent_max': max(cpu) if cpu else None,
+            'leak': self.leak_report() if len(self.iteration_pss_kb) > 1 else None,
+            'series': {
+                't': [round(v, 3) for v in self.t],
+                'pss_kb': list(self.pss_kb),
+                'cpu_percent': [round(v, 1) if v == v else None for v in self.cpu_percent],
+                'iteration_pss_kb': list(self.iteration_pss_kb),
+            },
+        }
@@ -0,0 +1,121 @@
+"""
+Кеш результатов тестов, привязанный к сборке приложения
+
+Ключ кеша состоит из:
+- хеша APK (ANDROID_APP_PATH),
+- хеша исходника тестового модуля (и conftest.py),
+- хеша исходников page objects (pages/ и utilities/base_page.py),
+- профиля устройства (платформа, имя устройства, версия ОС).
+
+Если тест уже проходил с идентичным ключом, он пропускается как cached-pass.
+Хранилище - стандартный кеш pytest (.pytest_cache), одна запись на ключ,
+поэтому параллельные воркеры xdist не перезаписывают друг друга.
+"""
+import glob
+import hashlib
+import os
+import time
+
+# Корень e2e_tests
+E2E_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_PREFIX = 'mealrush/result_cache'
+CACHED_PASS_REASON = 'cached-pass'
+
+_file_hash_memo = {}
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Считает sha256 файла (с мемоизацией по размеру и mtime)"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _file_hash_memo:
+        return _file_hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    result = digest.hexdigest()
+    _file_hash_memo[memo_key] = result
+    return result
+
+
+def files_sha256(paths):
+    """Считает общий хеш набора файлов (порядок не важен)"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, E2E_ROOT).encode('utf-8'))
+        digest.update(file_sha256(path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def page_objects_sha256(root=E2E_ROOT):
+    """Хеш исходников page objects"""
+    paths = glob.glob(os.path.join(root, 'pages', '*.py'))
+    paths.append(os.path.join(root, 'utilities', 'base_page.py'))
+    return files_sha256([p for p in paths if os.path.exists(p)])
+
+
+class ResultCache:
+    """Кеш пройденных тестов поверх config.cache"""
+
+    def __init__(self, cache, apk_path, device_profile, root=E2E_ROOT):
+        self.cache = cache
+        self.root = root
+        self.device_profile = device_profile
+        self.apk_hash = file_sha256(apk_path) if apk_path and os.path.isfile(apk_path) else None
+        self.pages_hash = page_objects_sha256(root)
+        self._test_hashes = {}
+        self.hits = 0
+        self.stored = 0
+
+    @property
+    def enabled(self):
+        """Без APK нельзя доказать, что сборка не менялась - кеш отключен"""
+        return self.apk_hash is not None
+
+    def _test_source_hash(self, path):
+        if path not in self._test_hashes:
+            paths = [path]
+            conftest = os.path.join(self.root, 'conftest.py')
+            if os.path.exists(conftest):
+                paths.append(conftest)
+            self._test_hashes[path] = files_sha256(paths)
+        return self._test_hashes[path]
+
+    def key_for(self, nodeid, test_path):
+        """Возвращает ключ кеша для теста или None, если кеш отключен"""
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256()
+        for part in (nodeid, self.apk_hash, self._test_source_hash(str(test_path)),
+                     self.pages_hash, self.device_profile):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def is_cached_pass(self, key):
+        """Проверяет, проходил ли тест с таким ключом"""
+        if key is None:
+            return False
+        entry = self.cache.get(f'{CACHE_PREFIX}/{key}', None)
+        return bool(entry and entry.get('outcome') == 'passed')
+
+    def store_pass(self, key, nodeid):
+        """Запоминает успешное прохождение теста"""
+        if key is None:
+            return
+        self.cache.set(f'{CACHE_PREFIX}/{key}', {
+            'nodeid': nodeid,
+            'outcome': 'passed',
+            'timestamp': time.time(),
+        })
+        self.stored += 1
+
+    def forget(self, key):
+        """Удаляет запись (тест упал с этим ключом)"""
+        if key is None:
+            return
+        if self.cache.get(f'{CACHE_PREFIX}/{key}', None) is not None:
+            self.cache.set(f'{CACHE_PREFIX}/{key}', {'outcome': 'failed', 'timestamp': time.time()})
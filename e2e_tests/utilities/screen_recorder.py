@@ -0,0 +1,109 @@
+"""
+Запись видео экрана на время теста вместо пошаговых скриншотов
+
+Запись идет на устройстве (start_recording_screen) и забирается одним
+запросом в конце теста. Файл сохраняется только при падении теста, рядом
+кладется .srt с маркерами шагов - вызовами методов page objects.
+"""
+import base64
+import functools
+import os
+import re
+import sys
+import time
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import VIDEO_DIR, VIDEO_TIME_LIMIT, VIDEO_BIT_RATE, VIDEO_SIZE
+
+# Активная запись (одна на процесс: один driver на воркер)
+_active_recorder = None
+
+
+def record_step(label):
+    """Добавляет маркер шага в активную запись"""
+    if _active_recorder is not None:
+        _active_recorder.mark(label)
+
+
+def step_marker(label, func):
+    """Оборачивает метод page object, чтобы он оставлял маркер шага"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        record_step(label)
+        return func(*args, **kwargs)
+    wrapper.__step_label__ = label
+    return wrapper
+
+
+def format_srt_time(seconds):
+    """Форматирует время для .srt (HH:MM:SS,mmm)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def steps_to_srt(steps, total_duration):
+    """Строит субтитры из маркеров шагов [(offset, label), ...]"""
+    blocks = []
+    for i, (offset, label) in enumerate(steps):
+        end = steps[i + 1][0] if i + 1 < len(steps) else total_duration
+        end = max(end, offset + 0.5)
+        blocks.append(f"{i + 1}\n{format_srt_time(offset)} --> {format_srt_time(end)}\n{label}\n")
+    return '\n'.join(blocks)
+
+
+class ScreenRecorder:
+    """Запись экрана для одного теста"""
+
+    def __init__(self, driver, video_dir=VIDEO_DIR):
+        self.driver = driver
+        self.video_dir = video_dir
+        self.steps = []
+        self.started_at = None
+        self.test_name = None
+
+    def start(self, test_name):
+        """Начинает запись"""
+        global _active_recorder
+        self.test_name = test_name
+        self.steps = []
+        self.driver.start_recording_screen(
+            timeLimit=VIDEO_TIME_LIMIT,
+            bitRate=VIDEO_BIT_RATE,
+            videoSize=VIDEO_SIZE,
+            forcedRestart=True,
+        )
+        self.started_at = time.monotonic()
+        _active_recorder = self
+
+    def mark(self, label):
+        """Запоминает маркер шага относительно начала записи"""
+        if self.started_at is not None:
+            self.steps.append((time.monotonic() - self.started_at, label))
+
+    def stop(self, save):
+        """Останавливает запись; сохраняет видео и маркеры, если save=True"""
+        global _active_recorder
+        if _active_recorder is self:
+            _active_recorder = None
+        if self.started_at is None:
+            return None
+        duration = time.monotonic() - self.started_at
+        self.started_at = None
+
+        payload = self.driver.stop_recording_screen()
+        if not save or not payload:
+            return None
+
+        os.makedirs(self.video_dir, exist_ok=True)
+        safe_name = re.sub(r'[^\w.-]+', '_', self.test_name)
+        video_path = os.path.join(self.video_dir, f"failure_{safe_name}.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(base64.b64decode(payload))
+        with open(os.path.splitext(video_path)[0] + '.srt', 'w', encoding='utf-8') as f:
+            f.write(steps_to_srt(self.steps, duration))
+        return video_path
@@ -0,0 +1,279 @@
+"""
+Граф экранов приложения и переходы по кратчайшему пути
+
+Узлы графа - page objects, ребра - действия (методы page objects или
+deep link) со стоимостью в секундах. router.go(ProfilePage) определяет
+текущий экран по одному снимку page_source (идентификаторы экранов
+проверяются скомпилированными lxml XPath из реестра локаторов), ищет
+самый дешевый путь алгоритмом Дейкстры и выполняет его. Фактическое
+время каждого ребра (действие + появление целевого экрана) сглаживается
+EWMA и сохраняется в JSON - следующие прогоны планируют по измеренным
+стоимостям. Если после ребра оказались не там, путь перестраивается от
+фактического экрана.
+"""
+import heapq
+import json
+import os
+import sys
+import time
+
+from lxml import etree
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    ANDROID_CAPABILITIES, DEEP_LINKS, EXPLICIT_WAIT, ROUTER_COST_ALPHA, ROUTER_MAX_REPLANS,
+    TEST_USER_EMAIL, TEST_USER_PASSWORD,
+)
+from utilities.element_cache import NAVIGATION, screen_state
+from utilities.kpi import load_json
+from utilities.locators import ACCESSIBILITY_ID, ID, XPATH, registry
+
+DEFAULT_EDGE_COST = 3.0  # секунды, пока ребро ни разу не измерено
+DEFAULT_DEEP_LINK_COST = 2.0
+FAILURE_PENALTY = 2.0  # множитель стоимости за неудачный переход
+POLL_INTERVAL = 0.3
+
+
+class NavigationError(RuntimeError):
+    """До экрана не удалось добраться"""
+
+
+class Edge:
+    """Переход source -> target; action(driver) выполняет его"""
+
+    def __init__(self, source, target, action, name, cost=DEFAULT_EDGE_COST):
+        self.source = source
+        self.target = target
+        self.action = action
+        self.name = name
+        self.default_cost = cost
+
+    @property
+    def key(self):
+        return f"{self.source.__name__}->{self.target.__name__}:{self.name}"
+
+    def __repr__(self):
+        return f"Edge({self.key})"
+
+
+def page_action(page_cls, method, *args):
+    """Действие ребра: вызвать метод page object"""
+    def action(driver):
+        getattr(page_cls(driver), method)(*args)
+    action.__name__ = method
+    return action
+
+
+def deep_link_action(url, package=ANDROID_CAPABILITIES['appPackage']):
+    def action(driver):
+        driver.execute_script('mobile: deepLink', {'url': url, 'package': package})
+    return action
+
+
+class ScreenGraph:
+    """Экраны (page object + локатор-идентификатор) и переходы между ними"""
+
+    def __init__(self):
+        self.screens = {}  # page_cls -> локатор или список локаторов
+        self.edges = []
+
+    def add_screen(self, page_cls, identifier):
+        """identifier - имя атрибута-локатора класса или сам локатор"""
+        if isinstance(identifier, str):
+            identifier = getattr(page_cls, identifier)
+        self.screens[page_cls] = identifier
+        return self
+
+    def add_edge(self, source, target, action, name=None, cost=DEFAULT_EDGE_COST):
+        self.edges.append(Edge(source, target, action, name or action.__name__, cost))
+        return self
+
+    def add_deep_link(self, target, url, sources, cost=DEFAULT_DEEP_LINK_COST):
+        """Deep link на target с каждого экрана из sources"""
+        for source in sources:
+            if source is not target:
+                self.edges.append(Edge(source, target, deep_link_action(url), 'deep_link', cost))
+        return self
+
+    def edges_from(self, source):
+        return [edge for edge in self.edges if edge.source is source]
+
+
+class EdgeCosts:
+    """Измеренные стоимости ребер (EWMA, секунды) с сохранением в JSON"""
+
+    def __init__(self, path=None, alpha=ROUTER_COST_ALPHA):
+        self.path = path
+        self.alpha = alpha
+        self.data = load_json(path)
+
+    def cost(self, edge):
+        entry = self.data.get(edge.key)
+        return entry['cost'] if entry else edge.default_cost
+
+    def record(self, edge, seconds, ok=True):
+        entry = self.data.setdefault(edge.key, {'cost': edge.default_cost, 'runs': 0, 'failures': 0})
+        if not ok:
+            entry['failures'] += 1
+            seconds = max(seconds, entry['cost']) * FAILURE_PENALTY
+        # Первый замер заменяет априорную стоимость целиком
+        entry['cost'] = seconds if entry['runs'] == 0 and ok else \
+            (1 - self.alpha) * entry['cost'] + self.alpha * seconds
+        entry['runs'] += 1
+
+    def save(self):
+        if not self.path:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def snapshot(driver):
+    """Один page_source, разобранный lxml"""
+    return etree.fromstring(driver.page_source.encode('utf-8'))
+
+
+def matches(root, locator):
+    """Есть ли на снимке узел, подходящий под локатор"""
+    if isinstance(locator, list):
+        return any(matches(root, item) for item in locator)
+    strategy, value = locator
+    if strategy == XPATH:
+        return bool(registry.compiled(locator)(root))
+    if strategy == ACCESSIBILITY_ID:
+        return bool(root.xpath('//*[@content-desc=$v or @name=$v]', v=value))
+    if strategy == ID:
+        return bool(root.xpath('//*[@resource-id=$v or substring(@resource-id, string-length(@resource-id) - string-length($s) + 1) = $s]',
+                               v=value, s=f"/{value}"))
+    return False
+
+
+class Router:
+    """Переходы между экранами по графу"""
+
+    def __init__(self, driver, graph=None, costs=None, timeout=EXPLICIT_WAIT, max_replans=ROUTER_MAX_REPLANS):
+        self.driver = driver
+        self.graph = graph or default_graph()
+        self.costs = costs or EdgeCosts()
+        self.timeout = timeout
+        self.max_replans = max_replans
+        self.history = []  # [(ключ ребра, секунды, ok)]
+
+    def detect(self, root=None):
+        """Текущий экран по одному снимку; None - экран не из графа"""
+        if root is None:
+            root = snapshot(self.driver)
+        for page_cls, identifier in self.graph.screens.items():
+            if matches(root, identifier):
+                return page_cls
+        return None
+
+    def plan(self, source, target):
+        """Самый дешевый путь (список ребер) по Дейкстре"""
+        best = {source: 0.0}
+        previous = {}
+        queue = [(0.0, 0, source)]
+        counter = 1  # разрыв равенства без сравнения классов
+        while queue:
+            cost, _, node = heapq.heappop(queue)
+            if node is target:
+                path = []
+                while node is not source:
+                    edge, node = previous[node]
+                    path.append(edge)
+                return path[::-1]
+            if cost > best.get(node, float('inf')):
+                continue
+            for edge in self.graph.edges_from(node):
+                if edge.target is node:
+                    continue
+                total = cost + self.costs.cost(edge)
+                if total < best.get(edge.target, float('inf')):
+                    best[edge.target] = total
+                    previous[edge.target] = (edge, node)
+                    heapq.heappush(queue, (total, counter, edge.target))
+                    counter += 1
+        raise NavigationError(f"Нет пути {source.__name__} -> {target.__name__}")
+
+    def _wait_for(self, target):
+        """Ждет появления экрана target; возвращает фактический экран"""
+        deadline = time.time() + self.timeout
+        current = None
+        while time.time() < deadline:
+            current = self.detect()
+            if current is target:
+                return current
+            time.sleep(POLL_INTERVAL)
+        return current
+
+    def go(self, target):
+        """Переходит на экран target и возвращает его page object"""
+        current = self.detect()
+        replans = 0
+        while current is not target:
+            if current is None:
+                raise NavigationError(f"Текущий экран не распознан (цель {target.__name__})")
+            if replans > self.max_replans:
+                raise NavigationError(f"Не удалось перейти на {target.__name__}: {self.max_replans} перестроений пути")
+            replans += 1
+            for edge in self.plan(current, target):
+                started = time.time()
+                try:
+                    edge.action(self.driver)
+                except Exception:
+                    current = None
+                else:
+                    current = self._wait_for(edge.target)
+                finally:
+                    # Экран сменился (или неизвестно, что на нем): кеш элементов не годится
+                    screen_state(self.driver).bump(NAVIGATION)
+                ok = current is edge.target
+                elapsed = time.time() - started
+                self.costs.record(edge, elapsed, ok)
+                self.history.append((edge.key, elapsed, ok))
+                if not ok:
+                    if current is None:
+                        current = self.detect()
+                    break
+        return target(self.driver)
+
+    def report(self):
+        return [{'edge': key, 'seconds': round(seconds, 3), 'ok': ok} for key, seconds, ok in self.history]
+
+
+def default_graph():
+    """Граф экранов приложения (page objects из pages/)"""
+    from pages.main_page import MainPage
+    from pages.profile_page import ProfilePage
+    from pages.registration_page import RegistrationPage
+    from pages.search_page import SearchPage
+    from pages.sign_in_page import SignInPage
+
+    graph = ScreenGraph()
+    # Порядок важен: экран определяется по первому совпавшему идентификатору
+    graph.add_screen(RegistrationPage, 'CREATE_ACCOUNT_BUTTON')
+    graph.add_screen(SignInPage, 'LOGIN_BUTTON')
+    graph.add_screen(SearchPage, 'SEARCH_INPUT')
+    graph.add_screen(ProfilePage, 'SETTINGS_BUTTON')
+    graph.add_screen(MainPage, 'ADD_MEAL_BUTTON')
+
+    graph.add_edge(SignInPage, RegistrationPage, page_action(SignInPage, 'click_register_button'))
+    graph.add_edge(RegistrationPage, SignInPage, page_action(RegistrationPage, 'click_back'))
+    graph.add_edge(SignInPage, MainPage, page_action(SignInPage, 'login', TEST_USER_EMAIL, TEST_USER_PASSWORD), cost=6.0)
+    graph.add_edge(ProfilePage, SignInPage, page_action(ProfilePage, 'click_logout'), cost=4.0)
+    # Нижние вкладки видны на всех экранах основной части
+    main_screens = (MainPage, SearchPage, ProfilePage)
+    for source in main_screens:
+        for target, method in ((MainPage, 'navigate_to_home'), (SearchPage, 'navigate_to_search'),
+                               (ProfilePage, 'navigate_to_profile')):
+            if source is not target:
+                graph.add_edge(source, target, page_action(MainPage, method))
+
+    # Deep links открываются только после входа (до него AppNavigator показывает Auth)
+    pages = {cls.__name__: cls for cls in main_screens}
+    for name, url in DEEP_LINKS.items():
+        if name in pages:
+            graph.add_deep_link(pages[name], url, main_screens)
+    return graph
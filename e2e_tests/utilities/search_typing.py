@@ -0,0 +1,116 @@
+"""
+Поиск по мере ввода: задержки и число запросов к /product/search/name
+
+SearchPage.type_query_by_prefix вводит запрос по одному символу с заданным
+шагом, заглушка бэкенда (utilities.backend_stub) пишет журнал запросов.
+По меткам нажатий, журналу и моментам появления результатов на экране
+считается время до первого и до финального результата, а также лишние
+(устаревшие префиксы, дубли) и отмененные запросы.
+
+Все метки времени - time.time(): тест и заглушка работают на одной машине.
+"""
+import os
+import sys
+import time
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import EXPLICIT_WAIT, KPI_POLL_INTERVAL, SEARCH_TYPING_CADENCE
+
+SEARCH_ROUTE = 'search_by_name'
+
+
+def ms(start, end):
+    return (end - start) * 1000.0 if start is not None and end is not None else None
+
+
+def max_in_flight(requests):
+    """Максимум одновременно выполнявшихся запросов"""
+    events = []
+    for r in requests:
+        events.append((r['started'], 1))
+        events.append((r['finished'] if r['finished'] is not None else float('inf'), -1))
+    current = peak = 0
+    for _, delta in sorted(events):
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def analyze_search_typing(query, keystrokes, requests, first_result_at=None, final_result_at=None):
+    """Сводка по одному запросу
+
+    keystrokes - [(time, prefix)], requests - записи журнала заглушки
+    для поиска по названию, first/final_result_at - когда на экране
+    появились первые результаты и результаты финального запроса.
+    """
+    final_query = query.strip().lower()
+    first_key = keystrokes[0][0] if keystrokes else None
+    last_key = keystrokes[-1][0] if keystrokes else None
+    requests = sorted(requests, key=lambda r: r['started'])
+
+    final = [r for r in requests if r['query'].get('name', '').strip().lower() == final_query]
+    answered_final = [r for r in final if not r['cancelled'] and r['finished'] is not None]
+    final_request = answered_final[-1] if answered_final else None
+    # Ответы на префиксы, пришедшие после отправки финального запроса, могут перезаписать список
+    stale = [r for r in requests
+             if r not in final and final_request is not None and r['finished'] is not None
+             and r['finished'] > final_request['started']]
+
+    return {
+        'query': query,
+        'keystrokes': len(keystrokes),
+        'typing_ms': ms(first_key, last_key),
+        'requests': len(requests),
+        'request_queries': [r['query'].get('name', '') for r in requests],
+        # В идеале (debounce) на запрос уходит один поиск
+        'wasted_requests': max(len(requests) - 1, 0) if final else len(requests),
+        'cancelled_requests': sum(1 for r in requests if r['cancelled']),
+        'stale_responses': len(stale),
+        'max_in_flight': max_in_flight(requests),
+        'debounce_ms': ms(last_key, final[-1]['started']) if final else None,
+        'final_request_ms': ms(final_request['started'], final_request['finished']) if final_request else None,
+        'time_to_first_result_ms': ms(first_key, first_result_at),
+        'time_to_final_result_ms': ms(last_key, final_result_at),
+    }
+
+
+def measure_search_typing(search_page, stub, query, cadence=SEARCH_TYPING_CADENCE, timeout=EXPLICIT_WAIT):
+    """Вводит запрос посимвольно и собирает сводку
+
+    Экран поиска должен быть открыт, implicit wait - выставлен в 0.
+    """
+    driver = search_page.driver
+    observed = {'first': None}
+
+    def results_shown():
+        return bool(driver.find_elements(*search_page.PRODUCT_ITEM)) and \
+            not driver.find_elements(*search_page.LOADING_INDICATOR)
+
+    def check_first():
+        if observed['first'] is None and results_shown():
+            observed['first'] = time.time()
+
+    keystrokes = search_page.type_query_by_prefix(query, cadence, on_keystroke=check_first)
+    started = keystrokes[0][0]
+
+    final_result_at = None
+    deadline = time.time() + timeout
+    final_query = query.strip().lower()
+    while time.time() < deadline:
+        answered = [r for r in stub.requests(SEARCH_ROUTE, since=started)
+                    if r['finished'] is not None and not r['cancelled']
+                    and r['query'].get('name', '').strip().lower() == final_query]
+        shown = results_shown()
+        if shown and observed['first'] is None:
+            observed['first'] = time.time()
+        if shown and answered:
+            final_result_at = time.time()
+            break
+        time.sleep(KPI_POLL_INTERVAL)
+
+    # Даем долететь запросам, которые приложение могло отправить позже
+    time.sleep(cadence)
+    return analyze_search_typing(query, keystrokes, stub.requests(SEARCH_ROUTE, since=started),
+                                 observed['first'], final_result_at)
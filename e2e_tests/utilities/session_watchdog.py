@@ -0,0 +1,181 @@
+"""
+Сторож сессии Appium: heartbeat между тестами и восстановление сессии
+
+Если UiAutomator2-сервер падает посреди прогона, каждый следующий тест
+на session-scoped драйвере тратит таймауты впустую. Перед каждым тестом
+с драйвером SessionWatchdog выполняет дешевую команду (GET window/rect,
+она проксируется в UiAutomator2) и классифицирует ошибку:
+
+- session_gone - сессии больше нет (invalid session id, instrumentation
+  UiAutomator2 не запущен): сессия пересоздается на том же объекте
+  драйвера (driver.start_session), page objects и фикстуры его не меняют;
+- server_down - Appium-сервер не принимает соединения;
+- hung - сервер не ответил за SESSION_HEARTBEAT_TIMEOUT.
+
+Если сессию восстановить нельзя, оставшиеся тесты падают сразу с
+причиной. Время, потерянное на тесты с мертвой сессией и на
+восстановление, попадает в итоги pytest.
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from selenium.webdriver.remote.command import Command
+from urllib3.exceptions import HTTPError as TransportError, ReadTimeoutError
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import SESSION_HEARTBEAT_TIMEOUT, SESSION_MAX_RECREATIONS
+from utilities.element_cache import NAVIGATION, screen_state
+
+SESSION_GONE = 'session_gone'
+SERVER_DOWN = 'server_down'
+HUNG = 'hung'
+COMMAND_ERROR = 'command_error'  # обычная ошибка команды, сессия жива
+
+# Сообщения Appium, означающие, что сессия (или UiAutomator2 под ней) умерла
+SESSION_GONE_MESSAGES = (
+    'session is either terminated or not started',
+    'instrumentation process is not running',
+    'uiautomator2 server',
+    'socket hang up',
+    'could not proxy command',
+    'econnrefused',
+)
+
+
+def classify(exc):
+    """Класс ошибки транспорта/сессии для исключения из команды драйвера"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (ReadTimeoutError, socket.timeout)):
+            return HUNG
+        if isinstance(exc, (ConnectionError, TransportError)):
+            return SERVER_DOWN
+        if isinstance(exc, InvalidSessionIdException):
+            return SESSION_GONE
+        if isinstance(exc, WebDriverException):
+            message = (exc.msg or '').lower()
+            if any(text in message for text in SESSION_GONE_MESSAGES):
+                return SESSION_GONE
+            return COMMAND_ERROR
+        exc = getattr(exc, 'reason', None) or exc.__cause__ or exc.__context__
+    return None
+
+
+class SessionDead(Exception):
+    """Сессию не удалось восстановить"""
+
+
+class SessionWatchdog:
+    """Heartbeat и восстановление сессии драйвера"""
+
+    def __init__(self, driver, options, recreate=True, max_recreations=SESSION_MAX_RECREATIONS,
+                 heartbeat_timeout=SESSION_HEARTBEAT_TIMEOUT, on_recreate=None):
+        self.driver = driver
+        self.options = options  # capabilities исходной сессии
+        self.on_recreate = on_recreate  # настройка новой сессии (таймауты и т.п.)
+        self.recreate = recreate
+        self.max_recreations = max_recreations
+        self.heartbeat_timeout = heartbeat_timeout
+        self.recreations = 0
+        self.cause = None  # причина, по которой сессия признана мертвой
+        self.events = []  # [(time.time(), класс ошибки, сообщение, действие)]
+        self.lost_seconds = 0.0
+        self.fast_failed = 0
+        self.heartbeats = 0
+        self.heartbeat_seconds = 0.0
+
+    @property
+    def dead(self):
+        return self.cause is not None
+
+    def heartbeat(self):
+        """Дешевая команда; возвращает None или исключение (socket.timeout при зависании)"""
+        result = {}
+
+        def run():
+            try:
+                self.driver.execute(Command.GET_WINDOW_RECT)
+            except Exception as e:
+                result['error'] = e
+
+        started = time.time()
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(self.heartbeat_timeout)
+        self.heartbeats += 1
+        self.heartbeat_seconds += time.time() - started
+        if thread.is_alive():
+            return socket.timeout(f"heartbeat не ответил за {self.heartbeat_timeout} с")
+        return result.get('error')
+
+    def check(self):
+        """Проверка перед тестом; восстанавливает сессию или бросает SessionDead"""
+        if self.dead:
+            self.fast_failed += 1
+            raise SessionDead(self.cause)
+        error = self.heartbeat()
+        if error is None:
+            return
+        kind = classify(error) or COMMAND_ERROR
+        if kind == COMMAND_ERROR:
+            # Сессия отвечает - это не транспортная ошибка
+            return
+        self._recover(kind, error)
+
+    def _recover(self, kind, error):
+        message = f"{kind}: {str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__}"
+        started = time.time()
+        try:
+            # Зависший сервер пересоздание тоже подвесит
+            if kind == HUNG or not self.recreate or self.recreations >= self.max_recreations:
+                self._give_up(message, 'без восстановления')
+            try:
+                self.driver.execute(Command.QUIT)
+            except Exception:
+                pass
+            try:
+                self.driver.start_session(self.options)
+            except Exception as e:
+                self._give_up(f"{message}; новая сессия не создана: {classify(e) or type(e).__name__}", 'пересоздание не удалось')
+            if self.heartbeat() is not None:
+                self._give_up(f"{message}; новая сессия не отвечает", 'пересоздание не удалось')
+            if self.on_recreate is not None:
+                self.on_recreate(self.driver)
+            self.recreations += 1
+            # Приложение запущено заново: закешированные элементы недействительны
+            screen_state(self.driver).bump(NAVIGATION)
+            self.events.append((started, kind, message, 'сессия пересоздана'))
+        finally:
+            self.lost_seconds += time.time() - started
+
+    def _give_up(self, message, action):
+        self.cause = message
+        self.events.append((time.time(), message.split(':')[0], message, action))
+        raise SessionDead(message)
+
+    def record_failure(self, exc, duration):
+        """Тест упал: если из-за транспорта/сессии - его время потеряно"""
+        kind = classify(exc)
+        if kind in (SESSION_GONE, SERVER_DOWN, HUNG):
+            self.lost_seconds += duration
+            return kind
+        return None
+
+    def summary(self):
+        return {
+            'recreations': self.recreations,
+            'cause': self.cause,
+            'fast_failed': self.fast_failed,
+            'lost_seconds': round(self.lost_seconds, 1),
+            'heartbeats': self.heartbeats,
+            'heartbeat_ms': round(self.heartbeat_seconds / self.heartbeats * 1000, 1) if self.heartbeats else 0.0,
+            'events': [{'time': t, 'kind': kind, 'message': message, 'action': action}
+                       for t, kind, message, action in self.events],
+        }
@@ -0,0 +1,29 @@
+"""
+Генерация тестовых данных
+"""
+import random
+import string
+
+TEST_PASSWORD = "Test123456"
+
+# Профиль по docs/API_CONTRACT.md (POST /my-food/user-profile)
+DEFAULT_PROFILE = {
+    'height': 180,
+    'weight': 75,
+    'gender': 'MALE',
+    'birthday': '1990-05-15',
+    'targetWeightType': 'LOSE',
+    'targetWeight': 70.0,
+    'physicalActivityLevel': 'SECOND',
+    'dayLimitCal': 1800,
+}
+
+
+def generate_test_user(rng=random, length=6):
+    """Случайный тестовый пользователь (email, пароль, имя)"""
+    random_string = ''.join(rng.choices(string.ascii_lowercase, k=length))
+    return {
+        'email': f"test_{random_string}@example.com",
+        'password': TEST_PASSWORD,
+        'name': f"Test User {random_string}",
+    }
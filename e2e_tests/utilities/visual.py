@@ -0,0 +1,316 @@
+"""
+Визуальная регрессия скриншотов
+
+Каждый именованный скриншот шага (BasePage.take_screenshot) сравнивается
+с baseline прямо во время прогона:
+
+- кадр уменьшается до VISUAL_WIDTH по ширине (Pillow, BOX-фильтр) -
+  шум сжатия и сглаживания уходит;
+- динамические области закрываются маской: системные панели
+  (mobile: getSystemBars), элементы из `visual_masks` page object
+  (дата на MainPage);
+- |кадр - baseline| (максимум по каналам RGB, чтобы смена цвета той же
+  яркости не терялась) считается в NumPy и усредняется по плиткам
+  VISUAL_TILE x VISUAL_TILE; кадр отличается, если доля плиток со средней
+  разницей больше VISUAL_PIXEL_THRESHOLD превышает VISUAL_TOLERANCE;
+- по dHash (64 бита) кадра baseline находится по имени или, если имени
+  нет в индексе, ближайший по расстоянию Хэмминга.
+
+Baseline хранится уменьшенным (PNG в VISUAL_BASELINE_DIR + index.json).
+Новые и изменившиеся кадры попадают в VISUAL_PENDING_DIR вместе с
+картинкой различий; принять их в baseline:
+    python -m utilities.visual list
+    python -m utilities.visual approve SignInPage.1_sign_in_page_opened
+    python -m utilities.visual approve --all
+или прогнать тесты с --visual-update.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import weakref
+
+import numpy as np
+from PIL import Image
+
+# Добавляем родительскую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.appium_config import (
+    VISUAL_BASELINE_DIR, VISUAL_HASH_DISTANCE, VISUAL_PENDING_DIR, VISUAL_PIXEL_THRESHOLD, VISUAL_TILE,
+    VISUAL_TOLERANCE, VISUAL_WIDTH,
+)
+
+INDEX_FILE = 'index.json'
+
+MATCH = 'match'
+CHANGED = 'changed'
+NEW = 'new'
+
+_system_bars = weakref.WeakKeyDictionary()
+
+
+def to_frame(png, width=VISUAL_WIDTH):
+    """PNG (bytes) -> уменьшенный кадр RGB uint8 (высота x ширина x 3)"""
+    image = Image.open(io.BytesIO(png)).convert('RGB')
+    if image.width % width == 0:
+        # Целый коэффициент (1080 -> 270): reduce вдвое быстрее resize
+        return np.asarray(image.reduce(image.width // width))
+    height = max(1, round(image.height * width / image.width))
+    return np.asarray(image.resize((width, height), Image.BOX))
+
+
+def dhash(frame):
+    """64-битный difference hash кадра"""
+    small = np.asarray(Image.fromarray(frame).convert('L').resize((9, 8), Image.BOX), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hamming(hashes, value):
+    """Расстояния Хэмминга от value до массива хешей (uint64)"""
+    xor = np.bitwise_xor(np.asarray(hashes, dtype=np.uint64), np.uint64(value))
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def mask_array(shape, regions):
+    """Маска (True - не сравнивать) из областей в долях экрана (x, y, w, h)"""
+    height, width = shape[:2]
+    mask = np.zeros((height, width), dtype=bool)
+    for x, y, w, h in regions:
+        left, top = int(np.floor(x * width)), int(np.floor(y * height))
+        right, bottom = int(np.ceil((x + w) * width)), int(np.ceil((y + h) * height))
+        mask[max(0, top):max(0, bottom), max(0, left):max(0, right)] = True
+    return mask
+
+
+def compare(frame, baseline, mask=None, tile=VISUAL_TILE, pixel_threshold=VISUAL_PIXEL_THRESHOLD):
+    """Доля отличающихся плиток и их маска (плитки x плитки)"""
+    if frame.shape != baseline.shape:
+        return 1.0, None
+    rows, cols = frame.shape[0] // tile, frame.shape[1] // tile
+    height, width = rows * tile, cols * tile
+    frame, baseline = frame[:height, :width], baseline[:height, :width]
+    # |a - b| в uint8 без приведения типов, максимум по каналам (max(axis=2) в разы медленнее)
+    channels = np.maximum(frame, baseline) - np.minimum(frame, baseline)
+    diff = np.maximum(np.maximum(channels[..., 0], channels[..., 1]), channels[..., 2])
+    valid = np.ones((height, width), dtype=bool) if mask is None else ~mask[:height, :width]
+    diff = diff * valid
+    # Сумма и число сравниваемых пикселей по плиткам: сначала по строкам плитки, потом по столбцам
+    tile_sum = diff.reshape(rows, tile, width).sum(axis=1, dtype=np.uint32).reshape(rows, cols, tile).sum(axis=2)
+    tile_valid = valid.reshape(rows, tile, width).sum(axis=1, dtype=np.uint32).reshape(rows, cols, tile).sum(axis=2)
+    compared = tile_valid > 0
+    changed = compared & (tile_sum > pixel_threshold * np.maximum(tile_valid, 1))
+    return float(changed.sum() / max(1, compared.sum())), changed
+
+
+def diff_image(frame, baseline, changed, tile=VISUAL_TILE):
+    """Кадр с отличающимися плитками, подсвеченными красным (PNG bytes)"""
+    rgb = frame.copy()
+    if changed is not None:
+        highlight = np.kron(changed, np.ones((tile, tile), dtype=bool))
+        area = rgb[:highlight.shape[0], :highlight.shape[1]]
+        area[highlight] = (area[highlight] * 0.4 + np.array([255, 0, 0]) * 0.6).astype(np.uint8)
+    side_by_side = np.concatenate([baseline, rgb], axis=1) if baseline.shape == frame.shape else rgb
+    buffer = io.BytesIO()
+    Image.fromarray(side_by_side).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def system_bar_regions(driver):
+    """Статус-бар и панель навигации в долях экрана (один запрос на драйвер)"""
+    if driver not in _system_bars:
+        regions = []
+        try:
+            size = driver.get_window_size()
+            bars = driver.execute_script('mobile: getSystemBars') or {}
+            for bar in ('statusBar', 'navigationBar'):
+                info = bars.get(bar) or {}
+                if info.get('visible') and info.get('height'):
+                    regions.append((info.get('x', 0) / size['width'], info.get('y', 0) / size['height'],
+                                    info['width'] / size['width'], info['height'] / size['height']))
+        except Exception:
+            # Нет mobile: getSystemBars (iOS, старый драйвер) - типичная высота статус-бара
+            regions = [(0.0, 0.0, 1.0, 0.04)]
+        _system_bars[driver] = regions
+    return _system_bars[driver]
+
+
+class BaselineStore:
+    """Уменьшенные baseline-кадры и индекс dHash"""
+
+    def __init__(self, directory=VISUAL_BASELINE_DIR, pending_dir=VISUAL_PENDING_DIR):
+        self.directory = directory
+        self.pending_dir = pending_dir
+        self.index = {}
+        self._frames = {}
+        path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        self._names = list(self.index)
+        self._hashes = np.array([int(self.index[name]['hash'], 16) for name in self._names], dtype=np.uint64)
+
+    def find(self, name, frame_hash, max_distance=VISUAL_HASH_DISTANCE):
+        """Имя baseline: то же имя или ближайший по dHash"""
+        if name in self.index:
+            return name
+        if not self._names:
+            return None
+        distances = hamming(self._hashes, frame_hash)
+        best = int(distances.argmin())
+        return self._names[best] if distances[best] <= max_distance else None
+
+    def frame(self, name):
+        if name not in self._frames:
+            with Image.open(os.path.join(self.directory, f"{name}.png")) as image:
+                self._frames[name] = np.asarray(image.convert('RGB'))
+        return self._frames[name]
+
+    def save(self, name, frame, frame_hash, regions=()):
+        os.makedirs(self.directory, exist_ok=True)
+        Image.fromarray(frame).save(os.path.join(self.directory, f"{name}.png"))
+        self.index[name] = {'hash': f"{frame_hash:016x}", 'shape': list(frame.shape), 'masks': [list(r) for r in regions],
+                            'updated': time.strftime('%Y-%m-%d %H:%M:%S')}
+        self._frames[name] = frame
+        self._names = list(self.index)
+        self._hashes = np.array([int(self.index[n]['hash'], 16) for n in self._names], dtype=np.uint64)
+        self.write_index()
+
+    def write_index(self):
+        with open(os.path.join(self.directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def save_pending(self, name, frame, frame_hash, regions, diff=None):
+        """Кандидат в baseline (новый или изменившийся кадр) на проверку человеком"""
+        os.makedirs(self.pending_dir, exist_ok=True)
+        Image.fromarray(frame).save(os.path.join(self.pending_dir, f"{name}.png"))
+        with open(os.path.join(self.pending_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump({'hash': f"{frame_hash:016x}", 'masks': [list(r) for r in regions]}, f)
+        if diff is not None:
+            with open(os.path.join(self.pending_dir, f"{name}.diff.png"), 'wb') as f:
+                f.write(diff)
+
+    def pending(self):
+        if not os.path.isdir(self.pending_dir):
+            return []
+        return sorted(name[:-len('.json')] for name in os.listdir(self.pending_dir) if name.endswith('.json'))
+
+    def approve(self, name):
+        """Переносит кандидата в baseline"""
+        with open(os.path.join(self.pending_dir, f"{name}.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with Image.open(os.path.join(self.pending_dir, f"{name}.png")) as image:
+            frame = np.asarray(image.convert('RGB'))
+        self.save(name, frame, int(meta['hash'], 16), [tuple(r) for r in meta['masks']])
+        for suffix in ('.png', '.json', '.diff.png'):
+            path = os.path.join(self.pending_dir, f"{name}{suffix}")
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class VisualChecker:
+    """Сравнение кадров прогона с baseline"""
+
+    def __init__(self, store=None, update=False, tolerance=VISUAL_TOLERANCE):
+        self.store = store or BaselineStore()
+        self.update = update  # сразу записывать новые и изменившиеся кадры в baseline
+        self.tolerance = tolerance
+        self.results = []
+        self.compare_ms = 0.0
+
+    def check(self, name, png, regions=()):
+        """Сравнивает скриншот с baseline; возвращает результат (dict)"""
+        started = time.perf_counter()
+        frame = to_frame(png)
+        decoded = time.perf_counter()
+        frame_hash = dhash(frame)
+        mask = mask_array(frame.shape, regions)
+        baseline_name = self.store.find(name, frame_hash)
+        if baseline_name is None:
+            status, ratio, changed, baseline = NEW, None, None, None
+        else:
+            baseline = self.store.frame(baseline_name)
+            # Маски baseline тоже действуют: дата могла сдвинуться
+            stored = self.store.index[baseline_name].get('masks', [])
+            ratio, changed = compare(frame, baseline, mask | mask_array(frame.shape, stored))
+            status = MATCH if ratio <= self.tolerance else CHANGED
+        compared = time.perf_counter()
+
+        if status != MATCH:
+            if self.update:
+                self.store.save(name, frame, frame_hash, regions)
+            else:
+                diff = diff_image(frame, baseline, changed) if baseline is not None else None
+                self.store.save_pending(name, frame, frame_hash, regions, diff)
+        result = {
+            'name': name,
+            'baseline': baseline_name,
+            'status': status,
+            'changed_ratio': None if ratio is None else round(ratio, 4),
+            'decode_ms': round((decoded - started) * 1000.0, 2),
+            'compare_ms': round((compared - decoded) * 1000.0, 2),
+        }
+        self.compare_ms += compared - decoded
+        self.results.append(result)
+        return result
+
+    def summary(self):
+        counts = {status: sum(1 for r in self.results if r['status'] == status) for status in (MATCH, CHANGED, NEW)}
+        frames = len(self.results)
+        return dict(counts, frames=frames,
+                    compare_ms=round(self.compare_ms * 1000.0 / frames, 2) if frames else 0.0,
+                    decode_ms=round(sum(r['decode_ms'] for r in self.results) / frames, 2) if frames else 0.0)
+
+
+# Проверка, активная в прогоне (создается в conftest при E2E_VISUAL_CHECK=1)
+checker = None
+
+
+def page_regions(page):
+    """Области для маски: системные панели и элементы visual_masks page object"""
+    driver = page.driver
+    regions = list(system_bar_regions(driver))
+    locators = getattr(page, 'visual_masks', ())
+    if locators:
+        size = driver.get_window_size()
+        for locator in locators:
+            for element in page.find_elements(locator, timeout=0):
+                rect = element.rect
+                regions.append((rect['x'] / size['width'], rect['y'] / size['height'],
+                                rect['width'] / size['width'], rect['height'] / size['height']))
+    return regions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Baseline визуальной регрессии')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='Кандидаты в baseline после прогона')
+    approve = commands.add_parser('approve', help='Принять кандидатов в baseline')
+    approve.add_argument('names', nargs='*')
+    approve.add_argument('--all', action='store_true')
+    commands.add_parser('clear', help='Удалить кандидатов')
+    args = parser.parse_args(argv)
+
+    store = BaselineStore()
+    pending = store.pending()
+    if args.command == 'list':
+        for name in pending:
+            kind = 'изменился' if name in store.index else 'новый'
+            print(f"{name}: {kind} ({os.path.join(store.pending_dir, name)}.png)")
+        print(f"Кандидатов: {len(pending)}")
+    elif args.command == 'approve':
+        names = pending if args.all else args.names
+        for name in names:
+            store.approve(name)
+            print(f"{name}: принят в baseline")
+    elif args.command == 'clear':
+        shutil.rmtree(store.pending_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())